@@ -0,0 +1,424 @@
+"""
+Serves the contacts and notes over a local HTTP/JSON API.
+
+One warm pair of managers is shared by all clients. Requests are handled on a thread per connection
+(connections are kept alive). Reads share the read lock of a manager and run concurrently, while
+changes hold its write lock, so every request sees the managers in a consistent state. Records are
+converted to dictionaries while the lock is held and encoded to JSON after it is released.
+
+Routes (request and response bodies are JSON):
+
+    GET    /contacts?q=&limit=&offset=&cursor=   page of contacts, optionally filtered by a query
+                                                 in the search language, e.g. q=name~ivan birthday_month:5
+    POST   /contacts                             add a contact
+    GET    /contacts/<name>                      one contact
+    PUT    /contacts/<name>                      change the given fields of a contact
+    DELETE /contacts/<name>                      remove a contact
+    GET    /birthdays?days=7                     upcoming birthdays
+    GET    /notes?title=&tag=&limit=&offset=&cursor=
+    POST   /notes                                add a note (the id is assigned by the server)
+    GET    /notes/<id>                           one note
+    PUT    /notes/<id>                           change the content and tags of a note
+    DELETE /notes/<id>                           remove a note
+    GET    /stats                                latency statistics (with --stats)
+
+Errors are returned as {"error": "..."} with a 4xx (or 500) status. Messages that the managers print while
+changing records are returned in the "messages" field of the response.
+"""
+
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from managers import ContactManager, NoteManager
+from managers.pagination import Page, paginate
+from models import Contact, Note
+from utils.exceptions import ValidationError
+from utils.output import thread_output
+from batch import ANSI_ESCAPE
+from metrics import metrics
+from colors import format_green, format_yellow
+
+
+class ApiError(Exception):
+    """
+    An error answered with an HTTP status and a JSON error message.
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = ANSI_ESCAPE.sub("", message)
+
+
+Route = Tuple[str, "re.Pattern[str]", Callable[..., Tuple[int, Any]]]
+
+
+class AssistantApi:
+    """
+    The API operations on top of the contact and note managers, independent of the HTTP transport.
+    """
+
+    def __init__(self, contact_manager: ContactManager, note_manager: NoteManager) -> None:
+        """
+        Initializes the API and loads the data, so the first request is as fast as the others.
+
+        Args:
+            contact_manager (ContactManager): The manager for contacts.
+            note_manager (NoteManager): The manager for notes.
+        """
+        self.contact_manager = contact_manager
+        self.note_manager = note_manager
+        # What a request prints is captured on its own thread, so requests never get each other's messages
+        self._output = thread_output()
+        self.routes: List[Route] = [
+            ("GET", re.compile(r"/contacts"), self.list_contacts),
+            ("POST", re.compile(r"/contacts"), self.add_contact),
+            ("GET", re.compile(r"/contacts/(?P<name>[^/]+)"), self.get_contact),
+            ("PUT", re.compile(r"/contacts/(?P<name>[^/]+)"), self.edit_contact),
+            ("DELETE", re.compile(r"/contacts/(?P<name>[^/]+)"), self.remove_contact),
+            ("GET", re.compile(r"/birthdays"), self.upcoming_birthdays),
+            ("GET", re.compile(r"/notes"), self.list_notes),
+            ("POST", re.compile(r"/notes"), self.add_note),
+            ("GET", re.compile(r"/notes/(?P<note_id>\d+)"), self.get_note),
+            ("PUT", re.compile(r"/notes/(?P<note_id>\d+)"), self.edit_note),
+            ("DELETE", re.compile(r"/notes/(?P<note_id>\d+)"), self.remove_note),
+            ("GET", re.compile(r"/stats"), self.stats),
+        ]
+        contact_manager.find_contact("")
+        note_manager.get_note_by_id(0)
+
+    def handle(self, method: str, target: str, body: Optional[bytes]) -> Tuple[int, Any]:
+        """
+        Runs one request.
+
+        Args:
+            method (str): The HTTP method.
+            target (str): The request target (path and query string).
+            body (Optional[bytes]): The request body, if any.
+
+        Returns:
+            Tuple[int, Any]: The HTTP status and the JSON-serializable response.
+        """
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        # Another assistant process may have saved changes since the last request
+        self.contact_manager.refresh()
+        self.note_manager.refresh()
+
+        path_matched = False
+        for route_method, pattern, operation in self.routes:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            started = time.perf_counter_ns()
+            try:
+                parameters = {name: unquote(value) for name, value in match.groupdict().items()}
+                if method in ("POST", "PUT"):
+                    parameters["data"] = self._decode_body(body)
+                return operation(query=query, **parameters)
+            except ApiError as ex:
+                return ex.status, {"error": ex.message}
+            except Exception as ex:
+                return 500, {"error": ANSI_ESCAPE.sub("", f"Internal error: {ex}")}
+            finally:
+                if metrics.enabled:
+                    metrics.record(f"api.{method} {pattern.pattern}", time.perf_counter_ns() - started)
+
+        if path_matched:
+            return 405, {"error": f"Method {method} is not allowed for {path}."}
+        return 404, {"error": f"Unknown path {path}."}
+
+    @staticmethod
+    def _decode_body(body: Optional[bytes]) -> Dict[str, Any]:
+        """
+        Decodes a JSON object request body.
+
+        Raises:
+            ApiError: If the body is missing or is not a JSON object.
+        """
+        try:
+            data = json.loads(body or b"")
+        except ValueError as ex:
+            raise ApiError(400, f"Invalid JSON body: {ex}")
+        if not isinstance(data, dict):
+            raise ApiError(400, "The request body must be a JSON object.")
+        return data
+
+    @staticmethod
+    def _page_options(query: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Reads the paging parameters of a list request.
+
+        Raises:
+            ApiError: If the limit or offset is not a number.
+        """
+        try:
+            return {
+                "limit": int(query.get("limit", 50)),
+                "offset": int(query.get("offset", 0)),
+                "cursor": query.get("cursor"),
+            }
+        except ValueError:
+            raise ApiError(400, "The limit and offset must be numbers.")
+
+    @staticmethod
+    def _page_response(page: Page) -> Dict[str, Any]:
+        """
+        Converts a page of records into its JSON form.
+        """
+        return {
+            "items": [record.to_dict() for record in page.items],
+            "total": page.total,
+            "offset": page.offset,
+            "limit": page.limit,
+            "next_cursor": page.next_cursor,
+        }
+
+    def _call(self, operation: Callable[[], Any]) -> Tuple[Any, List[str]]:
+        """
+        Calls a manager method that prints its outcome, capturing what it prints on this thread only.
+
+        Returns:
+            Tuple[Any, List[str]]: The result of the call and the uncolored messages it printed.
+        """
+        with self._output.capture() as output:
+            result = operation()
+        return result, [ANSI_ESCAPE.sub("", line) for line in output.getvalue().splitlines() if line]
+
+    def list_contacts(self, query: Dict[str, str]) -> Tuple[int, Any]:
+        """
+        Returns a page of contacts, filtered by the query 'q' if given.
+        """
+        options = self._page_options(query)
+        with self.contact_manager.lock.read():
+            try:
+                if query.get("q"):
+                    contacts = self.contact_manager.query(query["q"])
+                    page = paginate(contacts, lambda contact: contact.name, **options)
+                else:
+                    page = self.contact_manager.get_contacts_page(**options)
+            except ValueError as ex:
+                raise ApiError(400, str(ex))
+            return 200, self._page_response(page)
+
+    def get_contact(self, query: Dict[str, str], name: str) -> Tuple[int, Any]:
+        """
+        Returns the contact with the given name.
+        """
+        with self.contact_manager.lock.read():
+            contact = self.contact_manager.find_contact(name)
+            if contact is None:
+                raise ApiError(404, f"Contact '{name}' not found.")
+            return 200, contact.to_dict()
+
+    def add_contact(self, query: Dict[str, str], data: Dict[str, Any]) -> Tuple[int, Any]:
+        """
+        Adds a contact from the request data.
+        """
+        contact = _build_record(Contact, {"address": "", **data})
+        with self.contact_manager.lock.write():
+            if self.contact_manager.find_contact(contact.name):
+                raise ApiError(409, f"Contact '{contact.name}' already exists.")
+            _, messages = self._call(lambda: self.contact_manager.add_contact(contact))
+            return 201, {"contact": contact.to_dict(), "messages": messages}
+
+    def edit_contact(self, query: Dict[str, str], name: str, data: Dict[str, Any]) -> Tuple[int, Any]:
+        """
+        Changes the given fields of a contact; the name stays the same.
+        """
+        with self.contact_manager.lock.write():
+            existing = self.contact_manager.find_contact(name)
+            if existing is None:
+                raise ApiError(404, f"Contact '{name}' not found.")
+            updated = _build_record(Contact, {**existing.to_dict(), **data, "name": name})
+            _, messages = self._call(lambda: self.contact_manager.edit_contact(name, updated))
+            return 200, {"contact": self.contact_manager.find_contact(name).to_dict(), "messages": messages}
+
+    def remove_contact(self, query: Dict[str, str], name: str) -> Tuple[int, Any]:
+        """
+        Removes the contact with the given name.
+        """
+        with self.contact_manager.lock.write():
+            if self.contact_manager.find_contact(name) is None:
+                raise ApiError(404, f"Contact '{name}' not found.")
+            _, messages = self._call(lambda: self.contact_manager.remove_contact(name))
+            return 200, {"messages": messages}
+
+    def upcoming_birthdays(self, query: Dict[str, str]) -> Tuple[int, Any]:
+        """
+        Returns the birthdays in the next 'days' days.
+        """
+        try:
+            days = int(query.get("days", 7))
+        except ValueError:
+            raise ApiError(400, "The number of days must be a number.")
+        with self.contact_manager.lock.read():
+            return 200, self.contact_manager.get_upcoming_birthdays(days)
+
+    def stats(self, query: Dict[str, str]) -> Tuple[int, Any]:
+        """
+        Returns the latency statistics, collected when the server was started with --stats.
+        """
+        return 200, metrics.to_dict()
+
+    def list_notes(self, query: Dict[str, str]) -> Tuple[int, Any]:
+        """
+        Returns a page of notes, filtered by 'title' or 'tag' if given.
+        """
+        options = self._page_options(query)
+        with self.note_manager.lock.read():
+            try:
+                if query.get("title"):
+                    notes = self.note_manager.search_by_title(query["title"])
+                elif query.get("tag"):
+                    notes = self.note_manager.search_by_tag(query["tag"])
+                else:
+                    return 200, self._page_response(self.note_manager.get_notes_page(**options))
+                return 200, self._page_response(paginate(notes, lambda note: note.id, **options))
+            except (ValueError, RuntimeError) as ex:
+                raise ApiError(400, str(ex))
+
+    def get_note(self, query: Dict[str, str], note_id: str) -> Tuple[int, Any]:
+        """
+        Returns the note with the given id.
+        """
+        with self.note_manager.lock.read():
+            note = self.note_manager.get_note_by_id(int(note_id))
+            if note is None:
+                raise ApiError(404, f"Note with id {note_id} not found.")
+            return 200, note.to_dict()
+
+    def add_note(self, query: Dict[str, str], data: Dict[str, Any]) -> Tuple[int, Any]:
+        """
+        Adds a note from the request data with the next free id.
+        """
+        fields = {name: data.get(name, "") for name in ("title", "contact", "content")}
+        fields["tags"] = _tags_of(data)
+        with self.note_manager.lock.write():
+            note = _build_record(Note, {"id": self.note_manager.next_note_id(), **fields})
+            if self.note_manager.find_note_by_title(note.title):
+                raise ApiError(409, f"A note with the title '{note.title}' already exists.")
+            valid, messages = self._call(lambda: self.note_manager.validate_note(note))
+            if not valid:
+                raise ApiError(400, " ".join(messages))
+            _, messages = self._call(lambda: self.note_manager.add_note(note))
+            return 201, {"note": note.to_dict(), "messages": messages}
+
+    def edit_note(self, query: Dict[str, str], note_id: str, data: Dict[str, Any]) -> Tuple[int, Any]:
+        """
+        Replaces the content and tags of a note; empty values keep the current ones.
+        """
+        with self.note_manager.lock.write():
+            note = self.note_manager.get_note_by_id(int(note_id))
+            if note is None:
+                raise ApiError(404, f"Note with id {note_id} not found.")
+            updated = Note(id=note.id, content=str(data.get("content", "")), tags=_tags_of(data))
+            _, messages = self._call(lambda: self.note_manager.edit_note(note.id, updated))
+            return 200, {"note": note.to_dict(), "messages": messages}
+
+    def remove_note(self, query: Dict[str, str], note_id: str) -> Tuple[int, Any]:
+        """
+        Removes the note with the given id.
+        """
+        with self.note_manager.lock.write():
+            note = self.note_manager.get_note_by_id(int(note_id))
+            if note is None:
+                raise ApiError(404, f"Note with id {note_id} not found.")
+            _, messages = self._call(lambda: self.note_manager.remove_note(note.title))
+            return 200, {"messages": messages}
+
+
+def _build_record(record_type: type, data: Dict[str, Any]) -> Any:
+    """
+    Creates a validated Contact or Note from request data.
+
+    Raises:
+        ApiError: If a field is unknown or invalid.
+    """
+    try:
+        return record_type(**data)
+    except TypeError as ex:
+        raise ApiError(400, f"Invalid fields: {ex}")
+    except (ValidationError, ValueError) as ex:
+        raise ApiError(400, str(ex))
+
+
+def _tags_of(data: Dict[str, Any]) -> List[str]:
+    """
+    Reads the tags of a note from request data, as a list or a comma-separated string.
+    """
+    tags = data.get("tags", [])
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return [str(tag).strip() for tag in tags if str(tag).strip()]
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    Translates HTTP requests into calls of the AssistantApi.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs stall every keep-alive response
+    disable_nagle_algorithm = True
+    server: "ApiServer"
+
+    def _respond(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        status, payload = self.server.api.handle(self.command, self.path, body)
+
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ApiServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server for one AssistantApi.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], api: AssistantApi, verbose: bool = False) -> None:
+        self.api = api
+        self.verbose = verbose
+        super().__init__(address, ApiRequestHandler)
+
+
+def run_api_server(
+    host: str, port: int, contact_manager: ContactManager, note_manager: NoteManager
+) -> None:
+    """
+    Serves the API until Ctrl+C.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        contact_manager (ContactManager): The manager for contacts.
+        note_manager (NoteManager): The manager for notes.
+    """
+    with ApiServer((host, port), AssistantApi(contact_manager, note_manager)) as server:
+        print(format_green(f"Serving the API on http://{host}:{server.server_address[1]}. Press Ctrl+C to stop."))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    print(format_yellow("API server stopped."))
@@ -0,0 +1,207 @@
+"""
+Runs assistant commands from a script instead of the interactive prompt.
+
+Each line of the script is one command with its arguments given by name, either as text
+
+    add_contact name="Ivan Petrenko" address="" phone_number=+380501234567 email=ivan@example.com birthday=01.02.1990
+
+or as a JSON object
+
+    {"command": "add_note", "args": {"title": "Call Ivan", "contact": "Ivan Petrenko", "content": "About the trip", "tags": ""}}
+
+Empty lines and lines starting with '#' are ignored, and 'exit' stops the script. The argument names are
+the ones listed for each command by `help`. Every argument a command asks for must be given, with an
+empty value to skip an optional answer: an omitted argument, an unknown one or a rejected value fails
+the command.
+All changes are saved once, after the last command; a failed command keeps none of its changes.
+"""
+
+import io
+import json
+import re
+import shlex
+import time
+from contextlib import redirect_stdout
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from managers import ContactManager, NoteManager
+from constants import COMMAND
+from commands import registry
+from utils.prompts import provided_arguments
+from utils.custom_decorators import collect_errors
+from colors import format_red
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+# A shell-like word: unquoted characters and quoted parts without escapes, e.g. name="Ivan Petrenko"
+WORD = re.compile(r"""(?:[^\s"']+|"[^"]*"|'[^']*')+""")
+QUOTED = re.compile(r""""([^"]*)"|'([^']*)'""")
+
+
+class _CommandFailed(Exception):
+    """
+    Rolls back the changes of a command that reported an error without raising it.
+    """
+
+
+@dataclass
+class BatchResult:
+    """
+    The result of one scripted command.
+
+    Attributes:
+        line (int): The line number in the script.
+        command (str): The command name.
+        status (str): 'ok', or 'error' if the command failed or is unknown.
+        output (str): The text the command printed, without colors.
+        error (Optional[str]): The error message for a failed command.
+        duration_ms (float): How long the command took, in milliseconds.
+    """
+
+    line: int
+    command: str
+    status: str
+    output: str
+    error: Optional[str]
+    duration_ms: float
+
+    def to_dict(self) -> dict:
+        """
+        Converts the BatchResult object into a dictionary.
+
+        Returns:
+            dict: A dictionary representation of the result.
+        """
+        return asdict(self)
+
+
+def parse_batch_line(line: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Parses one script line into a command and its named arguments.
+
+    Args:
+        line (str): A text line ('command key=value ...') or a JSON object line.
+
+    Returns:
+        Optional[Tuple[str, Dict[str, Any]]]: The command and its arguments, or None for an empty
+                                              or comment line.
+
+    Raises:
+        ValueError: If the line is malformed.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    if line.startswith("{"):
+        data = json.loads(line)
+        if not isinstance(data, dict) or not isinstance(data.get("command"), str):
+            raise ValueError(format_red("A JSON command needs a 'command' string."))
+        arguments = data.get("args", {})
+        if not isinstance(arguments, dict):
+            raise ValueError(format_red("The 'args' of a JSON command must be an object."))
+        return data["command"].strip().lower(), arguments
+
+    if "\\" in line:
+        words = shlex.split(line)
+    else:
+        # Much faster than shlex for the common case of lines without escapes
+        words = [
+            QUOTED.sub(lambda match: match.group(1) if match.group(1) is not None else match.group(2), word)
+            for word in WORD.findall(line)
+        ]
+    command, *terms = words
+    arguments = {}
+    for term in terms:
+        name, separator, value = term.partition("=")
+        if not separator or not name:
+            raise ValueError(format_red(f"Invalid argument '{term}'. Expected name=value."))
+        arguments[name] = value
+    return command.lower(), arguments
+
+
+def run_command(
+    command: str,
+    arguments: Dict[str, Any],
+    contact_manager: ContactManager,
+    note_manager: NoteManager,
+) -> Tuple[str, str, Optional[str]]:
+    """
+    Runs one command with provided arguments, capturing what it prints.
+
+    The command runs in a transaction of both managers, so a failed command keeps none of its changes;
+    inside the transaction of a batch, only its own changes are rolled back.
+
+    Args:
+        command (str): The command name.
+        arguments (Dict[str, Any]): The named arguments.
+        contact_manager (ContactManager): The manager for contacts.
+        note_manager (NoteManager): The manager for notes.
+
+    Returns:
+        Tuple[str, str, Optional[str]]: The status, the uncolored output and the error message, if any.
+    """
+    spec = registry.get(command)
+    if spec is None:
+        return "error", "", f"Unknown command '{command}'."
+    unknown = [name for name in arguments if name not in spec.arguments]
+    if unknown:
+        expected = ", ".join(spec.arguments) or "none"
+        return "error", "", f"Unknown argument '{unknown[0]}' for '{command}'. Expected: {expected}."
+
+    buffer = io.StringIO()
+    error = None
+    with redirect_stdout(buffer), provided_arguments(arguments), collect_errors() as errors:
+        try:
+            # Picks up changes saved by another process; a no-op inside the transaction of a batch
+            contact_manager.refresh()
+            note_manager.refresh()
+            with contact_manager.transaction(), note_manager.transaction():
+                spec.invoke(contact_manager, note_manager)
+                if errors:
+                    raise _CommandFailed
+        except _CommandFailed:
+            pass
+        except Exception as ex:
+            errors.append(str(ex))
+    if errors:
+        error = ANSI_ESCAPE.sub("", errors[0])
+
+    return ("error" if error else "ok"), ANSI_ESCAPE.sub("", buffer.getvalue()), error
+
+
+def run_batch(
+    lines: Iterable[str], contact_manager: ContactManager, note_manager: NoteManager
+) -> List[BatchResult]:
+    """
+    Runs every command of a script and saves the changes once at the end.
+
+    Args:
+        lines (Iterable[str]): The script lines.
+        contact_manager (ContactManager): The manager for contacts.
+        note_manager (NoteManager): The manager for notes.
+
+    Returns:
+        List[BatchResult]: One result per command, in script order.
+    """
+    results = []
+    with contact_manager.transaction(), note_manager.transaction():
+        for number, line in enumerate(lines, start=1):
+            started = time.perf_counter()
+            try:
+                parsed = parse_batch_line(line)
+            except ValueError as ex:
+                results.append(BatchResult(number, "", "error", "", ANSI_ESCAPE.sub("", str(ex)), 0.0))
+                continue
+            if parsed is None:
+                continue
+
+            command, arguments = parsed
+            if command == COMMAND.EXIT:
+                break
+
+            status, output, error = run_command(command, arguments, contact_manager, note_manager)
+            duration_ms = (time.perf_counter() - started) * 1000
+            results.append(BatchResult(number, command, status, output, error, duration_ms))
+
+    return results
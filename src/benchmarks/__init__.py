@@ -0,0 +1,5 @@
+"""
+Benchmarks for the personal assistant.
+
+Run the modules from the 'src' directory, e.g. `python -m benchmarks.memory_benchmark`.
+"""
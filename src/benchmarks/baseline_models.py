@@ -0,0 +1,107 @@
+"""
+The Contact and Note models as they were before they declared __slots__, kept as the baseline of the
+memory benchmark.
+
+The layout is unchanged from the original models: `Contact` is a dataclass whose fields are shadowed
+by validating properties that store name-mangled attributes in the instance __dict__, and `Note` is a
+plain dataclass holding the tag list it was given. Only the methods the benchmark does not use are left
+out.
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import List, Optional
+
+
+@dataclass
+class BaselineContact:
+    name: str
+    address: str
+    phone_number: str
+    email: str
+    birthday: Optional[str] = field(default=None)
+
+    def __post_init__(self):
+        self._validate_phone_number(self.phone_number)
+        self._validate_email(self.email)
+        if self.birthday:
+            self._validate_birthday(self.birthday)
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self.__name = value
+
+    @property
+    def address(self) -> str:
+        return self.__address
+
+    @address.setter
+    def address(self, value: str) -> None:
+        self.__address = value
+
+    @property
+    def phone_number(self) -> str:
+        return self.__phone_number
+
+    @phone_number.setter
+    def phone_number(self, value: str) -> None:
+        self._validate_phone_number(value)
+        self.__phone_number = value
+
+    @property
+    def email(self) -> str:
+        return self.__email
+
+    @email.setter
+    def email(self, value: str) -> None:
+        self._validate_email(value)
+        self.__email = value
+
+    @property
+    def birthday(self) -> str:
+        return self.__birthday
+
+    @birthday.setter
+    def birthday(self, value: str) -> None:
+        self._validate_birthday(value)
+        self.__birthday = value
+
+    def _validate_phone_number(self, phone_number: str) -> None:
+        if not re.match(r"^(?:\+380|0)[\d]{9,12}$", phone_number):
+            raise ValueError(f"Invalid phone number: {phone_number}.")
+
+    def _validate_email(self, email: str) -> None:
+        if not re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", email):
+            raise ValueError(f"Invalid email address: {email}.")
+
+    def _validate_birthday(self, birthday: str) -> None:
+        if not re.match(r"^\d{2}\.\d{2}\.\d{4}$", birthday):
+            raise ValueError(f"Invalid birthday format: {birthday}.")
+        if datetime.strptime(birthday, "%d.%m.%Y").date() > date.today():
+            raise ValueError("Birthday cannot be in the future.")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class BaselineNote:
+    id: int = 0
+    title: str = ""
+    contact: str = ""
+    content: str = ""
+    tags: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+
+    def to_dict(self) -> dict:
+        note_dict = asdict(self)
+        for name in ("created_at", "updated_at"):
+            value = note_dict[name]
+            note_dict[name] = value.isoformat() if isinstance(value, datetime) else value
+        return note_dict
@@ -0,0 +1,201 @@
+"""
+Concurrency stress test for the contact and note managers.
+
+Runs reader threads (exact lookups, indexed queries, tag searches) against the managers, first alone
+to report the read throughput for each number of readers, then together with writer threads that
+replace contacts and toggle note tags inside transactions. The reads are CPU-bound and share the
+interpreter lock, so throughput grows little with more readers (about 1.4x from 1 to 4 readers on
+one machine); readers never wait for each other, but they do not run in parallel. The readers check invariants that only
+hold if they never observe a half-applied change:
+
+- the number of contacts never changes (every removal is paired with an addition),
+- every contact can be found by name and by an indexed phone query,
+- the temporary 'stress' tag is never visible (it is added and removed in the same transaction).
+
+Data is kept in a temporary directory, so the real data files are not touched.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.concurrency_stress --records 5000 --seconds 2 --readers 1 2 4 8 --writers 2 --write-interval 0.5
+"""
+
+import argparse
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from typing import List, Tuple
+from benchmarks.memory_benchmark import _contact_rows, _note_rows
+from managers import ContactManager, NoteManager
+from models import Contact
+from storage import ContactStorage, NoteStorage
+
+STRESS_TAG = "stress"
+
+
+class StressRun:
+    """
+    One run of reader and writer threads with shared counters and recorded violations.
+    """
+
+    def __init__(
+        self, contact_manager: ContactManager, note_manager: NoteManager, records: int, write_interval: float
+    ) -> None:
+        self.contact_manager = contact_manager
+        self.note_manager = note_manager
+        self.records = records
+        self.write_interval = write_interval
+        self.stop = threading.Event()
+        self.reads = 0
+        self.writes = 0
+        self.violations: List[str] = []
+        self._counter_lock = threading.Lock()
+
+    def _violation(self, message: str) -> None:
+        with self._counter_lock:
+            if len(self.violations) < 20:
+                self.violations.append(message)
+
+    def reader(self, seed: int) -> None:
+        """
+        Runs lookups and checks the invariants until stopped.
+        """
+        generator = random.Random(seed)
+        reads = 0
+        while not self.stop.is_set():
+            i = generator.randrange(self.records)
+            name = f"Name{i} Surname{i % 5000}"
+
+            contact = self.contact_manager.find_contact(name)
+            if contact is None:
+                self._violation(f"Contact '{name}' not found by name.")
+            else:
+                found = self.contact_manager.query(f"phone:{contact.phone_number}")
+                if [match.name for match in found] != [name]:
+                    self._violation(f"Phone query for '{name}' returned {[match.name for match in found]}.")
+
+            if reads % 50 == 0:
+                total = len(self.contact_manager.get_all_contacts())
+                if total != self.records:
+                    self._violation(f"Saw {total} contacts instead of {self.records}.")
+                if self.note_manager.search_by_tag(STRESS_TAG):
+                    self._violation("Saw a temporary tag of an uncommitted transaction.")
+            reads += 1
+
+        with self._counter_lock:
+            self.reads += reads
+
+    def writer(self, seed: int) -> None:
+        """
+        Replaces contacts and toggles note tags inside transactions until stopped.
+        """
+        generator = random.Random(seed)
+        writes = 0
+        while not self.stop.is_set():
+            i = generator.randrange(self.records)
+            name = f"Name{i} Surname{i % 5000}"
+            with self.contact_manager.transaction():
+                contact = self.contact_manager.find_contact(name)
+                self.contact_manager.remove_contact(name)
+                self.contact_manager.add_contact(
+                    Contact(
+                        name=name,
+                        address=f"Kyiv, street {writes}",
+                        phone_number=contact.phone_number,
+                        email=contact.email,
+                        birthday=contact.birthday,
+                    )
+                )
+
+            note_id = generator.randrange(self.records) + 1
+            with self.note_manager.transaction():
+                self.note_manager.add_tag(note_id, STRESS_TAG)
+                self.note_manager.remove_tag(note_id, STRESS_TAG)
+            writes += 1
+            self.stop.wait(self.write_interval)
+
+        with self._counter_lock:
+            self.writes += writes
+
+    def run(self, readers: int, writers: int, seconds: float) -> Tuple[float, float]:
+        """
+        Runs the threads for the given time.
+
+        Returns:
+            Tuple[float, float]: Reads and writes per second.
+        """
+        threads = [threading.Thread(target=self.reader, args=(n,)) for n in range(readers)]
+        threads += [threading.Thread(target=self.writer, args=(1000 + n,)) for n in range(writers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return self.reads / elapsed, self.writes / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stress the managers with concurrent readers and writers.")
+    parser.add_argument("--records", type=int, default=5000, help="Number of contacts and notes.")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duration of each run.")
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8], help="Reader thread counts.")
+    parser.add_argument("--writers", type=int, default=2, help="Writer threads in the mixed runs.")
+    parser.add_argument(
+        "--write-interval",
+        type=float,
+        default=0.5,
+        help="Pause of a writer between changes, in seconds. Every change saves a data file while holding "
+        "the write lock, so writers without pauses leave the readers little time.",
+    )
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        contacts_path = os.path.join(directory, "contacts.json")
+        notes_path = os.path.join(directory, "notes.json")
+        with open(contacts_path, "w", encoding="utf-8") as file:
+            file.write(_contact_rows(options.records))
+        with open(notes_path, "w", encoding="utf-8") as file:
+            file.write(_note_rows(options.records))
+
+        contact_manager = ContactManager(ContactStorage(contacts_path))
+        note_manager = NoteManager(NoteStorage(notes_path))
+
+        violations: List[str] = []
+        baseline = None
+        print(f"{'Readers':>8}{'Writers':>9}{'Reads/s':>12}{'Scaling':>9}{'Writes/s':>10}")
+        # The managers print a message for every change
+        with redirect_stdout(io.StringIO()):
+            rows = []
+            for writers in (0, options.writers):
+                for readers in options.readers:
+                    run = StressRun(contact_manager, note_manager, options.records, options.write_interval)
+                    reads_per_second, writes_per_second = run.run(readers, writers, options.seconds)
+                    violations += run.violations
+                    rows.append((readers, writers, reads_per_second, writes_per_second))
+
+        for readers, writers, reads_per_second, writes_per_second in rows:
+            if writers == 0 and baseline is None:
+                baseline = reads_per_second
+            scaling = reads_per_second / baseline if baseline else 0.0
+            print(f"{readers:>8}{writers:>9}{reads_per_second:>12.0f}{scaling:>8.2f}x{writes_per_second:>10.1f}")
+
+        saved = len(ContactStorage(contacts_path).load_data())
+        if saved != options.records:
+            violations.append(f"The saved file has {saved} contacts instead of {options.records}.")
+
+    if violations:
+        print(f"\n{len(violations)} violation(s):")
+        for violation in violations:
+            print(f"  {violation}")
+        return 1
+    print("\nNo violations: readers always saw a consistent state.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+"""
+Deterministic generator of realistic contacts and notes for benchmarks and manual testing.
+
+The same seed always produces the same records, so benchmark runs on different machines or commits
+work on identical data. Every generated contact passes the validation of the Contact model: a unique
+name, a Ukrainian mobile number (+380 and an operator code), an email address and a birthday in the
+past. Notes have unique titles, content of varying length, tags drawn from a skewed distribution (a
+few tags are on most notes, most tags are rare, as in real collections) and a link to a contact for
+about half of them.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.data_generator --contacts 100000 --notes 100000 --seed 1 --output /tmp/dataset
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+FIRST_NAMES = (
+    "Oleksandr", "Andrii", "Dmytro", "Serhii", "Ivan", "Mykola", "Volodymyr", "Yurii", "Taras", "Bohdan",
+    "Oleh", "Vasyl", "Petro", "Roman", "Maksym", "Artem", "Denys", "Viktor", "Ihor", "Yaroslav",
+    "Olena", "Nataliia", "Iryna", "Tetiana", "Oksana", "Yuliia", "Kateryna", "Mariia", "Anna", "Viktoriia",
+    "Svitlana", "Halyna", "Liudmyla", "Khrystyna", "Sofiia", "Daryna", "Alina", "Solomiia", "Zoriana", "Larysa",
+)
+
+LAST_NAMES = (
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko", "Boiko", "Kovalchuk", "Oliinyk",
+    "Shevchuk", "Polishchuk", "Koval", "Lysenko", "Marchenko", "Moroz", "Petrenko", "Savchenko",
+    "Rudenko", "Melnyk", "Klymenko", "Pavlenko", "Ponomarenko", "Kharchenko", "Savchuk", "Vasylenko",
+    "Levchenko", "Karpenko", "Tkachuk", "Ivanenko", "Hrytsenko", "Romanenko", "Kuzmenko", "Zinchenko",
+    "Sydorenko", "Mazur", "Kostenko", "Fedorenko", "Yakovenko", "Nazarenko", "Honchar", "Symonenko",
+)
+
+# Mobile operator codes that follow +380
+OPERATOR_CODES = ("39", "50", "63", "66", "67", "68", "73", "91", "92", "93", "95", "96", "97", "98", "99")
+
+EMAIL_DOMAINS = ("gmail.com", "ukr.net", "i.ua", "meta.ua", "outlook.com", "proton.me", "example.com.ua")
+
+CITIES = (
+    "Kyiv", "Lviv", "Odesa", "Kharkiv", "Dnipro", "Zaporizhzhia", "Vinnytsia", "Poltava", "Chernihiv",
+    "Uzhhorod", "Ivano-Frankivsk", "Ternopil", "Lutsk", "Rivne", "Zhytomyr", "Cherkasy", "Sumy", "Mykolaiv",
+)
+
+STREETS = (
+    "Shevchenka", "Franka", "Hrushevskoho", "Khreshchatyk", "Sadova", "Lesi Ukrainky", "Soborna",
+    "Nezalezhnosti", "Heroiv Maidanu", "Zelena", "Shkilna", "Myru", "Bandery", "Kotliarevskoho",
+)
+
+TITLE_WORDS = (
+    "Meeting", "Call", "Shopping", "Project", "Trip", "Birthday", "Recipe", "Ideas", "Plan", "Review",
+    "Reminder", "Budget", "Doctor", "Workout", "Reading", "Repair", "Invoice", "Lecture", "Interview", "Garden",
+)
+
+TITLE_TOPICS = (
+    "notes", "list", "summary", "draft", "follow-up", "agenda", "checklist", "outline", "details", "log",
+)
+
+CONTENT_WORDS = (
+    "call", "back", "about", "order", "meeting", "tomorrow", "before", "noon", "send", "documents", "to",
+    "the", "client", "buy", "milk", "bread", "check", "invoice", "number", "remember", "ticket", "train",
+    "Lviv", "Kyiv", "prepare", "slides", "for", "review", "discuss", "budget", "with", "team", "book",
+    "table", "restaurant", "pick", "up", "parcel", "from", "post", "office", "pay", "rent", "and",
+    "internet", "update", "report", "weekly", "plan", "sprint", "fix", "bug", "in", "release", "doctor",
+    "appointment", "at", "morning", "gift", "birthday", "party", "on", "Saturday", "read", "chapter",
+)
+
+TAGS = (
+    "work", "home", "family", "urgent", "ideas", "shopping", "travel", "finance", "health", "study",
+    "project", "meeting", "call", "personal", "later", "books", "recipes", "car", "garden", "sport",
+    "friends", "bills", "kids", "pets", "music", "movies", "gifts", "events", "docs", "repairs",
+    "taxes", "insurance", "school", "holiday", "hobby", "games", "photos", "volunteering", "language", "career",
+)
+
+# Share of notes with 0, 1, 2, 3 and 4 tags
+TAG_COUNT_WEIGHTS = (10, 35, 30, 15, 10)
+
+# Tag popularity falls as a power of its rank (a Zipf distribution)
+_TAG_CUM_WEIGHTS: List[float] = []
+for _rank in range(1, len(TAGS) + 1):
+    _TAG_CUM_WEIGHTS.append((_TAG_CUM_WEIGHTS[-1] if _TAG_CUM_WEIGHTS else 0.0) + 1 / _rank ** 1.1)
+
+BIRTHDAY_FIRST = date(1940, 1, 1)
+BIRTHDAY_LAST = date(2008, 12, 31)
+NOTES_FIRST = datetime(2023, 1, 1)
+NOTES_SPAN_SECONDS = 3 * 365 * 24 * 3600
+
+
+def _sentence(rng: random.Random) -> str:
+    words = " ".join(rng.choices(CONTENT_WORDS, k=rng.randint(5, 40)))
+    return words[0].upper() + words[1:] + "."
+
+
+def generate_contacts(count: int, seed: int = 0) -> List[dict]:
+    """
+    Generates contacts in the format of the contacts data file.
+
+    Names are unique; when the combinations of first and last names run out, a number is added.
+
+    Args:
+        count (int): The number of contacts.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        List[dict]: The contacts, each with name, address, phone_number, email and birthday.
+    """
+    rng = random.Random(f"contacts-{seed}")
+    birthday_days = (BIRTHDAY_LAST - BIRTHDAY_FIRST).days
+    seen_names: dict = {}
+    contacts = []
+    for _ in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        name = f"{first} {last}"
+        repeats = seen_names.get(name, 0)
+        seen_names[name] = repeats + 1
+        if repeats:
+            name = f"{name} {repeats + 1}"
+
+        local_part = f"{first}.{last}".lower()
+        if repeats:
+            local_part += str(repeats + 1)
+        birthday = BIRTHDAY_FIRST + timedelta(days=rng.randrange(birthday_days + 1))
+        contacts.append(
+            {
+                "name": name,
+                "address": f"{rng.choice(CITIES)}, {rng.choice(STREETS)} street {rng.randint(1, 200)}",
+                "phone_number": f"+380{rng.choice(OPERATOR_CODES)}{rng.randrange(10_000_000):07d}",
+                "email": f"{local_part}@{rng.choice(EMAIL_DOMAINS)}",
+                "birthday": birthday.strftime("%d.%m.%Y"),
+            }
+        )
+    return contacts
+
+
+def generate_notes(count: int, contact_names: Sequence[str] = (), seed: int = 0) -> List[dict]:
+    """
+    Generates notes in the format of the notes data file.
+
+    Args:
+        count (int): The number of notes.
+        contact_names (Sequence[str]): Names that notes may refer to; about half of the notes refer to one.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        List[dict]: The notes, with ids from 1 and unique titles.
+    """
+    rng = random.Random(f"notes-{seed}")
+    notes = []
+    for i in range(count):
+        tag_count = rng.choices(range(len(TAG_COUNT_WEIGHTS)), weights=TAG_COUNT_WEIGHTS)[0]
+        tags: List[str] = []
+        while len(tags) < tag_count:
+            tag = rng.choices(TAGS, cum_weights=_TAG_CUM_WEIGHTS)[0]
+            if tag not in tags:
+                tags.append(tag)
+
+        created = NOTES_FIRST + timedelta(seconds=rng.randrange(NOTES_SPAN_SECONDS))
+        updated = created + timedelta(seconds=rng.randrange(30 * 24 * 3600)) if rng.random() < 0.4 else created
+        notes.append(
+            {
+                "id": i + 1,
+                # The index keeps the titles unique
+                "title": f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_TOPICS)} {i + 1}",
+                "contact": rng.choice(contact_names) if contact_names and rng.random() < 0.5 else "",
+                "content": _sentence(rng),
+                "tags": tags,
+                "created_at": created.isoformat(timespec="microseconds"),
+                "updated_at": updated.isoformat(timespec="microseconds"),
+            }
+        )
+    return notes
+
+
+def generate_dataset(contacts: int, notes: int, seed: int = 0) -> Tuple[List[dict], List[dict]]:
+    """
+    Generates contacts and notes that refer to them.
+
+    Args:
+        contacts (int): The number of contacts.
+        notes (int): The number of notes.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        Tuple[List[dict], List[dict]]: The contacts and the notes.
+    """
+    contact_rows = generate_contacts(contacts, seed)
+    note_rows = generate_notes(notes, [row["name"] for row in contact_rows], seed)
+    return contact_rows, note_rows
+
+
+def write_dataset(
+    directory: str, contacts: int, notes: int, seed: int = 0, indent: Optional[int] = 4
+) -> Tuple[str, str]:
+    """
+    Generates a dataset and writes it as the two data files of the assistant.
+
+    Args:
+        directory (str): The directory of the data files; created if missing.
+        contacts (int): The number of contacts.
+        notes (int): The number of notes.
+        seed (int): The seed of the random generator.
+        indent (Optional[int]): The JSON indentation; 4 like the storage writes, None for compact files.
+
+    Returns:
+        Tuple[str, str]: The paths of the contacts and notes data files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    contact_rows, note_rows = generate_dataset(contacts, notes, seed)
+    paths = (os.path.join(directory, "contacts_data.json"), os.path.join(directory, "note_data.json"))
+    for path, rows in zip(paths, (contact_rows, note_rows)):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(rows, file, ensure_ascii=False, indent=indent)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate contacts and notes data files.")
+    parser.add_argument("--contacts", type=int, default=10_000, help="Number of contacts.")
+    parser.add_argument("--notes", type=int, default=10_000, help="Number of notes.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed; the same seed gives the same data.")
+    parser.add_argument("--output", default="generated_data", help="Directory for the two data files.")
+    options = parser.parse_args()
+
+    contacts_path, notes_path = write_dataset(options.output, options.contacts, options.notes, options.seed)
+    print(f"Wrote {options.contacts:,} contacts to {contacts_path}")
+    print(f"Wrote {options.notes:,} notes to {notes_path}")
+
+
+if __name__ == "__main__":
+    main()
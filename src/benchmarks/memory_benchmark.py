@@ -0,0 +1,147 @@
+"""
+Memory benchmark for the Contact and Note models.
+
+Measures the resident bytes per record of loaded contacts and notes (objects, field values and the
+list slot that holds them) and compares them with the models as they were before they declared
+__slots__ (see `benchmarks.baseline_models`). The slotted models are measured twice: as loaded, and
+after a save, when every record also keeps its serialized fragment of the data file (see
+`models.tracking`).
+
+The goal of halving the memory per record is not reached. At 200k records a loaded contact takes about
+a fifth less memory than the baseline and a loaded note about a seventh less: the slots remove the
+per-instance __dict__, but the field strings, which dominate what remains, are unchanged. Halving would
+need the fields packed into one buffer and decoded on every access, which the searches cannot afford.
+After a save the kept fragments make a record larger than the baseline one, the price of cheap full
+saves.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.memory_benchmark --records 1000000
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Callable, List
+from benchmarks.baseline_models import BaselineContact, BaselineNote
+from models import Contact, Note
+from storage.storage import _encode_record
+
+
+def _contact_rows(count: int) -> str:
+    """
+    Builds a JSON document with the given number of contacts.
+
+    Args:
+        count (int): The number of contacts.
+
+    Returns:
+        str: The JSON text, as it would be read from the storage file.
+    """
+    return json.dumps(
+        [
+            {
+                "name": f"Name{i} Surname{i % 5000}",
+                "address": f"Kyiv, Khreshchatyk street {i % 300}",
+                "phone_number": f"+380{500000000 + i}",
+                "email": f"user{i}@example.com",
+                "birthday": f"{i % 28 + 1:02d}.{i % 12 + 1:02d}.{1950 + i % 60}",
+            }
+            for i in range(count)
+        ]
+    )
+
+
+def _note_rows(count: int) -> str:
+    """
+    Builds a JSON document with the given number of notes.
+
+    Args:
+        count (int): The number of notes.
+
+    Returns:
+        str: The JSON text, as it would be read from the storage file.
+    """
+    tags = ["work", "home", "family", "urgent", "ideas"]
+    return json.dumps(
+        [
+            {
+                "id": i + 1,
+                "title": f"Note title {i}",
+                "contact": f"Name{i} Surname{i % 5000}",
+                "content": f"Call back about the order number {i}",
+                "tags": tags[: i % 4],
+                "created_at": f"2024-08-{i % 28 + 1:02d}T10:15:{i % 60:02d}.000000",
+                "updated_at": f"2024-08-{i % 28 + 1:02d}T11:15:{i % 60:02d}.000000",
+            }
+            for i in range(count)
+        ]
+    )
+
+
+def measure_bytes_per_record(text: str, factory: Callable[..., object]) -> float:
+    """
+    Loads records from JSON text and measures the memory they keep alive.
+
+    Args:
+        text (str): The JSON text with a list of records.
+        factory (Callable[..., object]): Creates one record from its fields.
+
+    Returns:
+        float: The traced bytes per record still allocated after loading.
+    """
+    gc.collect()
+    tracemalloc.start()
+    records: List[object] = [factory(**row) for row in json.loads(text)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(records)
+    del records
+    gc.collect()
+    return allocated / count if count else 0.0
+
+
+def after_save(factory: Callable[..., object]) -> Callable[..., object]:
+    """
+    Wraps a record factory so that every record keeps its fragment, as after a save.
+
+    Args:
+        factory (Callable[..., object]): Creates one record from its fields.
+
+    Returns:
+        Callable[..., object]: The wrapped factory.
+    """
+
+    def create(**fields) -> object:
+        record = factory(**fields)
+        record.keep_fragment(_encode_record(record.to_dict()))
+        return record
+
+    return create
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure memory per contact and note.")
+    parser.add_argument("--records", type=int, default=1_000_000, help="Number of records to load.")
+    options = parser.parse_args()
+
+    print(f"Loading {options.records} records of each kind...")
+    for kind, text, model, baseline_model in (
+        ("Contact", _contact_rows(options.records), Contact, BaselineContact),
+        ("Note", _note_rows(options.records), Note, BaselineNote),
+    ):
+        baseline = measure_bytes_per_record(text, baseline_model)
+        results = [
+            (f"{kind} (baseline)", baseline),
+            (f"{kind} (slots, loaded)", measure_bytes_per_record(text, model)),
+            (f"{kind} (slots, after a save)", measure_bytes_per_record(text, after_save(model))),
+        ]
+        for label, per_record in results:
+            total_mb = per_record * options.records / 1024 / 1024
+            change = (per_record / baseline - 1) * 100 if baseline else 0.0
+            print(f"{label:<30}{per_record:>10.1f} bytes/record{total_mb:>12.1f} MiB total{change:>+9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Benchmark of the manager and storage operations on generated data.
+
+For every scale, contacts and notes are generated with `benchmarks.data_generator` into a temporary
+directory, so the real data files are not touched, and each operation is run a number of times.
+Timed operations:
+
+    storage.load.contacts / storage.load.notes      reading and parsing a data file
+    storage.save.contacts / storage.save.notes      serializing and writing a data file
+    contacts.<method>                                 find_contact, the search methods, query and get_upcoming_birthdays
+    notes.<method>                                    search_by_title, search_by_tag, sort_by_tags, add_tag and remove_tag
+
+Tag mutations are timed as the user sees them, including the save of the notes file. Lookups that
+take microseconds are timed in batches and reported per call. Searches are timed with the result
+cache of the managers turned off, since it would answer every run after the first one.
+
+Before every measured run a fixed pure-Python workload is timed too. Its median is saved with each
+operation as `calibration_ms`, so a comparison can allow for the machine being faster or slower
+overall (CPU frequency, other load) than during an earlier run.
+
+The results are printed and saved as JSON (see `save_results`), so runs on different commits or
+machines can be compared.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.operations_benchmark --scales 10000 100000 --repeat 5 --output results.json
+    python -m benchmarks.operations_benchmark --scales 1000000 --repeat 3 --only storage. notes.sort_by_tags
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from benchmarks.data_generator import write_dataset
+from managers import ContactManager, NoteManager
+from storage import ContactStorage, NoteStorage
+
+DEFAULT_SCALES = (10_000, 100_000)
+# Lookups per sample for the operations that take microseconds
+BATCH = 1000
+
+# Items of the calibration workload; it takes a few milliseconds
+CALIBRATION_ITEMS = 5000
+
+# (operation, function running one sample, calls per sample)
+Benchmark = Tuple[str, Callable[[], Any], int]
+
+
+def calibrate() -> float:
+    """
+    Times a fixed workload of string formatting, dictionary inserts and sorting.
+
+    Returns:
+        float: The duration, in milliseconds.
+    """
+    started = time.perf_counter()
+    rng = random.Random(0)
+    table = {f"key{rng.random()}": index for index in range(CALIBRATION_ITEMS)}
+    sorted(table, key=str.lower)
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(
+    function: Callable[[], Any], repeat: int, warmup: int = 1, calibration: Optional[List[float]] = None
+) -> List[float]:
+    """
+    Runs a function several times and measures each run.
+
+    Messages the function prints are discarded. The warm-up runs build the indexes and caches the
+    operation uses, which are kept in a running assistant too.
+
+    Args:
+        function (Callable[[], Any]): The function.
+        repeat (int): The number of measured runs.
+        warmup (int): The number of runs before them that are not measured.
+        calibration (Optional[List[float]]): If given, `calibrate()` is timed before every measured
+            run and its durations are appended here.
+
+    Returns:
+        List[float]: The duration of every measured run, in milliseconds.
+    """
+    samples = []
+    with redirect_stdout(io.StringIO()):
+        for run in range(warmup + repeat):
+            gc.collect()
+            if calibration is not None and run >= warmup:
+                calibration.append(calibrate())
+            started = time.perf_counter()
+            function()
+            elapsed = (time.perf_counter() - started) * 1000
+            if run >= warmup:
+                samples.append(elapsed)
+    return samples
+
+
+def summarize(
+    scale: int, operation: str, samples: List[float], calls: int, calibration: Sequence[float] = ()
+) -> Dict[str, Any]:
+    """
+    Converts the samples of an operation into a result record, with the times per call.
+
+    Args:
+        scale (int): The number of contacts and of notes.
+        operation (str): The operation name.
+        samples (List[float]): The durations of the runs, in milliseconds.
+        calls (int): The calls of the operation in every run.
+        calibration (Sequence[float]): The durations of the calibration workload timed with the runs.
+
+    Returns:
+        Dict[str, Any]: The result record saved in the JSON file.
+    """
+    per_call = [sample / calls for sample in samples]
+    return {
+        "scale": scale,
+        "operation": operation,
+        "calls_per_sample": calls,
+        "samples_ms": [round(value, 6) for value in per_call],
+        "median_ms": round(statistics.median(per_call), 6),
+        "mean_ms": round(statistics.fmean(per_call), 6),
+        "stdev_ms": round(statistics.stdev(per_call), 6) if len(per_call) > 1 else 0.0,
+        "min_ms": round(min(per_call), 6),
+        "max_ms": round(max(per_call), 6),
+        "calibration_ms": round(statistics.median(calibration), 6) if calibration else None,
+    }
+
+
+def _benchmarks(directory: str, seed: int, samples: int) -> List[Benchmark]:
+    """
+    Creates the managers over the data files in a directory and returns the operations to time.
+
+    Args:
+        directory (str): The directory with the generated data files.
+        seed (int): The seed for choosing the looked-up names and the changed notes.
+        samples (int): The number of runs of every operation, including the warm-up.
+    """
+    contacts_path = os.path.join(directory, "contacts_data.json")
+    notes_path = os.path.join(directory, "note_data.json")
+    contact_manager = ContactManager(ContactStorage(contacts_path))
+    note_manager = NoteManager(NoteStorage(notes_path))
+    for manager in (contact_manager, note_manager):
+        manager.result_cache.max_entries = 0
+    contacts = contact_manager.get_all_contacts()
+    notes = note_manager.get_all_notes()
+
+    rng = random.Random(seed)
+    names = [contact.name for contact in rng.choices(contacts, k=BATCH)]
+
+    # Every add_tag run tags another note, and the remove_tag run with the same number untags it
+    tagged = [(note.id, f"benchmark{run}") for run, note in enumerate(rng.choices(notes, k=samples))]
+    to_add = iter(tagged)
+    to_remove = iter(tagged)
+
+    def find_contacts() -> None:
+        for name in names:
+            contact_manager.find_contact(name)
+
+    return [
+        ("storage.load.contacts", lambda: ContactStorage(contacts_path).load_data(), 1),
+        ("storage.load.notes", lambda: NoteStorage(notes_path).load_data(), 1),
+        ("storage.save.contacts", lambda: contact_manager.storage.save_data(contacts), 1),
+        ("storage.save.notes", lambda: note_manager.storage.save_data(notes), 1),
+        ("contacts.find_contact", find_contacts, BATCH),
+        ("contacts.search_by_name", lambda: contact_manager.search_by_name("petrenko"), 1),
+        ("contacts.search_by_email", lambda: contact_manager.search_by_email("@ukr.net"), 1),
+        ("contacts.search_by_phone_number", lambda: contact_manager.search_by_phone_number("+38067"), 1),
+        ("contacts.query", lambda: contact_manager.query("address~Lviv birthday_month:5"), 1),
+        ("contacts.get_upcoming_birthdays", lambda: contact_manager.get_upcoming_birthdays(7), 1),
+        ("notes.search_by_title", lambda: note_manager.search_by_title("budget"), 1),
+        ("notes.search_by_tag", lambda: note_manager.search_by_tag("urgent"), 1),
+        ("notes.sort_by_tags", lambda: note_manager.sort_by_tags("asc"), 1),
+        ("notes.add_tag", lambda: note_manager.add_tag(*next(to_add)), 1),
+        ("notes.remove_tag", lambda: note_manager.remove_tag(*next(to_remove)), 1),
+    ]
+
+
+def run_scale(
+    scale: int, repeat: int, warmup: int, seed: int, only: Sequence[str] = ()
+) -> List[Dict[str, Any]]:
+    """
+    Generates the data of one scale and times the operations on it.
+
+    Args:
+        scale (int): The number of contacts and of notes.
+        repeat (int): The measured runs of every operation.
+        warmup (int): The runs of every operation before the measured ones.
+        seed (int): The seed of the data generator.
+        only (Sequence[str]): Time only the operations whose name starts with one of these.
+
+    Returns:
+        List[Dict[str, Any]]: One result record per operation, see `summarize`.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="assistant-benchmark-") as directory:
+        write_dataset(directory, scale, scale, seed)
+        for operation, function, calls in _benchmarks(directory, seed, warmup + repeat):
+            if only and not operation.startswith(tuple(only)):
+                continue
+            calibration: List[float] = []
+            samples = measure(function, repeat, warmup, calibration)
+            result = summarize(scale, operation, samples, calls, calibration)
+            print(
+                f"{operation:<36}{result['median_ms']:>12.4f} ms"
+                f"{result['min_ms']:>12.4f}{result['max_ms']:>12.4f}{result['stdev_ms']:>12.4f}"
+            )
+            results.append(result)
+    return results
+
+
+def run_benchmarks(
+    scales: Sequence[int], repeat: int, warmup: int = 1, seed: int = 0, only: Sequence[str] = ()
+) -> List[Dict[str, Any]]:
+    """
+    Times the operations at every scale, printing a table per scale.
+
+    Args:
+        scales (Sequence[int]): The numbers of contacts and notes to generate.
+        repeat (int): The measured runs of every operation.
+        warmup (int): The runs of every operation before the measured ones.
+        seed (int): The seed of the data generator.
+        only (Sequence[str]): Time only the operations whose name starts with one of these.
+
+    Returns:
+        List[Dict[str, Any]]: The result records of all scales.
+    """
+    results = []
+    for scale in scales:
+        print(f"\n{scale:,} contacts and {scale:,} notes")
+        print(f"{'operation':<36}{'median':>15}{'min':>12}{'max':>12}{'stdev':>12}")
+        results.extend(run_scale(scale, repeat, warmup, seed, only))
+    return results
+
+
+def save_results(path: str, results: List[Dict[str, Any]], options: Dict[str, Any]) -> None:
+    """
+    Writes the results with a description of the run to a JSON file.
+
+    Args:
+        path (str): The path of the JSON file.
+        results (List[Dict[str, Any]]): The result records.
+        options (Dict[str, Any]): The settings of the run (scales, repeat, warmup, seed).
+    """
+    document = {
+        "benchmark": "operations",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "options": options,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=4)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time the manager and storage operations on generated data.")
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=list(DEFAULT_SCALES),
+        help="Numbers of contacts and notes to generate, e.g. 10000 100000 1000000.",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Measured runs of every operation.")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs before them.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the data generator.")
+    parser.add_argument("--only", nargs="+", default=[], help="Operation name prefixes to time, e.g. storage. notes.")
+    parser.add_argument("--output", default="operations_benchmark.json", help="JSON file for the results.")
+    options = parser.parse_args(argv)
+
+    settings = {
+        "scales": options.scales, "repeat": options.repeat, "warmup": options.warmup,
+        "seed": options.seed, "only": options.only,
+    }
+    results = run_benchmarks(**settings)
+    save_results(options.output, results, settings)
+    print(f"\nResults saved to {options.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Performance regression gate for the manager and storage operations.
+
+Runs `benchmarks.operations_benchmark` with the settings stored in a baseline file (or reads a saved
+run) and compares every operation with the baseline. An operation regressed when both hold:
+
+- its median time per call grew by more than the threshold (20% by default), and
+- the growth is larger than the noise of the two runs: `--sigmas` times the combined standard
+  deviation of their samples, so a change within the run-to-run variance is not reported.
+
+Before the comparison, the times of this run are scaled by how much faster or slower the machine ran
+the calibration workload than during the baseline (see `benchmarks.operations_benchmark`), so a
+machine that is busier or clocked lower than before does not make every operation look slower. Pass
+`--no-normalize` to compare the raw times.
+
+Operations that got faster by the same rule are reported as improved. The exit status is 1 when an
+operation regressed, 2 when the baseline cannot be read, and 0 otherwise, so the check can be run
+before a commit or from a script. Everything runs locally, on generated data in a temporary directory.
+
+Timings depend on the machine, so the committed baseline is only a starting point: record one on your
+own machine with `--update-baseline` before changing the code, and compare against it afterwards.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.regression_check --update-baseline     # record benchmarks/baseline.json
+    python -m benchmarks.regression_check                       # run again and compare
+    python -m benchmarks.regression_check --results run.json    # compare a saved run instead
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from benchmarks.operations_benchmark import run_benchmarks, save_results
+from colors import format_green, format_red, format_yellow
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SETTINGS = {"scales": [10_000], "repeat": 7, "warmup": 1, "seed": 0, "only": []}
+
+OK = "ok"
+REGRESSED = "regressed"
+IMPROVED = "improved"
+NEW = "new"
+MISSING = "missing"
+
+
+@dataclass
+class Comparison:
+    """
+    The comparison of one operation at one scale with the baseline.
+
+    Attributes:
+        scale (int): The number of contacts and of notes.
+        operation (str): The operation name.
+        status (str): OK, REGRESSED, IMPROVED, NEW (not in the baseline) or MISSING (not in this run).
+        baseline_ms (Optional[float]): The baseline median per call.
+        current_ms (Optional[float]): The median per call of this run.
+        change (Optional[float]): The relative change of the median, e.g. 0.25 for 25% slower.
+        noise_ms (Optional[float]): The smallest difference of the medians that is not noise.
+        speed (float): The factor the times of this run were multiplied by to match the machine
+            speed of the baseline.
+    """
+
+    scale: int
+    operation: str
+    status: str
+    baseline_ms: Optional[float] = None
+    current_ms: Optional[float] = None
+    change: Optional[float] = None
+    noise_ms: Optional[float] = None
+    speed: float = 1.0
+
+
+def load_results(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Reads a file saved by the operations benchmark.
+
+    Args:
+        path (str): The path of the JSON file.
+
+    Returns:
+        Tuple[Dict[str, Any], List[Dict[str, Any]]]: The settings of the run and its result records.
+
+    Raises:
+        ValueError: If the file cannot be read or is not a benchmark result file.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            document = json.load(file)
+        return document["options"], document["results"]
+    except (OSError, ValueError, KeyError, TypeError) as ex:
+        raise ValueError(format_red(f"Cannot read benchmark results from '{path}': {ex}"))
+
+
+def compare_operation(
+    scale: int,
+    operation: str,
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    sigmas: float,
+    normalize: bool = True,
+) -> Comparison:
+    """
+    Compares one operation of a run with the baseline.
+
+    Args:
+        scale (int): The number of contacts and of notes.
+        operation (str): The operation name.
+        baseline (Dict[str, Any]): The result record of the baseline.
+        current (Dict[str, Any]): The result record of this run.
+        threshold (float): The relative change of the median that counts, e.g. 0.2 for 20%.
+        sigmas (float): How many combined standard deviations a change must exceed.
+        normalize (bool): Scale the times of this run by the calibration times of both runs.
+
+    Returns:
+        Comparison: The comparison with its status.
+    """
+    speed = 1.0
+    if normalize and baseline.get("calibration_ms") and current.get("calibration_ms"):
+        speed = baseline["calibration_ms"] / current["calibration_ms"]
+    baseline_ms = baseline["median_ms"]
+    current_ms = current["median_ms"] * speed
+    noise_ms = sigmas * math.hypot(baseline["stdev_ms"], current["stdev_ms"] * speed)
+    difference = current_ms - baseline_ms
+    change = difference / baseline_ms if baseline_ms else 0.0
+
+    status = OK
+    if change > threshold and difference > noise_ms:
+        status = REGRESSED
+    elif change < -threshold and -difference > noise_ms:
+        status = IMPROVED
+    return Comparison(scale, operation, status, baseline_ms, current_ms, change, noise_ms, speed)
+
+
+def compare(
+    baseline: List[Dict[str, Any]],
+    current: List[Dict[str, Any]],
+    threshold: float = 0.2,
+    sigmas: float = 3.0,
+    normalize: bool = True,
+) -> List[Comparison]:
+    """
+    Compares the results of a run with the baseline, operation by operation.
+
+    Args:
+        baseline (List[Dict[str, Any]]): The result records of the baseline.
+        current (List[Dict[str, Any]]): The result records of this run.
+        threshold (float): The relative change of the median that counts, e.g. 0.2 for 20%.
+        sigmas (float): How many combined standard deviations a change must exceed.
+        normalize (bool): Scale the times of this run by the calibration times of both runs.
+
+    Returns:
+        List[Comparison]: One comparison per operation and scale found in either run.
+    """
+    baseline_by_key = {(result["scale"], result["operation"]): result for result in baseline}
+    current_by_key = {(result["scale"], result["operation"]): result for result in current}
+
+    comparisons = []
+    for key, result in current_by_key.items():
+        if key in baseline_by_key:
+            comparisons.append(compare_operation(*key, baseline_by_key[key], result, threshold, sigmas, normalize))
+        else:
+            comparisons.append(Comparison(*key, NEW, current_ms=result["median_ms"]))
+    for key, result in baseline_by_key.items():
+        if key not in current_by_key:
+            comparisons.append(Comparison(*key, MISSING, baseline_ms=result["median_ms"]))
+    return comparisons
+
+
+def print_report(comparisons: List[Comparison]) -> None:
+    """
+    Prints the comparisons as a table, followed by a summary line.
+
+    Args:
+        comparisons (List[Comparison]): The comparisons.
+    """
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.4f}"
+
+    colors = {REGRESSED: format_red, IMPROVED: format_green, NEW: format_yellow, MISSING: format_yellow}
+    print(f"\n{'scale':>9}  {'operation':<36}{'baseline ms':>14}{'current ms':>14}{'change':>9}{'noise ms':>12}{'speed':>7}  status")
+    for comparison in comparisons:
+        change = "-" if comparison.change is None else f"{comparison.change:+.1%}"
+        line = (
+            f"{comparison.scale:>9,}  {comparison.operation:<36}{ms(comparison.baseline_ms):>14}"
+            f"{ms(comparison.current_ms):>14}{change:>9}{ms(comparison.noise_ms):>12}{comparison.speed:>7.2f}  {comparison.status}"
+        )
+        print(colors.get(comparison.status, str)(line))
+
+    regressed = sum(comparison.status == REGRESSED for comparison in comparisons)
+    improved = sum(comparison.status == IMPROVED for comparison in comparisons)
+    if regressed:
+        print(format_red(f"\n{regressed} operation(s) regressed, {improved} improved."))
+    else:
+        print(format_green(f"\nNo regressions, {improved} operation(s) improved."))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the operations benchmark with a baseline.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="The baseline results file.")
+    parser.add_argument("--results", help="Compare these saved results instead of running the benchmark.")
+    parser.add_argument("--update-baseline", action="store_true", help="Run the benchmark and save it as the baseline.")
+    parser.add_argument("--scales", type=int, nargs="+", help="Scales to run; default: those of the baseline.")
+    parser.add_argument("--repeat", type=int, help="Measured runs per operation; default: that of the baseline.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative median change that counts (0.2 = 20%%).")
+    parser.add_argument("--sigmas", type=float, default=3.0, help="Standard deviations a change must exceed.")
+    parser.add_argument("--no-normalize", action="store_true", help="Compare raw times, ignoring the calibration.")
+    parser.add_argument("--output", help="Also save the results of this run to this file.")
+    options = parser.parse_args(argv)
+
+    if options.update_baseline:
+        settings = dict(DEFAULT_SETTINGS)
+        if os.path.exists(options.baseline):
+            try:
+                settings.update(load_results(options.baseline)[0])
+            except ValueError:
+                pass
+    else:
+        try:
+            settings, baseline = load_results(options.baseline)
+        except ValueError as ex:
+            print(ex)
+            return 2
+    if options.scales:
+        settings["scales"] = options.scales
+    if options.repeat:
+        settings["repeat"] = options.repeat
+
+    if options.results and not options.update_baseline:
+        try:
+            _, current = load_results(options.results)
+        except ValueError as ex:
+            print(ex)
+            return 2
+    else:
+        current = run_benchmarks(**settings)
+        if options.output:
+            save_results(options.output, current, settings)
+
+    if options.update_baseline:
+        save_results(options.baseline, current, settings)
+        print(format_green(f"\nBaseline saved to {options.baseline}"))
+        return 0
+
+    comparisons = compare(baseline, current, options.threshold, options.sigmas, not options.no_normalize)
+    print_report(comparisons)
+    return 1 if any(comparison.status == REGRESSED for comparison in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Startup benchmark for the assistant.
+
+Starts fresh interpreters that go through the startup path of `main.py` up to the first prompt
+(importing the application, creating the managers and the prompt completer) and reports the
+wall-clock cold-start time together with the import time breakdown from `python -X importtime`.
+
+Usage (from the 'src' directory):
+    python -m benchmarks.startup_benchmark --runs 10 --top 15
+    python -m benchmarks.startup_benchmark --load-data   # also load both data files, as the first command does
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP = (
+    "import main\n"
+    "from launcher import initialize_managers\n"
+    "from utils import get_completer\n"
+    "contact_manager, note_manager = initialize_managers()\n"
+    "from prompt_toolkit import PromptSession\n"
+    "get_completer()\n"
+)
+
+LOAD_DATA = "contact_manager.contacts\nnote_manager.notes\n"
+
+
+def run_startup(code: str, import_time: bool = False) -> Tuple[float, str]:
+    """
+    Runs the startup code in a fresh interpreter.
+
+    Args:
+        code (str): The Python code to run.
+        import_time (bool): Whether to pass `-X importtime` to the interpreter.
+
+    Returns:
+        Tuple[float, str]: The wall-clock time in milliseconds and the interpreter's standard error.
+    """
+    command = [sys.executable] + (["-X", "importtime"] if import_time else []) + ["-c", code]
+    started = time.perf_counter()
+    completed = subprocess.run(
+        command, cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    return (time.perf_counter() - started) * 1000, completed.stderr
+
+
+def parse_import_times(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parses the output of `-X importtime`.
+
+    Args:
+        stderr (str): The standard error of an interpreter started with `-X importtime`.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Module name -> (self time, cumulative time) in microseconds.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the cold-start time of the assistant.")
+    parser.add_argument("--runs", type=int, default=10, help="Number of interpreter starts to time.")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list.")
+    parser.add_argument(
+        "--load-data", action="store_true", help="Also load the contact and note data files."
+    )
+    options = parser.parse_args()
+
+    code = STARTUP + (LOAD_DATA if options.load_data else "")
+    baseline = [run_startup("pass")[0] for _ in range(options.runs)]
+    startup = [run_startup(code)[0] for _ in range(options.runs)]
+    _, stderr = run_startup(code, import_time=True)
+    imports = parse_import_times(stderr)
+
+    interpreter_ms = statistics.median(baseline)
+    startup_ms = statistics.median(startup)
+    print(f"Bare interpreter start      {interpreter_ms:>8.1f} ms (median of {options.runs})")
+    print(f"Start up to the first prompt{startup_ms:>8.1f} ms (median of {options.runs})")
+    print(f"Added by the assistant      {startup_ms - interpreter_ms:>8.1f} ms")
+    print(f"Import of 'main'            {imports.get('main', (0, 0))[1] / 1000:>8.1f} ms (-X importtime)")
+
+    slowest: List[Tuple[str, Tuple[int, int]]] = sorted(
+        imports.items(), key=lambda item: item[1][1], reverse=True
+    )[:options.top]
+    print(f"\n{'Module':<40}{'self ms':>10}{'cumulative ms':>16}")
+    for module, (self_us, cumulative_us) in slowest:
+        print(f"{module:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+A thin client for the assistant daemon.
+
+Sends one command given on the command line, or the lines of a script read from standard input,
+to a running daemon (`python main.py --daemon`) and prints the output:
+
+    python client.py search_contact by=name query=ivan
+    python client.py < commands.txt
+
+Only the standard library is imported, so a command costs little more than the interpreter start.
+The exit code is 1 if any command failed and 2 if the daemon is not running or closed the connection.
+"""
+
+import json
+import os
+import socket
+import sys
+from collections.abc import Iterable
+
+# The same path as constants.SOCKET_PATH, built with os.path to keep the client's imports minimal
+SOCKET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "assistant.sock")
+
+
+def build_request(argv: list[str]) -> str:
+    """
+    Builds a request line from command-line words.
+
+    Args:
+        argv (list[str]): The command followed by name=value arguments.
+
+    Returns:
+        str: A JSON request line.
+    """
+    command, *terms = argv
+    arguments = dict(term.partition("=")[::2] for term in terms)
+    return json.dumps({"command": command, "args": arguments}, ensure_ascii=False)
+
+
+def send_requests(socket_path: str, lines: Iterable[str]) -> int:
+    """
+    Sends request lines to the daemon and prints the responses.
+
+    Args:
+        socket_path (str): The path of the daemon's Unix domain socket.
+        lines (Iterable[str]): The request lines.
+
+    Returns:
+        int: The exit code.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_path)
+        except OSError as ex:
+            print(f"The daemon is not running on '{socket_path}': {ex}", file=sys.stderr)
+            return 2
+
+        exit_code = 0
+        try:
+            with connection.makefile("rwb") as stream:
+                # One request at a time, so neither side can block on a full socket buffer
+                for line in lines:
+                    if not line.strip() or line.lstrip().startswith("#"):
+                        continue
+                    stream.write(line.strip().encode("utf-8") + b"\n")
+                    stream.flush()
+                    reply = stream.readline()
+                    if not reply:
+                        raise ConnectionResetError
+                    response = json.loads(reply)
+                    sys.stdout.write(response["output"])
+                    if response["status"] != "ok":
+                        print(response["error"], file=sys.stderr)
+                        exit_code = 1
+                    if response["command"] == "exit":
+                        break
+        except ConnectionError:
+            # The daemon drops a connection that stays idle, for example while standard input is slow
+            print("The daemon closed the connection (idle timeout).", file=sys.stderr)
+            return 2
+    return exit_code
+
+
+def main(argv: list[str]) -> int:
+    socket_path = SOCKET_PATH
+    if argv[:1] == ["--socket"] and len(argv) > 1:
+        socket_path, argv = argv[1], argv[2:]
+
+    lines = [build_request(argv)] if argv else sys.stdin
+    return send_requests(socket_path, lines)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
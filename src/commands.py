@@ -0,0 +1,102 @@
+"""
+The commands of the assistant.
+
+Adding a command means adding one `registry.register(...)` call here; dispatching, `help`, the
+prompt completer, the command suggestions and the argument check of batch mode all read this registry.
+"""
+
+from constants import COMMAND
+from utils.command_registry import BOTH, CONTACTS, NOTES, CommandRegistry
+
+HANDLERS = "utils.command_handlers"
+JOB_HANDLERS = "utils.job_handlers"
+
+registry = CommandRegistry()
+
+registry.register(
+    COMMAND.ADD_CONTACT, "Add a new contact", f"{HANDLERS}:handle_add_contact",
+    ("name", "address", "phone_number", "email", "birthday"), CONTACTS,
+)
+registry.register(
+    COMMAND.ADD_NOTE, "Add a new note", f"{HANDLERS}:handle_add_note",
+    ("title", "contact", "content", "tags"), NOTES,
+)
+registry.register(
+    COMMAND.ADD_TAG, "Add a tag for exisiting note", f"{HANDLERS}:handle_add_tag",
+    ("title", "tag"), NOTES,
+)
+registry.register(
+    COMMAND.EDIT_CONTACT, "Edit an existing contact", f"{HANDLERS}:handle_edit_contact",
+    ("name", "address", "phone_number", "email", "birthday"), CONTACTS,
+)
+registry.register(
+    COMMAND.EDIT_NOTE, "Edit an existing note", f"{HANDLERS}:handle_edit_note",
+    ("title", "content", "tags"), NOTES,
+)
+registry.register(
+    COMMAND.SEARCH_CONTACT, "Search for a contact", f"{HANDLERS}:handle_search_contact",
+    ("by", "query"), CONTACTS,
+)
+registry.register(
+    COMMAND.SEARCH_NOTE, "Search for a note", f"{HANDLERS}:handle_search_notes",
+    ("by", "query"), NOTES,
+)
+registry.register(
+    COMMAND.REMOVE_CONTACT, "Remove a contact", f"{HANDLERS}:handle_remove_contact",
+    ("name",), CONTACTS,
+)
+registry.register(
+    COMMAND.REMOVE_NOTE, "Remove a note", f"{HANDLERS}:handle_remove_note",
+    ("title",), NOTES,
+)
+registry.register(
+    COMMAND.REMOVE_TAG, "Remove a tag from specific note", f"{HANDLERS}:handle_remove_tag",
+    ("title", "tag"), NOTES,
+)
+registry.register(
+    COMMAND.ALL_NOTES, "Show all notes", f"{HANDLERS}:handle_show_all_notes",
+    ("page",), NOTES,
+)
+registry.register(
+    COMMAND.ALL_CONTACTS, "Show all contacts", f"{HANDLERS}:handle_show_all_contacts",
+    ("page",), CONTACTS,
+)
+registry.register(
+    COMMAND.CHECK_BIRTHDAYS, "Check upcoming birthdays", f"{HANDLERS}:handle_upcoming_birthdays",
+    ("days",), CONTACTS,
+)
+registry.register(
+    COMMAND.SORT_NOTES, "Sorting notes", f"{HANDLERS}:handle_sort_notes_by_tags",
+    ("order",), NOTES,
+)
+registry.register(
+    COMMAND.NOTE_HISTORY, "List the revisions of a note", f"{HANDLERS}:handle_note_history",
+    ("title",), NOTES,
+)
+registry.register(
+    COMMAND.SHOW_REVISION, "Show a note as it was at a revision", f"{HANDLERS}:handle_show_revision",
+    ("title", "revision"), NOTES,
+)
+registry.register(
+    COMMAND.RESTORE_REVISION, "Restore a note to a revision", f"{HANDLERS}:handle_restore_revision",
+    ("title", "revision"), NOTES,
+)
+registry.register(
+    COMMAND.FIND_DUPLICATES, "Find and merge duplicate contacts", f"{HANDLERS}:handle_find_duplicates",
+    ("threshold", "merge"), CONTACTS,
+)
+registry.register(COMMAND.UNDO, "Undo the last change", f"{HANDLERS}:handle_undo", (), BOTH)
+registry.register(COMMAND.REDO, "Redo the last undone change", f"{HANDLERS}:handle_redo", (), BOTH)
+registry.register(
+    COMMAND.IMPORT, "Import contacts or notes from a JSON Lines file", f"{JOB_HANDLERS}:handle_import",
+    ("kind", "path"), BOTH,
+)
+registry.register(
+    COMMAND.EXPORT, "Export contacts or notes to a JSON Lines file", f"{JOB_HANDLERS}:handle_export",
+    ("kind", "path"), BOTH,
+)
+registry.register(COMMAND.JOBS, "Show background jobs", f"{JOB_HANDLERS}:handle_jobs")
+registry.register(COMMAND.CANCEL, "Cancel a background job", f"{JOB_HANDLERS}:handle_cancel", ("job",))
+registry.register(COMMAND.STATS, "Show operation latency statistics", f"{HANDLERS}:handle_stats", ("path",))
+registry.register(COMMAND.EXIT, "Exit the application", "launcher:exit_program")
+registry.register(COMMAND.HELP, "Show available commands", "launcher:show_help")
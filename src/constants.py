@@ -21,51 +21,35 @@ class COMMAND:
     ALL_CONTACTS = "all_contacts"
     CHECK_BIRTHDAYS = "check_birthdays"
     SORT_NOTES = "sort_notes"
+    NOTE_HISTORY = "note_history"
+    SHOW_REVISION = "show_revision"
+    RESTORE_REVISION = "restore_revision"
+    FIND_DUPLICATES = "find_duplicates"
+    UNDO = "undo"
+    REDO = "redo"
+    JOBS = "jobs"
+    CANCEL = "cancel"
+    IMPORT = "import"
+    EXPORT = "export"
+    STATS = "stats"
     EXIT = "exit"
     HELP = "help"
 
 
-# List of all commands
-COMMANDS = [
-    COMMAND.ADD_CONTACT,
-    COMMAND.ADD_NOTE,
-    COMMAND.ADD_TAG,
-    COMMAND.EDIT_CONTACT,
-    COMMAND.EDIT_NOTE,
-    COMMAND.SEARCH_CONTACT,
-    COMMAND.SEARCH_NOTE,
-    COMMAND.REMOVE_CONTACT,
-    COMMAND.REMOVE_NOTE,
-    COMMAND.REMOVE_TAG,
-    COMMAND.ALL_NOTES,
-    COMMAND.ALL_CONTACTS,
-    COMMAND.CHECK_BIRTHDAYS,
-    COMMAND.SORT_NOTES,
-    COMMAND.EXIT,
-    COMMAND.HELP
-]
-
-# Command descriptions
-COMMAND_DESCRIPTIONS = {
-    COMMAND.ADD_CONTACT: "Add a new contact",
-    COMMAND.ADD_NOTE: "Add a new note",
-    COMMAND.ADD_TAG: "Add a tag for exisiting note",
-    COMMAND.EDIT_CONTACT: "Edit an existing contact",
-    COMMAND.EDIT_NOTE: "Edit an existing note",
-    COMMAND.SEARCH_CONTACT: "Search for a contact",
-    COMMAND.SEARCH_NOTE: "Search for a note",
-    COMMAND.REMOVE_CONTACT: "Remove a contact",
-    COMMAND.REMOVE_NOTE: "Remove a note",
-    COMMAND.REMOVE_TAG: "Remove a tag from specific note",
-    COMMAND.ALL_NOTES: "Show all notes",
-    COMMAND.ALL_CONTACTS: "Show all contacts",
-    COMMAND.CHECK_BIRTHDAYS: "Check upcoming birthdays",
-    COMMAND.SORT_NOTES: "Sorting notes",
-    COMMAND.EXIT: "Exit the application",
-    COMMAND.HELP: "Show available commands"
-}
+# Number of records shown per page by the show-all commands
+PAGE_SIZE = 20
 
 # File paths
 BASE_DIR = Path(__file__).resolve().parent.parent
 CONTACT_DATA_FILE_PATH = BASE_DIR.joinpath("data", "contacts_data.json")
 NOTE_DATA_FILE_PATH = BASE_DIR.joinpath("data", "note_data.json")
+NOTE_HISTORY_FILE_PATH = BASE_DIR.joinpath("data", "note_history.json")
+
+# Where `--profile` saves the cProfile statistics and tracemalloc snapshots
+PROFILE_DIR = BASE_DIR.joinpath("data", "profiles")
+
+# Where `--slow-log` writes the operations slower than their threshold
+SLOW_LOG_PATH = BASE_DIR.joinpath("data", "slow_operations.log")
+
+# The Unix domain socket of the daemon mode
+SOCKET_PATH = BASE_DIR.joinpath("data", "assistant.sock")
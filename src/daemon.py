@@ -0,0 +1,180 @@
+"""
+Serves assistant commands from a long-running process over a local Unix domain socket.
+
+The daemon loads the contacts and notes once and keeps the managers, with their lookups and indexes,
+in memory between commands. Clients (see `client.py`) connect to the socket and send one request per
+line, in the format of a batch script line
+
+    search_contact by=query query="name~ivan"
+
+and receive one JSON object per request with the same fields as a batch mode report entry. Changes
+are saved right after each command, as in the interactive mode. The `exit` command stops the daemon.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import time
+from typing import Any, Dict
+from managers import ContactManager, NoteManager
+from batch import ANSI_ESCAPE, parse_batch_line, run_command
+from constants import COMMAND
+from colors import format_green, format_red, format_yellow
+
+
+class CommandRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answers the requests of one client connection, one JSON line per request line.
+
+    Connections are served one at a time, so a connection that sends nothing for `timeout` seconds
+    is closed to let the next client in.
+    """
+
+    server: "AssistantDaemon"
+
+    # How long, in seconds, a connection may stay idle between request lines
+    timeout = 5.0
+
+    def handle(self) -> None:
+        try:
+            for raw_line in self.rfile:
+                line = raw_line.decode("utf-8").strip()
+                if not line:
+                    continue
+                response = self.server.execute(line)
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.wfile.flush()
+                if response.get("command") == COMMAND.EXIT:
+                    self.server.stop_requested = True
+                    return
+        except TimeoutError:
+            # A stalled client; the connection is closed when the handler returns
+            return
+
+
+class AssistantDaemon(socketserver.UnixStreamServer):
+    """
+    A Unix socket server that runs commands against warm managers.
+
+    Connections are served one at a time, so commands never run concurrently against the managers.
+    An idle connection is dropped after `CommandRequestHandler.timeout` seconds, so a stalled client
+    cannot keep the others waiting.
+    """
+
+    # How often, in seconds, the serving loop checks whether it should stop
+    timeout = 0.5
+
+    def __init__(self, socket_path: str, contact_manager: ContactManager, note_manager: NoteManager) -> None:
+        """
+        Binds the socket and warms up the managers.
+
+        Args:
+            socket_path (str): The path of the Unix domain socket.
+            contact_manager (ContactManager): The manager for contacts.
+            note_manager (NoteManager): The manager for notes.
+
+        Raises:
+            RuntimeError: If another daemon is already listening on the socket.
+        """
+        _remove_stale_socket(socket_path)
+        self.contact_manager = contact_manager
+        self.note_manager = note_manager
+        self.stop_requested = False
+        super().__init__(socket_path, CommandRequestHandler)
+        # Only the owner may send commands to the address book
+        os.chmod(socket_path, 0o600)
+        self.warm_up()
+
+    def warm_up(self) -> None:
+        """
+        Loads the data files and builds the lookups, so that the first request is as fast as the others.
+        """
+        self.contact_manager.find_contact("")
+        self.note_manager.get_note_by_id(0)
+
+    def execute(self, line: str) -> Dict[str, Any]:
+        """
+        Runs one request line.
+
+        Args:
+            line (str): A command line in batch script format.
+
+        Returns:
+            Dict[str, Any]: The command, status, uncolored output, error message and duration.
+        """
+        started = time.perf_counter()
+        try:
+            parsed = parse_batch_line(line)
+        except ValueError as ex:
+            parsed, error = None, ANSI_ESCAPE.sub("", str(ex))
+        else:
+            error = None if parsed else "Empty request."
+
+        if parsed is None:
+            command, status, output = "", "error", ""
+        elif parsed[0] == COMMAND.EXIT:
+            command, status, output = COMMAND.EXIT, "ok", "Daemon stopped.\n"
+        else:
+            command, arguments = parsed
+            status, output, error = run_command(command, arguments, self.contact_manager, self.note_manager)
+
+        return {
+            "command": command,
+            "status": status,
+            "output": output,
+            "error": error,
+            "duration_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Removes a socket file left behind by a daemon that did not shut down cleanly.
+
+    Args:
+        socket_path (str): The path of the Unix domain socket.
+
+    Raises:
+        RuntimeError: If a daemon is still listening on the socket.
+    """
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.remove(socket_path)
+            return
+    raise RuntimeError(format_red(f"A daemon is already listening on '{socket_path}'."))
+
+
+def run_daemon(socket_path: str, contact_manager: ContactManager, note_manager: NoteManager) -> None:
+    """
+    Serves commands on the socket until the `exit` command or Ctrl+C.
+
+    Args:
+        socket_path (str): The path of the Unix domain socket.
+        contact_manager (ContactManager): The manager for contacts.
+        note_manager (NoteManager): The manager for notes.
+
+    Raises:
+        RuntimeError: If Unix domain sockets are not supported or a daemon is already running.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError(format_red("Daemon mode needs Unix domain socket support."))
+
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    with AssistantDaemon(socket_path, contact_manager, note_manager) as daemon:
+        print(format_green(f"Serving commands on '{socket_path}'. Press Ctrl+C to stop."))
+        try:
+            while not daemon.stop_requested:
+                daemon.handle_request()
+        except KeyboardInterrupt:
+            pass
+    print(format_yellow("Daemon stopped."))
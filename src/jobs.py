@@ -0,0 +1,299 @@
+"""
+Runs long operations as background jobs of the asynchronous REPL.
+
+A job is a function that runs in a worker thread and reports its progress with `job.advance(...)`,
+which also raises `JobCancelled` once the job was cancelled, so the function stops at the next
+progress report. The REPL shows the progress of the running jobs in its bottom toolbar, and the
+`jobs` and `cancel` commands list and stop them. The managers are thread-safe, so commands keep
+working against them while a job runs.
+
+The REPL also hands the saves of the managers to this module: a change returns as soon as it is made
+in memory and the file is written by a background job, one job per manager at a time, which saves
+all changes made in the meantime at once.
+
+Outside the REPL there is no event loop, and jobs run to completion before `start` returns.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+from colors import format_green, format_red, format_yellow
+
+
+class JobCancelled(Exception):
+    """Raised by `Job.advance` in a job that was cancelled."""
+
+
+class Job:
+    """
+    One background job and its progress.
+
+    Attributes:
+        id (int): The number shown by the `jobs` command.
+        name (str): What the job does.
+        done (int): The units of work done so far.
+        total (Optional[int]): The units of work in total, if known.
+        status (str): 'running', 'done', 'cancelled' or 'failed'.
+        result (str): The message of a finished job.
+        cancellable (bool): Whether the job may be cancelled.
+    """
+
+    def __init__(self, job_id: int, name: str, cancellable: bool = True) -> None:
+        self.id = job_id
+        self.name = name
+        self.done = 0
+        self.total: Optional[int] = None
+        self.status = "running"
+        self.result = ""
+        self.cancellable = cancellable
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self._cancel = threading.Event()
+
+    def advance(self, done: int, total: Optional[int] = None) -> None:
+        """
+        Reports progress; called by the job function from its worker thread.
+
+        Args:
+            done (int): The units of work done so far.
+            total (Optional[int]): The units of work in total, if known.
+
+        Raises:
+            JobCancelled: If the job was cancelled.
+        """
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def cancel(self) -> bool:
+        """
+        Asks the job to stop at its next progress report.
+
+        Returns:
+            bool: False if the job is not running or cannot be cancelled.
+        """
+        if self.status != "running" or not self.cancellable:
+            return False
+        self._cancel.set()
+        return True
+
+    def describe(self) -> str:
+        """
+        Returns a one-line summary with the progress and the elapsed time.
+        """
+        elapsed = (self.finished or time.monotonic()) - self.started
+        if self.total:
+            progress = f"{self.done / self.total:.0%}"
+        elif self.done:
+            progress = f"{self.done:,}"
+        else:
+            progress = "..."
+        state = progress if self.status == "running" else self.status
+        if self._cancel.is_set() and self.status == "running":
+            state += " (cancelling)"
+        return f"[{self.id}] {self.name} {state} {elapsed:.1f}s"
+
+
+class JobRunner:
+    """
+    Starts jobs and keeps track of them.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: Dict[int, Job] = {}
+        self._next_id = 1
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # The ids of the managers with a save job running
+        self._saving: Set[int] = set()
+        # Manager id -> how many jobs hold back its saves
+        self._held: Dict[int, int] = {}
+        self._held_lock = threading.Lock()
+        # Called when a job starts or finishes, on the event loop thread
+        self.listener: Optional[Callable[[], None]] = None
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """
+        Makes jobs run in the background on the given event loop; None makes them run in the foreground.
+
+        Args:
+            loop (Optional[asyncio.AbstractEventLoop]): The event loop of the REPL.
+        """
+        self._loop = loop
+
+    def start(
+        self,
+        name: str,
+        work: Callable[[Job], Optional[str]],
+        cancellable: bool = True,
+        quiet: bool = False,
+        on_done: Optional[Callable[[Job], None]] = None,
+    ) -> Job:
+        """
+        Starts a job.
+
+        Args:
+            name (str): What the job does.
+            work (Callable[[Job], Optional[str]]): The job function; it returns a message for the user.
+            cancellable (bool): Whether the `cancel` command may stop the job.
+            quiet (bool): Announce neither the start nor a successful end of the job.
+            on_done (Optional[Callable[[Job], None]]): Called with the job when it has ended.
+
+        Returns:
+            Job: The started job; already finished when there is no event loop.
+        """
+        job = Job(self._next_id, name, cancellable)
+        self._next_id += 1
+        self._jobs[job.id] = job
+
+        if self._loop is None:
+            self._run(job, work)
+            self._finish(job, quiet, on_done)
+            return job
+
+        task = self._loop.create_task(self._run_in_background(job, work, quiet, on_done))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if not quiet:
+            print(format_green(f"Started job [{job.id}] {name}. Use 'jobs' to follow it and 'cancel' to stop it."))
+        self._notify()
+        return job
+
+    def _run(self, job: Job, work: Callable[[Job], Optional[str]]) -> None:
+        """
+        Runs the job function and records how it ended.
+        """
+        try:
+            job.result = work(job) or ""
+            job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as ex:
+            job.status = "failed"
+            job.result = str(ex)
+        finally:
+            job.finished = time.monotonic()
+
+    async def _run_in_background(
+        self, job: Job, work: Callable[[Job], Optional[str]], quiet: bool, on_done: Optional[Callable[[Job], None]]
+    ) -> None:
+        await asyncio.to_thread(self._run, job, work)
+        self._finish(job, quiet, on_done)
+        self._notify()
+
+    def _finish(self, job: Job, quiet: bool, on_done: Optional[Callable[[Job], None]]) -> None:
+        """
+        Tells the user how a job ended and runs its `on_done` callback.
+        """
+        if job.status == "done":
+            if quiet:
+                # Nothing to look back at
+                del self._jobs[job.id]
+            else:
+                print(format_green(f"Job [{job.id}] {job.name} finished. {job.result}".rstrip()))
+        elif job.status == "cancelled":
+            print(format_yellow(f"Job [{job.id}] {job.name} cancelled. {job.result}".rstrip()))
+        else:
+            print(format_red(f"Job [{job.id}] {job.name} failed: {job.result}"))
+        if on_done is not None:
+            on_done(job)
+
+    def _notify(self) -> None:
+        if self.listener is not None:
+            self.listener()
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """
+        Returns a job by its id, or None if there is no such job.
+        """
+        return self._jobs.get(job_id)
+
+    def all(self) -> List[Job]:
+        """
+        Returns the jobs started so far, except quiet jobs that finished successfully.
+        """
+        return list(self._jobs.values())
+
+    def running(self) -> List[Job]:
+        """
+        Returns the running jobs.
+        """
+        return [job for job in self._jobs.values() if job.status == "running"]
+
+    def toolbar(self) -> str:
+        """
+        Returns the progress of the running jobs for the bottom toolbar of the prompt.
+        """
+        return "  ".join(job.describe() for job in self.running())
+
+    def schedule_save(self, manager: Any) -> None:
+        """
+        The save scheduler of the managers: saves the manager's changes in a background job.
+
+        May be called from any thread. If a save job of the manager is already running, it saves the
+        new changes too, or another job is started when it ends.
+
+        Args:
+            manager (Any): A manager with pending changes, saved with `manager.flush()`.
+        """
+        if self._loop is None:
+            manager.flush()
+            return
+        self._loop.call_soon_threadsafe(self._start_save, manager)
+
+    @contextmanager
+    def saves_held(self, manager: Any) -> Iterator[None]:
+        """
+        Postpones the background saves of a manager until the block ends; may be used from any thread.
+
+        A job adding records in many steps uses it to write the data file once instead of after every step.
+
+        Args:
+            manager (Any): The manager whose saves are postponed.
+
+        Yields:
+            None: The body of the `with` block runs with the saves postponed.
+        """
+        with self._held_lock:
+            self._held[id(manager)] = self._held.get(id(manager), 0) + 1
+        try:
+            yield
+        finally:
+            with self._held_lock:
+                self._held[id(manager)] -= 1
+            self.schedule_save(manager)
+
+    def _start_save(self, manager: Any) -> None:
+        if id(manager) in self._saving or self._held.get(id(manager)) or not manager.has_unsaved_changes:
+            return
+
+        def save(job: Job) -> None:
+            while not self._held.get(id(manager)) and manager.flush():
+                pass
+
+        def finished(job: Job) -> None:
+            self._saving.discard(id(manager))
+            # Changes made after the last flush, while the job was ending
+            self._start_save(manager)
+
+        self._saving.add(id(manager))
+        name = f"save {os.path.basename(str(manager.storage.file_path))}"
+        self.start(name, save, cancellable=False, quiet=True, on_done=finished)
+
+    async def shutdown(self) -> None:
+        """
+        Cancels the cancellable jobs and waits until all jobs, including saves, have ended.
+        """
+        for job in self.running():
+            job.cancel()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+# The jobs of the application
+jobs = JobRunner()
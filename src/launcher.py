@@ -1,48 +1,91 @@
+import atexit
+from typing import Sequence
 from managers import ContactManager, NoteManager
-from storage import ContactStorage, NoteStorage
-from constants import (
-    CONTACT_DATA_FILE_PATH,
-    NOTE_DATA_FILE_PATH,
-    COMMAND,
-    COMMAND_DESCRIPTIONS
-)
-from prettytable import PrettyTable
-from utils import (
-    handle_add_contact,
-    handle_search_contact,
-    handle_show_all_notes,
-    handle_remove_contact,
-    handle_show_all_contacts,
-    handle_upcoming_birthdays,
-    handle_edit_contact,
-    handle_add_note,
-    handle_search_notes,
-    handle_remove_note,
-    handle_edit_note,
-    handle_add_tag,
-    handle_remove_tag,
-    handle_sort_notes_by_tags,
-    suggest_command
-)
-from colors import format_green, format_yellow
+from managers.undo_log import UndoLog
+from storage import ContactStorage, NoteHistoryStorage, NoteStorage
+from constants import CONTACT_DATA_FILE_PATH, NOTE_DATA_FILE_PATH, NOTE_HISTORY_FILE_PATH, PROFILE_DIR
+from commands import registry
+from metrics import metrics
+from utils.suggestion_utils import suggest_command
+from colors import format_green, format_red, format_yellow
 
 
 def initialize_managers() -> tuple[ContactManager, NoteManager]:
     """
-    Initializes the contact and note managers with storage.
+    Initializes the contact and note managers with storage, sharing one undo log.
 
     Returns:
         tuple[ContactManager, NoteManager]: Initialized managers for contacts and notes.
     """
     contact_storage = ContactStorage(file_path=CONTACT_DATA_FILE_PATH)
     note_storage = NoteStorage(file_path=NOTE_DATA_FILE_PATH)
+    note_history_storage = NoteHistoryStorage(file_path=NOTE_HISTORY_FILE_PATH)
 
     contact_manager = ContactManager(storage=contact_storage)
-    note_manager = NoteManager(storage=note_storage)
+    note_manager = NoteManager(storage=note_storage, history_storage=note_history_storage)
+    undo_log = UndoLog()
+    contact_manager.undo_log = undo_log
+    note_manager.undo_log = undo_log
+    metrics.register_cache(contact_manager.result_cache)
+    metrics.register_cache(note_manager.result_cache)
 
     return contact_manager, note_manager
 
 
+def enable_statistics() -> None:
+    """
+    Starts collecting the latency statistics shown by the `stats` command, including the public
+    methods of the managers.
+    """
+    metrics.enable()
+    metrics.instrument(ContactManager, "contacts")
+    metrics.instrument(NoteManager, "notes")
+
+
+def enable_profiling(
+    commands: Sequence[str], slowest: int = 0, directory: str = str(PROFILE_DIR), trace_memory: bool = True
+) -> None:
+    """
+    Profiles the given commands, or every command keeping the slowest, with cProfile and tracemalloc.
+
+    Args:
+        commands (Sequence[str]): The commands profiled on every run.
+        slowest (int): Also profile every command and report this many slowest runs at exit.
+        directory (str): Where the profile files are saved.
+        trace_memory (bool): Also trace allocations with tracemalloc.
+
+    Raises:
+        ValueError: If a command is unknown.
+    """
+    from profiling import profiler
+
+    unknown = [command for command in commands if command not in registry]
+    if unknown:
+        raise ValueError(format_red(f"Cannot profile unknown command(s): {', '.join(unknown)}."))
+    profiler.configure(commands, slowest, directory, trace_memory)
+    if slowest:
+        atexit.register(profiler.report)
+
+
+def enable_slow_log(path: str, threshold_ms: float, thresholds: Sequence[str] = ()) -> None:
+    """
+    Starts logging the commands, manager calls and data file accesses slower than their threshold.
+
+    Args:
+        path (str): The log file.
+        threshold_ms (float): The default threshold, in milliseconds.
+        thresholds (Sequence[str]): Per-operation overrides as 'prefix=milliseconds'.
+
+    Raises:
+        ValueError: If a threshold is malformed.
+    """
+    from slow_log import parse_thresholds, slow_log
+
+    slow_log.enable(path, threshold_ms, parse_thresholds(thresholds))
+    slow_log.instrument(ContactManager, "contacts", lambda manager: manager.loaded_count)
+    slow_log.instrument(NoteManager, "notes", lambda manager: manager.loaded_count)
+
+
 def handle_command(
     command: str, contact_manager: ContactManager, note_manager: NoteManager
 ) -> None:
@@ -51,49 +94,32 @@ def handle_command(
 
     Args:
         command (str): The command entered by the user.
-        args (list): The arguments for the command.
         contact_manager (ContactManager): The manager for contacts.
         note_manager (NoteManager): The manager for notes.
-        available_commands (dict): A dictionary of available commands and descriptions.
     """
-    command_map = {
-        COMMAND.ADD_CONTACT: lambda: handle_add_contact(contact_manager),
-        COMMAND.ADD_NOTE: lambda: handle_add_note(note_manager),
-        COMMAND.ADD_TAG: lambda: handle_add_tag(note_manager),
-        COMMAND.EDIT_CONTACT: lambda: handle_edit_contact(contact_manager),
-        COMMAND.EDIT_NOTE: lambda: handle_edit_note(note_manager),  # not finished
-        COMMAND.REMOVE_CONTACT: lambda: handle_remove_contact(contact_manager),
-        COMMAND.REMOVE_NOTE: lambda: handle_remove_note(note_manager),
-        COMMAND.REMOVE_TAG: lambda: handle_remove_tag(note_manager),
-        COMMAND.SEARCH_CONTACT: lambda: handle_search_contact(contact_manager),
-        COMMAND.SEARCH_NOTE: lambda: handle_search_notes(note_manager),
-        COMMAND.ALL_CONTACTS: lambda: handle_show_all_contacts(contact_manager),
-        COMMAND.ALL_NOTES: lambda: handle_show_all_notes(note_manager),
-        COMMAND.CHECK_BIRTHDAYS: lambda: handle_upcoming_birthdays(contact_manager),
-        COMMAND.SORT_NOTES: lambda: handle_sort_notes_by_tags(note_manager),
-        COMMAND.HELP: lambda: show_help(COMMAND_DESCRIPTIONS),
-        COMMAND.EXIT: lambda: exit_program(),
-    }
-
-    handler = command_map.get(command)
-    if handler:
-        handler()
+    spec = registry.get(command)
+    if spec:
+        # Another assistant process may have saved changes since the last command
+        contact_manager.refresh()
+        note_manager.refresh()
+        spec.invoke(contact_manager, note_manager)
     else:
         suggest_command(command)
 
 
-def show_help(available_commands: dict) -> None:
+def show_help() -> None:
     """
-    Prints the list of available commands and their descriptions.
-
-    Args:
-        available_commands (dict): A dictionary of available commands and descriptions.
+    Prints the list of available commands with their descriptions and arguments.
     """
+    from prettytable import PrettyTable
+
     table = PrettyTable()
-    table.field_names = [format_yellow("Command"), format_yellow("Description")]
+    table.field_names = [
+        format_yellow("Command"), format_yellow("Description"), format_yellow("Arguments")
+    ]
 
-    for cmd, description in available_commands.items():
-        table.add_row([format_green(cmd), description])
+    for spec in registry:
+        table.add_row([format_green(spec.name), spec.description, ", ".join(spec.arguments)])
     
     print(format_green("\nAvailable commands:"))
     print(table)
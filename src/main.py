@@ -1,31 +1,259 @@
-from launcher import initialize_managers, handle_command
-from utils import parse_input, completer
-from prompt_toolkit import PromptSession
+import argparse
+import json
+import sys
+from typing import Optional
+from launcher import enable_profiling, enable_slow_log, enable_statistics, initialize_managers, handle_command
+from utils import parse_input, get_completer
+from constants import PROFILE_DIR, SLOW_LOG_PATH, SOCKET_PATH
+from slow_log import DEFAULT_THRESHOLD_MS
+from utils.output import FORMATS, JSONL, TABLE, is_jsonl, set_output_format
 from colors import format_yellow, format_green, format_red
 
 
-def main():
+def parse_arguments() -> argparse.Namespace:
     """
-    Main entry point for the Contact Manager console application.
-    Initializes the ContactManager and provides a command-line interface for the user.
+    Parses the command-line options of the application.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Personal assistant for contacts and notes.")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run the commands from FILE ('-' for standard input) instead of the interactive prompt.",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        help="In batch mode, write one JSON result per command to FILE.",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep the data in memory and serve commands from client.py over a Unix domain socket.",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        default=str(SOCKET_PATH),
+        help="The socket path of the daemon mode.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve the contacts and notes over a local HTTP/JSON API.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="The address of the API server.")
+    parser.add_argument("--port", type=int, default=8000, help="The port of the API server.")
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Collect latency statistics of commands, manager methods and data file access for the 'stats' command.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="+",
+        metavar="COMMAND",
+        default=[],
+        help="Profile every run of these commands with cProfile and tracemalloc, save the profiles and print "
+        "the top hotspots and allocators to standard error.",
+    )
+    parser.add_argument(
+        "--profile-slowest",
+        type=int,
+        metavar="N",
+        default=0,
+        help="Profile every command and report the N slowest runs when the assistant exits.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        metavar="DIR",
+        default=str(PROFILE_DIR),
+        help="Where the profiles are saved.",
+    )
+    parser.add_argument(
+        "--profile-no-memory",
+        action="store_true",
+        help="Profile time only, without tracemalloc, which slows commands down the most.",
+    )
+    parser.add_argument(
+        "--slow-log",
+        nargs="?",
+        const=str(SLOW_LOG_PATH),
+        metavar="FILE",
+        help=f"Log the commands, manager calls and data file accesses slower than their threshold to FILE "
+        f"(default: {SLOW_LOG_PATH}).",
+    )
+    parser.add_argument(
+        "--slow-ms",
+        type=float,
+        default=DEFAULT_THRESHOLD_MS,
+        metavar="MS",
+        help="The threshold of the slow-operation log, in milliseconds.",
+    )
+    parser.add_argument(
+        "--slow-threshold",
+        nargs="+",
+        default=[],
+        metavar="OPERATION=MS",
+        help="Thresholds for operations whose name starts with OPERATION, e.g. command=1000 storage.save=500.",
+    )
+    parser.add_argument(
+        "--output",
+        choices=FORMATS,
+        default=TABLE,
+        help="How search and listing commands show their results: tables, or one JSON object per line. "
+        "In batch mode JSON Lines go straight to standard output and the summary to standard error.",
+    )
+    return parser.parse_args()
+
+
+def run_batch_mode(script_path: str, report_path: Optional[str] = None) -> int:
+    """
+    Runs a command script and reports the results.
+
+    Args:
+        script_path (str): The path to the script, or '-' for standard input.
+        report_path (str): An optional path for the per-command JSON Lines report.
+
+    Returns:
+        int: The exit code; 1 if any command failed.
     """
+    from batch import run_batch
+
     contact_manager, note_manager = initialize_managers()
+    # Keep standard output for the records; batch mode captures what commands print
+    summary = sys.stderr if is_jsonl() else sys.stdout
+    if is_jsonl():
+        set_output_format(JSONL, stream=sys.stdout)
+
+    if script_path == "-":
+        results = run_batch(sys.stdin, contact_manager, note_manager)
+    else:
+        with open(script_path, "r", encoding="utf-8") as script:
+            results = run_batch(script, contact_manager, note_manager)
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as report:
+            for result in results:
+                report.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+
+    failed = [result for result in results if result.status != "ok"]
+    for result in failed:
+        print(format_red(f"Line {result.line} ({result.command or 'unparsed'}): {result.error}"), file=summary)
+
+    total_ms = sum(result.duration_ms for result in results)
+    print(
+        format_green(f"{len(results) - len(failed)} command(s) succeeded, ")
+        + (format_red if failed else format_green)(f"{len(failed)} failed")
+        + format_green(f" in {total_ms:.0f} ms."),
+        file=summary,
+    )
+    return 1 if failed else 0
+
+
+async def run_interactive(contact_manager, note_manager) -> None:
+    """
+    Runs the interactive prompt.
+
+    Commands run one at a time on the event loop, while loading and indexing the data, saving it and
+    imports and exports run as background jobs (see `jobs.py`); the bottom toolbar shows their
+    progress. Pending saves are finished before the prompt exits.
+
+    Args:
+        contact_manager (ContactManager): The manager for contacts.
+        note_manager (NoteManager): The manager for notes.
+    """
+    import asyncio
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.patch_stdout import patch_stdout
+    from jobs import jobs
+
+    managers = (contact_manager, note_manager)
+    jobs.attach(asyncio.get_running_loop())
+    for manager in managers:
+        manager.save_scheduler = jobs.schedule_save
 
     print(format_green("Welcome to the Contact Manager!"))
-    session = PromptSession(completer=completer)
+    session = PromptSession(completer=get_completer(), refresh_interval=0.5)
+    # The toolbar is shown only while jobs run
+    jobs.listener = lambda: setattr(session, "bottom_toolbar", jobs.toolbar if jobs.running() else None)
+
+    def warm_up(job) -> None:
+        contact_manager.find_contact("")
+        note_manager.get_note_by_id(0)
+
+    jobs.start("load and index", warm_up, cancellable=False, quiet=True)
+
+    try:
+        while True:
+            try:
+                # Messages of background jobs are printed above the prompt instead of through it
+                with patch_stdout(raw=True):
+                    user_input = await session.prompt_async("Enter a command: ")
+                if user_input:
+                    command, *args = parse_input(user_input)
+                    handle_command(command, contact_manager, note_manager)
+                else:
+                    print(format_red("No command entered. Please try again."))
+            except KeyboardInterrupt:
+                print(format_yellow("Good bye!"))
+                break
+    finally:
+        await jobs.shutdown()
+        jobs.attach(None)
+        for manager in managers:
+            manager.save_scheduler = None
+            manager.flush()
+
+
+def main():
+    """
+    Main entry point for the Contact Manager console application.
+    Initializes the ContactManager and provides a command-line interface for the user.
+    """
+    options = parse_arguments()
+    set_output_format(options.output)
+    if options.stats:
+        enable_statistics()
+    if options.slow_log:
+        try:
+            enable_slow_log(options.slow_log, options.slow_ms, options.slow_threshold)
+        except ValueError as ex:
+            print(ex)
+            sys.exit(2)
+    if options.profile or options.profile_slowest:
+        try:
+            enable_profiling(
+                options.profile, options.profile_slowest, options.profile_dir, not options.profile_no_memory
+            )
+        except ValueError as ex:
+            print(ex)
+            sys.exit(2)
+    if options.batch:
+        sys.exit(run_batch_mode(options.batch, options.report))
+    if options.daemon:
+        from daemon import run_daemon
 
-    while True:
         try:
-            user_input = session.prompt("Enter a command: ")
-            if user_input:
-                command, *args = parse_input(user_input)
-                handle_command(command, contact_manager, note_manager)
-            else:
-                print(format_red("No command entered. Please try again."))
-        except KeyboardInterrupt:
-            print(format_yellow("Good bye!"))
-            break
+            run_daemon(options.socket, *initialize_managers())
+        except RuntimeError as ex:
+            print(ex)
+            sys.exit(1)
+        return
+    if options.serve:
+        from api_server import run_api_server
+
+        run_api_server(options.host, options.port, *initialize_managers())
+        return
+
+    # The data files are loaded by the managers on the first command that needs them
+    contact_manager, note_manager = initialize_managers()
+
+    import asyncio
 
+    asyncio.run(run_interactive(contact_manager, note_manager))
 
 if __name__ == "__main__":
     main()
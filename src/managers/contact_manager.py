@@ -16,16 +16,47 @@ edit_contact(name: str, updated_contact: Contact): Changes information about a c
 search_by_name(name: str): Search for contacts by name.
 search_by_email(email: str): Search for prospects by email.
 search_by_phone_number(phone_number: str): Search for contacts by phone number.
+find_duplicates(threshold: float): Finds groups of contacts that likely describe the same person.
+merge_duplicates(suggestions: List[MergeSuggestion]): Merges groups of duplicate contacts with a single save.
+query(text: str): Search for contacts matching several field predicates at once.
+explain_query(text: str): Describe how a query would be executed.
+transaction(): Group several changes into one save that is undone on an error.
+get_contacts_page(limit: int, offset: int, cursor: str): Retrieve one page of contacts.
+find_contact(name: str): Find a contact by its exact name.
+
+The results of the searches are cached until the contacts change (see `managers.result_cache`).
 """
 
 import re
+import threading
 from storage import ContactStorage
 from datetime import datetime, timedelta, date
-from typing import List
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 from models import Contact
+from managers.contact_query import ContactQueryEngine, parse_query
+from managers.result_cache import ResultCache, normalize_text
+from managers.transaction import TransactionMixin
+from utils.rwlock import ReadWriteLock, read_locked, write_locked
+from managers.pagination import Page, paginate
 from colors import format_red, format_green
 
-class ContactManager:
+if TYPE_CHECKING:
+    from managers.duplicate_finder import MergeSuggestion
+
+
+def _birthday_in_year(born: date, year: int) -> date:
+    """
+    Returns the birthday in the given year; 29 February falls on 28 February in common years.
+    """
+    try:
+        return born.replace(year=year)
+    except ValueError:
+        return date(year, 2, 28)
+
+
+class ContactManager(TransactionMixin):
+    RECORD_FIELDS = ("name", "address", "phone_number", "email", "birthday")
+
     def __init__(self, storage: ContactStorage) -> None:
         """
         Initializes the ContactManager with a ContactStorage instance.
@@ -34,8 +65,205 @@ class ContactManager:
             storage (ContactStorage): An instance of ContactStorage for managing contact data.
         """
         self.storage = storage
-        self.contacts: List[Contact] = self.storage.load_data()
+        # Loaded from the storage on first access, so startup does not wait for the data file
+        self._contacts: Optional[List[Contact]] = None
+        # Shared by concurrent readers, exclusive for changes; transactions hold it for writing
+        self.lock = ReadWriteLock()
+
+        # Bumped on every change of the contact list, so derived data such as indexes can be reused safely
+        self._generation = 0
+        self._query_engine = ContactQueryEngine()
+        self._init_transactions()
+        # Search results of the current generation, so repeated searches do not scan every contact
+        self.result_cache = ResultCache("contacts")
+
+        # Exact name lookup, built on first use and kept in step with changes made through the manager
+        self._contacts_by_name: Optional[Dict[str, Contact]] = None
+        self._contacts_by_name_generation = -1
+        self._lookup_lock = threading.Lock()
+
+    @property
+    def contacts(self) -> List[Contact]:
+        """
+        Returns the list of contacts, loading it from the storage on first access.
+        """
+        if self._contacts is None:
+            self._contacts = self.storage.load_data()
+        return self._contacts
+
+    @contacts.setter
+    def contacts(self, contacts: List[Contact]) -> None:
+        self._contacts = contacts
+
+    @property
+    def loaded_count(self) -> int:
+        """
+        Returns the number of contacts in memory, without loading the data file; 0 before it is loaded.
+        """
+        contacts = self._contacts
+        return len(contacts) if contacts is not None else 0
+
+    def _records(self) -> List[Contact]:
+        """
+        Returns the list of contacts managed by the manager.
+        """
+        return self.contacts
+
+    def _changed(self, added: Iterable[Contact] = (), removed: Iterable[Contact] = ()) -> None:
+        """
+        Bumps the generation after a change and updates the name lookup incrementally.
+
+        Args:
+            added (Iterable[Contact]): The contacts added to the list.
+            removed (Iterable[Contact]): The contacts removed from the list.
+        """
+        self._generation += 1
+        if self._contacts_by_name is None:
+            return
+        for contact in removed:
+            if self._contacts_by_name.get(contact.name) is contact:
+                del self._contacts_by_name[contact.name]
+        for contact in added:
+            self._contacts_by_name[contact.name] = contact
+        self._contacts_by_name_generation = self._generation
+
+    def _position_of(self, contact: Contact) -> int:
+        """
+        Finds the position of a contact object in the list by identity.
+
+        Args:
+            contact (Contact): The contact object.
+
+        Returns:
+            int: The position, or -1 if the object is not in the list.
+        """
+        return next((i for i, existing in enumerate(self.contacts) if existing is contact), -1)
+
+    def _put_back(self, contact: Contact, position: int) -> None:
+        """
+        Inserts a contact again where it was, to undo its removal or redo its addition.
+
+        Raises:
+            ValueError: If another contact has its name by now.
+        """
+        if self.find_contact(contact.name):
+            raise ValueError(f"a contact named '{contact.name}' exists.")
+        position = min(position, len(self.contacts))
+        self._remember_list()
+        self.contacts.insert(position, contact)
+        self._changed(added=[contact])
+        self._on_rollback(lambda: self._take_out(contact, position), list_change=True)
+        self._persist()
+
+    def _take_out(self, contact: Contact, position: int) -> None:
+        """
+        Removes a contact object again, to undo its addition or redo its removal.
+
+        Raises:
+            ValueError: If the contact was removed or replaced since.
+        """
+        position = self._locate(contact, position)
+        if position < 0:
+            raise ValueError(f"the contact '{contact.name}' was changed or removed since.")
+        self._remember_list()
+        del self.contacts[position]
+        self._changed(removed=[contact])
+        self._on_rollback(lambda: self._put_back(contact, position), list_change=True)
+        self._persist()
+
+    def _swap(self, current: Contact, replacement: Contact, position: int) -> None:
+        """
+        Puts one version of an edited contact in place of the other, to undo or redo the edit.
 
+        Raises:
+            ValueError: If the current version was removed or replaced since, or the name of the
+                replacement is taken by another contact.
+        """
+        position = self._locate(current, position)
+        if position < 0:
+            raise ValueError(f"the contact '{current.name}' was changed or removed since.")
+        taken = self.find_contact(replacement.name)
+        if taken is not None and taken is not current:
+            raise ValueError(f"a contact named '{replacement.name}' exists.")
+        self._remember_list()
+        self.contacts[position] = replacement
+        self._changed(added=[replacement], removed=[current])
+        self._on_rollback(lambda: self._swap(replacement, current, position), list_change=True)
+        self._persist()
+
+    def _fields_of(self, contact: Contact) -> tuple:
+        """
+        Returns the values of the fields of a contact, to tell whether it was changed in place.
+        """
+        return tuple(getattr(contact, name) for name in self.RECORD_FIELDS)
+
+    def _set_fields(self, changes: List[Tuple[Contact, tuple, tuple]]) -> None:
+        """
+        Sets the fields of contacts changed in place, to undo or redo a merge of duplicates.
+
+        Args:
+            changes (List[Tuple[Contact, tuple, tuple]]): Each contact with the field values it must have
+                now and the values to set.
+
+        Raises:
+            ValueError: If a contact was removed, replaced or changed otherwise since.
+        """
+        for contact, expected, _ in changes:
+            if self.find_contact(contact.name) is not contact or self._fields_of(contact) != expected:
+                raise ValueError(f"the contact '{contact.name}' was changed or removed since.")
+        for contact, _, state in changes:
+            self._remember(contact)
+            for name, value in zip(self.RECORD_FIELDS, state):
+                setattr(contact, name, value)
+        if changes:
+            self._changed()
+            self._persist()
+
+    def _unmerge(self, changes: List[Tuple[Contact, tuple, tuple]], removed: List[Tuple[int, Contact]]) -> None:
+        """
+        Undoes a merge of duplicates: clears the fields filled in the primary contacts and inserts the
+        duplicates again where they were.
+
+        Args:
+            changes (List[Tuple[Contact, tuple, tuple]]): Each changed primary contact with its fields
+                before and after the merge.
+            removed (List[Tuple[int, Contact]]): The removed duplicates with their positions, in list order.
+        """
+        self._set_fields([(contact, after, before) for contact, before, after in changes])
+        for position, duplicate in removed:
+            self._put_back(duplicate, position)
+
+    def _remerge(self, changes: List[Tuple[Contact, tuple, tuple]], removed: List[Tuple[int, Contact]]) -> None:
+        """
+        Redoes a merge of duplicates undone by `_unmerge`.
+        """
+        for position, duplicate in reversed(removed):
+            self._take_out(duplicate, position)
+        self._set_fields(changes)
+
+    @read_locked
+    def find_contact(self, name: str) -> Optional[Contact]:
+        """
+        Finds a contact by its exact name in constant time.
+
+        Args:
+            name (str): The exact contact name.
+
+        Returns:
+            Optional[Contact]: The contact, or None if there is no contact with this name.
+        """
+        if self._contacts_by_name is None or self._contacts_by_name_generation != self._generation:
+            # Concurrent readers may get here together; only one of them builds the lookup
+            with self._lookup_lock:
+                if self._contacts_by_name is None or self._contacts_by_name_generation != self._generation:
+                    contacts_by_name: Dict[str, Contact] = {}
+                    for contact in self.contacts:
+                        contacts_by_name.setdefault(contact.name, contact)
+                    self._contacts_by_name = contacts_by_name
+                    self._contacts_by_name_generation = self._generation
+        return self._contacts_by_name.get(name)
+
+    @write_locked
     def add_contact(self, contact: Contact) -> None:
         """
         Adds a new contact to the list if it doesn't already exist and saves the updated list to the storage.
@@ -49,17 +277,50 @@ class ContactManager:
         Parameters:
             contact (Contact): The contact to be added to the list. Must be an instance of the Contact class.
         """
-        if self.contacts:
-            for existing_contact in self.contacts:
-                if existing_contact.name == contact.name:
-                    print(format_red(f"Contact with the name '{contact.name}' already exists."))
-                    return
+        if self.find_contact(contact.name):
+            print(format_red(f"Contact with the name '{contact.name}' already exists."))
+            return
 
+        self._remember_list()
         self.contacts.append(contact)
-        self.storage.save_data(self.contacts)
+        self._changed(added=[contact])
+        self._persist()
+        position = len(self.contacts) - 1
+        self._log_undo(
+            f"add contact '{contact.name}'",
+            lambda: self._take_out(contact, position),
+            lambda: self._put_back(contact, position),
+            (contact,),
+        )
 
         print(format_green(f"Contact '{contact.name}' successfully added."))
+
+    @write_locked
+    def add_contacts(self, contacts: Iterable[Contact]) -> int:
+        """
+        Adds many contacts with a single save, skipping those whose name is already taken.
+
+        Unlike `add_contact` nothing is printed per contact, which makes it suitable for imports.
+
+        Args:
+            contacts (Iterable[Contact]): The contacts to add.
+
+        Returns:
+            int: The number of contacts added.
+        """
+        added: List[Contact] = []
+        for contact in contacts:
+            if self.find_contact(contact.name):
+                continue
+            self._remember_list()
+            self.contacts.append(contact)
+            self._changed(added=[contact])
+            added.append(contact)
+        if added:
+            self._persist()
+        return len(added)
         
+    @write_locked
     def remove_contact(self, name: str) -> None:
         """
         Removes a contact from the list by name.
@@ -74,15 +335,24 @@ class ContactManager:
         Returns:
             str: A message indicating the result of the removal operation.
         """
-        contact_to_remove = next(
-            (contact for contact in self.contacts if contact.name == name), None
-        )
+        contact_to_remove = self.find_contact(name)
         if contact_to_remove:
-            self.contacts.remove(contact_to_remove)
-            self.storage.save_data(self.contacts)
+            position = self._position_of(contact_to_remove)
+            self._remember_list()
+            del self.contacts[position]
+            self._changed(removed=[contact_to_remove])
+            self._persist()
+            self._log_undo(
+                f"remove contact '{name}'",
+                lambda: self._put_back(contact_to_remove, position),
+                lambda: self._take_out(contact_to_remove, position),
+                (contact_to_remove,),
+            )
             print(format_green(f"Contact {name} successfully deleted."))
-        print(format_red(f"Contact {name} not found."))
+        else:
+            print(format_red(f"Contact {name} not found."))
 
+    @write_locked
     def edit_contact(self, name: str, updated_contact: Contact) -> None:
         """
         Updates the information of an existing contact.
@@ -94,20 +364,30 @@ class ContactManager:
             name (str): The name of the contact to be updated.
             updated_contact (Contact): An instance of the Contact class with updated information.
         """
-        for i, contact in enumerate(self.contacts):
-            if contact.name == name:
-
-                # Validate the updated phone number and email
-                contact._validate_phone_number(updated_contact.phone_number)
-                contact._validate_email(updated_contact.email)
+        contact = self.find_contact(name)
+        if contact:
+
+            # Validate the updated phone number and email
+            contact._validate_phone_number(updated_contact.phone_number)
+            contact._validate_email(updated_contact.email)
+
+            position = self._position_of(contact)
+            self._remember_list()
+            self.contacts[position] = updated_contact
+            self._changed(added=[updated_contact], removed=[contact])
+            self._persist()
+            self._log_undo(
+                f"edit contact '{name}'",
+                lambda: self._swap(updated_contact, contact, position),
+                lambda: self._swap(contact, updated_contact, position),
+                (contact, updated_contact),
+            )
+            print(format_green(f"Contact {name} updated successfully."))
+            return
 
-                self.contacts[i] = updated_contact
-                self.storage.save_data(self.contacts)
-                print(format_green(f"Contact {name} updated successfully."))
-                return
-        
         print(format_red(f"Contact with the name {name} not found."))
 
+    @read_locked
     def search_by_name(self, name: str) -> List[Contact]:
         """
         Searches for contacts by name or part of the name.
@@ -127,9 +407,11 @@ class ContactManager:
                 raise ValueError(format_red("Search name cannot be empty."))
             
             pattern = re.compile(re.escape(name), re.IGNORECASE)
-            matching_contacts = [
-                contact for contact in self.contacts if pattern.search(contact.name)
-            ]
+            matching_contacts = self.result_cache.get_or_compute(
+                ("search_by_name", normalize_text(name)),
+                self._generation,
+                lambda: [contact for contact in self.contacts if pattern.search(contact.name)],
+            )
 
             return matching_contacts  # A list of notes s that match the search query.
 
@@ -141,6 +423,7 @@ class ContactManager:
         except Exception as e:
             raise RuntimeError(format_red(f"An unexpected error occurred during the search: {e}"))
 
+    @read_locked
     def search_by_email(self, email: str) -> List[Contact]:
         """
         Searches for contacts by email address.
@@ -154,14 +437,14 @@ class ContactManager:
         Returns:
             List[Contact]: A list of contacts that have the specified email address or a matching partial email.
         """
-        matching_contacts = []
         # search for contacts with matching email
-        for contact in self.contacts:
-            if email in contact.email:
-                matching_contacts.append(contact)
-        # retrun the list of matching contacts
-        return matching_contacts
+        return self.result_cache.get_or_compute(
+            ("search_by_email", email),
+            self._generation,
+            lambda: [contact for contact in self.contacts if email in contact.email],
+        )
 
+    @read_locked
     def search_by_phone_number(self, phone_number: str) -> List[Contact]:
         """
         Search for contacts by phone number (exact or partial match).
@@ -173,16 +456,57 @@ class ContactManager:
         Returns:
         - list of dict: A list of contacts whose phone numbers match the search query.
         """
-        matching_contacts = []
+        phone_number = str(phone_number)
+        # Check if the phone number part of the contact matches the search query
+        return self.result_cache.get_or_compute(
+            ("search_by_phone_number", phone_number),
+            self._generation,
+            lambda: [contact for contact in self.contacts if phone_number in contact.phone_number],
+        )
+
+    @read_locked
+    def query(self, text: str) -> List[Contact]:
+        """
+        Searches for contacts matching every predicate of a query.
 
-        if self.contacts:
-            for contact in self.contacts:
-                # Check if the phone number part of the contact matches the search query
-                if str(phone_number) in contact.phone_number:
-                    matching_contacts.append(contact)
+        The query is a space separated list of 'field:value' (exact) and 'field~value' (substring)
+        predicates, e.g. 'name~ivan email:@gmail.com birthday_month:5 address~Kyiv'. The most
+        selective index is used first and only the remaining candidates are checked.
 
-        return matching_contacts
+        Args:
+            text (str): The query.
 
+        Returns:
+            List[Contact]: A list of contacts that match all predicates.
+
+        Raises:
+            ValueError: If the query is empty or malformed.
+        """
+        predicates = parse_query(text)
+        # The predicates must all match, so their order does not change the result
+        key = ("query", tuple(sorted((p.field, p.operator, p.value) for p in predicates)))
+        return self.result_cache.get_or_compute(
+            key, self._generation, lambda: self._query_engine.execute(self.contacts, self._generation, predicates)
+        )
+
+    @read_locked
+    def explain_query(self, text: str) -> str:
+        """
+        Describes how a query would be executed, without running it.
+
+        Args:
+            text (str): The query.
+
+        Returns:
+            str: The index lookups in execution order with their estimated sizes, and the
+                 predicates that are verified against the candidates.
+
+        Raises:
+            ValueError: If the query is empty or malformed.
+        """
+        return self._query_engine.plan(self.contacts, self._generation, parse_query(text)).explain()
+
+    @read_locked
     def get_all_contacts(self) -> List[Contact]:
         """
         Retrieves all contacts from the contact list.
@@ -190,10 +514,31 @@ class ContactManager:
         This method returns the entire list of contacts stored in the contact manager.
 
         Returns:
-            List[Contact]: A list of all contacts.
+            List[Contact]: A snapshot of the contact list, safe to iterate while other threads change it.
         """
-        return self.contacts
+        return list(self.contacts)
 
+    @read_locked
+    def get_contacts_page(
+        self, limit: int = 20, offset: int = 0, cursor: Optional[str] = None
+    ) -> Page[Contact]:
+        """
+        Retrieves one page of contacts in their stable list order.
+
+        Args:
+            limit (int): The maximum number of contacts on the page. Default is 20.
+            offset (int): The position of the first contact; ignored when a cursor is given.
+            cursor (Optional[str]): The cursor returned with the previous page.
+
+        Returns:
+            Page[Contact]: The page with its contacts, the total count and the next cursor.
+
+        Raises:
+            ValueError: If the limit or offset is negative or the cursor is malformed.
+        """
+        return paginate(self.contacts, lambda contact: contact.name, limit, offset, cursor)
+
+    @read_locked
     def get_upcoming_birthdays(self, n_day: int = 7) -> List[dict]:
         """
         Retrieves a list of upcoming birthdays within a specified number of days.
@@ -210,21 +555,28 @@ class ContactManager:
             List[str]: A list of strings with each string containing the contact's name and
                     their upcoming birthday date.
         """
+        to_date = date.today()
+        return self.result_cache.get_or_compute(
+            ("get_upcoming_birthdays", n_day, to_date),
+            self._generation,
+            lambda: self._upcoming_birthdays(to_date, n_day),
+        )
+
+    def _upcoming_birthdays(self, to_date: date, n_day: int) -> List[dict]:
+        """
+        Lists the birthdays from a date to the given number of days after it.
+        """
         res = []
         if self.contacts:
-            to_date = date.today()
             for (
                 contact
             ) in (
                 self.contacts
             ):  # We go through the contacts and pike up birthdays, transferring the day to the desired format
-                birthday = (
-                    datetime.strptime(contact.birthday, "%d.%m.%Y")
-                    .replace(year=to_date.year)
-                    .date()
-                )
+                born = datetime.strptime(contact.birthday, "%d.%m.%Y").date()
+                birthday = _birthday_in_year(born, to_date.year)
                 if birthday < to_date:  # Check if the date of birth has passed
-                    birthday = birthday.replace(year=to_date.year + 1)
+                    birthday = _birthday_in_year(born, to_date.year + 1)
                 if (
                     to_date <= birthday <= (to_date + timedelta(days=n_day))
                 ):  # Check if the date of birth falls within a given period of days
@@ -235,3 +587,71 @@ class ContactManager:
                         }
                     )
         return res
+
+    @read_locked
+    def find_duplicates(self, threshold: float = 85.0) -> List["MergeSuggestion"]:
+        """
+        Finds groups of contacts that most likely describe the same person.
+
+        Contacts are matched by normalized phone number, email address and name tokens, so
+        'Ivan Petrenko' and 'Petrenko Ivan' or two names sharing one phone number are reported.
+
+        Args:
+            threshold (float): The minimum match score (0-100). Default is 85.
+
+        Returns:
+            List[MergeSuggestion]: The suggested merges, strongest matches first.
+        """
+        from managers.duplicate_finder import DuplicateFinder
+
+        return DuplicateFinder(threshold=threshold).find_duplicates(self.contacts)
+
+    @write_locked
+    def merge_duplicates(self, suggestions: List["MergeSuggestion"]) -> int:
+        """
+        Merges every suggested group of duplicates into its primary contact.
+
+        Empty optional fields of the primary contact are filled from its duplicates, the duplicates
+        are removed, and the contact list is saved to the storage once for the whole batch.
+        Inside a transaction the save is deferred to its commit.
+
+        Args:
+            suggestions (List[MergeSuggestion]): The merge suggestions to apply.
+
+        Returns:
+            int: The number of removed duplicate contacts.
+        """
+        from managers.duplicate_finder import merge_contact_fields
+
+        duplicate_ids = set()
+        before = []
+        for suggestion in suggestions:
+            self._remember(suggestion.primary)
+            before.append((suggestion.primary, self._fields_of(suggestion.primary)))
+            merge_contact_fields(suggestion.primary, suggestion.duplicates)
+            duplicate_ids.update(id(duplicate) for duplicate in suggestion.duplicates)
+
+        if not duplicate_ids:
+            return 0
+
+        # The positions of the duplicates, so undoing the merge puts them back where they were
+        removed = [(i, contact) for i, contact in enumerate(self.contacts) if id(contact) in duplicate_ids]
+        self._remember_list()
+        self.contacts[:] = [
+            contact for contact in self.contacts if id(contact) not in duplicate_ids
+        ]
+        self._changed(
+            removed=[duplicate for suggestion in suggestions for duplicate in suggestion.duplicates]
+        )
+        self._persist()
+        if self.undo_log is not None:
+            changes = [(primary, fields, self._fields_of(primary)) for primary, fields in before]
+            changes = [change for change in changes if change[1] != change[2]]
+            self._log_undo(
+                f"merge {len(removed)} duplicate contact(s)",
+                lambda: self._unmerge(changes, removed),
+                lambda: self._remerge(changes, removed),
+                tuple(contact for contact, _, _ in changes) + tuple(contact for _, contact in removed),
+            )
+        print(format_green(f"{len(duplicate_ids)} duplicate contact(s) merged."))
+        return len(duplicate_ids)
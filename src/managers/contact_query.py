@@ -0,0 +1,499 @@
+"""The contact query engine module
+
+Task: Answer multi-field contact queries without scanning the whole contact list.
+
+‌
+
+Query language:
+
+A query is a space separated list of predicates, all of which must match. Values with spaces are quoted.
+
+    field:value    exact match (case-insensitive); 'email:@gmail.com' matches the email domain
+    field~value    substring match (case-insensitive)
+
+Fields: name, address, phone, email, birthday, birthday_day, birthday_month, birthday_year.
+
+Example: name~ivan email:@gmail.com birthday_month:5 address~"Kyiv, Main"
+
+The planner estimates how many contacts each predicate can match using the available indexes, starts
+from the most selective one, intersects the candidate positions with the other indexed predicates and
+only then verifies every predicate against the remaining contacts. Indexes are built lazily, per field,
+on first use and are discarded when the contact list changes.
+"""
+
+import shlex
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from models import Contact
+from managers.duplicate_finder import normalize_phone
+from colors import format_red
+
+# Postings hold contact positions in ascending order; a lone position is stored as a plain int
+Posting = Union[int, array]
+
+# Field name -> (contact value getter, value normalizer)
+FIELDS: Dict[str, Tuple[Callable[[Contact], str], Callable[[str], str]]] = {
+    "name": (lambda contact: contact.name, str.casefold),
+    "address": (lambda contact: contact.address, str.casefold),
+    "phone": (lambda contact: contact.phone_number, str),
+    "email": (lambda contact: contact.email, str.lower),
+    "birthday": (lambda contact: contact.birthday, str),
+    "birthday_day": (lambda contact: _birthday_part(contact.birthday, 0, 2), str),
+    "birthday_month": (lambda contact: _birthday_part(contact.birthday, 3, 5), str),
+    "birthday_year": (lambda contact: _birthday_part(contact.birthday, 6, 10), str),
+}
+
+# Predicates on these fields compare whole values, so '~' behaves like ':'
+NUMERIC_FIELDS = {"birthday_day", "birthday_month", "birthday_year"}
+
+# Below this many candidates verifying directly is cheaper than intersecting more postings
+VERIFY_DIRECTLY_BELOW = 32
+
+# The number of trigrams of a substring predicate whose postings are intersected
+RAREST_TRIGRAMS = 3
+
+
+@dataclass
+class Predicate:
+    """
+    A single condition of a contact query.
+
+    Attributes:
+        field (str): The contact field, one of FIELDS.
+        operator (str): ':' for an exact match or '~' for a substring match.
+        value (str): The normalized value to compare with.
+    """
+
+    field: str
+    operator: str
+    value: str
+
+    def __str__(self) -> str:
+        return f"{self.field}{self.operator}{self.value!r}"
+
+
+@dataclass
+class PlanStep:
+    """
+    An index access chosen by the planner.
+
+    Attributes:
+        predicate (Predicate): The predicate the index answers.
+        index (str): The name of the index used.
+        key (Union[str, List[str]]): The index key, or the trigrams for a substring lookup.
+        estimate (int): The estimated number of matching contacts.
+        exact (bool): Whether the index answers the predicate exactly, so it needs no verification.
+    """
+
+    predicate: Predicate
+    index: str
+    key: Union[str, List[str]]
+    estimate: int
+    exact: bool
+
+
+@dataclass
+class QueryPlan:
+    """
+    The execution plan of a contact query.
+
+    Attributes:
+        steps (List[PlanStep]): Index accesses, most selective first.
+        verify (List[Predicate]): Predicates checked against every candidate contact.
+        total (int): The number of contacts in the list.
+    """
+
+    steps: List[PlanStep] = field(default_factory=list)
+    verify: List[Predicate] = field(default_factory=list)
+    total: int = 0
+
+    def explain(self) -> str:
+        """
+        Describes the plan in a human readable form.
+
+        Returns:
+            str: One line per plan step.
+        """
+        lines = []
+        if not self.steps:
+            lines.append(f"full scan of {self.total} contact(s)")
+        for number, step in enumerate(self.steps, start=1):
+            action = "lookup" if number == 1 else "intersect"
+            key = " & ".join(step.key) if isinstance(step.key, list) else step.key
+            lines.append(
+                f"{action} {step.index} [{key}] for {step.predicate} (~{step.estimate} row(s))"
+            )
+        if self.verify:
+            lines.append("verify " + ", ".join(str(predicate) for predicate in self.verify))
+        return "\n".join(lines)
+
+
+def parse_query(text: str) -> List[Predicate]:
+    """
+    Parses a query string into predicates.
+
+    Args:
+        text (str): The query, e.g. 'name~ivan email:@gmail.com birthday_month:5'.
+
+    Returns:
+        List[Predicate]: The parsed predicates.
+
+    Raises:
+        ValueError: If the query is empty or a predicate is malformed.
+    """
+    try:
+        terms = shlex.split(text)
+    except ValueError as ex:
+        raise ValueError(format_red(f"Invalid query: {ex}"))
+    if not terms:
+        raise ValueError(format_red("Query cannot be empty."))
+
+    predicates = []
+    for term in terms:
+        positions = [position for position in (term.find(":"), term.find("~")) if position > 0]
+        if not positions:
+            raise ValueError(format_red(f"Invalid predicate '{term}'. Expected field:value or field~value."))
+
+        split_at = min(positions)
+        field_name, operator, value = term[:split_at].lower(), term[split_at], term[split_at + 1:]
+        if field_name not in FIELDS:
+            raise ValueError(
+                format_red(f"Unknown field '{field_name}'. Available fields: {', '.join(FIELDS)}.")
+            )
+        if not value:
+            raise ValueError(format_red(f"Value for '{field_name}' cannot be empty."))
+
+        if field_name in NUMERIC_FIELDS:
+            operator, value = ":", value.lstrip("0") or "0"
+        predicates.append(Predicate(field_name, operator, FIELDS[field_name][1](value)))
+
+    return predicates
+
+
+class ContactQueryEngine:
+    """
+    Plans and executes contact queries over lazily built per-field indexes.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the engine with no indexes; they are built on first use.
+        """
+        self._generation: Optional[Tuple[int, int]] = None
+        self._exact: Dict[str, Dict[str, Posting]] = {}
+        self._trigrams: Dict[str, Dict[str, Posting]] = {}
+        # Queries may run in concurrent readers; indexes are refreshed and built by one of them at a time
+        self._build_lock = threading.Lock()
+
+    def plan(self, contacts: List[Contact], generation: int, predicates: List[Predicate]) -> QueryPlan:
+        """
+        Chooses the index accesses for the predicates.
+
+        Args:
+            contacts (List[Contact]): The contacts to query.
+            generation (int): The contact list generation; indexes of an older generation are discarded.
+            predicates (List[Predicate]): The parsed query predicates.
+
+        Returns:
+            QueryPlan: The plan, with index accesses ordered from the most selective one.
+        """
+        self._refresh(contacts, generation)
+        plan = QueryPlan(total=len(contacts))
+
+        for predicate in predicates:
+            step = self._access_path(contacts, predicate)
+            if step is None or not step.exact:
+                plan.verify.append(predicate)
+            if step is not None:
+                plan.steps.append(step)
+
+        plan.steps.sort(key=lambda step: step.estimate)
+        return plan
+
+    def execute(self, contacts: List[Contact], generation: int, predicates: List[Predicate]) -> List[Contact]:
+        """
+        Finds the contacts matching all predicates.
+
+        Args:
+            contacts (List[Contact]): The contacts to query.
+            generation (int): The contact list generation.
+            predicates (List[Predicate]): The parsed query predicates.
+
+        Returns:
+            List[Contact]: The matching contacts, in contact list order.
+        """
+        plan = self.plan(contacts, generation, predicates)
+
+        if plan.steps:
+            candidates, applied = self._intersect(plan)
+            # Exact steps skipped by an early stop still have to be verified
+            answered = [step.predicate for step in applied if step.exact]
+            checks = [
+                _matcher(predicate)
+                for predicate in predicates
+                if not any(predicate is done for done in answered)
+            ]
+            found = (contacts[position] for position in candidates)
+        else:
+            checks = [_matcher(predicate) for predicate in plan.verify]
+            found = iter(contacts)
+
+        return [contact for contact in found if all(check(contact) for check in checks)]
+
+    def _intersect(self, plan: QueryPlan) -> Tuple[List[int], List[PlanStep]]:
+        """
+        Intersects the postings of the plan steps, most selective first.
+
+        Intersection stops early once few candidates are left, because verifying them directly
+        is cheaper than reading more postings.
+
+        Args:
+            plan (QueryPlan): The query plan.
+
+        Returns:
+            Tuple[List[int], List[PlanStep]]: The ascending candidate positions and the applied steps.
+        """
+        candidates: Optional[List[int]] = None
+        applied: List[PlanStep] = []
+        for step in plan.steps:
+            if candidates is not None and len(candidates) < VERIFY_DIRECTLY_BELOW:
+                break
+            for posting in self._step_postings(step):
+                if candidates is None:
+                    candidates = list(_iter_posting(posting))
+                elif _posting_size(posting) <= len(candidates) * 8:
+                    # Comparable sizes: one pass over the posting is cheaper than a binary search per candidate
+                    candidate_set = set(candidates)
+                    candidates = [position for position in _iter_posting(posting) if position in candidate_set]
+                else:
+                    candidates = [
+                        position for position in candidates if _posting_contains(posting, position)
+                    ]
+                if not candidates:
+                    return [], applied
+            applied.append(step)
+        return candidates or [], applied
+
+    def _step_postings(self, step: PlanStep) -> Iterable[Posting]:
+        """
+        Returns the postings an index step reads.
+
+        Args:
+            step (PlanStep): The plan step.
+
+        Returns:
+            Iterable[Posting]: The postings to intersect; a missing key yields an empty posting.
+        """
+        index = self._trigrams if step.index.endswith(".trigram") else self._exact
+        postings = index[step.index.rsplit(".", 1)[0]]
+        keys = step.key if isinstance(step.key, list) else [step.key]
+        return [postings.get(key, array("I")) for key in keys]
+
+    def _access_path(self, contacts: List[Contact], predicate: Predicate) -> Optional[PlanStep]:
+        """
+        Finds the index access that answers a predicate, if any.
+
+        Args:
+            contacts (List[Contact]): The contacts to query.
+            predicate (Predicate): The predicate.
+
+        Returns:
+            Optional[PlanStep]: The index access, or None if the predicate needs a full scan.
+        """
+        if predicate.operator == ":":
+            if predicate.field == "email" and predicate.value.startswith("@"):
+                postings = self._exact_index(contacts, "email_domain")
+                key = predicate.value[1:]
+                return PlanStep(predicate, "email_domain.exact", key, _posting_size(postings.get(key)), True)
+
+            key = normalize_phone(predicate.value) if predicate.field == "phone" else predicate.value
+            postings = self._exact_index(contacts, predicate.field)
+            return PlanStep(predicate, f"{predicate.field}.exact", key, _posting_size(postings.get(key)), True)
+
+        grams = _trigrams(predicate.value)
+        if not grams:
+            return None
+
+        postings = self._trigram_index(contacts, predicate.field)
+        # The predicate is verified anyway, so only the rarest trigrams are worth intersecting
+        grams = sorted(grams, key=lambda gram: _posting_size(postings.get(gram)))[:RAREST_TRIGRAMS]
+        estimate = _posting_size(postings.get(grams[0]))
+        return PlanStep(predicate, f"{predicate.field}.trigram", grams, estimate, False)
+
+    def _refresh(self, contacts: List[Contact], generation: int) -> None:
+        """
+        Discards the indexes if the contact list changed since they were built.
+
+        Args:
+            contacts (List[Contact]): The contacts to query.
+            generation (int): The contact list generation.
+        """
+        current = (generation, len(contacts))
+        if self._generation != current:
+            with self._build_lock:
+                if self._generation != current:
+                    self._exact = {}
+                    self._trigrams = {}
+                    self._generation = current
+
+    def _exact_index(self, contacts: List[Contact], field_name: str) -> Dict[str, Posting]:
+        """
+        Returns the exact-value index of a field, building it on first use.
+
+        Args:
+            contacts (List[Contact]): The contacts to index.
+            field_name (str): The field, or 'email_domain'.
+
+        Returns:
+            Dict[str, Posting]: Normalized value -> contact positions.
+        """
+        postings = self._exact.get(field_name)
+        if postings is not None:
+            return postings
+
+        with self._build_lock:
+            if field_name in self._exact:
+                return self._exact[field_name]
+            if field_name == "email_domain":
+                key_of = lambda contact: contact.email.lower().rpartition("@")[2]
+            elif field_name == "phone":
+                key_of = lambda contact: normalize_phone(contact.phone_number)
+            elif field_name in NUMERIC_FIELDS:
+                getter = FIELDS[field_name][0]
+                key_of = lambda contact: (getter(contact) or "").lstrip("0") or "0"
+            else:
+                getter, normalize = FIELDS[field_name]
+                key_of = lambda contact: normalize(getter(contact) or "")
+
+            postings = {}
+            for position, contact in enumerate(contacts):
+                _add_to_posting(postings, key_of(contact), position)
+            self._exact[field_name] = postings
+        return postings
+
+    def _trigram_index(self, contacts: List[Contact], field_name: str) -> Dict[str, Posting]:
+        """
+        Returns the trigram index of a field, building it on first use.
+
+        Args:
+            contacts (List[Contact]): The contacts to index.
+            field_name (str): The field.
+
+        Returns:
+            Dict[str, Posting]: Trigram of the normalized value -> contact positions.
+        """
+        postings = self._trigrams.get(field_name)
+        if postings is not None:
+            return postings
+
+        with self._build_lock:
+            if field_name in self._trigrams:
+                return self._trigrams[field_name]
+            getter, normalize = FIELDS[field_name]
+            postings = {}
+            for position, contact in enumerate(contacts):
+                for gram in _trigrams(normalize(getter(contact) or "")):
+                    _add_to_posting(postings, gram, position)
+            self._trigrams[field_name] = postings
+        return postings
+
+
+def _matcher(predicate: Predicate) -> Callable[[Contact], bool]:
+    """
+    Builds a function that checks a predicate against a contact.
+
+    Args:
+        predicate (Predicate): The predicate.
+
+    Returns:
+        Callable[[Contact], bool]: The check.
+    """
+    getter, normalize = FIELDS[predicate.field]
+    value = predicate.value
+
+    if predicate.field in NUMERIC_FIELDS:
+        return lambda contact: ((getter(contact) or "").lstrip("0") or "0") == value
+    if predicate.operator == "~":
+        return lambda contact: value in normalize(getter(contact) or "")
+    if predicate.field == "email" and value.startswith("@"):
+        domain = value[1:]
+        return lambda contact: contact.email.lower().rpartition("@")[2] == domain
+    if predicate.field == "phone":
+        phone = normalize_phone(value)
+        return lambda contact: normalize_phone(contact.phone_number) == phone
+    return lambda contact: normalize(getter(contact) or "") == value
+
+
+def _birthday_part(birthday: Optional[str], start: int, end: int) -> str:
+    """
+    Extracts a part of a DD.MM.YYYY birthday.
+
+    Args:
+        birthday (Optional[str]): The birthday.
+        start (int): The start offset of the part.
+        end (int): The end offset of the part.
+
+    Returns:
+        str: The part, or an empty string if the birthday is missing.
+    """
+    return birthday[start:end] if birthday and len(birthday) >= end else ""
+
+
+def _trigrams(value: str) -> set:
+    """
+    Splits a value into its distinct three-character substrings.
+
+    Args:
+        value (str): The normalized value.
+
+    Returns:
+        set: The trigrams; empty for values shorter than three characters.
+    """
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+def _add_to_posting(postings: Dict[str, Posting], key: str, position: int) -> None:
+    """
+    Appends a position to the posting of a key, keeping single positions as plain ints.
+
+    Args:
+        postings (Dict[str, Posting]): The index.
+        key (str): The index key.
+        position (int): The contact position; positions are added in ascending order.
+    """
+    posting = postings.get(key)
+    if posting is None:
+        postings[key] = position
+    elif isinstance(posting, int):
+        postings[key] = array("I", (posting, position))
+    else:
+        posting.append(position)
+
+
+def _posting_size(posting: Optional[Posting]) -> int:
+    """
+    Returns the number of positions in a posting.
+    """
+    if posting is None:
+        return 0
+    return 1 if isinstance(posting, int) else len(posting)
+
+
+def _iter_posting(posting: Posting) -> Iterable[int]:
+    """
+    Iterates over the positions of a posting.
+    """
+    return (posting,) if isinstance(posting, int) else posting
+
+
+def _posting_contains(posting: Posting, position: int) -> bool:
+    """
+    Checks whether a posting holds a position using binary search.
+    """
+    if isinstance(posting, int):
+        return posting == position
+    index = bisect_left(posting, position)
+    return index < len(posting) and posting[index] == position
@@ -0,0 +1,297 @@
+"""The duplicate contact detection module
+
+Task: Find contacts that most likely describe the same person without comparing every pair.
+
+‌
+
+Contacts are first grouped into blocks that share a normalized key (phone number, email address,
+sorted name tokens or a name token prefix). Only contacts that meet in at least one block are scored,
+which keeps the work close to linear for realistic address books. Candidate pairs are scored with
+rapidfuzz and the matching pairs are grouped into merge suggestions.
+"""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set, Tuple
+from models import Contact
+
+
+@dataclass
+class MergeSuggestion:
+    """
+    A group of contacts that are considered to be the same person.
+
+    Attributes:
+        primary (Contact): The contact that is kept when the group is merged.
+        duplicates (List[Contact]): The contacts that are merged into the primary contact.
+        score (float): The lowest pair score that linked the group together (0-100).
+        reasons (List[str]): Human readable explanations of why the contacts were matched.
+    """
+
+    primary: Contact
+    duplicates: List[Contact]
+    score: float
+    reasons: List[str] = field(default_factory=list)
+
+
+def normalize_phone(phone_number: str) -> str:
+    """
+    Normalizes a phone number so that '+380XXXXXXXXX' and '0XXXXXXXXX' produce the same key.
+
+    Args:
+        phone_number (str): The phone number to normalize.
+
+    Returns:
+        str: The last nine digits of the phone number, or an empty string if it has no digits.
+    """
+    digits = re.sub(r"\D", "", phone_number or "")
+    return digits[-9:]
+
+
+def normalize_email(email: str) -> str:
+    """
+    Normalizes an email address by lowercasing it and dropping a '+suffix' from the local part.
+
+    Args:
+        email (str): The email address to normalize.
+
+    Returns:
+        str: The normalized email address.
+    """
+    local, _, domain = (email or "").strip().lower().partition("@")
+    local = local.split("+", 1)[0]
+    return f"{local}@{domain}" if domain else local
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a name into casefolded word tokens sorted alphabetically.
+
+    Args:
+        name (str): The contact name.
+
+    Returns:
+        str: The sorted tokens joined by a single space, so 'Petrenko Ivan' equals 'Ivan Petrenko'.
+    """
+    return " ".join(sorted(re.findall(r"\w+", (name or "").casefold())))
+
+
+class DuplicateFinder:
+    """
+    Detects likely duplicate contacts using blocking and fuzzy name scoring.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 85.0,
+        max_block_size: int = 50,
+        token_prefix_length: int = 4,
+    ) -> None:
+        """
+        Initializes the DuplicateFinder.
+
+        Args:
+            threshold (float): The minimum score (0-100) for two contacts to be considered duplicates.
+            max_block_size (int): Name token blocks larger than this are skipped, because very common
+                                  tokens (e.g. a popular first name) would reintroduce quadratic work.
+                                  Exact phone, email and full name blocks are never skipped.
+            token_prefix_length (int): The length of the name token prefix used as a fuzzy block key.
+        """
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.token_prefix_length = token_prefix_length
+
+    def find_duplicates(self, contacts: List[Contact]) -> List[MergeSuggestion]:
+        """
+        Finds groups of duplicate contacts.
+
+        Args:
+            contacts (List[Contact]): The contacts to examine.
+
+        Returns:
+            List[MergeSuggestion]: One suggestion per group of duplicates, strongest matches first.
+        """
+        # Imported on first use: the normalization helpers are needed at startup, rapidfuzz is not
+        from rapidfuzz import fuzz
+
+        self._name_similarity = fuzz.token_sort_ratio
+        names = [normalize_name(contact.name) for contact in contacts]
+        phones = [normalize_phone(contact.phone_number) for contact in contacts]
+        emails = [normalize_email(contact.email) for contact in contacts]
+
+        parents = list(range(len(contacts)))
+        group_scores: Dict[int, float] = {}
+        group_reasons: Dict[int, Set[str]] = defaultdict(set)
+
+        for i, j in self._candidate_pairs(names, phones, emails):
+            score, reasons = self._score_pair(i, j, names, phones, emails)
+            if score < self.threshold:
+                continue
+
+            root_i, root_j = self._find(parents, i), self._find(parents, j)
+            if root_i != root_j:
+                parents[root_j] = root_i
+                group_scores[root_i] = min(
+                    score,
+                    group_scores.pop(root_j, score),
+                    group_scores.get(root_i, score),
+                )
+                group_reasons[root_i].update(group_reasons.pop(root_j, set()))
+            group_reasons[root_i].update(reasons)
+
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for index in range(len(contacts)):
+            root = self._find(parents, index)
+            if root in group_scores:
+                groups[root].append(index)
+
+        suggestions = []
+        for root, members in groups.items():
+            primary_index = max(members, key=lambda index: (_filled_fields(contacts[index]), -index))
+            suggestions.append(
+                MergeSuggestion(
+                    primary=contacts[primary_index],
+                    duplicates=[contacts[index] for index in members if index != primary_index],
+                    score=group_scores[root],
+                    reasons=sorted(group_reasons[root]),
+                )
+            )
+
+        suggestions.sort(key=lambda suggestion: suggestion.score, reverse=True)
+        return suggestions
+
+    def _candidate_pairs(
+        self, names: List[str], phones: List[str], emails: List[str]
+    ) -> Iterable[Tuple[int, int]]:
+        """
+        Yields every pair of contact indexes that share at least one block, each pair once.
+
+        Args:
+            names (List[str]): The normalized names.
+            phones (List[str]): The normalized phone numbers.
+            emails (List[str]): The normalized email addresses.
+
+        Yields:
+            Tuple[int, int]: A pair of indexes (i < j).
+        """
+        exact_blocks: Dict[str, List[int]] = defaultdict(list)
+        token_blocks: Dict[str, List[int]] = defaultdict(list)
+
+        for index, (name, phone, email) in enumerate(zip(names, phones, emails)):
+            if phone:
+                exact_blocks["p:" + phone].append(index)
+            if email:
+                exact_blocks["e:" + email].append(index)
+            if name:
+                exact_blocks["n:" + name].append(index)
+            for token in set(name.split()):
+                if len(token) >= self.token_prefix_length:
+                    token_blocks["t:" + token[: self.token_prefix_length]].append(index)
+
+        seen: Set[Tuple[int, int]] = set()
+        blocks = list(exact_blocks.values()) + [
+            block for block in token_blocks.values() if len(block) <= self.max_block_size
+        ]
+        for block in blocks:
+            if len(block) < 2:
+                continue
+            if len(block) > self.max_block_size:
+                # Everyone in an oversized exact block shares a phone, email or name, so linking
+                # each member to the first one is enough to put them into one group.
+                pairs = ((block[0], j) for j in block[1:])
+            else:
+                pairs = (
+                    (i, j) for position, i in enumerate(block) for j in block[position + 1:]
+                )
+            for pair in pairs:
+                if pair not in seen:
+                    seen.add(pair)
+                    yield pair
+
+    def _score_pair(
+        self, i: int, j: int, names: List[str], phones: List[str], emails: List[str]
+    ) -> Tuple[float, List[str]]:
+        """
+        Scores how likely two contacts describe the same person.
+
+        A shared phone number or email address is strong evidence on its own, and the name similarity
+        only refines the score. Without a shared channel the score is the name similarity alone.
+
+        Args:
+            i (int): The index of the first contact.
+            j (int): The index of the second contact.
+            names (List[str]): The normalized names.
+            phones (List[str]): The normalized phone numbers.
+            emails (List[str]): The normalized email addresses.
+
+        Returns:
+            Tuple[float, List[str]]: The score (0-100) and the reasons behind it.
+        """
+        reasons = []
+        name_score = self._name_similarity(names[i], names[j], processor=None)
+
+        if phones[i] and phones[i] == phones[j]:
+            reasons.append("same phone")
+        if emails[i] and emails[i] == emails[j]:
+            reasons.append("same email")
+
+        if reasons:
+            score = 90 + name_score / 10
+        else:
+            score = name_score
+        if name_score >= self.threshold:
+            reasons.append(f"similar name ({name_score:.0f})")
+
+        return score, reasons
+
+    @staticmethod
+    def _find(parents: List[int], index: int) -> int:
+        """
+        Finds the root of a union-find group, compressing the path along the way.
+
+        Args:
+            parents (List[int]): The union-find parent list.
+            index (int): The index whose root is looked up.
+
+        Returns:
+            int: The root index of the group.
+        """
+        root = index
+        while parents[root] != root:
+            root = parents[root]
+        while parents[index] != root:
+            parents[index], index = root, parents[index]
+        return root
+
+
+def merge_contact_fields(primary: Contact, duplicates: List[Contact]) -> None:
+    """
+    Fills the empty optional fields of the primary contact with values from its duplicates.
+
+    Args:
+        primary (Contact): The contact that is kept.
+        duplicates (List[Contact]): The contacts merged into the primary contact.
+    """
+    for duplicate in duplicates:
+        if not primary.address and duplicate.address:
+            primary.address = duplicate.address
+        if not primary.birthday and duplicate.birthday:
+            primary.birthday = duplicate.birthday
+
+
+def _filled_fields(contact: Contact) -> int:
+    """
+    Counts the non-empty fields of a contact, used to pick the most complete record as primary.
+
+    Args:
+        contact (Contact): The contact to examine.
+
+    Returns:
+        int: The number of non-empty fields.
+    """
+    return sum(
+        1
+        for value in (contact.name, contact.address, contact.phone_number, contact.email, contact.birthday)
+        if value
+    )
@@ -1,26 +1,371 @@
 """The Note Manager logic module
 
+Changes are saved to the storage right away, or once on commit when they are grouped with
+`with manager.transaction():`. The results of the searches are cached until the notes change
+(see `managers.result_cache`).
 
+With a history storage, every edit of a note also records its earlier and new content and tags as
+revisions (see `models.note_history`), which can be listed, shown and restored. The history file is
+read on the first edit or revision lookup and saved together with the notes.
 """
 
+import os
 import re
-from typing import List
-from models import Note
-from storage import NoteStorage
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from models import Note, NoteHistory
+from storage import NoteHistoryStorage, NoteStorage
+from managers.transaction import TransactionMixin
+from managers.result_cache import ResultCache, normalize_text
+from utils.rwlock import ReadWriteLock, read_locked, write_locked
+from managers.pagination import Page, paginate
 from colors import format_red, format_green
 
 
-class NoteManager:
-    def __init__(self, storage: NoteStorage) -> None:
+class NoteManager(TransactionMixin):
+    RECORD_FIELDS = ("id", "title", "contact", "content", "tags", "created_at", "updated_at")
+
+    def __init__(self, storage: NoteStorage, history_storage: Optional[NoteHistoryStorage] = None) -> None:
         """
         Initializes the NoteManager with a NoteStorage instance.
 
         Args:
             storage (NoteStorage): An instance of NoteStorage for managing note data.
+            history_storage (Optional[NoteHistoryStorage]): Where the revisions of the notes are kept;
+                without it, edits keep no history.
         """
         self.storage = storage
-        self.notes: List[Note] = self.storage.load_data()
+        self.history_storage = history_storage
+        # Loaded from the storage on first access, so startup does not wait for the data file
+        self._notes: Optional[List[Note]] = None
+        # Shared by concurrent readers, exclusive for changes; transactions hold it for writing
+        self.lock = ReadWriteLock()
+
+        # Bumped on every change of the notes, so derived data can be reused safely
+        self._generation = 0
+        self._init_transactions()
+        # Search results of the current generation, so repeated searches do not scan every note
+        self.result_cache = ResultCache("notes")
+
+        # Id and title lookups, built on first use and kept in step with changes made through the manager
+        self._notes_by_id: Optional[Dict[int, Note]] = None
+        self._notes_by_title: Dict[str, Note] = {}
+        self._next_id = 1
+        self._lookup_generation = -1
+        self._lookup_lock = threading.Lock()
+
+        # The histories of the notes, read on first use; note id -> history
+        self._history_records: Optional[List[NoteHistory]] = None
+        self._histories: Optional[Dict[int, NoteHistory]] = None
+        self._history_unsaved = False
+        self._history_lock = threading.Lock()
+
+    @property
+    def notes(self) -> List[Note]:
+        """
+        Returns the list of notes, loading it from the storage on first access.
+        """
+        if self._notes is None:
+            self._notes = self.storage.load_data()
+        return self._notes
+
+    @notes.setter
+    def notes(self, notes: List[Note]) -> None:
+        self._notes = notes
+
+    @property
+    def loaded_count(self) -> int:
+        """
+        Returns the number of notes in memory, without loading the data file; 0 before it is loaded.
+        """
+        notes = self._notes
+        return len(notes) if notes is not None else 0
+
+    def _records(self) -> List[Note]:
+        """
+        Returns the list of notes managed by the manager.
+        """
+        return self.notes
+
+    def _changed(self, added: Iterable[Note] = (), removed: Iterable[Note] = ()) -> None:
+        """
+        Bumps the generation after a change and updates the id and title lookups incrementally.
+
+        Args:
+            added (Iterable[Note]): The notes added to the list.
+            removed (Iterable[Note]): The notes removed from the list.
+        """
+        self._generation += 1
+        if self._notes_by_id is None:
+            return
+        for note in removed:
+            if self._notes_by_id.get(note.id) is note:
+                del self._notes_by_id[note.id]
+            if self._notes_by_title.get(note.title.lower()) is note:
+                del self._notes_by_title[note.title.lower()]
+        for note in added:
+            self._notes_by_id[note.id] = note
+            self._notes_by_title.setdefault(note.title.lower(), note)
+            if isinstance(note.id, int):
+                self._next_id = max(self._next_id, note.id + 1)
+        self._lookup_generation = self._generation
+
+    def _lookups(self) -> Dict[int, Note]:
+        """
+        Returns the id lookup, rebuilding both lookups if the notes changed outside the manager methods.
+
+        Returns:
+            Dict[int, Note]: Note id -> note; for repeated ids the last note wins.
+        """
+        if self._notes_by_id is None or self._lookup_generation != self._generation:
+            # Concurrent readers may get here together; only one of them builds the lookups
+            with self._lookup_lock:
+                if self._notes_by_id is None or self._lookup_generation != self._generation:
+                    notes_by_id: Dict[int, Note] = {}
+                    notes_by_title: Dict[str, Note] = {}
+                    next_id = 1
+                    for note in self.notes:
+                        notes_by_id[note.id] = note
+                        notes_by_title.setdefault(note.title.lower(), note)
+                        if isinstance(note.id, int):
+                            next_id = max(next_id, note.id + 1)
+                    self._notes_by_title = notes_by_title
+                    self._next_id = next_id
+                    self._notes_by_id = notes_by_id
+                    self._lookup_generation = self._generation
+        return self._notes_by_id
+
+    def _history_index(self) -> Dict[int, NoteHistory]:
+        """
+        Returns the histories by note id, reading the history file on first use.
+
+        Returns:
+            Dict[int, NoteHistory]: Note id -> history; empty without a history storage.
+        """
+        if self._histories is None:
+            with self._history_lock:
+                if self._histories is None:
+                    if self._history_records is None:
+                        storage = self.history_storage
+                        # A missing history file only means that no note was edited yet
+                        if storage is not None and os.path.exists(storage.file_path):
+                            self._history_records = storage.load_data()
+                        else:
+                            self._history_records = []
+                    self._histories = {history.note_id: history for history in self._history_records}
+        return self._histories
+
+    def _record_revision(self, note: Note, content: str, tags: List[str], updated_at: Any) -> None:
+        """
+        Records an edit of a note in its history: the state before the edit, unless it is the last
+        revision already, and the state after it.
+
+        Args:
+            note (Note): The edited note.
+            content (str): The content before the edit.
+            tags (List[str]): The tags before the edit.
+            updated_at (Any): When the note got the content and tags before the edit.
+        """
+        if self.history_storage is None:
+            return
+        histories = self._history_index()
+        history = histories.get(note.id)
+        if history is None:
+            history = NoteHistory(note.id)
+            histories[note.id] = history
+            self._history_records.append(history)
+        count = len(history)
+        # Also covers changes made without an edit, such as added tags
+        history.append(content, tags, updated_at)
+        history.append(note.content, note.tags, note.updated_at)
+        self._history_unsaved = True
+        self._on_rollback(lambda: self._truncate_history(history, count))
+
+    def _truncate_history(self, history: NoteHistory, count: int) -> None:
+        """
+        Drops the revisions recorded in a rolled back transaction, and the history if none are left.
+        """
+        history.truncate(count)
+        if not len(history):
+            if self._histories is not None:
+                self._histories.pop(history.note_id, None)
+            self._history_records[:] = [kept for kept in self._history_records if kept is not history]
+        self._history_unsaved = True
+
+    def _drop_history(self, note_id: int) -> Optional[NoteHistory]:
+        """
+        Drops the history of a removed note, so a later note that gets its id starts without one.
+
+        Returns:
+            Optional[NoteHistory]: The dropped history, if the note had one.
+        """
+        if self.history_storage is None:
+            return None
+        history = self._history_index().pop(note_id, None)
+        if history is None:
+            return None
+        self._history_records[:] = [kept for kept in self._history_records if kept is not history]
+        self._history_unsaved = True
+        self._on_rollback(lambda: self._keep_history(history))
+        return history
+
+    def _keep_history(self, history: Optional[NoteHistory]) -> None:
+        """
+        Adds a dropped history again, when the removal of its note is undone.
+        """
+        if history is None or self.history_storage is None:
+            return
+        self._history_index()[history.note_id] = history
+        self._history_records.append(history)
+        self._history_unsaved = True
+        self._on_rollback(lambda: self._drop_history(history.note_id))
+
+    def _put_back(self, note: Note, position: int, history: Optional[NoteHistory] = None) -> None:
+        """
+        Inserts a note again where it was, with its history, to undo its removal or redo its addition.
+
+        Raises:
+            ValueError: If another note has its id or title by now.
+        """
+        if note.id in self._lookups() or self.find_note_by_title(note.title):
+            raise ValueError(f"another note has the id {note.id} or the title '{note.title}'.")
+        position = min(position, len(self.notes))
+        self._remember_list()
+        self.notes.insert(position, note)
+        self._changed(added=[note])
+        self._on_rollback(lambda: self._take_out(note, position), list_change=True)
+        self._keep_history(history)
+        self._persist()
+
+    def _take_out(self, note: Note, position: int) -> Optional[NoteHistory]:
+        """
+        Removes a note object again, with its history, to undo its addition or redo its removal.
+
+        Returns:
+            Optional[NoteHistory]: The dropped history, if the note had one.
+
+        Raises:
+            ValueError: If the note was removed or replaced since.
+        """
+        position = self._locate(note, position)
+        if position < 0:
+            raise ValueError(f"the note '{note.title}' was changed or removed since.")
+        self._remember_list()
+        del self.notes[position]
+        self._changed(removed=[note])
+        self._on_rollback(lambda: self._put_back(note, position), list_change=True)
+        history = self._drop_history(note.id)
+        self._persist()
+        return history
+
+    def _set_state(self, note: Note, expected: tuple, state: tuple) -> None:
+        """
+        Sets the content, tags and update time of a note, to undo or redo an edit or a tag change.
+
+        Args:
+            note (Note): The note.
+            expected (tuple): The content, tags and update time the note must have now.
+            state (tuple): The content, tags and update time to set.
+
+        Raises:
+            ValueError: If the note was removed, replaced or changed otherwise since.
+        """
+        if self._lookups().get(note.id) is not note or (note.content, list(note.tags), note.updated_at) != expected:
+            raise ValueError(f"the note '{note.title}' was changed or removed since.")
+        self._remember(note)
+        content, tags, updated_at = state
+        note.content = content
+        note.tags = list(tags)
+        note.updated_at = updated_at
+        self._record_revision(note, *expected)
+        self._changed()
+        self._persist()
+
+    def _log_state_change(self, description: str, note: Note, before: tuple) -> None:
+        """
+        Records a change of the content, tags or update time of a note in the undo log.
+
+        Args:
+            description (str): What the change did.
+            note (Note): The changed note.
+            before (tuple): Its content, tags and update time before the change.
+        """
+        if self.undo_log is None:
+            return
+        after = (note.content, list(note.tags), note.updated_at)
+        self._log_undo(
+            description,
+            lambda: self._set_state(note, after, before),
+            lambda: self._set_state(note, before, after),
+        )
+
+    def _history_of(self, note_id: int) -> NoteHistory:
+        """
+        Returns the history of a note.
+
+        Raises:
+            ValueError: If there is no history storage or the note has no recorded revisions.
+        """
+        if self.history_storage is None:
+            raise ValueError(format_red("Note history is not enabled."))
+        history = self._history_index().get(note_id)
+        if history is None or not len(history):
+            raise ValueError(format_red(f"Note with id {note_id} has no revisions yet; they are recorded when it is edited."))
+        return history
+
+    def _save_now(self) -> None:
+        """
+        Saves the notes and, if revisions were recorded since the last save, the history.
+        """
+        super()._save_now()
+        if self._history_unsaved:
+            self._history_unsaved = False
+            if self.history_storage.save_data(self._history_records):
+                # Histories another process saved were merged in
+                self._histories = None
+
+    def refresh(self) -> bool:
+        """
+        Picks up the notes and the histories other processes saved since they were last read or saved.
+
+        Returns:
+            bool: True if the notes were updated.
+        """
+        refreshed = super().refresh()
+        storage = self.history_storage
+        if storage is not None and self._history_records is not None and storage.has_external_changes():
+            with self.lock.write():
+                if not (self.in_transaction or self._unsaved or self._history_unsaved) and storage.refresh():
+                    self._histories = None
+        return refreshed
+
+    @read_locked
+    def find_note_by_title(self, title: str) -> Optional[Note]:
+        """
+        Finds a note by its title, ignoring case, in constant time.
+
+        Args:
+            title (str): The note title.
+
+        Returns:
+            Optional[Note]: The note, or None if there is no note with this title.
+        """
+        self._lookups()
+        return self._notes_by_title.get(title.lower())
 
+    @read_locked
+    def next_note_id(self) -> int:
+        """
+        Returns an id that no note uses yet.
+
+        Returns:
+            int: One more than the largest note id.
+        """
+        self._lookups()
+        return self._next_id
+
+    @read_locked
     def get_note_by_id(self, note_id: int) -> Note:
         """Method returns note by it`s id
 
@@ -30,8 +375,7 @@ class NoteManager:
         Returns:
             Note: Returns Founded Note otherwise None
         """
-        results = [note for note in self.notes if note.id == note_id]
-        return results[-1] if results else None
+        return self._lookups().get(note_id)
 
     def validate_note(self, note: Note, min_title_length: int = 5) -> bool:
         """
@@ -65,6 +409,7 @@ class NoteManager:
 
         return True
 
+    @write_locked
     def add_note(self, note: Note) -> None:
         """
         Adds a new note to the list of notes if the title is unique.
@@ -76,15 +421,52 @@ class NoteManager:
         Args:
             note (Note): The Note object to be added.
         """
-        for existing_note in self.notes:
-            if existing_note.title.lower() == note.title.lower():
-                print(format_red(f"Error: A note with the same '{note.title}' already exists"))
-                return
+        if self.find_note_by_title(note.title):
+            print(format_red(f"Error: A note with the same '{note.title}' already exists"))
+            return
 
+        self._remember_list()
         self.notes.append(note)
-        self.storage.save_data(self.notes)
+        self._changed(added=[note])
+        self._persist()
+        position = len(self.notes) - 1
+        self._log_undo(
+            f"add note '{note.title}'",
+            lambda: self._take_out(note, position),
+            lambda: self._put_back(note, position),
+            (note,),
+        )
         print(format_green(f"Success: Note titled '{note.title}' successfully added."))
 
+    @write_locked
+    def add_notes(self, notes: Iterable[Note]) -> int:
+        """
+        Adds many notes with a single save, skipping those whose title is already taken.
+
+        A note whose id is already used gets the next free id. Unlike `add_note` nothing is printed
+        per note, which makes it suitable for imports.
+
+        Args:
+            notes (Iterable[Note]): The notes to add.
+
+        Returns:
+            int: The number of notes added.
+        """
+        added = 0
+        for note in notes:
+            if self.find_note_by_title(note.title):
+                continue
+            if note.id in self._lookups():
+                note.id = self._next_id
+            self._remember_list()
+            self.notes.append(note)
+            self._changed(added=[note])
+            added += 1
+        if added:
+            self._persist()
+        return added
+
+    @read_locked
     def search_by_title(self, query: str) -> List[Note]:
         """
         Searches for notes by title or content and returns a list of matching notes.
@@ -109,7 +491,11 @@ class NoteManager:
                 raise ValueError(format_red("Search name cannot be empty."))
 
             pattern = re.compile(re.escape(query), re.IGNORECASE)
-            matching_notes = [note for note in self.notes if pattern.search(note.title)]
+            matching_notes = self.result_cache.get_or_compute(
+                ("search_by_title", normalize_text(query)),
+                self._generation,
+                lambda: [note for note in self.notes if pattern.search(note.title)],
+            )
 
             return matching_notes
 
@@ -122,6 +508,7 @@ class NoteManager:
                 format_red(f"An unexpected error occurred during the search: {e}")
             )
 
+    @write_locked
     def edit_note(self, note_id: int, updated_note: Note) -> None:
         """
         Updates a note with the specified note_id with new data.
@@ -140,12 +527,101 @@ class NoteManager:
         """
         note = self.get_note_by_id(note_id)
         if note:
+            self._remember(note)
+            content, tags, updated_at = note.content, list(note.tags), note.updated_at
             note.update_content_and_tag(updated_note.content, updated_note.tags)
-            self.storage.save_data(self.notes)
+            self._record_revision(note, content, tags, updated_at)
+            self._changed()
+            self._persist()
+            self._log_state_change(f"edit note '{note.title}'", note, (content, tags, updated_at))
             print(format_green(f"Note '{note.title}' updated successfully."))
         else:
             print(format_red(f"Note with id {note_id} not found."))
 
+    @read_locked
+    def get_revisions(self, note_id: int) -> List[Dict[str, Any]]:
+        """
+        Lists the recorded revisions of a note, without rebuilding them.
+
+        Args:
+            note_id (int): The ID of the note.
+
+        Returns:
+            List[Dict[str, Any]]: Per revision, oldest first: its number, when the note got it ('at'),
+            whether it is stored as a 'checkpoint' or a 'delta', and its stored size in bytes.
+
+        Raises:
+            ValueError: If note history is not enabled or the note has no revisions.
+        """
+        return [
+            {
+                "revision": revision["revision"],
+                "at": revision["at"],
+                "kind": revision["kind"],
+                "stored_bytes": len(revision["data"]),
+            }
+            for revision in self._history_of(note_id).revisions
+        ]
+
+    @read_locked
+    def get_note_revision(self, note_id: int, revision: int) -> Note:
+        """
+        Rebuilds a note as it was at one of its revisions; the note itself is not changed.
+
+        Args:
+            note_id (int): The ID of the note.
+            revision (int): The revision number, from 1.
+
+        Returns:
+            Note: A copy of the note with the content and tags of the revision, updated at its time.
+
+        Raises:
+            ValueError: If the note does not exist, has no such revision or history is not enabled.
+        """
+        note = self.get_note_by_id(note_id)
+        if not note:
+            raise ValueError(format_red(f"Note with id {note_id} not found."))
+        history = self._history_of(note_id)
+        content, tags = history.state(revision)
+        return Note(
+            id=note.id,
+            title=note.title,
+            contact=note.contact,
+            content=content,
+            tags=tags,
+            created_at=note.created_at,
+            updated_at=history.revisions[revision - 1]["at"],
+        )
+
+    @write_locked
+    def restore_note_revision(self, note_id: int, revision: int) -> None:
+        """
+        Sets the content and tags of a note back to those of a revision.
+
+        The restore is an edit like any other: it is recorded as a new revision, so the revisions
+        after the restored one are kept and can be restored in turn.
+
+        Args:
+            note_id (int): The ID of the note.
+            revision (int): The revision number, from 1.
+
+        Raises:
+            ValueError: If the note does not exist, has no such revision or history is not enabled.
+        """
+        restored = self.get_note_revision(note_id, revision)
+        note = self.get_note_by_id(note_id)
+        self._remember(note)
+        content, tags, updated_at = note.content, list(note.tags), note.updated_at
+        note.content = restored.content
+        note.tags = restored.tags
+        note.updated_at = datetime.now()
+        self._record_revision(note, content, tags, updated_at)
+        self._changed()
+        self._persist()
+        self._log_state_change(f"restore note '{note.title}' to revision {revision}", note, (content, tags, updated_at))
+        print(format_green(f"Note '{note.title}' restored to revision {revision}."))
+
+    @write_locked
     def remove_note(self, title: str) -> None:
         """
         Deletes a note with the specified title from the list of notes.
@@ -161,16 +637,29 @@ class NoteManager:
         Raises:
             ValueError: If no note with the specified title is found, an error message is printed.
         """
-        note_to_remove = next(
-            (note for note in self.notes if note.title == title), None
-        )
+        note_to_remove = self.find_note_by_title(title)
+        if note_to_remove and note_to_remove.title != title:
+            note_to_remove = next(
+                (note for note in self.notes if note.title == title), None
+            )
         if note_to_remove:
-            self.notes.remove(note_to_remove)
-            self.storage.save_data(self.notes)
+            position = next(i for i, note in enumerate(self.notes) if note is note_to_remove)
+            self._remember_list()
+            del self.notes[position]
+            history = self._drop_history(note_to_remove.id)
+            self._changed(removed=[note_to_remove])
+            self._persist()
+            self._log_undo(
+                f"remove note '{title}'",
+                lambda: self._put_back(note_to_remove, position, history),
+                lambda: self._take_out(note_to_remove, position),
+                (note_to_remove,),
+            )
             print(format_green(f"Note '{title}' successfully deleted."))
         else:
             print(format_red(f"Note '{title}' not found."))
 
+    @read_locked
     def search_by_tag(self, tag: str) -> List[Note]:
         """
         Searches for notes that contain the specified tag.
@@ -189,8 +678,11 @@ class NoteManager:
         if not tag.strip():
             raise ValueError(format_red("Tag cannot be empty or whitespace."))
 
-        return [note for note in self.notes if tag in note.tags]
+        return self.result_cache.get_or_compute(
+            ("search_by_tag", tag), self._generation, lambda: [note for note in self.notes if tag in note.tags]
+        )
 
+    @read_locked
     def sort_by_tags(self, order: str = "asc") -> List[Note]:
         """
         Sort the notes by the number of tags and then alphabetically by tags.
@@ -212,19 +704,15 @@ class NoteManager:
         if order not in ('asc', 'desc'):
             raise ValueError(format_red("Order must be 'asc' or 'desc'"))
         
-        if order == 'asc':
-            sorted_notes = sorted(
-                self.notes, key=lambda note: (len(note.tags), sorted(note.tags))
-            )
-        else:
-            sorted_notes = sorted(
-                self.notes,
-                key=lambda note: (len(note.tags), sorted(note.tags)),
-                reverse=True,
-            )
-
-        return sorted_notes
+        return self.result_cache.get_or_compute(
+            ("sort_by_tags", order),
+            self._generation,
+            lambda: sorted(
+                self.notes, key=lambda note: (len(note.tags), sorted(note.tags)), reverse=order == 'desc'
+            ),
+        )
 
+    @read_locked
     def get_all_notes(self) -> List[Note]:
         """
         Retrieves all notes from the notes collection.
@@ -232,10 +720,32 @@ class NoteManager:
         This method returns a list of all notes currently stored in the notes collection.
 
         Returns:
-            List[Note]: A list of all Note objects. If no notes are stored, an empty list is returned.
+            List[Note]: A snapshot of the notes, safe to iterate while other threads change them.
+                        If no notes are stored, an empty list is returned.
         """
-        return self.notes
+        return list(self.notes)
 
+    @read_locked
+    def get_notes_page(
+        self, limit: int = 20, offset: int = 0, cursor: Optional[str] = None
+    ) -> Page[Note]:
+        """
+        Retrieves one page of notes in their stable list order.
+
+        Args:
+            limit (int): The maximum number of notes on the page. Default is 20.
+            offset (int): The position of the first note; ignored when a cursor is given.
+            cursor (Optional[str]): The cursor returned with the previous page.
+
+        Returns:
+            Page[Note]: The page with its notes, the total count and the next cursor.
+
+        Raises:
+            ValueError: If the limit or offset is negative or the cursor is malformed.
+        """
+        return paginate(self.notes, lambda note: note.id, limit, offset, cursor)
+
+    @write_locked
     def add_tag(self, note_id: int, tag: str) -> None:
         """
         Adds a tag to the note with the specified note_id.
@@ -254,14 +764,19 @@ class NoteManager:
         note = self.get_note_by_id(note_id)
         if not note:
             print(format_red(f"Note with id {note_id} not found."))
-            
+            return
+
         # Add the tag to the note's tags list if it's not already present
         if tag and tag not in note.tags:
+            self._remember(note)
+            before = (note.content, list(note.tags), note.updated_at)
             note.tags.append(tag)
-            self.storage.save_data(self.notes)
+            self._changed()
+            self._persist()
+            self._log_state_change(f"add tag '{tag}' to note '{note.title}'", note, before)
 
-            # Verify if the tag has been successfully added to the storage
-            if self.is_note_tag_in_storage(note_id, tag):
+            # Verify that the tag was added to the note, which is the object the storage saves
+            if tag in note.tags:
                 print(format_green(f"Tag '{tag}' has been added to the Note with id {note.title}."))
             else:
                 print(
@@ -272,6 +787,7 @@ class NoteManager:
         else:
             print(format_red("Invalid tag. Please provide a valid tag string."))
     
+    @write_locked
     def remove_tag(self, note_id: int, tag: str) -> None:
         """
         Removes a tag from the note with the specified note_id.
@@ -289,14 +805,19 @@ class NoteManager:
         note = self.get_note_by_id(note_id)
         if not note:
             print(format_red(f"Note with id {note_id} not found."))
-        
+            return
+
         # Remove the tag if it exists
         if tag in note.tags:
+            self._remember(note)
+            before = (note.content, list(note.tags), note.updated_at)
             note.tags.remove(tag)
-            self.storage.save_data(self.notes)
+            self._changed()
+            self._persist()
+            self._log_state_change(f"remove tag '{tag}' from note '{note.title}'", note, before)
 
-            # Verify if the tag has been successfully removed from the storage
-            if not self.is_note_tag_in_storage(note_id, tag):
+            # Verify that the tag was removed from the note, which is the object the storage saves
+            if tag not in note.tags:
                 print(
                     format_green(f"Tag '{tag}' has been removed from the Note with id {note.title}.")
                 )
@@ -309,15 +830,19 @@ class NoteManager:
                 format_red(f"Tag '{tag}' not found for the Note with id {note.title}.")
             )
     
-    def is_note_tag_in_storage(self, note_id: int, tag:str) -> bool:
-        """Method check is tag in the data storage
+    @read_locked
+    def note_has_tag(self, note_id: int, tag: str) -> bool:
+        """
+        Checks whether the note with the given id has a tag.
+
+        The managed note is checked, not the data file; the storage saves the managed note objects.
+
         Args:
-            note_id (int): The ID of the note from which the tag will be checked.
+            note_id (int): The ID of the note to check.
             tag (str): The tag to check.
+
         Returns:
-            bool: True if tag is in the storage in checked Note otherwise False.
+            bool: True if the note exists and has the tag, False otherwise.
         """
-        note = [note for note in self.storage.load_data() if note.id == note_id]
-        if note:
-            return tag in note[-1].tags
-        return False
+        note = self.get_note_by_id(note_id)
+        return note is not None and tag in note.tags
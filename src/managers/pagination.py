@@ -0,0 +1,143 @@
+"""The pagination module
+
+Task: Return records one page at a time without copying or formatting the whole list.
+
+‌
+
+Records are paged in their list order, which is stable: new records are appended at the end and the
+order of the others never changes. Pages can be addressed by offset, or by an opaque cursor returned
+with the previous page. A cursor remembers the key of the last record shown (the contact name or the
+note id) together with its position, so the next page continues after that record even if records
+before it were added or removed in the meantime.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, List, Optional, TypeVar
+from colors import format_red
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """
+    One page of records.
+
+    Attributes:
+        items (List[T]): The records on the page.
+        total (int): The total number of records.
+        offset (int): The position of the first record on the page.
+        limit (int): The maximum number of records on a page.
+        next_cursor (Optional[str]): The cursor of the next page, or None on the last page.
+    """
+
+    items: List[T]
+    total: int
+    offset: int
+    limit: int
+    next_cursor: Optional[str]
+
+    @property
+    def number(self) -> int:
+        """
+        Returns the 1-based number of the page.
+        """
+        return self.offset // self.limit + 1 if self.limit else 1
+
+    @property
+    def pages(self) -> int:
+        """
+        Returns the total number of pages.
+        """
+        return max(1, -(-self.total // self.limit)) if self.limit else 1
+
+
+def paginate(
+    records: List[T],
+    key: Callable[[T], Any],
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> Page[T]:
+    """
+    Returns one page of records, addressed by offset or by cursor.
+
+    Only the records on the page are touched, so the cost does not depend on the size of the list
+    (except when a cursor has to relocate a record that moved).
+
+    Args:
+        records (List[T]): The records in their stable order.
+        key (Callable[[T], Any]): Returns the unique key of a record, stored in cursors.
+        limit (int): The maximum number of records on the page.
+        offset (int): The position of the first record; ignored when a cursor is given.
+        cursor (Optional[str]): The cursor returned with the previous page.
+
+    Returns:
+        Page[T]: The requested page.
+
+    Raises:
+        ValueError: If the limit or offset is negative or the cursor is malformed.
+    """
+    if limit <= 0:
+        raise ValueError(format_red("Page size must be a positive number."))
+    if offset < 0:
+        raise ValueError(format_red("Offset cannot be negative."))
+
+    if cursor is not None:
+        offset = _resume_position(records, key, *_decode_cursor(cursor))
+
+    items = records[offset:offset + limit]
+    end = offset + len(items)
+    next_cursor = _encode_cursor(key(items[-1]), end - 1) if items and end < len(records) else None
+
+    return Page(items=items, total=len(records), offset=offset, limit=limit, next_cursor=next_cursor)
+
+
+def _encode_cursor(last_key: Any, position: int) -> str:
+    """
+    Encodes the key and position of the last record on a page into an opaque cursor.
+    """
+    payload = json.dumps([last_key, position], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """
+    Decodes a cursor into the key and position of the last record shown.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        last_key, position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return last_key, int(position)
+    except (ValueError, TypeError) as ex:
+        raise ValueError(format_red(f"Invalid page cursor: {ex}"))
+
+
+def _resume_position(records: List[T], key: Callable[[T], Any], last_key: Any, position: int) -> int:
+    """
+    Finds the position right after the last record shown.
+
+    The record is normally still at the remembered position. If records before it were added or
+    removed, it is looked up by key; if it was removed itself, paging continues at the old position.
+
+    Args:
+        records (List[T]): The records in their stable order.
+        key (Callable[[T], Any]): Returns the unique key of a record.
+        last_key (Any): The key of the last record shown.
+        position (int): The position the record had.
+
+    Returns:
+        int: The offset of the next page.
+    """
+    if 0 <= position < len(records) and key(records[position]) == last_key:
+        return position + 1
+
+    for index, record in enumerate(records):
+        if key(record) == last_key:
+            return index + 1
+
+    return min(max(position, 0), len(records))
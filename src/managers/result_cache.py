@@ -0,0 +1,190 @@
+"""The manager result cache module
+
+Task: Answer a repeated search without scanning every record again while nothing has changed.
+
+‌
+
+The managers keep the results of their searches in a `ResultCache`, keyed by the method and its
+normalized arguments. Every entry remembers the generation of the manager it was computed in; the
+managers bump their generation on every change of their records (including rollbacks, refreshes and
+merged saves), so an entry of an older generation is stale and is recomputed on its next lookup.
+Invalidation therefore costs one integer increment per change, whatever the number of entries.
+
+The cache is bounded by a number of entries and by a memory budget. Results refer to the records of
+the manager, which are not copied, so only the result lists themselves and the values created for
+them (such as the birthday entries) count against the budget. When either bound is exceeded, the
+least recently used entries are evicted. A result larger than a quarter of the budget is not cached,
+so one huge listing cannot evict everything else.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+# The bounds of a cache; 16 MB holds the matches of about two million records
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# The bookkeeping of one entry besides its result: the dictionary slot, the key and the entry tuple
+_ENTRY_OVERHEAD = 200
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes the text of a case-insensitive search for the cache key.
+
+    Only ASCII text is lowercased: for other scripts the case rules of `str.lower` and of
+    `re.IGNORECASE` differ, and two texts must share a key only if they match the same records.
+
+    Args:
+        text (str): The searched text.
+
+    Returns:
+        str: The key part.
+    """
+    return text.lower() if text.isascii() else text
+
+
+def estimate_size(result: Sequence[Any]) -> int:
+    """
+    Estimates the memory a cached result holds on its own.
+
+    Records of the manager are shared with it and not counted; dictionaries created for the result,
+    such as the upcoming birthdays, are counted with their values.
+
+    Args:
+        result (Sequence[Any]): The cached result.
+
+    Returns:
+        int: The size in bytes.
+    """
+    size = sys.getsizeof(result)
+    for item in result:
+        if type(item) is dict:
+            size += sys.getsizeof(item) + sum(sys.getsizeof(value) for value in item.values())
+    return size
+
+
+class ResultCache:
+    """
+    A least recently used cache of search results, invalidated by the generation of its manager.
+    """
+
+    def __init__(self, name: str, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            name (str): The name shown in the statistics, e.g. 'contacts'.
+            max_entries (int): The maximum number of cached results; 0 disables the cache.
+            max_bytes (int): The memory budget of the cached results, in bytes.
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Key -> (generation, result, size), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[int, Tuple[Any, ...], int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.uncached = 0
+        # Searches run in concurrent readers
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, generation: int, compute: Callable[[], Sequence[Any]]) -> List[Any]:
+        """
+        Returns the cached result for a key, or computes and caches it.
+
+        Exceptions of `compute` are not cached.
+
+        Args:
+            key (Hashable): The method name and its normalized arguments.
+            generation (int): The current generation of the manager.
+            compute (Callable[[], Sequence[Any]]): Computes the result.
+
+        Returns:
+            List[Any]: A new list with the result, which the caller may change.
+        """
+        if not self.max_entries:
+            return list(compute())
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == generation:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(entry[1])
+                # Computed before the last change of the records
+                self._discard(key)
+                self.stale += 1
+            self.misses += 1
+
+        result = tuple(compute())
+        size = estimate_size(result) + _ENTRY_OVERHEAD
+        with self._lock:
+            if size > self.max_bytes // 4:
+                self.uncached += 1
+            else:
+                if key in self._entries:
+                    self._discard(key)
+                self._entries[key] = (generation, result, size)
+                self._bytes += size
+                self._evict()
+        return list(result)
+
+    def clear(self) -> None:
+        """
+        Drops every cached result, keeping the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def reset_counters(self) -> None:
+        """
+        Sets the counters of lookups and evictions to zero, keeping the cached results.
+        """
+        with self._lock:
+            self.hits = self.misses = self.stale = self.evictions = self.uncached = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the counters and the size of the cache.
+
+        Returns:
+            Dict[str, Any]: Lookups by outcome, the hit ratio, evictions, entries and bytes held.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "uncached": self.uncached,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _discard(self, key: Hashable) -> None:
+        """
+        Removes an entry; the lock is held by the caller.
+        """
+        self._bytes -= self._entries.pop(key)[2]
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used entries until both bounds hold; the lock is held by the caller.
+        """
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
@@ -0,0 +1,310 @@
+"""The manager transaction module
+
+Task: Let a manager apply many changes with a single save and undo all of them if one fails.
+
+‌
+
+Inside `with manager.transaction():` the manager methods change the records in memory as usual, but
+instead of saving after every change they only mark the manager as dirty. When the outermost block
+exits normally the records are saved once; when it exits with an exception the record list and every
+record changed in place are restored to their state at the start of the transaction.
+
+A nested block is a savepoint: when it exits with an exception, only the changes made inside it are
+undone, and the enclosing transaction goes on. The record list is copied for a block only before the
+block first adds or removes a record, so blocks that change records in place, or nothing, cost nothing
+per record.
+
+Saving merges the changes other processes saved to the same file in the meantime (see `Storage`), and
+`refresh()` picks them up between commands. A caller that sets `save_scheduler` (the asynchronous REPL)
+is told about changes instead, and saves them later with `flush()`.
+
+A caller that sets `undo_log` gets the changes recorded for undo and redo (see `managers.undo_log`);
+changes rolled back with their transaction are taken out of the log again.
+"""
+
+import copy
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from managers.undo_log import UndoLog
+
+
+@dataclass
+class Savepoint:
+    """
+    What a transaction block needs to undo its own changes.
+
+    Attributes:
+        copy_list (bool): Restore the record list from a copy, rather than with the rollback actions
+            of the list changes.
+        actions (int): The number of rollback actions registered before the block.
+        records (Optional[List[Any]]): The record list before the block first changed it, if it did.
+        touched (Dict[int, Tuple[Any, Dict[str, Any]]]): id(record) -> the record and its field values
+            before the block first changed it in place.
+    """
+
+    copy_list: bool
+    actions: int
+    records: Optional[List[Any]] = None
+    touched: Dict[int, Tuple[Any, Dict[str, Any]]] = field(default_factory=dict)
+
+
+class TransactionMixin(ABC):
+    """
+    Adds transactions to a manager that keeps its records in a list and persists them through `self.storage`.
+
+    Subclasses call `_init_transactions()` in `__init__`, implement `_records()`, list the record fields in
+    `RECORD_FIELDS`, call `_persist()` instead of saving directly, `_remember(record)` before changing a
+    record in place and `_remember_list()` before adding, removing or replacing records in the list.
+    They also provide `self.lock`, a ReadWriteLock.
+    """
+
+    RECORD_FIELDS: Tuple[str, ...] = ()
+
+    def _init_transactions(self) -> None:
+        """
+        Initializes the transaction state; no transaction is active.
+        """
+        # One savepoint per open transaction block, the outermost first
+        self._savepoints: List[Savepoint] = []
+        self._transaction_dirty = False
+        # Undo the changes of the transaction kept outside the records, such as note revisions
+        self._rollback_actions: List[Tuple[Callable[[], None], bool]] = []
+        # Called with the manager instead of saving, by callers that save in the background
+        self.save_scheduler: Optional[Callable[[Any], None]] = None
+        self._unsaved = False
+        # Receives the changes for undo and redo, when set
+        self.undo_log: Optional["UndoLog"] = None
+
+    @abstractmethod
+    def _records(self) -> List[Any]:
+        """
+        Returns the list of records managed by the manager.
+        """
+        pass
+
+    @property
+    def in_transaction(self) -> bool:
+        """
+        Tells whether a transaction is active.
+
+        Returns:
+            bool: True inside a `transaction()` block.
+        """
+        return bool(self._savepoints)
+
+    @property
+    def has_unsaved_changes(self) -> bool:
+        """
+        Tells whether changes handed to `save_scheduler` still wait for `flush()`.
+        """
+        return self._unsaved
+
+    @contextmanager
+    def transaction(self, snapshot: bool = True) -> Iterator[None]:
+        """
+        Groups changes so that they are saved once on commit and undone on an exception.
+
+        Nested transactions join the outermost one, which alone saves; an exception in a nested block
+        undoes the changes made in that block only. The write lock of the manager is held for the whole
+        transaction.
+
+        Without a snapshot the record list is not copied, even when the block changes it; the changes
+        made in it must then undo their own changes to the list, with `_on_rollback(action, list_change=True)`.
+        The undo log applies its steps this way.
+
+        Args:
+            snapshot (bool): Copy the record list before its first change, to restore it on a rollback.
+
+        Yields:
+            None: The body of the `with` block runs inside the transaction.
+
+        Raises:
+            Exception: Any exception raised inside the block is re-raised after the rollback.
+        """
+        # Other threads neither see the changes before the commit nor join the transaction by accident
+        with self.lock.write():
+            outermost = not self._savepoints
+            if outermost:
+                self._transaction_dirty = False
+                self._rollback_actions = []
+            self._savepoints.append(Savepoint(snapshot, len(self._rollback_actions)))
+            try:
+                yield
+            except BaseException:
+                self._rollback(self._savepoints[-1])
+                raise
+            else:
+                if outermost and self._transaction_dirty:
+                    self._save()
+            finally:
+                self._savepoints.pop()
+                if outermost:
+                    self._transaction_dirty = False
+                    self._rollback_actions = []
+
+    def _persist(self) -> None:
+        """
+        Saves the records, or only marks them dirty while a transaction is active.
+        """
+        if self._savepoints:
+            self._transaction_dirty = True
+        else:
+            self._save()
+
+    def _save(self) -> None:
+        """
+        Saves the records, or hands the save to `save_scheduler` if one is set.
+        """
+        if self.save_scheduler is not None:
+            self._unsaved = True
+            self.save_scheduler(self)
+            return
+        self._save_now()
+
+    def _save_now(self) -> None:
+        """
+        Saves the records; if the storage merged in changes of another process, the lookups are rebuilt.
+        """
+        if self.storage.save_data(self._records()):
+            self._generation += 1
+
+    def flush(self) -> bool:
+        """
+        Saves the changes whose save was handed to `save_scheduler`.
+
+        Returns:
+            bool: True if there was anything to save.
+        """
+        with self.lock.write():
+            if not self._unsaved:
+                return False
+            self._unsaved = False
+            self._save_now()
+            return True
+
+    def refresh(self) -> bool:
+        """
+        Picks up the changes other processes saved to the data file since it was last read or saved.
+
+        Checking costs one `stat` call, so it can run before every command. Nothing is refreshed inside
+        a transaction or while a deferred save is pending; the save merges the changes instead.
+
+        Returns:
+            bool: True if the records were updated.
+        """
+        if self.in_transaction or self._unsaved or not self.storage.has_external_changes():
+            return False
+        with self.lock.write():
+            if self.in_transaction or self._unsaved or not self.storage.refresh():
+                return False
+            self._generation += 1
+            return True
+
+    def _remember(self, record: Any) -> None:
+        """
+        Records the state of a record before it is changed in place, so a rollback can restore it.
+
+        Args:
+            record (Any): The record about to be changed.
+        """
+        state = None
+        for savepoint in self._savepoints:
+            if id(record) not in savepoint.touched:
+                # The record is unchanged since the start of every block that has not seen it yet
+                if state is None:
+                    state = (record, {name: copy.copy(getattr(record, name)) for name in self.RECORD_FIELDS})
+                savepoint.touched[id(record)] = state
+
+    def _remember_list(self) -> None:
+        """
+        Copies the record list before records are added, removed or replaced, so a rollback can restore it.
+
+        The list is copied at most once per transaction block, and only for blocks with a snapshot.
+        """
+        records = None
+        for savepoint in self._savepoints:
+            if savepoint.copy_list and savepoint.records is None:
+                # The list is unchanged since the start of every block that has no copy yet
+                if records is None:
+                    records = list(self._records())
+                savepoint.records = records
+
+    def _on_rollback(self, action: Callable[[], None], list_change: bool = False) -> None:
+        """
+        Registers how to undo a change kept outside the records, in case the transaction is rolled back.
+
+        Outside a transaction nothing is registered.
+
+        Args:
+            action (Callable[[], None]): Undoes the change; actions run in the reverse order of registration.
+            list_change (bool): The change added, removed or replaced records in the list. Such changes are
+                undone by the copy of the list when the rolled back block has one, so the action then does
+                not run.
+        """
+        if self._savepoints:
+            self._rollback_actions.append((action, list_change))
+
+    def _locate(self, record: Any, hint: int = -1) -> int:
+        """
+        Finds the position of a record object in the list by identity, trying the expected position first.
+
+        Args:
+            record (Any): The record object.
+            hint (int): Where the record is expected, e.g. where it was when a change was recorded.
+
+        Returns:
+            int: The position, or -1 if the object is not in the list.
+        """
+        records = self._records()
+        if 0 <= hint < len(records) and records[hint] is record:
+            return hint
+        return next((i for i, existing in enumerate(records) if existing is record), -1)
+
+    def _log_undo(
+        self, description: str, undo: Callable[[], None], redo: Callable[[], None], kept: Tuple[Any, ...] = ()
+    ) -> None:
+        """
+        Records a change in the undo log, if there is one.
+
+        Both actions run inside a transaction of the manager without a snapshot, so they call
+        `_remember`, `_on_rollback` and `_persist` like the manager methods, and record nothing in the log.
+
+        Args:
+            description (str): What the change did, e.g. "remove contact 'Ivan'".
+            undo (Callable[[], None]): Takes the change back.
+            redo (Callable[[], None]): Makes the change again.
+            kept (Tuple[Any, ...]): The records the actions keep alive, counted against the memory budget.
+        """
+        if self.undo_log is None:
+            return
+        from managers.undo_log import ENTRY_OVERHEAD, UndoEntry, record_size
+
+        entry = UndoEntry(self, description, undo, redo, ENTRY_OVERHEAD + sum(map(record_size, kept)))
+        undo_log = self.undo_log
+        undo_log.record(entry)
+        self._on_rollback(lambda: undo_log.discard(entry))
+
+    def _rollback(self, savepoint: Savepoint) -> None:
+        """
+        Restores the record list and the records changed in place to their state at the start of a block.
+
+        Args:
+            savepoint (Savepoint): The savepoint of the block.
+        """
+        for record, state in savepoint.touched.values():
+            for name, value in state.items():
+                setattr(record, name, value)
+        if savepoint.records is not None:
+            self._records()[:] = savepoint.records
+        # The actions may register actions of their own, which are not run
+        actions = self._rollback_actions[savepoint.actions:]
+        del self._rollback_actions[savepoint.actions:]
+        for action, list_change in reversed(actions):
+            if not (list_change and savepoint.records is not None):
+                action()
+        del self._rollback_actions[savepoint.actions:]
+        self._generation += 1
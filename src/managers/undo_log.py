@@ -0,0 +1,316 @@
+"""The undo log module
+
+Task: Undo and redo the changes of the last commands without keeping copies of the contacts or notes.
+
+‌
+
+The managers record every change they make as an `UndoEntry`: how to undo it and how to do it again,
+holding only the records and field values the change touched. The entries recorded while one command
+runs form one step (see `UndoLog.step`), so `undo` takes back a whole command, such as tagging every
+note with a title, across both managers. Undoing or redoing a step therefore costs time and memory in
+proportion to the change, whatever the number of records.
+
+A step is applied inside a transaction of every manager it touches, so it is saved once and is either
+applied completely or not at all. Entries find their records by identity and refuse to apply when a
+record was changed or replaced in a way the log does not know of, e.g. by another process; such a step
+is dropped with a message instead of applying to the wrong record.
+
+The log is bounded by a number of steps and by a memory budget over the undo and redo stacks; when a
+bound is exceeded, the oldest steps are forgotten first. Recording a new step clears the redo stack.
+"""
+
+import sys
+import threading
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Iterator, List, Optional
+from colors import format_red
+
+# The bounds of the log
+DEFAULT_MAX_STEPS = 100
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+# The bookkeeping of one entry besides the values it holds: the entry and its two closures
+ENTRY_OVERHEAD = 400
+
+
+def record_size(record: Any) -> int:
+    """
+    Estimates the memory a contact or note kept by an entry holds: the object and its field values.
+
+    Args:
+        record (Any): The contact or note.
+
+    Returns:
+        int: The size in bytes.
+    """
+    return sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record.to_dict().values())
+
+
+@dataclass
+class UndoEntry:
+    """
+    One change recorded by a manager.
+
+    Attributes:
+        manager (Any): The manager that made the change; undo and redo run in its transaction.
+        description (str): What the change did, e.g. "remove contact 'Ivan'".
+        undo (Callable[[], None]): Takes the change back; raises ValueError if it no longer applies.
+        redo (Callable[[], None]): Makes the change again; raises ValueError if it no longer applies.
+        size (int): The estimated memory the entry holds, in bytes.
+    """
+
+    manager: Any
+    description: str
+    undo: Callable[[], None]
+    redo: Callable[[], None]
+    size: int = ENTRY_OVERHEAD
+
+
+@dataclass
+class UndoStep:
+    """
+    The entries recorded by one command, undone together.
+
+    Attributes:
+        description (str): The command with its number of changes, or the description of its only entry.
+        entries (List[UndoEntry]): The entries in the order they were recorded.
+    """
+
+    description: str
+    entries: List[UndoEntry] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return sum(entry.size for entry in self.entries)
+
+
+def _remove_entry(step: UndoStep, entry: UndoEntry) -> bool:
+    """
+    Removes an entry from a step; rollbacks remove the entries last to first, so the last is tried first.
+
+    Returns:
+        bool: True if the step held the entry.
+    """
+    if step.entries and step.entries[-1] is entry:
+        step.entries.pop()
+        return True
+    if any(recorded is entry for recorded in step.entries):
+        step.entries = [recorded for recorded in step.entries if recorded is not entry]
+        return True
+    return False
+
+
+class UndoLog:
+    """
+    The undo and redo stacks shared by the managers.
+    """
+
+    def __init__(self, max_steps: int = DEFAULT_MAX_STEPS, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Initializes an empty log.
+
+        Args:
+            max_steps (int): The maximum number of steps that can be undone.
+            max_bytes (int): The memory budget of both stacks, in bytes.
+        """
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+        self._undo: Deque[UndoStep] = deque()
+        self._redo: List[UndoStep] = []
+        self._bytes = 0
+        self.forgotten = 0
+        # The number of steps recorded so far
+        self._pushes = 0
+        # Guards the stacks; the open step belongs to the thread running the command
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @contextmanager
+    def step(self, description: str) -> Iterator[None]:
+        """
+        Groups the entries recorded inside the block into one step, e.g. those of one command.
+
+        Nested blocks join the outermost one. A block that records nothing adds no step.
+
+        Args:
+            description (str): The description of the step, e.g. the command name.
+
+        Yields:
+            None: The body runs with the step open.
+        """
+        if getattr(self._local, "step", None) is not None:
+            yield
+            return
+        self._local.step = UndoStep(description)
+        try:
+            yield
+        finally:
+            step, self._local.step = self._local.step, None
+            if step.entries:
+                if len(step.entries) == 1:
+                    step.description = step.entries[0].description
+                else:
+                    step.description = f"{step.description} ({len(step.entries)} changes)"
+                self._push(step)
+
+    def record(self, entry: UndoEntry) -> None:
+        """
+        Adds a change to the open step, or as a step of its own if no step is open.
+
+        Args:
+            entry (UndoEntry): The change.
+        """
+        step = getattr(self._local, "step", None)
+        if step is not None:
+            step.entries.append(entry)
+        else:
+            self._push(UndoStep(entry.description, [entry]))
+
+    def discard(self, entry: UndoEntry) -> None:
+        """
+        Removes a change that was rolled back, e.g. with the transaction of a batch, together with its
+        step if nothing else is left in it.
+
+        Args:
+            entry (UndoEntry): The change.
+        """
+        step = getattr(self._local, "step", None)
+        if step is not None and _remove_entry(step, entry):
+            return
+        with self._lock:
+            # Rolled back changes are the latest ones, so the search starts from the top
+            for position in range(len(self._undo) - 1, -1, -1):
+                step = self._undo[position]
+                if _remove_entry(step, entry):
+                    self._bytes -= entry.size
+                    if not step.entries:
+                        del self._undo[position]
+                    return
+
+    def undo(self) -> Optional[str]:
+        """
+        Takes back the last step and moves it to the redo stack.
+
+        Returns:
+            Optional[str]: The description of the step, or None if there is nothing to undo.
+
+        Raises:
+            ValueError: If the step no longer applies; it is dropped and nothing is changed.
+        """
+        # The managers record changes holding their write lock, so the log's lock is never held while
+        # waiting for a manager's lock
+        with self._lock:
+            if not self._undo:
+                return None
+            step = self._undo.pop()
+            self._bytes -= step.size
+            pushes = self._pushes
+        self._apply(step, True)
+        with self._lock:
+            # A change recorded meanwhile cleared the redo stack, which the step must not outlive
+            if self._pushes == pushes:
+                self._redo.append(step)
+                self._bytes += step.size
+        return step.description
+
+    def redo(self) -> Optional[str]:
+        """
+        Makes the last undone step again and moves it back to the undo stack.
+
+        Returns:
+            Optional[str]: The description of the step, or None if there is nothing to redo.
+
+        Raises:
+            ValueError: If the step no longer applies; it is dropped and nothing is changed.
+        """
+        with self._lock:
+            if not self._redo:
+                return None
+            step = self._redo.pop()
+            self._bytes -= step.size
+        self._apply(step, False)
+        with self._lock:
+            self._undo.append(step)
+            self._bytes += step.size
+            self._evict()
+        return step.description
+
+    def clear(self) -> None:
+        """
+        Forgets every step.
+        """
+        with self._lock:
+            self._undo.clear()
+            self._redo.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the number of steps on both stacks and the memory they hold.
+        """
+        with self._lock:
+            return {
+                "undo_steps": len(self._undo),
+                "redo_steps": len(self._redo),
+                "bytes": self._bytes,
+                "forgotten": self.forgotten,
+                "max_steps": self.max_steps,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _push(self, step: UndoStep) -> None:
+        """
+        Adds a new step to the undo stack, clearing the redo stack.
+        """
+        with self._lock:
+            self._bytes -= sum(redone.size for redone in self._redo)
+            self._redo.clear()
+            self._undo.append(step)
+            self._bytes += step.size
+            self._pushes += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Forgets the oldest steps until both bounds hold; the lock is held by the caller.
+        """
+        while self._undo and (len(self._undo) > self.max_steps or self._bytes > self.max_bytes):
+            self._bytes -= self._undo.popleft().size
+            self.forgotten += 1
+        # A redo step is only reachable after undoing everything above it, so it goes last
+        while self._redo and self._bytes > self.max_bytes:
+            self._bytes -= self._redo.pop(0).size
+            self.forgotten += 1
+
+    def _apply(self, step: UndoStep, undoing: bool) -> None:
+        """
+        Runs the undo or redo actions of a step in one transaction per manager it touches.
+        """
+        entries = list(reversed(step.entries)) if undoing else step.entries
+        managers = []
+        for entry in step.entries:
+            if not any(manager is entry.manager for manager in managers):
+                managers.append(entry.manager)
+        # Always in the same order, so two threads never wait for each other's manager
+        managers.sort(key=lambda manager: type(manager).__name__)
+        try:
+            with ExitStack() as transactions:
+                for manager in managers:
+                    # The entries undo their own list changes on a rollback, so the list is not copied
+                    transactions.enter_context(manager.transaction(snapshot=False))
+                # An entry that no longer applies rolls back the entries applied before it, also inside
+                # an enclosing transaction such as that of a batch
+                for entry in entries:
+                    (entry.undo if undoing else entry.redo)()
+        except ValueError as ex:
+            raise ValueError(format_red(f"Cannot {'undo' if undoing else 'redo'} {step.description}: {ex}"))
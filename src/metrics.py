@@ -0,0 +1,450 @@
+"""
+Latency statistics of commands, manager methods and storage loads and saves.
+
+Collection is off unless the assistant is started with `--stats`, and then costs one clock read and a
+few additions per call. Every operation keeps its count, total, minimum and maximum time, the bytes
+it read or wrote, and a fixed-size histogram of its durations from which the percentiles are read.
+The `stats` command shows them and exports them as JSON.
+
+Operation names:
+    command.<name>              a whole command, including the prompts for its arguments
+    contacts.<method>           a public ContactManager method, also when called by another method
+    notes.<method>              a public NoteManager method
+    storage.load.<file>         reading and parsing a data file
+    storage.refresh.<file>      picking up the changes another process saved to a data file
+    storage.save.<file>         serializing and writing a data file
+
+Loads, refreshes and saves are also split into their steps, as `<operation>.<step>`, so the time
+spent encoding and decoding JSON can be told apart from the time spent on the disk:
+
+    storage.load.<file>.read      reading the file (bytes read)
+    storage.load.<file>.decode    parsing the JSON and checking the records
+    storage.load.<file>.build     creating the objects (also for refresh)
+    storage.save.<file>.lock      waiting for the inter-process lock
+    storage.save.<file>.merge     merging the changes another process saved meanwhile (bytes read)
+    storage.save.<file>.encode    converting the records to JSON text
+    storage.save.<file>.write     writing the text to the temporary file (bytes written)
+    storage.save.<file>.fsync     waiting for the disk to confirm it
+    storage.save.<file>.replace   moving the temporary file over the data file
+
+The count of a step is the number of calls of it. Every save also adds to the write amplification of
+its file (see `FileWrites`): how many records, and bytes, were written per record actually changed.
+
+The search result caches of the managers (see `managers.result_cache`) count their hits, misses and
+evictions themselves; registered caches are reported with the statistics.
+"""
+
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from managers.result_cache import ResultCache
+
+# Sub-buckets per power of two; the relative error of a percentile is at most 1 / SUB_BUCKETS
+SUB_BUCKETS = 8
+_SUB_BITS = SUB_BUCKETS.bit_length() - 1
+# Enough buckets for any duration in nanoseconds that fits in 64 bits
+_BUCKETS = 64 * SUB_BUCKETS
+
+
+class Histogram:
+    """
+    A log-linear histogram of non-negative integers with a fixed number of buckets.
+
+    Every power of two is split into SUB_BUCKETS equal buckets, so the memory used does not grow with
+    the number of values recorded and a percentile is accurate to 1 / SUB_BUCKETS of its value.
+    """
+
+    __slots__ = ("counts", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < SUB_BUCKETS:
+            return value
+        exponent = value.bit_length() - 1
+        return exponent * SUB_BUCKETS + ((value >> (exponent - _SUB_BITS)) & (SUB_BUCKETS - 1))
+
+    @staticmethod
+    def _middle(index: int) -> float:
+        """
+        Returns the middle of the values that fall into a bucket.
+        """
+        if index < SUB_BUCKETS:
+            return float(index)
+        exponent, sub_bucket = divmod(index, SUB_BUCKETS)
+        width = 1 << (exponent - _SUB_BITS)
+        return (SUB_BUCKETS + sub_bucket) * width + width / 2
+
+    def record(self, value: int) -> None:
+        """
+        Adds a value.
+
+        Args:
+            value (int): A non-negative value, such as a duration in nanoseconds.
+        """
+        self.counts[self._index(value)] += 1
+        self.count += 1
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns the value below which the given percentage of the values fall.
+
+        Args:
+            percent (float): The percentage, between 0 and 100.
+
+        Returns:
+            float: The middle of the bucket holding that value, or 0.0 if nothing was recorded.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self._middle(index)
+        return 0.0
+
+
+class OperationStats:
+    """
+    The statistics of one operation.
+    """
+
+    __slots__ = ("name", "count", "total_ns", "min_ns", "max_ns", "bytes_read", "bytes_written", "histogram", "_lock")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        # Operations may be timed from several threads at once (API server, background jobs)
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Forgets the calls recorded so far.
+        """
+        with self._lock:
+            self.count = 0
+            self.total_ns = 0
+            self.min_ns = 0
+            self.max_ns = 0
+            self.bytes_read = 0
+            self.bytes_written = 0
+            self.histogram = Histogram()
+
+    def record(self, duration_ns: int, bytes_read: int = 0, bytes_written: int = 0) -> None:
+        """
+        Adds one call of the operation.
+
+        Args:
+            duration_ns (int): How long the call took, in nanoseconds.
+            bytes_read (int): The bytes the call read.
+            bytes_written (int): The bytes the call wrote.
+        """
+        with self._lock:
+            if not self.count or duration_ns < self.min_ns:
+                self.min_ns = duration_ns
+            if duration_ns > self.max_ns:
+                self.max_ns = duration_ns
+            self.count += 1
+            self.total_ns += duration_ns
+            self.bytes_read += bytes_read
+            self.bytes_written += bytes_written
+            self.histogram.record(duration_ns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts the statistics into a dictionary with the times in milliseconds.
+
+        Returns:
+            Dict[str, Any]: The operation name, count, times, percentiles and bytes.
+        """
+        with self._lock:
+            def ms(nanoseconds: float) -> float:
+                # Percentiles are bucket middles; keep them within the values actually seen
+                return round(min(max(nanoseconds, self.min_ns), self.max_ns) / 1e6, 4)
+
+            return {
+                "operation": self.name,
+                "count": self.count,
+                "total_ms": round(self.total_ns / 1e6, 3),
+                "mean_ms": ms(self.total_ns / self.count) if self.count else 0.0,
+                "p50_ms": ms(self.histogram.percentile(50)),
+                "p95_ms": ms(self.histogram.percentile(95)),
+                "p99_ms": ms(self.histogram.percentile(99)),
+                "max_ms": round(self.max_ns / 1e6, 4),
+                "bytes_read": self.bytes_read,
+                "bytes_written": self.bytes_written,
+            }
+
+
+class FileWrites:
+    """
+    The write amplification of one data file.
+
+    Every save rewrites the whole file, so a save that changes one record of a million writes a million
+    records. The records changed are those added, edited or removed since the file was last read or
+    saved. The records encoded are those serialized again; the others are copied as they were saved.
+    """
+
+    __slots__ = ("name", "saves", "records_written", "records_changed", "records_encoded", "bytes_written", "_lock")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Forgets the saves recorded so far.
+        """
+        with self._lock:
+            self.saves = 0
+            self.records_written = 0
+            self.records_changed = 0
+            self.records_encoded = 0
+            self.bytes_written = 0
+
+    def record(self, records_written: int, records_changed: int, bytes_written: int, records_encoded: int) -> None:
+        """
+        Adds one save.
+
+        Args:
+            records_written (int): The records in the saved file.
+            records_changed (int): The records added, changed or removed by the save.
+            bytes_written (int): The size of the saved file.
+            records_encoded (int): The records serialized by the save.
+        """
+        with self._lock:
+            self.saves += 1
+            self.records_written += records_written
+            self.records_changed += records_changed
+            self.records_encoded += records_encoded
+            self.bytes_written += bytes_written
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts the write amplification into a dictionary.
+
+        Returns:
+            Dict[str, Any]: The totals, the records and bytes written per changed record, and the
+            share of the bytes written that only repeated unchanged records.
+        """
+        with self._lock:
+            changed = self.records_changed
+            unchanged_share = 1 - changed / self.records_written if self.records_written else 0.0
+            return {
+                "file": self.name,
+                "saves": self.saves,
+                "records_written": self.records_written,
+                "records_changed": changed,
+                "records_encoded": self.records_encoded,
+                "bytes_written": self.bytes_written,
+                "records_per_change": round(self.records_written / changed, 1) if changed else None,
+                "bytes_per_change": round(self.bytes_written / changed) if changed else None,
+                "unchanged_bytes_pct": round(max(unchanged_share, 0.0) * 100, 1),
+            }
+
+
+class Metrics:
+    """
+    The statistics of all operations, collected only while enabled.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._operations: Dict[str, OperationStats] = {}
+        self._writes: Dict[str, FileWrites] = {}
+        self._caches: Dict[str, "ResultCache"] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """
+        Starts collecting statistics.
+        """
+        self.enabled = True
+
+    def operation(self, name: str) -> OperationStats:
+        """
+        Returns the statistics of an operation, creating them on first use.
+
+        Args:
+            name (str): The operation name.
+
+        Returns:
+            OperationStats: The statistics of the operation.
+        """
+        stats = self._operations.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._operations.setdefault(name, OperationStats(name))
+        return stats
+
+    def record(self, name: str, duration_ns: int, bytes_read: int = 0, bytes_written: int = 0) -> None:
+        """
+        Adds one call of an operation, if statistics are enabled.
+
+        Args:
+            name (str): The operation name.
+            duration_ns (int): How long the call took, in nanoseconds.
+            bytes_read (int): The bytes the call read.
+            bytes_written (int): The bytes the call wrote.
+        """
+        if self.enabled:
+            self.operation(name).record(duration_ns, bytes_read, bytes_written)
+
+    def record_write(
+        self,
+        file_name: str,
+        records_written: int,
+        records_changed: int,
+        bytes_written: int,
+        records_encoded: Optional[int] = None,
+    ) -> None:
+        """
+        Adds one save of a data file to its write amplification, if statistics are enabled.
+
+        Args:
+            file_name (str): The name of the data file.
+            records_written (int): The records in the saved file.
+            records_changed (int): The records added, changed or removed by the save.
+            bytes_written (int): The size of the saved file.
+            records_encoded (Optional[int]): The records serialized by the save; all of them if not given.
+        """
+        if not self.enabled:
+            return
+        writes = self._writes.get(file_name)
+        if writes is None:
+            with self._lock:
+                writes = self._writes.setdefault(file_name, FileWrites(file_name))
+        writes.record(
+            records_written, records_changed, bytes_written, records_written if records_encoded is None else records_encoded
+        )
+
+    def register_cache(self, cache: "ResultCache") -> None:
+        """
+        Reports the counters of a result cache with the statistics, replacing a cache of the same name.
+
+        Args:
+            cache (ResultCache): The cache.
+        """
+        with self._lock:
+            self._caches[cache.name] = cache
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Times the body of the `with` block as one call of an operation.
+
+        Args:
+            name (str): The operation name.
+
+        Yields:
+            None: The body runs while it is timed.
+        """
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - started)
+
+    def instrument(self, cls: type, prefix: str) -> None:
+        """
+        Times every public method defined by a class, as '<prefix>.<method>'.
+
+        The methods are replaced on the class, so the cost is only paid once statistics are enabled
+        and this is called.
+
+        Args:
+            cls (type): The class, e.g. ContactManager.
+            prefix (str): The first part of the operation names.
+        """
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(method) or getattr(method, "__timed__", False):
+                continue
+            setattr(cls, name, self._timed(method, self.operation(f"{prefix}.{name}")))
+
+    @staticmethod
+    def _timed(method: Callable[..., Any], stats: OperationStats) -> Callable[..., Any]:
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats.record(time.perf_counter_ns() - started)
+
+        wrapper.__timed__ = True
+        return wrapper
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Returns the statistics of the operations called at least once, by operation name.
+
+        Returns:
+            List[Dict[str, Any]]: One dictionary per operation, see `OperationStats.to_dict`.
+        """
+        with self._lock:
+            operations = sorted(self._operations.values(), key=lambda stats: stats.name)
+        return [stats.to_dict() for stats in operations if stats.count]
+
+    def writes(self) -> List[Dict[str, Any]]:
+        """
+        Returns the write amplification of the data files saved at least once, by file name.
+
+        Returns:
+            List[Dict[str, Any]]: One dictionary per data file, see `FileWrites.to_dict`.
+        """
+        with self._lock:
+            files = sorted(self._writes.values(), key=lambda writes: writes.name)
+        return [writes.to_dict() for writes in files if writes.saves]
+
+    def caches(self) -> List[Dict[str, Any]]:
+        """
+        Returns the counters of the registered result caches, by name.
+
+        Returns:
+            List[Dict[str, Any]]: One dictionary per cache, see `ResultCache.stats`.
+        """
+        with self._lock:
+            caches = sorted(self._caches.values(), key=lambda cache: cache.name)
+        return [cache.stats() for cache in caches]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns all statistics in the format of the JSON export.
+
+        Returns:
+            Dict[str, Any]: Whether collection is enabled, the operations, the data file writes and
+            the result caches.
+        """
+        return {
+            "enabled": self.enabled,
+            "operations": self.snapshot(),
+            "writes": self.writes(),
+            "caches": self.caches(),
+        }
+
+    def reset(self) -> None:
+        """
+        Forgets the statistics collected so far.
+        """
+        with self._lock:
+            collected = [*self._operations.values(), *self._writes.values()]
+            caches = list(self._caches.values())
+        for stats in collected:
+            stats.clear()
+        for cache in caches:
+            cache.reset_counters()
+
+
+# The statistics of the application
+metrics = Metrics()
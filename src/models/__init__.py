@@ -1,2 +1,3 @@
 from .note import Note
 from .contact import Contact
+from .note_history import NoteHistory
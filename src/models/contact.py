@@ -12,30 +12,55 @@ address (string): The residential address of the contact.
 phone_number (string): The phone number of the contact. The format must be validated with a regular expression.
 email (string): Email address of the contact. The format must be validated with a regular expression.
 birthday (datetime.date): Date of birth of the prospect.
+
+The class declares __slots__ instead of being a dataclass, so an instance stores its five fields
+directly instead of carrying a per-instance __dict__, which matters for address books with millions
+of contacts.
+
+Every setter marks the contact dirty (see `models.tracking`), so a save re-encodes only the contacts
+that changed since the last one.
 """
 
 import re
-from dataclasses import dataclass, field, asdict
+import sys
 from typing import Optional
 from datetime import date, datetime
 from colors import format_red
+from models.tracking import Tracked
+
 
-@dataclass
-class Contact:
-    name: str
-    address: str
-    phone_number: str
-    email: str
-    birthday: Optional[str] = field(default=None)
+class Contact(Tracked):
+    __slots__ = ("__name", "__address", "__phone_number", "__email", "__birthday")
 
-    def __post_init__(self):
-        # Validate phone number and email after initialization
-        self._validate_phone_number(self.phone_number)
-        self._validate_email(self.email)
+    # Contacts compare by value like the dataclass they replace, so they stay unhashable
+    __hash__ = None
+
+    def __init__(
+        self,
+        name: str,
+        address: str,
+        phone_number: str,
+        email: str,
+        birthday: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes the Contact, validating the fields through their property setters.
 
-        # Validate birthday if it is provided
-        if self.birthday:
-            self._validate_birthday(self.birthday)
+        Args:
+            name (str): The contact name.
+            address (str): The contact address.
+            phone_number (str): The contact phone number.
+            email (str): The contact email.
+            birthday (Optional[str]): The contact birthday in DD.MM.YYYY format.
+
+        Raises:
+            ValidationError: If the phone number, email or birthday is invalid.
+        """
+        self.name = name
+        self.address = address
+        self.phone_number = phone_number
+        self.email = email
+        self.birthday = birthday
 
     @property
     def name(self) -> str:
@@ -56,6 +81,7 @@ class Contact:
             value (str): The contact name.
         """
         self.__name = value
+        self._fragment = None
 
     @property
     def address(self) -> str:
@@ -76,6 +102,7 @@ class Contact:
             value (str): The contact address.
         """
         self.__address = value
+        self._fragment = None
 
     @property
     def phone_number(self) -> str:
@@ -100,6 +127,7 @@ class Contact:
         """
         self._validate_phone_number(value)
         self.__phone_number = value
+        self._fragment = None
 
     @property
     def email(self) -> str:
@@ -124,6 +152,7 @@ class Contact:
         """
         self._validate_email(value)
         self.__email = value
+        self._fragment = None
 
     @property
     def birthday(self) -> str:
@@ -144,7 +173,9 @@ class Contact:
             value (str): The contact birthday.
         """
         self._validate_birthday(value)
-        self.__birthday = value
+        # Birthdays have few distinct values, so equal strings share one object
+        self.__birthday = sys.intern(value)
+        self._fragment = None
 
     def _validate_phone_number(self, phone_number: str) -> None:
         """
@@ -228,7 +259,23 @@ class Contact:
         Returns:
             dict: A dictionary representation of the Contact object.
         """
-        return asdict(self)
+        return {
+            "name": self.__name,
+            "address": self.__address,
+            "phone_number": self.__phone_number,
+            "email": self.__email,
+            "birthday": self.__birthday,
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return (f"Contact(name={self.__name!r}, address={self.__address!r}, "
+                f"phone_number={self.__phone_number!r}, email={self.__email!r}, "
+                f"birthday={self.__birthday!r})")
 
     def __str__(self) -> str:
         return (f"ID: {self.id}, Name: {self.__name}, Address: {self.__address}, "
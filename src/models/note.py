@@ -12,16 +12,27 @@ contact (Contact): An object of the Contact class with which the note is associa
 content (string): The textual content of the note.
 created_at (Date): The date and time the note was created.
 updated_at (Date): Date and time the note was last updated.
+
+The dataclass uses slots=True, so notes do not carry a per-instance __dict__. Assigning a field or
+changing the tags in place marks the note dirty (see `models.tracking`), so a save re-encodes only the
+notes that changed since the last one.
 """
 
+import sys
 from datetime import datetime
 from dataclasses import dataclass, asdict, field
-from typing import List
-from models.contact import Contact 
+from typing import Iterable, List, Optional
+from models.contact import Contact
+from models.tracking import TagList, Tracked
+
 
+def _tag_list(tags: Iterable[str]) -> TagList:
+    # Tags repeat across notes, so equal tag strings share one object
+    return TagList(sys.intern(tag) if type(tag) is str else tag for tag in tags)
 
-@dataclass
-class Note:
+
+@dataclass(slots=True, init=False)
+class Note(Tracked):
     id: int = 0
     title: str = ""
     contact: Contact.name = ""
@@ -30,6 +41,52 @@ class Note:
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
 
+    def __init__(
+        self,
+        id: int = 0,
+        title: str = "",
+        contact: Contact.name = "",
+        content: str = "",
+        tags: Optional[List[str]] = None,
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+    ) -> None:
+        # The fields are set directly: a new note is dirty anyway, and loading millions of notes
+        # should not go through the change tracking of __setattr__
+        set_field = object.__setattr__
+        set_field(self, "id", id)
+        set_field(self, "title", title)
+        set_field(self, "contact", contact)
+        set_field(self, "content", content)
+        set_field(self, "tags", _tag_list(tags) if tags else TagList())
+        set_field(self, "created_at", datetime.now() if created_at is None else created_at)
+        set_field(self, "updated_at", datetime.now() if updated_at is None else updated_at)
+        set_field(self, "_fragment", None)
+
+    def __setattr__(self, name: str, value) -> None:
+        if name == "tags" and type(value) is not TagList:
+            value = _tag_list(value)
+        object.__setattr__(self, name, value)
+        if name != "_fragment":
+            object.__setattr__(self, "_fragment", None)
+
+    @property
+    def fragment(self) -> Optional[str]:
+        """
+        Returns the serialized note as it was last saved, or None if it or its tags changed since.
+        """
+        return None if self.tags.dirty else self._fragment
+
+    def keep_fragment(self, fragment: str) -> None:
+        """
+        Remembers the serialized note after a save; the note is clean until it or its tags change.
+
+        Args:
+            fragment (str): The note as written to the data file.
+        """
+        self._fragment = fragment
+        self.tags.dirty = False
+
     def __repr__(self) -> str:
         return str(asdict(self))
       
@@ -78,17 +135,15 @@ class Note:
                 - 'updated_at': The last update timestamp of the note, serialized to ISO format if it's a datetime object (str or datetime).
                 - 'tags': A list of tags associated with the note (List[str]).
         """
-        note_dict = asdict(self)
-
-        note_dict["created_at"] = (
-            self.created_at.isoformat()
-            if isinstance(self.created_at, datetime)
-            else self.created_at
-        )
-        note_dict["updated_at"] = (
-            self.updated_at.isoformat()
-            if isinstance(self.updated_at, datetime)
-            else self.updated_at
-        )
-
-        return note_dict
+        # Built directly: `asdict` copies every value recursively, which made saving notes slow
+        created_at = self.created_at
+        updated_at = self.updated_at
+        return {
+            "id": self.id,
+            "title": self.title,
+            "contact": self.contact,
+            "content": self.content,
+            "tags": list(self.tags),
+            "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+            "updated_at": updated_at.isoformat() if isinstance(updated_at, datetime) else updated_at,
+        }
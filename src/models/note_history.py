@@ -0,0 +1,223 @@
+"""The note history logic implementation
+
+Task: Keep the earlier versions of a note without storing a full copy of the note for every edit.
+
+‌
+
+A `NoteHistory` holds the revisions of one note: its content and tags after each recorded change, with
+the time of the change. Most revisions are stored as a line delta against the revision before them
+(the runs of lines copied from it and the new lines, as found by `difflib`); from time to time a
+revision is stored in full instead, as a checkpoint. Both are compressed with zlib and kept as base64
+text in the history file.
+
+Showing a revision decodes the nearest checkpoint at or before it and applies the deltas after it. A
+checkpoint is written when the chain of deltas since the last one reaches `MAX_CHAIN` revisions or
+when the deltas together take more space than the note itself, so rebuilding any revision applies at
+most `MAX_CHAIN` deltas and reads at most about twice the size of the note, while a heavily edited note
+grows by the size of its changes rather than by its full size per edit.
+"""
+
+import base64
+import difflib
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+from models.tracking import Tracked
+from colors import format_red
+
+# The largest number of deltas applied to rebuild a revision
+MAX_CHAIN = 32
+
+CHECKPOINT = "checkpoint"
+DELTA = "delta"
+
+# The content and tags of a note at one revision
+State = Tuple[str, List[str]]
+
+
+def _pack(payload: Any) -> str:
+    """
+    Compresses a JSON value into base64 text.
+    """
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(zlib.compress(data, 9)).decode("ascii")
+
+
+def _unpack(text: str) -> Any:
+    """
+    Decompresses a JSON value packed by `_pack`.
+    """
+    return json.loads(zlib.decompress(base64.b64decode(text)).decode("utf-8"))
+
+
+def line_delta(old: str, new: str) -> List[Any]:
+    """
+    Describes a text as the changes to an earlier text, line by line.
+
+    Args:
+        old (str): The earlier text.
+        new (str): The new text.
+
+    Returns:
+        List[Any]: The pieces of the new text in order: `[start, end]` copies lines start..end-1 of the
+            earlier text, a string is new text.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    delta: List[Any] = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([old_start, old_end])
+        elif new_start < new_end:
+            delta.append("".join(new_lines[new_start:new_end]))
+    return delta
+
+
+def apply_delta(old: str, delta: List[Any]) -> str:
+    """
+    Rebuilds a text from the earlier text and the delta made by `line_delta`.
+
+    Args:
+        old (str): The earlier text.
+        delta (List[Any]): The delta.
+
+    Returns:
+        str: The new text.
+    """
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for piece in delta:
+        parts.append(piece if isinstance(piece, str) else "".join(old_lines[piece[0]:piece[1]]))
+    return "".join(parts)
+
+
+class NoteHistory(Tracked):
+    """
+    The revisions of one note, numbered from 1, oldest first.
+
+    Every revision is a dictionary with its number, the time of the change ('at'), its kind
+    (CHECKPOINT or DELTA) and the packed data.
+    """
+
+    __slots__ = ("note_id", "revisions", "_latest")
+
+    def __init__(self, note_id: int, revisions: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Initializes the history of a note.
+
+        Args:
+            note_id (int): The id of the note.
+            revisions (Optional[List[Dict[str, Any]]]): The stored revisions, e.g. read from the history file.
+        """
+        self.note_id = note_id
+        self.revisions: List[Dict[str, Any]] = revisions or []
+        # The state of the last revision, so recording the next one does not rebuild it
+        self._latest: Optional[State] = None
+        self._fragment = None
+
+    def __len__(self) -> int:
+        return len(self.revisions)
+
+    def append(self, content: str, tags: List[str], at: Union[datetime, str]) -> Optional[int]:
+        """
+        Records a new revision of the note, unless it equals the last one.
+
+        Args:
+            content (str): The content of the note.
+            tags (List[str]): The tags of the note.
+            at (Union[datetime, str]): When the note got this content and these tags; notes read from
+                the data file keep their timestamps as ISO strings.
+
+        Returns:
+            Optional[int]: The number of the new revision, or None if nothing changed.
+        """
+        tags = list(tags)
+        if self.revisions:
+            latest_content, latest_tags = self.state(len(self.revisions))
+            if latest_content == content and latest_tags == tags:
+                return None
+
+        number = len(self.revisions) + 1
+        at = at.isoformat() if isinstance(at, datetime) else str(at)
+        revision: Dict[str, Any] = {"revision": number, "at": at}
+        full = _pack({"content": content, "tags": tags})
+        chain = self._chain_since_checkpoint()
+        if self.revisions and len(chain) < MAX_CHAIN:
+            delta = _pack({"lines": line_delta(latest_content, content), "tags": tags})
+            # Deltas larger together than the note itself would make rebuilding it slower than a checkpoint
+            if sum(len(item["data"]) for item in chain) + len(delta) <= len(full):
+                revision.update(kind=DELTA, data=delta)
+        if "kind" not in revision:
+            revision.update(kind=CHECKPOINT, data=full)
+
+        self.revisions.append(revision)
+        self._latest = (content, tags)
+        self._fragment = None
+        return number
+
+    def state(self, number: int) -> State:
+        """
+        Rebuilds the content and tags of the note at a revision.
+
+        Args:
+            number (int): The revision number, from 1.
+
+        Returns:
+            State: The content and the tags.
+
+        Raises:
+            ValueError: If there is no such revision.
+        """
+        if not 1 <= number <= len(self.revisions):
+            raise ValueError(
+                format_red(f"Note {self.note_id} has no revision {number}; it has {len(self.revisions)}.")
+            )
+        if number == len(self.revisions) and self._latest is not None:
+            return self._latest[0], list(self._latest[1])
+
+        start = number - 1
+        while self.revisions[start]["kind"] != CHECKPOINT:
+            start -= 1
+        payload = _unpack(self.revisions[start]["data"])
+        content, tags = payload["content"], payload["tags"]
+        for revision in self.revisions[start + 1:number]:
+            payload = _unpack(revision["data"])
+            content, tags = apply_delta(content, payload["lines"]), payload["tags"]
+
+        if number == len(self.revisions):
+            self._latest = (content, list(tags))
+        return content, tags
+
+    def truncate(self, count: int) -> None:
+        """
+        Drops the revisions after the first `count`, e.g. those recorded in a rolled back transaction.
+
+        Args:
+            count (int): The number of revisions to keep.
+        """
+        if count < len(self.revisions):
+            del self.revisions[count:]
+            self._latest = None
+            self._fragment = None
+
+    def _chain_since_checkpoint(self) -> List[Dict[str, Any]]:
+        """
+        Returns the delta revisions after the last checkpoint.
+        """
+        chain = []
+        for revision in reversed(self.revisions):
+            if revision["kind"] == CHECKPOINT:
+                break
+            chain.append(revision)
+        return chain
+
+    def to_dict(self) -> dict:
+        """
+        Converts the history into a dictionary for the history file.
+
+        Returns:
+            dict: The note id and the list of revisions.
+        """
+        return {"note_id": self.note_id, "revisions": self.revisions}
@@ -0,0 +1,77 @@
+"""The change tracking module
+
+Task: Let the storage tell which records changed since they were last saved, without comparing them.
+
+‌
+
+A record remembers its serialized form (its fragment of the data file) from the last save. Every change
+of a field drops it, so the record is dirty until the next save encodes it again; the fragments of the
+other records are written as they are. Tags are kept in a `TagList`, which marks itself dirty when it is
+changed in place.
+"""
+
+from typing import Optional
+
+
+class Tracked:
+    """
+    A record that keeps its saved fragment until one of its fields changes.
+
+    Subclasses set `_fragment` to None whenever a field is assigned.
+    """
+
+    __slots__ = ("_fragment",)
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Tells whether the record changed since it was last saved, or was never saved.
+        """
+        return self.fragment is None
+
+    @property
+    def fragment(self) -> Optional[str]:
+        """
+        Returns the serialized record as it was last saved, or None if the record is dirty.
+        """
+        return getattr(self, "_fragment", None)
+
+    def keep_fragment(self, fragment: str) -> None:
+        """
+        Remembers the serialized record after a save; the record is clean until it changes.
+
+        Args:
+            fragment (str): The record as written to the data file.
+        """
+        self._fragment = fragment
+
+
+class TagList(list):
+    """
+    A list of tags that remembers whether it was changed in place.
+    """
+
+    __slots__ = ("dirty",)
+
+    def __init__(self, tags=()) -> None:
+        super().__init__(tags)
+        self.dirty = False
+
+
+def _marking(name: str):
+    method = getattr(list, name)
+
+    def mutator(self, *args, **kwargs):
+        self.dirty = True
+        return method(self, *args, **kwargs)
+
+    mutator.__name__ = name
+    mutator.__doc__ = method.__doc__
+    return mutator
+
+
+for _name in (
+    "append", "extend", "insert", "remove", "pop", "clear", "sort", "reverse",
+    "__setitem__", "__delitem__", "__iadd__", "__imul__",
+):
+    setattr(TagList, _name, _marking(_name))
@@ -0,0 +1,285 @@
+"""
+Opt-in profiling of commands with cProfile and tracemalloc.
+
+Started with `--profile <command> ...`, every run of the chosen commands is profiled: where the time
+went (cProfile) and which source lines allocated the memory still held when the command ended, with
+the peak traced memory (tracemalloc). Both are saved to the profile directory and the top hotspots
+and allocators are printed to standard error after the command, so a slow `search_note` or
+`check_birthdays` on real data is diagnosed in one run:
+
+    python main.py --profile search_note check_birthdays
+
+With `--profile-slowest N` every command is profiled and the files of the N slowest runs are kept;
+their summary is printed when the assistant exits. The files are read with the standard library:
+
+    python -m pstats data/profiles/<file>.prof
+    tracemalloc.Snapshot.load("data/profiles/<file>.tracemalloc")
+
+Profiling slows commands down several times, most of it from tracemalloc, and covers only the thread
+that runs the command, not background jobs.
+"""
+
+import heapq
+import io
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, TextIO, Union
+from colors import format_green, format_yellow
+
+if TYPE_CHECKING:
+    import cProfile
+    import tracemalloc
+
+# Hotspots and allocators printed per profile
+TOP = 15
+# Stack frames recorded per allocation; one is enough to group allocations by source line
+TRACE_FRAMES = 1
+
+
+@dataclass(order=True)
+class CommandProfile:
+    """
+    The profile of one command run.
+
+    Attributes:
+        duration (float): How long the command took under the profiler, in seconds.
+        command (str): The command name.
+        stats_path (str): The cProfile statistics file.
+        snapshot_path (Optional[str]): The tracemalloc snapshot file, if memory was traced.
+        peak_bytes (int): The peak traced memory during the command.
+    """
+
+    duration: float
+    command: str = field(compare=False)
+    stats_path: str = field(compare=False)
+    snapshot_path: Optional[str] = field(compare=False, default=None)
+    peak_bytes: int = field(compare=False, default=0)
+
+    def remove_files(self) -> None:
+        """
+        Deletes the saved files of the profile.
+        """
+        for path in (self.stats_path, self.snapshot_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+
+class CommandProfiler:
+    """
+    Profiles the chosen commands, or all commands keeping the slowest, when configured.
+    """
+
+    def __init__(self) -> None:
+        self.commands: frozenset = frozenset()
+        self.slowest = 0
+        self.directory = ""
+        self.trace_memory = True
+        self.stream: Optional[TextIO] = None
+        # Min-heap of the kept profiles in slowest mode, so the fastest one is dropped first
+        self._kept: List[CommandProfile] = []
+        # cProfile cannot profile two commands at once
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Tells whether any command is profiled.
+        """
+        return bool(self.commands or self.slowest)
+
+    def configure(
+        self, commands: Sequence[str] = (), slowest: int = 0, directory: str = "", trace_memory: bool = True
+    ) -> None:
+        """
+        Chooses the commands to profile.
+
+        Args:
+            commands (Sequence[str]): The commands profiled on every run.
+            slowest (int): Profile every command and keep the files of this many slowest runs.
+            directory (str): Where the profile files are saved; created if missing.
+            trace_memory (bool): Also trace allocations with tracemalloc.
+        """
+        self.commands = frozenset(commands)
+        self.slowest = max(0, slowest)
+        self.directory = directory
+        self.trace_memory = trace_memory
+
+    def wants(self, command: str) -> bool:
+        """
+        Tells whether a run of the command is profiled.
+        """
+        return bool(self.slowest) or command in self.commands
+
+    @contextmanager
+    def profile(self, command: str) -> Iterator[None]:
+        """
+        Profiles the body of the `with` block as one run of a command.
+
+        When another command is being profiled in another thread, the block runs unprofiled.
+
+        Args:
+            command (str): The command name.
+
+        Yields:
+            None: The body runs under the profiler.
+        """
+        if not self._lock.acquire(blocking=False):
+            yield
+            return
+        # Imported here, so the assistant starts as fast without profiling
+        import cProfile
+        import tracemalloc
+
+        try:
+            trace = self.trace_memory and not tracemalloc.is_tracing()
+            if trace:
+                tracemalloc.start(TRACE_FRAMES)
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                duration = time.perf_counter() - started
+                snapshot = peak = None
+                if trace:
+                    snapshot = tracemalloc.take_snapshot()
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                self._finish(command, duration, profiler, snapshot, peak or 0)
+        finally:
+            self._lock.release()
+
+    def _finish(
+        self,
+        command: str,
+        duration: float,
+        profiler: "cProfile.Profile",
+        snapshot: Optional["tracemalloc.Snapshot"],
+        peak: int,
+    ) -> None:
+        """
+        Saves a profile and prints it, or in slowest mode keeps it only if it is among the slowest.
+        """
+        if command not in self.commands and len(self._kept) >= self.slowest and duration <= self._kept[0].duration:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        stem = os.path.join(self.directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{command}")
+        result = CommandProfile(duration, command, f"{stem}.prof", None, peak)
+        profiler.dump_stats(result.stats_path)
+        if snapshot is not None:
+            result.snapshot_path = f"{stem}.tracemalloc"
+            snapshot.dump(result.snapshot_path)
+
+        if command in self.commands:
+            self._print(result, profiler, snapshot)
+        else:
+            heapq.heappush(self._kept, result)
+            if len(self._kept) > self.slowest:
+                heapq.heappop(self._kept).remove_files()
+
+    def _print(
+        self,
+        result: CommandProfile,
+        profiler: Optional["cProfile.Profile"] = None,
+        snapshot: Optional["tracemalloc.Snapshot"] = None,
+    ) -> None:
+        """
+        Prints the top hotspots and allocators of a profile, reading them from its files if not given.
+        """
+        import tracemalloc
+
+        stream = self.stream or sys.stderr
+        print(format_yellow(f"\nProfile of '{result.command}': {result.duration * 1000:.1f} ms"), file=stream)
+        print(f"Statistics: {result.stats_path}", file=stream)
+        print(format_yellow(f"Top {TOP} functions by cumulative time:"), file=stream)
+        print(hotspots(profiler or result.stats_path), file=stream)
+
+        if result.snapshot_path:
+            snapshot = snapshot or tracemalloc.Snapshot.load(result.snapshot_path)
+            print(f"Allocations: {result.snapshot_path}", file=stream)
+            print(
+                format_yellow(f"Top {TOP} allocators (memory held at the end, peak {result.peak_bytes / 1024:,.0f} KiB):"),
+                file=stream,
+            )
+            for line in allocators(snapshot):
+                print(f"  {line}", file=stream)
+
+    def report(self) -> None:
+        """
+        Prints the kept profiles of the slowest commands, slowest first.
+        """
+        if not self.slowest:
+            return
+        if not self._kept:
+            print(format_yellow("No commands were profiled."), file=self.stream or sys.stderr)
+            return
+        kept = sorted(self._kept, reverse=True)
+        print(
+            format_green(f"\nThe {len(kept)} slowest command(s), profiles in '{self.directory}':"),
+            file=self.stream or sys.stderr,
+        )
+        for result in kept:
+            self._print(result)
+
+
+def hotspots(source: Union["cProfile.Profile", str], limit: int = TOP) -> str:
+    """
+    Formats the functions with the most cumulative time.
+
+    Args:
+        source (Union[cProfile.Profile, str]): A profiler or the path of a saved statistics file.
+        limit (int): The number of functions.
+
+    Returns:
+        str: The pstats table.
+    """
+    import pstats
+
+    output = io.StringIO()
+    stats = pstats.Stats(source, stream=output)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    # Drop the header lines pstats prints before the table
+    text = output.getvalue()
+    start = text.find("   ncalls")
+    return text[start:].rstrip() if start >= 0 else text.rstrip()
+
+
+def allocators(snapshot: "tracemalloc.Snapshot", limit: int = TOP) -> List[str]:
+    """
+    Formats the source lines holding the most memory in a snapshot.
+
+    Args:
+        snapshot (tracemalloc.Snapshot): The snapshot.
+        limit (int): The number of lines.
+
+    Returns:
+        List[str]: One line per source line: size, count of blocks and location.
+    """
+    import tracemalloc
+
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+    )
+    lines = []
+    for statistic in snapshot.statistics("lineno")[:limit]:
+        frame = statistic.traceback[0]
+        lines.append(
+            f"{statistic.size / 1024:>10,.1f} KiB {statistic.count:>9,} blocks  {frame.filename}:{frame.lineno}"
+        )
+    return lines
+
+
+# The profiler of the application
+profiler = CommandProfiler()
@@ -0,0 +1,226 @@
+"""
+Logs the commands, manager calls and data file reads and writes that are slower than a threshold.
+
+Started with `--slow-log`, every command, public manager method and storage load, refresh or save
+that takes longer than its threshold is written to the log with its duration, the number of records
+it worked on and a short summary of its arguments:
+
+    2026-10-19 10:15:02,114 operation=contacts.search_by_name duration_ms=412.7 size=1000000 args=('petrenko',)
+
+The log is written through a `QueueHandler`: the thread that ran the operation only puts the record
+on a queue, and a `QueueListener` thread writes it to the file, so a slow disk never stalls the REPL.
+
+Thresholds are set per operation name prefix; the longest matching prefix wins, e.g.
+`--slow-ms 200 --slow-threshold command=1000 contacts.find_contact=5`.
+"""
+
+import atexit
+import os
+import reprlib
+import time
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Mapping, Optional
+from colors import format_red
+
+if TYPE_CHECKING:
+    import logging
+    import logging.handlers
+
+DEFAULT_THRESHOLD_MS = 200.0
+LOGGER_NAME = "assistant.slow"
+
+# Keeps the argument summaries short: long strings, lists and records are cut
+_repr = reprlib.Repr()
+_repr.maxstring = 80
+_repr.maxother = 80
+_repr.maxlist = 5
+_repr.maxdict = 8
+
+
+def summarize_arguments(args: tuple = (), kwargs: Optional[Mapping[str, Any]] = None) -> str:
+    """
+    Returns a short text of call arguments for the log.
+
+    Args:
+        args (tuple): The positional arguments.
+        kwargs (Optional[Mapping[str, Any]]): The keyword arguments.
+
+    Returns:
+        str: E.g. "('petrenko',)", "{'by': 'title'}" or "('petrenko',) {'limit': 20}".
+    """
+    parts = []
+    if args or not kwargs:
+        parts.append(_repr.repr(tuple(args)))
+    if kwargs:
+        parts.append(_repr.repr(dict(kwargs)))
+    return " ".join(parts)
+
+
+def parse_thresholds(values: Iterable[str]) -> Dict[str, float]:
+    """
+    Parses 'prefix=milliseconds' threshold overrides.
+
+    Args:
+        values (Iterable[str]): E.g. ['command=1000', 'storage.save=500'].
+
+    Returns:
+        Dict[str, float]: Operation name prefix -> threshold in milliseconds.
+
+    Raises:
+        ValueError: If a value is not 'prefix=milliseconds' with a non-negative number.
+    """
+    thresholds = {}
+    for value in values:
+        prefix, _, milliseconds = value.partition("=")
+        try:
+            threshold = float(milliseconds)
+        except ValueError:
+            threshold = -1.0
+        if not prefix or threshold < 0:
+            raise ValueError(format_red(f"Invalid slow threshold '{value}'. Expected 'operation=milliseconds'."))
+        thresholds[prefix] = threshold
+    return thresholds
+
+
+class SlowOperationLog:
+    """
+    Writes operations slower than their threshold to a log file, from a background thread.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.path: Optional[str] = None
+        self._default_ns = int(DEFAULT_THRESHOLD_MS * 1e6)
+        self._thresholds: Dict[str, int] = {}
+        # Operation name -> threshold in nanoseconds, resolved from the prefixes on first use
+        self._resolved: Dict[str, int] = {}
+        self._logger: Optional["logging.Logger"] = None
+        self._handler: Optional["logging.handlers.QueueHandler"] = None
+        self._listener: Optional["logging.handlers.QueueListener"] = None
+
+    def enable(
+        self, path: str, threshold_ms: float = DEFAULT_THRESHOLD_MS, thresholds: Optional[Mapping[str, float]] = None
+    ) -> None:
+        """
+        Starts logging slow operations to a file, appending to it.
+
+        Args:
+            path (str): The log file; its directory is created if missing.
+            threshold_ms (float): The threshold of the operations without an override, in milliseconds.
+            thresholds (Optional[Mapping[str, float]]): Operation name prefix -> threshold in milliseconds.
+        """
+        # Imported here, so the assistant starts as fast without the log
+        import logging
+        import logging.handlers
+        import queue
+
+        self.close()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.FileHandler(path, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._handler = logging.handlers.QueueHandler(records)
+        self._listener = logging.handlers.QueueListener(records, file_handler)
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self._logger.setLevel(logging.INFO)
+        # Slow operations go to the file only, not to the error output of the application
+        self._logger.propagate = False
+        self._logger.addHandler(self._handler)
+        self._listener.start()
+
+        self.path = path
+        self._default_ns = int(threshold_ms * 1e6)
+        self._thresholds = {prefix: int(value * 1e6) for prefix, value in (thresholds or {}).items()}
+        self._resolved = {}
+        self.enabled = True
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        """
+        Stops logging, after writing the records still on the queue.
+        """
+        self.enabled = False
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+        if self._logger is not None and self._handler is not None:
+            self._logger.removeHandler(self._handler)
+            self._handler = None
+
+    def threshold_ns(self, operation: str) -> int:
+        """
+        Returns the threshold of an operation: that of its longest configured prefix, or the default.
+
+        Args:
+            operation (str): The operation name, e.g. 'contacts.search_by_name'.
+
+        Returns:
+            int: The threshold in nanoseconds.
+        """
+        threshold = self._resolved.get(operation)
+        if threshold is None:
+            matches = [prefix for prefix in self._thresholds if operation.startswith(prefix)]
+            threshold = self._thresholds[max(matches, key=len)] if matches else self._default_ns
+            self._resolved[operation] = threshold
+        return threshold
+
+    def observe(self, operation: str, duration_ns: int, size: Optional[int] = None, arguments: str = "") -> None:
+        """
+        Logs an operation if it took longer than its threshold.
+
+        Args:
+            operation (str): The operation name.
+            duration_ns (int): How long it took, in nanoseconds.
+            size (Optional[int]): The number of records it worked on, if known.
+            arguments (str): A short summary of its arguments.
+        """
+        if not self.enabled or duration_ns < self.threshold_ns(operation):
+            return
+        self._logger.info(
+            "operation=%s duration_ms=%.1f size=%s args=%s",
+            operation,
+            duration_ns / 1e6,
+            "-" if size is None else size,
+            arguments or "-",
+        )
+
+    def instrument(self, cls: type, prefix: str, size: Callable[[Any], Optional[int]]) -> None:
+        """
+        Logs the slow calls of every public method defined by a class, as '<prefix>.<method>'.
+
+        Args:
+            cls (type): The class, e.g. ContactManager.
+            prefix (str): The first part of the operation names.
+            size (Callable[[Any], Optional[int]]): Returns the number of records of an instance.
+        """
+        import inspect
+
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(method) or getattr(method, "__slow_logged__", False):
+                continue
+            setattr(cls, name, self._logged(method, f"{prefix}.{name}", size))
+
+    def _logged(
+        self, method: Callable[..., Any], operation: str, size: Callable[[Any], Optional[int]]
+    ) -> Callable[..., Any]:
+        @wraps(method)
+        def wrapper(instance, *args, **kwargs):
+            started = time.perf_counter_ns()
+            try:
+                return method(instance, *args, **kwargs)
+            finally:
+                duration = time.perf_counter_ns() - started
+                if self.enabled and duration >= self.threshold_ns(operation):
+                    self.observe(operation, duration, size(instance), summarize_arguments(args, kwargs))
+
+        wrapper.__slow_logged__ = True
+        return wrapper
+
+
+# The slow-operation log of the application
+slow_log = SlowOperationLog()
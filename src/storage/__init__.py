@@ -1,3 +1,4 @@
 from .storage import Storage
 from .contact_storage import ContactStorage
 from .note_storage import NoteStorage
+from .note_history_storage import NoteHistoryStorage
@@ -40,3 +40,27 @@ class ContactStorage(Storage[Contact]):
             Contact: A Contact instance created from the provided data.
         """
         return Contact(**data)
+
+    def record_key(self, data: dict) -> str:
+        """
+        Returns the name, which identifies a contact.
+
+        Args:
+            data (dict): The contact data.
+
+        Returns:
+            str: The contact name.
+        """
+        return data["name"]
+
+    def key_of(self, contact: Contact) -> str:
+        """
+        Returns the name of a contact.
+
+        Args:
+            contact (Contact): The contact.
+
+        Returns:
+            str: The contact name.
+        """
+        return contact.name
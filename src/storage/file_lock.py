@@ -0,0 +1,79 @@
+"""
+An advisory lock on a file, shared by all processes that use the same data file.
+
+The lock is taken on a separate `<data file>.lock` file rather than on the data file itself, because
+the data file is replaced on every save and a lock on the old file would not exclude a process that
+opens the new one. The lock is advisory: it only excludes processes that take it too.
+"""
+
+import time
+from typing import IO, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    An exclusive inter-process lock, used as a context manager.
+
+    Usage:
+        with FileLock("data/contacts_data.json.lock"):
+            ...  # no other process holds the lock here
+    """
+
+    # How long, in seconds, to wait for the lock on Windows, where locking cannot block forever
+    TIMEOUT = 10.0
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): The path of the lock file; it is created if it does not exist.
+        """
+        self.path = path
+        self._file: Optional[IO[bytes]] = None
+
+    def __enter__(self) -> "FileLock":
+        self._file = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._lock_windows()
+        except BaseException:
+            self._file.close()
+            self._file = None
+            raise
+        return self
+
+    def _lock_windows(self) -> None:
+        """
+        Locks the first byte of the lock file, retrying until the timeout.
+
+        Raises:
+            OSError: If another process holds the lock for longer than the timeout.
+        """
+        deadline = time.monotonic() + self.TIMEOUT
+        while True:
+            self._file.seek(0)
+            try:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def __exit__(self, *exc_info: Any) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
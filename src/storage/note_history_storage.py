@@ -0,0 +1,65 @@
+from models import NoteHistory
+from storage import Storage
+from colors import format_red
+
+
+class NoteHistoryStorage(Storage[NoteHistory]):
+    """
+    The NoteHistoryStorage class is responsible for managing the persistent storage of the note
+    revisions in a JSON file, one record per note that has any.
+    """
+
+    def is_valid_data(self, data: dict) -> bool:
+        """
+        Validates whether the provided history data contains all required fields.
+
+        Args:
+            data (dict): The history data to be validated.
+
+        Returns:
+            bool: True if the data contains all required fields, False otherwise.
+
+        Side effects:
+            Prints an error message to the console if any required fields are missing.
+        """
+        missing_fields = {"note_id", "revisions"} - data.keys()
+        if missing_fields:
+            print(format_red(f"Missing fields in note history data: {missing_fields}"))
+            return False
+        return True
+
+    def create_instance(self, data: dict) -> NoteHistory:
+        """
+        Creates a NoteHistory instance from the provided data.
+
+        Args:
+            data (dict): The data to be used for creating a NoteHistory instance.
+
+        Returns:
+            NoteHistory: The revisions of one note.
+        """
+        return NoteHistory(data["note_id"], data["revisions"])
+
+    def record_key(self, data: dict) -> int:
+        """
+        Returns the note id, which identifies a history.
+
+        Args:
+            data (dict): The history data.
+
+        Returns:
+            int: The note id.
+        """
+        return data["note_id"]
+
+    def key_of(self, history: NoteHistory) -> int:
+        """
+        Returns the note id of a history.
+
+        Args:
+            history (NoteHistory): The history.
+
+        Returns:
+            int: The note id.
+        """
+        return history.note_id
@@ -1,3 +1,4 @@
+from typing import Hashable, Set
 from models import Note
 from storage import Storage
 from colors import format_red
@@ -48,3 +49,42 @@ class NoteStorage(Storage[Note]):
             Note: A Note instance created from the provided data.
         """
         return Note(**data)
+
+    def record_key(self, data: dict) -> int:
+        """
+        Returns the id, which identifies a note.
+
+        Args:
+            data (dict): The note data.
+
+        Returns:
+            int: The note id.
+        """
+        return data["id"]
+
+    def key_of(self, note: Note) -> int:
+        """
+        Returns the id of a note.
+
+        Args:
+            note (Note): The note.
+
+        Returns:
+            int: The note id.
+        """
+        return note.id
+
+    def rekey(self, note: Note, taken: Set[Hashable]) -> bool:
+        """
+        Gives a note the next free id, when another process added a note with the same id.
+
+        Args:
+            note (Note): The note added in this process.
+            taken (Set[Hashable]): The ids in use by either process; the new id is added to it.
+
+        Returns:
+            bool: True, the note always gets a new id.
+        """
+        note.id = max((key for key in taken if isinstance(key, int)), default=0) + 1
+        taken.add(note.id)
+        return True
@@ -1,17 +1,159 @@
 import os
 import json
-from typing import List, Optional, TypeVar, Generic
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import suppress
+from typing import Dict, Hashable, List, Optional, Set, Tuple, TypeVar, Generic
 from abc import ABC, abstractmethod
+from storage.file_lock import FileLock
+from metrics import metrics
+from slow_log import slow_log
 from colors import format_red, format_yellow, format_green
 
 # Define a TypeVar for the generic type
 T = TypeVar("T")
 
+# Identifies one version of a file: inode, size and modification time
+Signature = Tuple[int, int, int]
+
+
+def _signature(stat_result: os.stat_result) -> Signature:
+    return (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+
+
+def _file_signature(file_path: str) -> Optional[Signature]:
+    """
+    Returns the signature of the file, or None if it does not exist.
+    """
+    try:
+        return _signature(os.stat(file_path))
+    except FileNotFoundError:
+        return None
+
+
+# Encodes a string as a JSON string literal without escaping non-ASCII characters; in C when available
+_encode_string = json.encoder.encode_basestring
+
+_FIELD_INDENT = " " * 8
+_ITEM_INDENT = " " * 12
+_ITEM_FIELD_INDENT = " " * 16
+
+
+def _encode_scalar(value) -> Optional[str]:
+    """
+    Encodes a string, integer, boolean or None as JSON, or returns None for any other value.
+    """
+    kind = type(value)
+    if kind is str:
+        return _encode_string(value)
+    if kind is int:
+        return int.__repr__(value)
+    if value is None:
+        return "null"
+    if kind is bool:
+        return "true" if value else "false"
+    return None
+
+
+def _encode_item(item: dict) -> Optional[str]:
+    """
+    Encodes a dictionary of scalars that is an element of a list field, or returns None if it has other values.
+    """
+    if not item:
+        return "{}"
+    lines = []
+    for key, value in item.items():
+        text = _encode_scalar(value)
+        if text is None or type(key) is not str:
+            return None
+        lines.append(f"{_ITEM_FIELD_INDENT}{_encode_string(key)}: {text}")
+    return "{\n" + ",\n".join(lines) + f"\n{_ITEM_INDENT}}}"
+
+
+def _encode_record(item: dict) -> str:
+    """
+    Encodes a record as it appears in the data file, indented inside the top-level list.
+
+    The encoded records, one per line group, joined by commas and wrapped in brackets on their own
+    lines, give the same text as `json.dumps(items, ensure_ascii=False, indent=4)` of the whole list.
+
+    `json.dumps` uses its pure-Python encoder whenever it indents, so the flat records of the data files
+    (strings, integers, booleans, None, lists of strings and lists of such flat dictionaries, like note
+    revisions) are laid out here and only their strings are encoded by the C encoder. Any other record
+    is left to `json.dumps`.
+    """
+    lines = []
+    for key, value in item.items():
+        text = _encode_scalar(value)
+        if text is None:
+            if type(value) is not list:
+                return _encode_record_generic(item)
+            if not value:
+                text = "[]"
+            elif all(type(element) is str for element in value):
+                elements = f",\n{_ITEM_INDENT}".join(map(_encode_string, value))
+                text = f"[\n{_ITEM_INDENT}{elements}\n{_FIELD_INDENT}]"
+            elif all(type(element) is dict for element in value):
+                elements = [_encode_item(element) for element in value]
+                if None in elements:
+                    return _encode_record_generic(item)
+                text = f"[\n{_ITEM_INDENT}" + f",\n{_ITEM_INDENT}".join(elements) + f"\n{_FIELD_INDENT}]"
+            else:
+                return _encode_record_generic(item)
+        if type(key) is not str:
+            return _encode_record_generic(item)
+        lines.append(f"{_FIELD_INDENT}{_encode_string(key)}: {text}")
+    if not lines:
+        return "    {}"
+    return "    {\n" + ",\n".join(lines) + "\n    }"
+
+
+def _encode_record_generic(item: dict) -> str:
+    """
+    Encodes any record like `_encode_record`, with `json.dumps`.
+    """
+    return "    " + json.dumps(item, ensure_ascii=False, indent=4).replace("\n", "\n    ")
+
+
+def _record_hash(item: dict) -> int:
+    """
+    Hashes the serialized form of a record, to tell whether it changed since it was last read or saved.
+    """
+    try:
+        return hash((tuple(item), tuple([tuple(value) if type(value) is list else value for value in item.values()])))
+    except TypeError:
+        pass
+    try:
+        # Lists of flat dictionaries, such as note revisions
+        return hash((tuple(item), tuple([_freeze(value) for value in item.values()])))
+    except TypeError:
+        return hash(json.dumps(item, ensure_ascii=False, sort_keys=True))
+
+
+def _freeze(value):
+    """
+    Turns a list of dictionaries into nested tuples of their items, which can be hashed.
+    """
+    if type(value) is list:
+        return tuple([tuple(element.items()) if type(element) is dict else element for element in value])
+    return value
+
+
 class Storage(Generic[T], ABC):
     """
     The Storage class is responsible for managing the persistent storage of data in a JSON file.
     It provides methods to load and save data, while also caching the data in memory to avoid
     redundant file operations.
+
+    Several processes may share the file. Saves hold an advisory lock on `<file>.lock` and replace the
+    file atomically. The storage remembers which version of the file its cache matches, so a save
+    merges the records other processes saved in the meantime instead of overwriting them, and
+    `refresh()` picks up their changes, creating objects only for the records that changed.
+
+    Records that track their changes (see `models.tracking`) keep their encoded form after a save, so
+    the next save encodes only the records that changed and copies the others.
     """
 
     def __init__(self, file_path: str) -> None:
@@ -25,45 +167,94 @@ class Storage(Generic[T], ABC):
             file_path (str): The path to the file where data will be read from or written to.
             __data_cache (Optional[List[T]]): A cache for storing data loaded from the file.
                                             Initialized as None to indicate that data has not yet been loaded.
+            __lock (threading.RLock): Makes the first load happen once and saves happen one at a time.
+            __signature (Optional[Signature]): The version of the file the cache was last synced with.
+            __synced (Dict[Hashable, Tuple[int, T]]): Record key -> hash of the record as of that version,
+                                            and the object created for it.
+            __saved (List[T]): The records as of the last save, in their order.
         """
         self.file_path = file_path
         self.__data_cache: Optional[List[T]] = None
+        # Serializes loading and saving when the storage is used from several threads
+        self.__lock = threading.RLock()
+        self.__signature: Optional[Signature] = None
+        self.__synced: Dict[Hashable, Tuple[int, T]] = {}
+        self.__saved: List[T] = []
 
-    def __load_from_file(self) -> List[T]:
+    def __read_items(self, operation: Optional[str] = None) -> Tuple[Optional[Signature], Optional[List[dict]]]:
         """
-        Loads data from the JSON file.
+        Reads the valid records from the JSON file, without creating objects for them.
+
+        Args:
+            operation (Optional[str]): 'load' or 'refresh', the operation the read and decode times are
+                accounted to; None when they are part of another step, like the merge of a save.
 
         Returns:
-            List[T]: A list of objects of type T retrieved from the file. If the file does not
-                     exist or there is an error, an empty list is returned.
+            Tuple[Optional[Signature], Optional[List[dict]]]: The signature of the version read and its
+                records, or None for the records if the file does not exist or cannot be read.
+
+        Raises:
+            ValueError: If the file does not contain a list.
 
         Side effects:
             Prints error messages to the console in case of file access or JSON decoding issues.
         """
-        if not os.path.exists(self.file_path):
-            print(format_yellow(f"Warning - File '{self.file_path}' does not exist."))
-            return []
-
         try:
             with open(self.file_path, "r", encoding="utf-8") as file:
+                # The signature of the opened file, which a concurrent save cannot change
+                signature = _signature(os.fstat(file.fileno()))
+                started = time.perf_counter_ns()
+                text = file.read()
+                if operation:
+                    started = self.__phase(operation, "read", started, bytes_read=signature[1])
                 try:
-                    data = json.load(file)
+                    data = json.loads(text)
+                    del text
                     if not isinstance(data, list):
                         raise ValueError(
                             format_red("Data in the file is not a valid list.")
                         )
-                    return [
-                        self.create_instance(item) 
-                        for item in data 
-                        if self.is_valid_data(item)
-                    ]
+                    items = [item for item in data if self.is_valid_data(item)]
+                    if operation:
+                        self.__phase(operation, "decode", started)
+                    return signature, items
                 except json.JSONDecodeError:
                     print(format_red("Error decoding JSON data."))
-                    return []
+                    return signature, None
+        except FileNotFoundError:
+            return None, None
         except (OSError, IOError) as ex:
             print(format_red(f"Error reading file '{self.file_path}': {ex}"))
+            return None, None
+
+    def __load_from_file(self) -> List[T]:
+        """
+        Loads data from the JSON file.
+
+        Returns:
+            List[T]: A list of objects of type T retrieved from the file. If the file does not
+                     exist or there is an error, an empty list is returned.
+
+        Side effects:
+            Prints error messages to the console in case of file access or JSON decoding issues.
+        """
+        if not os.path.exists(self.file_path):
+            print(format_yellow(f"Warning - File '{self.file_path}' does not exist."))
             return []
 
+        signature, items = self.__read_items("load")
+        started = time.perf_counter_ns()
+        records: List[T] = []
+        synced: Dict[Hashable, Tuple[int, T]] = {}
+        for item in items or ():
+            record = self.create_instance(item)
+            records.append(record)
+            synced[self.record_key(item)] = (_record_hash(item), record)
+        self.__phase("load", "build", started)
+        self.__signature = signature
+        self.__synced = synced
+        return records
+
     def load_data(self) -> List[T]:
         """
         Loads data from the cache or, if not cached, from the file.
@@ -73,9 +264,92 @@ class Storage(Generic[T], ABC):
                      otherwise, the data is read from the file and cached.
         """
         if self.__data_cache is None:
-            self.__data_cache = self.__load_from_file()
+            with self.__lock:
+                if self.__data_cache is None:
+                    started = time.perf_counter_ns()
+                    self.__data_cache = self.__load_from_file()
+                    self.__record("load", started, bytes_read=self.__signature[1] if self.__signature else 0)
         return self.__data_cache
-    
+
+    def __record(self, operation: str, started: int, bytes_read: int = 0, bytes_written: int = 0) -> None:
+        """
+        Adds a load, refresh or save of the file to the statistics and the slow-operation log, if enabled.
+        """
+        if not (metrics.enabled or slow_log.enabled):
+            return
+        name = f"storage.{operation}.{os.path.basename(str(self.file_path))}"
+        duration = time.perf_counter_ns() - started
+        metrics.record(name, duration, bytes_read, bytes_written)
+        if slow_log.enabled:
+            size = len(self.__data_cache) if self.__data_cache is not None else None
+            slow_log.observe(name, duration, size, f"{bytes_read} bytes read, {bytes_written} bytes written")
+
+    def __phase(self, operation: str, phase: str, started: int, bytes_read: int = 0, bytes_written: int = 0) -> int:
+        """
+        Adds one step of a load, refresh or save, such as decoding or fsync, to the statistics if they are enabled.
+
+        Returns:
+            int: The current time, where the next step starts.
+        """
+        now = time.perf_counter_ns()
+        if metrics.enabled:
+            metrics.record(
+                f"storage.{operation}.{os.path.basename(str(self.file_path))}.{phase}",
+                now - started,
+                bytes_read,
+                bytes_written,
+            )
+        return now
+
+    def has_external_changes(self) -> bool:
+        """
+        Tells whether another process saved the file since the cache was last synced with it.
+
+        This only compares the file's inode, size and modification time, so it is cheap enough to call
+        before every command.
+
+        Returns:
+            bool: True if the data is cached and the file changed; False otherwise.
+        """
+        return self.__data_cache is not None and _file_signature(self.file_path) != self.__signature
+
+    def refresh(self) -> bool:
+        """
+        Updates the cached list in place with the changes other processes saved to the file.
+
+        Objects are created only for the records that were added or changed; the objects of unchanged
+        records are kept. The cache must not have unsaved changes.
+
+        Returns:
+            bool: True if the cached list was updated.
+        """
+        with self.__lock:
+            if not self.has_external_changes():
+                return False
+            started = time.perf_counter_ns()
+            signature, items = self.__read_items("refresh")
+            if items is None:
+                # Nothing usable to pick up; do not try again until the file changes once more
+                self.__signature = signature
+                return False
+
+            build_started = time.perf_counter_ns()
+            records: List[T] = []
+            synced: Dict[Hashable, Tuple[int, T]] = {}
+            for item in items:
+                key = self.record_key(item)
+                digest = _record_hash(item)
+                known = self.__synced.get(key)
+                record = known[1] if known is not None and known[0] == digest else self.create_instance(item)
+                records.append(record)
+                synced[key] = (digest, record)
+            self.__phase("refresh", "build", build_started)
+            self.__data_cache[:] = records
+            self.__signature = signature
+            self.__synced = synced
+            self.__record("refresh", started, bytes_read=signature[1] if signature else 0)
+            return True
+
     def __ensure_directory_exists(self, file_path: str) -> None:
         """
         Ensures that the directory for the given file path exists.
@@ -89,34 +363,252 @@ class Storage(Generic[T], ABC):
             os.makedirs(directory)
             print(format_green(f"Directory created: {directory}"))
 
-    def save_data(self, data: List[T]) -> None:
+    def __merge_external_changes(self, data: List[T]) -> bool:
+        """
+        Merges the records another process saved since the last sync into the given list, in place.
+
+        Each record is compared with its state at the last sync: changes made by only one of the
+        processes are kept, records added by the other process are appended, and records it removed
+        are dropped. When both processes changed the same record, the version in `data` wins.
+
+        Args:
+            data (List[T]): The records about to be saved.
+
+        Returns:
+            bool: True if the list was changed.
+
+        Side effects:
+            Prints a warning for every record both processes changed.
+        """
+        _, items = self.__read_items()
+        if items is None:
+            return False
+        theirs = {self.record_key(item): item for item in items}
+        ours = [(record, record.to_dict()) for record in data]
+        taken: Set[Hashable] = set(theirs)
+        taken.update(self.record_key(item) for _, item in ours)
+
+        merged: List[T] = []
+        seen: Set[Hashable] = set()
+        changed = False
+        for record, item in ours:
+            key = self.record_key(item)
+            seen.add(key)
+            known = self.__synced.get(key)
+            base_hash = known[0] if known is not None else None
+            our_hash = _record_hash(item)
+            their_item = theirs.get(key)
+            their_hash = _record_hash(their_item) if their_item is not None else None
+
+            if our_hash == base_hash:
+                # Unchanged here: take whatever the other process did
+                changed = changed or their_hash != base_hash
+                if their_item is not None:
+                    merged.append(record if their_hash == base_hash else self.create_instance(their_item))
+                continue
+
+            merged.append(record)
+            if their_item is None or their_hash in (base_hash, our_hash):
+                continue
+            if known is None and self.rekey(record, taken):
+                # Both processes added a record under the same generated key; keep both
+                merged.append(self.create_instance(their_item))
+                seen.add(key)
+                changed = True
+                print(format_yellow(
+                    f"Warning - '{key}' was also added by another process; saved as '{self.record_key(record.to_dict())}'."
+                ))
+            else:
+                print(format_yellow(
+                    f"Warning - '{key}' was also changed by another process; keeping the version from this one."
+                ))
+
+        for key, their_item in theirs.items():
+            if key in seen:
+                continue
+            known = self.__synced.get(key)
+            if known is None:
+                merged.append(self.create_instance(their_item))
+                changed = True
+            elif _record_hash(their_item) != known[0]:
+                print(format_yellow(
+                    f"Warning - '{key}' was changed by another process but removed here; keeping it removed."
+                ))
+
+        if changed:
+            data[:] = merged
+        return changed
+
+    def __write_atomically(self, text: str) -> None:
+        """
+        Writes the text to a temporary file next to the data file and moves it over the data file,
+        so that readers always see either the old or the new version.
+
+        Args:
+            text (str): The new contents of the file.
+        """
+        directory = os.path.dirname(self.file_path) or "."
+        fd, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(self.file_path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                started = time.perf_counter_ns()
+                file.write(text)
+                file.flush()
+                started = self.__phase("save", "write", started, bytes_written=file.tell())
+                os.fsync(file.fileno())
+                started = self.__phase("save", "fsync", started)
+            if os.path.exists(self.file_path):
+                shutil.copymode(self.file_path, temp_path)
+            os.replace(temp_path, self.file_path)
+            self.__phase("save", "replace", started)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(temp_path)
+            raise
+
+    def save_data(self, data: List[T]) -> bool:
         """
         Saves the given list of data to the JSON file and updates the cache.
 
+        If another process saved the file since it was last read or saved here, its changes are first
+        merged into `data`.
+
         Args:
             data (List[T]): A list of objects of type T to be saved.
 
+        Returns:
+            bool: True if changes of another process were merged into `data`.
+
         Side effects:
             Writes the data to the file in JSON format, printing error messages to the console
             in case of file access or JSON serialization issues.
         """
-        self.__data_cache = data
+        with self.__lock:
+            started = time.perf_counter_ns()
+            self.__data_cache = data
 
-        self.__ensure_directory_exists(self.file_path)
+            self.__ensure_directory_exists(self.file_path)
 
-        try:
-            with open(self.file_path, "w", encoding="utf-8") as file:
-                try:
-                    json.dump(
-                        [item.to_dict() for item in data],
-                        file,
-                        ensure_ascii=False,
-                        indent=4,
-                    )
-                except (TypeError, ValueError) as ex:
-                    print(format_red(f"Error serializing data to JSON: {ex}"))
-        except (OSError, IOError) as ex:
-            print(format_red(f"Error writing to file '{self.file_path}': {ex}"))
+            try:
+                with FileLock(f"{self.file_path}.lock"):
+                    step = self.__phase("save", "lock", started)
+                    merged = False
+                    bytes_read = 0
+                    current = _file_signature(self.file_path)
+                    if current != self.__signature:
+                        merged = self.__merge_external_changes(data)
+                        bytes_read = current[1] if current else 0
+                        step = self.__phase("save", "merge", step, bytes_read=bytes_read)
+
+                    encoded: List[Tuple[T, str]] = []
+                    changed = 0
+                    synced_before = self.__synced
+                    fragments = [getattr(record, "fragment", None) for record in data]
+                    # The same records as at the last save and none of them changed: the sync state still
+                    # holds. Both checks run in C, so such a save costs little more than the write itself.
+                    unchanged = None not in fragments and data == self.__saved
+                    if unchanged:
+                        synced = synced_before
+                    else:
+                        fragments = []
+                        synced = {}
+                    # Looked up once, as the loop runs for every record
+                    key_of = self.key_of
+                    add_fragment = fragments.append
+                    try:
+                        for record in () if unchanged else data:
+                            # A clean record is written as it was last saved; its sync state still holds
+                            fragment = getattr(record, "fragment", None)
+                            if fragment is not None:
+                                key = key_of(record)
+                                known = synced_before.get(key)
+                                if known is not None and known[1] is record:
+                                    synced[key] = known
+                                    add_fragment(fragment)
+                                    continue
+
+                            item = record.to_dict()
+                            fragment = _encode_record(item)
+                            key = self.record_key(item)
+                            digest = _record_hash(item)
+                            known = synced_before.get(key)
+                            if known is None or known[0] != digest:
+                                changed += 1
+                            synced[key] = (digest, record)
+                            add_fragment(fragment)
+                            encoded.append((record, fragment))
+                    except (TypeError, ValueError) as ex:
+                        print(format_red(f"Error serializing data to JSON: {ex}"))
+                        return merged
+                    if fragments:
+                        # The brackets go on the first and last records, so the text is built in one copy
+                        fragments[0] = "[\n" + fragments[0]
+                        fragments[-1] += "\n]"
+                    text = ",\n".join(fragments) if fragments else "[]"
+                    del fragments
+                    self.__phase("save", "encode", step)
+                    self.__write_atomically(text)
+                    del text
+
+                    # Only now the file holds the encoded records, so they are clean
+                    for record, fragment in encoded:
+                        if hasattr(record, "keep_fragment"):
+                            record.keep_fragment(fragment)
+                    self.__signature = _file_signature(self.file_path)
+                    bytes_written = self.__signature[1] if self.__signature else 0
+                    if metrics.enabled:
+                        removed = sum(1 for key in self.__synced if key not in synced)
+                        metrics.record_write(
+                            os.path.basename(str(self.file_path)),
+                            len(data),
+                            changed + removed,
+                            bytes_written,
+                            records_encoded=len(encoded),
+                        )
+                    self.__synced = synced
+                    self.__saved = list(data)
+                    self.__record("save", started, bytes_read, bytes_written)
+                    return merged
+            except (OSError, IOError) as ex:
+                print(format_red(f"Error writing to file '{self.file_path}': {ex}"))
+                return False
+
+    def rekey(self, record: T, taken: Set[Hashable]) -> bool:
+        """
+        Gives a record added here a new key, when another process added a record with the same key.
+
+        Storages whose keys are generated (like note ids) override this; by default the record added
+        here replaces the other one.
+
+        Args:
+            record (T): The record added here.
+            taken (Set[Hashable]): The keys in use by either process; the new key is added to it.
+
+        Returns:
+            bool: True if the record got a new key.
+        """
+        return False
+
+    def key_of(self, record: T) -> Hashable:
+        """
+        Returns the key of a record object; storages override it to read the key without `to_dict()`.
+
+        Args:
+            record (T): The record.
+
+        Returns:
+            Hashable: The same value as `record_key(record.to_dict())`.
+        """
+        return self.record_key(record.to_dict())
+
+    @abstractmethod
+    def record_key(self, data: dict) -> Hashable:
+        """
+        Returns the value identifying a record across versions of the file.
+        """
+        pass
 
     @abstractmethod
     def is_valid_data(self, data: dict) -> bool:
@@ -1,19 +1,45 @@
-from .command_parser import parse_input
-from .command_handlers import (
-    handle_add_contact,
-    handle_search_contact,
-    handle_show_all_notes,
-    handle_remove_contact,
-    handle_show_all_contacts,
-    handle_upcoming_birthdays,
-    handle_edit_contact,
-    handle_add_note,
-    handle_search_notes,
-    handle_remove_note,
-    handle_edit_note,
-    handle_add_tag,
-    handle_remove_tag,
-    handle_sort_notes_by_tags,
-)
-from .custom_decorators import error_handler
-from .suggestion_utils import suggest_command, completer
\ No newline at end of file
+"""
+The command-line helpers of the assistant.
+
+The names below are resolved on first access, so that importing one helper module (for example the
+command registry) does not import the command handlers and the managers behind them.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "parse_input": "command_parser",
+    "handle_add_contact": "command_handlers",
+    "handle_search_contact": "command_handlers",
+    "handle_show_all_notes": "command_handlers",
+    "handle_remove_contact": "command_handlers",
+    "handle_show_all_contacts": "command_handlers",
+    "handle_upcoming_birthdays": "command_handlers",
+    "handle_edit_contact": "command_handlers",
+    "handle_add_note": "command_handlers",
+    "handle_search_notes": "command_handlers",
+    "handle_remove_note": "command_handlers",
+    "handle_edit_note": "command_handlers",
+    "handle_add_tag": "command_handlers",
+    "handle_remove_tag": "command_handlers",
+    "handle_sort_notes_by_tags": "command_handlers",
+    "handle_find_duplicates": "command_handlers",
+    "handle_note_history": "command_handlers",
+    "handle_show_revision": "command_handlers",
+    "handle_restore_revision": "command_handlers",
+    "handle_undo": "command_handlers",
+    "handle_redo": "command_handlers",
+    "error_handler": "custom_decorators",
+    "suggest_command": "suggestion_utils",
+    "get_completer": "suggestion_utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
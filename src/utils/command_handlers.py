@@ -1,9 +1,13 @@
+import json
 from managers import ContactManager, NoteManager
 from models import Contact, Note
 from utils.custom_decorators import error_handler
-from prettytable import PrettyTable
+from utils.exceptions import ValidationError
 from typing import List, Dict, Any, Optional
 from colors import format_yellow, format_green, format_red
+from constants import PAGE_SIZE
+from utils.prompts import ask, is_interactive
+from utils.output import is_jsonl, write_records
 
 
 @error_handler
@@ -19,17 +23,14 @@ def handle_add_contact(manager: ContactManager) -> None:
         manager (ContactManager): An instance of ContactManager to manage contacts.
     """
     name = _prompt_for_non_empty_input("name", "Enter contact name (required): ")
-    if not name:
-        return
 
-    if manager.search_by_name(name):
-        print(format_red(f"Contact with the name '{name}' already exists."))
-        return
+    if manager.find_contact(name):
+        raise ValidationError(format_red(f"Contact with the name '{name}' already exists."))
 
-    address = input("Enter address (or press Enter to skip): ").strip()
-    phone_number = input("Enter phone number (required): ").strip()
-    email = input("Enter email (required): ").strip()
-    birthday = input("Enter birthday (DD.MM.YYYY) (or press Enter to skip): ").strip()
+    address = ask("address", "Enter address (or press Enter to skip): ").strip()
+    phone_number = ask("phone_number", "Enter phone number (required): ").strip()
+    email = ask("email", "Enter email (required): ").strip()
+    birthday = ask("birthday", "Enter birthday (DD.MM.YYYY) (or press Enter to skip): ").strip()
 
     new_contact = Contact(
         name=name,
@@ -46,36 +47,45 @@ def handle_search_contact(manager: ContactManager) -> None:
     """
     Handles the search for contacts based on the specified search type.
 
-    Prompts the user to select a search type ('name', 'email', or 'phone') and enter the search query.
+    Prompts the user to select a search type ('name', 'email', 'phone' or 'query') and enter the search query.
+    A 'query' combines several predicates, e.g. 'name~ivan email:@gmail.com birthday_month:5', and
+    'explain' prints the plan of such a query instead of running it.
     It then performs the search using the appropriate method from the ContactManager and displays the results.
     If an error occurs during the search, it prints an appropriate error message.
 
     Parameters:
         manager (ContactManager): An instance of ContactManager to manage contacts.
     """
-    search_type = input("Search by (name/email/phone): ").strip().lower()
-    query = input("Enter the search query: ").strip()
+    search_type = ask("by", "Search by (name/email/phone/query/explain): ").strip().lower()
+    query = ask("query", "Enter the search query: ").strip()
+
+    if search_type == "explain":
+        print(format_green("Query plan:"))
+        print(manager.explain_query(query))
+        return
 
     search_map = {
         "name": manager.search_by_name,
         "email": manager.search_by_email,
         "phone": manager.search_by_phone_number,
+        "query": manager.query,
     }
 
     search_method = search_map.get(search_type, "")
 
-    if search_method:
-        try:
-            results = search_method(query)
-            if results:
-                print(format_green(f"Found {len(results)} contact(s):"))
-                _print_contacts(results)
-            else:
-                print(format_red("No contacts found."))
-        except Exception as ex:
-            print(format_red(f"An error occurred during the search: {ex}"))
+    if not search_method:
+        raise ValidationError(
+            format_red("Invalid search type. Please choose 'name', 'email', 'phone', 'query' or 'explain'.")
+        )
+
+    results = search_method(query)
+    if is_jsonl():
+        write_records(contact.to_dict() for contact in results)
+    elif results:
+        print(format_green(f"Found {len(results)} contact(s):"))
+        _print_contacts(results)
     else:
-        print(format_red("Invalid search type. Please choose 'name', 'email', or 'phone'."))
+        print(format_red("No contacts found."))
 
 
 @error_handler
@@ -90,48 +100,45 @@ def handle_edit_contact(manager: ContactManager) -> None:
     Args:
         manager (ContactManager): An instance of ContactManager to manage contacts.
     """
-    try:
-        name = _prompt_for_non_empty_input(
-            "name", "Enter the name of the contact to edit: "
-        )
-        if not name:
-            return
-
-        contacts = manager.search_by_name(name)
-        if not contacts:
-            print(format_red(f"Contact with the name '{name}' not found."))
-            return
-
-        # Assume we edit the first matching contact for simplicity
-        contact_to_edit = contacts[0]
-
-        new_address = input(
-            "Enter new address (or press Enter to keep current): "
-        ).strip()
-        new_phone_number = input(
-            "Enter new phone number (or press Enter to keep current): "
-        ).strip()
-        new_email = input(
-            "Enter new email (or press Enter to keep current): "
-        ).strip()
-        new_birthday = input(
-            "Enter new birthday (DD.MM.YYYY) (or press Enter to keep current): "
-        ).strip()
-
-        if new_address:
-            contact_to_edit.address = new_address
-        if new_phone_number:
-            contact_to_edit.phone_number = new_phone_number
-        if new_email:
-            contact_to_edit.email = new_email
-        if new_birthday:
-            contact_to_edit.birthday = new_birthday
-
-        # Update the contact
-        manager.edit_contact(name, contact_to_edit)
-
-    except Exception as ex:
-        print(format_red(f"An error occurred while editing the contact: {ex}"))
+    name = _prompt_for_non_empty_input(
+        "name", "Enter the name of the contact to edit: "
+    )
+
+    contacts = manager.search_by_name(name)
+    if not contacts:
+        raise ValidationError(format_red(f"Contact with the name '{name}' not found."))
+
+    # Assume we edit the first matching contact for simplicity
+    contact_to_edit = contacts[0]
+
+    new_address = ask(
+        "address",
+        "Enter new address (or press Enter to keep current): "
+    ).strip()
+    new_phone_number = ask(
+        "phone_number",
+        "Enter new phone number (or press Enter to keep current): "
+    ).strip()
+    new_email = ask(
+        "email",
+        "Enter new email (or press Enter to keep current): "
+    ).strip()
+    new_birthday = ask(
+        "birthday",
+        "Enter new birthday (DD.MM.YYYY) (or press Enter to keep current): "
+    ).strip()
+
+    # Build the updated contact separately, so invalid input leaves the stored one untouched
+    updated_contact = Contact(
+        name=contact_to_edit.name,
+        address=new_address or contact_to_edit.address,
+        phone_number=new_phone_number or contact_to_edit.phone_number,
+        email=new_email or contact_to_edit.email,
+        birthday=new_birthday or contact_to_edit.birthday,
+    )
+
+    # Update the contact
+    manager.edit_contact(contact_to_edit.name, updated_contact)
 
 
 @error_handler
@@ -146,10 +153,9 @@ def handle_remove_contact(manager: ContactManager) -> None:
     Parameters:
         manager (ContactManager): An instance of ContactManager to manage contacts.
     """
-    name = input("Enter the name of the contact to remove: ").strip()
+    name = ask("name", "Enter the name of the contact to remove: ").strip()
     if not name:
-        print(format_red("Name cannot be empty."))
-        return
+        raise ValidationError(format_red("Name cannot be empty."))
         
     manager.remove_contact(name)
 
@@ -157,7 +163,7 @@ def handle_remove_contact(manager: ContactManager) -> None:
 @error_handler
 def handle_show_all_notes(manager: NoteManager) -> None:
     """
-    Handles the display of all notes from a Note object.
+    Handles the display of all notes from a Note object, one page at a time.
 
     Args:
         note (Note): An instance of the Note class containing the data.
@@ -165,13 +171,22 @@ def handle_show_all_notes(manager: NoteManager) -> None:
     Returns:
         None: Prints A formatted string displaying all notes or a message if no notes are available.
     """
-    all_notes = manager.get_all_notes()
-    if not all_notes:
+    if is_jsonl():
+        # All notes at once; pages are for reading at the prompt
+        write_records(note.to_dict() for note in manager.get_all_notes())
+        return
+
+    page = manager.get_notes_page(limit=PAGE_SIZE)
+    if not page.total:
         print(format_red("No notes available."))
         return
 
-    print(format_green(f"\nFound {len(all_notes)} note(s):"))
-    _print_notes(all_notes)
+    print(format_green(f"\nFound {page.total} note(s):"))
+    while True:
+        _print_notes(page.items)
+        if not page.next_cursor or not _ask_next_page(page):
+            break
+        page = manager.get_notes_page(limit=PAGE_SIZE, cursor=page.next_cursor)
 
 
 @error_handler
@@ -185,26 +200,25 @@ def handle_add_tag(manager: NoteManager) -> None:
     Returns:
         None: Prints messages indicating the result of the operation.
     """
-    title = input("Please, enter the Note title: ").strip().lower()
-    tag = input("Please, enter the tag name: ").strip()
+    title = ask("title", "Please, enter the Note title: ").strip().lower()
+    tag = ask("tag", "Please, enter the tag name: ").strip()
 
     # Validate tag input
     if not tag or not isinstance(tag, str):
-        print(format_red("Invalid tag. Please provide a valid tag string."))
-        return
+        raise ValidationError(format_red("Invalid tag. Please provide a valid tag string."))
 
     if not title:
-        print(format_red("Note title cannot be empty."))
-        return
+        raise ValidationError(format_red("Note title cannot be empty."))
 
     # Search for notes by title
     note_list = manager.search_by_title(title)
     if not note_list:
-        print(format_red("No notes found with the given title."))
-        return
+        raise ValidationError(format_red("No notes found with the given title."))
 
-    for note in note_list:
-        manager.add_tag(note.id, tag)
+    # Tag all matching notes with a single save
+    with manager.transaction():
+        for note in note_list:
+            manager.add_tag(note.id, tag)
 
 
 @error_handler
@@ -218,33 +232,32 @@ def handle_remove_tag(manager: NoteManager) -> None:
     Returns:
         None: Prints messages indicating the result of the operation.
     """
-    note_name = input("Please, enter the Note title for removing: ").strip().lower()
+    note_name = ask("title", "Please, enter the Note title for removing: ").strip().lower()
 
     if not note_name:
-        print(format_red("Note title cannot be empty."))
-        return
+        raise ValidationError(format_red("Note title cannot be empty."))
 
     # Search for notes by title
     note_list = manager.search_by_title(note_name)
     if not note_list:
-        print(format_red("No notes found with the given title."))
-        return
+        raise ValidationError(format_red("No notes found with the given title."))
     
-    tag = input("Please, enter the tag name for removing: ").strip()
+    tag = ask("tag", "Please, enter the tag name for removing: ").strip()
 
     # Validate inputs
     if not tag or not isinstance(tag, str):
-        print(format_red("Invalid tag. Please provide a valid tag string."))
-        return
+        raise ValidationError(format_red("Invalid tag. Please provide a valid tag string."))
 
-    for note in note_list:
-        manager.remove_tag(note.id, tag)
+    # Untag all matching notes with a single save
+    with manager.transaction():
+        for note in note_list:
+            manager.remove_tag(note.id, tag)
 
 
 @error_handler
 def handle_show_all_contacts(manager: ContactManager) -> None:
     """
-    Retrieves and formats all contacts from the ContactManager into a readable string.
+    Retrieves and formats all contacts from the ContactManager into a readable string, one page at a time.
 
     Args:
         manager (ContactManager): An instance of ContactManager that contains the contacts.
@@ -252,14 +265,23 @@ def handle_show_all_contacts(manager: ContactManager) -> None:
     Returns:
         None: Prints A formatted string of all contacts or a message indicating no contacts are available.
     """
-    contacts = manager.get_all_contacts()
+    if is_jsonl():
+        # All contacts at once; pages are for reading at the prompt
+        write_records(contact.to_dict() for contact in manager.get_all_contacts())
+        return
 
-    if not contacts:
+    page = manager.get_contacts_page(limit=PAGE_SIZE)
+
+    if not page.total:
         print(format_red("No contacts available."))
         return
 
-    print(format_green(f"\nFound {len(contacts)} contact(s):"))
-    _print_contacts(contacts)
+    print(format_green(f"\nFound {page.total} contact(s):"))
+    while True:
+        _print_contacts(page.items)
+        if not page.next_cursor or not _ask_next_page(page):
+            break
+        page = manager.get_contacts_page(limit=PAGE_SIZE, cursor=page.next_cursor)
 
 
 @error_handler
@@ -275,20 +297,23 @@ def handle_upcoming_birthdays(manager: ContactManager) -> None:
     """
     while True:
         try:
-            n_day_input = input(
+            n_day_input = ask(
+                "days",
                 "Enter the number of days to check for upcoming birthdays: "
             ).strip()
             n_day = int(n_day_input)
             if n_day <= 0:
-                print(format_red("Number of days must be positive. Please try again."))
+                _retry_or_fail("Number of days must be positive. Please try again.")
                 continue
             break
         except ValueError:
-            print(
-                format_red("Invalid input. Please enter a valid number.")
-            )
+            _retry_or_fail("Invalid input. Please enter a valid number.")
     upcoming_birthdays = manager.get_upcoming_birthdays(n_day)
 
+    if is_jsonl():
+        write_records(upcoming_birthdays)
+        return
+
     if not upcoming_birthdays:
         print(format_red("No upcoming birthdays within the specified period."))
         return
@@ -309,17 +334,18 @@ def handle_add_note(manager: NoteManager) -> None:
         manager (NoteManager): An instance of NoteManager to manage notes.
     """
 
-    title = input("Enter note title (required): ").strip()
-    contact = input("Enter contact name (required): ").strip()
-    content = input("Enter note content (required): ").strip()
-    new_tags_input = input(
+    title = ask("title", "Enter note title (required): ").strip()
+    contact = ask("contact", "Enter contact name (required): ").strip()
+    content = ask("content", "Enter note content (required): ").strip()
+    new_tags_input = ask(
+        "tags",
         "Enter tags, separated by commas (or press Enter to skip): "
     ).strip()
     new_tags = [tag.strip() for tag in new_tags_input.split(",") if tag.strip()]
 
     # Create a temporary note for validation
     temp_note = Note(
-        id=len(manager.get_all_notes()) + 1,
+        id=manager.next_note_id(),
         title=title,
         contact=contact,
         content=content,
@@ -328,19 +354,16 @@ def handle_add_note(manager: NoteManager) -> None:
 
     # Validate the note before adding it
     if not manager.validate_note(temp_note):
-        print(format_red("Validation failed. Note was not added."))
-        return
+        raise ValidationError(format_red("Validation failed. Note was not added."))
 
     # Check for name uniqueness
-    if any(note.title.lower() == title.lower() for note in manager.get_all_notes()):
-        print(format_red(f"Error: A note with the title '{title}' already exists."))
-        return
+    if manager.find_note_by_title(title):
+        raise ValidationError(format_red(f"Error: A note with the title '{title}' already exists."))
 
     manager.add_note(temp_note)
 
 
-@error_handler
-def _prompt_for_non_empty_input(field_name: str, prompt: str) -> Optional[str]:
+def _prompt_for_non_empty_input(field_name: str, prompt: str) -> str:
     """
     Prompts the user to enter a name and checks if it is non-empty.
 
@@ -348,15 +371,32 @@ def _prompt_for_non_empty_input(field_name: str, prompt: str) -> Optional[str]:
         prompt (str): The prompt message to display to the user.
 
     Returns:
-        Optional[str]: The entered name if it is non-empty, otherwise None.
+        str: The entered name.
+
+    Raises:
+        ValidationError: If the entered value is empty.
     """
-    value = input(prompt).strip()
+    value = ask(field_name, prompt).strip()
     if not value:
-        print(format_red(f"Error: {field_name.capitalize()} cannot be empty."))
-        return None
+        raise ValidationError(format_red(f"Error: {field_name.capitalize()} cannot be empty."))
     return value
 
 
+def _retry_or_fail(message: str) -> None:
+    """
+    Shows why an answer was rejected before asking again, or fails the command when nobody can answer again.
+
+    Args:
+        message (str): Why the answer was rejected.
+
+    Raises:
+        ValidationError: If the command runs with provided arguments.
+    """
+    if not is_interactive():
+        raise ValidationError(format_red(message))
+    print(format_red(message))
+
+
 @error_handler
 def handle_search_notes(manager: NoteManager) -> None:
     """
@@ -370,27 +410,24 @@ def handle_search_notes(manager: NoteManager) -> None:
         manager (NoteManager): An instance of NoteManager to manage notes.
     """
 
-    search_type = input("Search by (title/tag): ").strip().lower()
-    query = input("Enter the search query: ").strip()
+    search_type = ask("by", "Search by (title/tag): ").strip().lower()
+    query = ask("query", "Enter the search query: ").strip()
 
     search_map = {"title": manager.search_by_title, "tag": manager.search_by_tag}
 
     search_method = search_map.get(search_type, "")
 
-    if search_method:
-        try:
-            results = search_method(query)
-            if results:
-                print(format_green(f"Found {len(results)} note(s):"))
-                _print_notes(results)
-            else:
-                print(format_red("No notes found."))
-        except Exception as ex: 
-            print(
-                format_red(f"An error occured during the search: {ex}")
-            )
+    if not search_method:
+        raise ValidationError(format_red("Invalid search type. Please choose 'title' or 'tag'."))
+
+    results = search_method(query)
+    if is_jsonl():
+        write_records(note.to_dict() for note in results)
+    elif results:
+        print(format_green(f"Found {len(results)} note(s):"))
+        _print_notes(results)
     else:
-        print(format_red("Invalid search type. Please choose 'title' or 'tag'."))
+        print(format_red("No notes found."))
 
 
 @error_handler
@@ -407,45 +444,46 @@ def handle_edit_note(manager: NoteManager) -> None:
         manager (note_manager): An instance of Note Manager to manage notes.
 
     """
-    try:
-        # Promprt for the note title and esures it is not empty
-        title = input("Enter the title of the note to edit: ").strip()
-        if not title:
-           print(format_red("Title cannot be empty."))
-           return
-        
-        # Fetch the list of notes matching the title
-        notes_list = manager.search_by_title(title)
-        if not notes_list:
-            print(format_red(f"No notes found with the title '{title}'."))
-            return
+    # Promprt for the note title and esures it is not empty
+    title = ask("title", "Enter the title of the note to edit: ").strip()
+    if not title:
+        raise ValidationError(format_red("Title cannot be empty."))
 
-        # Assume that we want to edit the first matching note
-        note_to_edit = notes_list[0]
-        if not isinstance(note_to_edit, Note):
-            print(format_red("The retrieved object is not a Note instance."))
-            return
+    # Fetch the list of notes matching the title
+    notes_list = manager.search_by_title(title)
+    if not notes_list:
+        raise ValidationError(format_red(f"No notes found with the title '{title}'."))
 
-        new_content = input(
-            "Enter new content (or press Enter to keep current): "
-        ).strip()
-        new_tags_input = input(
-            "Enter new tags, separated by commas (or press Enter to keep current): "
-        ).strip()
-        new_tags = [tag.strip() for tag in new_tags_input.split(",") if tag.strip()]
+    # Assume that we want to edit the first matching note
+    note_to_edit = notes_list[0]
+    if not isinstance(note_to_edit, Note):
+        raise ValidationError(format_red("The retrieved object is not a Note instance."))
 
-        note_to_edit.update_content_and_tag(new_content, new_tags)
+    new_content = ask(
+        "content",
+        "Enter new content (or press Enter to keep current): "
+    ).strip()
+    new_tags_input = ask(
+        "tags",
+        "Enter new tags, separated by commas (or press Enter to keep current): "
+    ).strip()
+    new_tags = [tag.strip() for tag in new_tags_input.split(",") if tag.strip()]
 
-        # validate note before editing
-        if not manager.validate_note(note_to_edit):
-            print(format_red("Note validation failed. Please check details and try again."))
-            return
+    # Build the updated note separately, so a failed validation leaves the stored one untouched
+    updated_note = Note(
+        id=note_to_edit.id,
+        title=note_to_edit.title,
+        contact=note_to_edit.contact,
+        content=new_content or note_to_edit.content,
+        tags=new_tags or note_to_edit.tags,
+    )
 
-        # update note
-        manager.edit_note(note_to_edit.id, note_to_edit)
+    # validate note before editing
+    if not manager.validate_note(updated_note):
+        raise ValidationError(format_red("Note validation failed. Please check details and try again."))
 
-    except Exception as ex:
-        print(format_red(f"An error occurred while editing the note: {ex}"))
+    # update note
+    manager.edit_note(note_to_edit.id, updated_note)
 
 
 @error_handler
@@ -458,10 +496,9 @@ def handle_remove_note(manager: NoteManager) -> None:
     a success message is printed. If note is note found, an error message to be displayed.
 
     """
-    title = input("Enter the title of the note to remove: ").strip()
+    title = ask("title", "Enter the title of the note to remove: ").strip()
     if not title:
-        print(format_red("Title cannot be empty."))
-        return
+        raise ValidationError(format_red("Title cannot be empty."))
 
     manager.remove_note(title)
 
@@ -480,20 +517,414 @@ def handle_sort_notes_by_tags(manager: NoteManager) -> None:
     """
     print("How would you like to sort the notes by tags?")
     sort_order = (
-        input("Enter 'asc' for ascending or 'desc' for descending: ").strip().lower()
+        ask("order", "Enter 'asc' for ascending or 'desc' for descending: ").strip().lower()
     )
 
     if sort_order not in ['asc', 'desc']:
-        print(
-            format_red("Invalid sort order. Please enter 'asc' or 'desc'.")
-        )
-        return
+        raise ValidationError(format_red("Invalid sort order. Please enter 'asc' or 'desc'."))
 
     sorted_notes = manager.sort_by_tags(order=sort_order)
 
+    if is_jsonl():
+        write_records(note.to_dict() for note in sorted_notes)
+        return
+
     _print_sorted_notes(sorted_notes)
 
 
+@error_handler
+def handle_note_history(manager: NoteManager) -> None:
+    """
+    Handles the listing of the revisions of a note.
+
+    Prompts the user for the note title and shows every recorded revision with its time, how it is
+    stored (a full checkpoint or a delta against the revision before) and its stored size.
+
+    Args:
+        manager (NoteManager): An instance of Note Manager to manage notes.
+    """
+    note = _prompt_for_note(manager, "Enter the title of the note: ")
+
+    revisions = manager.get_revisions(note.id)
+
+    if is_jsonl():
+        write_records(revisions)
+        return
+
+    _print_revisions(note, revisions)
+
+
+@error_handler
+def handle_show_revision(manager: NoteManager) -> None:
+    """
+    Handles the display of a note as it was at one of its revisions.
+
+    Args:
+        manager (NoteManager): An instance of Note Manager to manage notes.
+    """
+    note = _prompt_for_note(manager, "Enter the title of the note: ")
+    revision = _prompt_for_revision()
+
+    note_at_revision = manager.get_note_revision(note.id, revision)
+
+    if is_jsonl():
+        write_records([note_at_revision.to_dict()])
+        return
+
+    print(format_green(f"\nNote '{note.title}' at revision {revision}:"))
+    _print_notes([note_at_revision])
+
+
+@error_handler
+def handle_restore_revision(manager: NoteManager) -> None:
+    """
+    Handles restoring the content and tags of a note from one of its revisions.
+
+    The restore is recorded as a new revision, so it can be undone by restoring the revision before it.
+
+    Args:
+        manager (NoteManager): An instance of Note Manager to manage notes.
+    """
+    note = _prompt_for_note(manager, "Enter the title of the note to restore: ")
+    revision = _prompt_for_revision()
+
+    manager.restore_note_revision(note.id, revision)
+
+
+def _prompt_for_note(manager: NoteManager, prompt: str) -> Note:
+    """
+    Prompts for a note title and finds the note with that title, ignoring case.
+
+    Args:
+        manager (NoteManager): An instance of Note Manager to manage notes.
+        prompt (str): The prompt message.
+
+    Returns:
+        Note: The note.
+
+    Raises:
+        ValidationError: If the title is empty or no note has it.
+    """
+    title = ask("title", prompt).strip()
+    if not title:
+        raise ValidationError(format_red("Note title cannot be empty."))
+
+    note = manager.find_note_by_title(title)
+    if not note:
+        raise ValidationError(format_red(f"Note '{title}' not found."))
+    return note
+
+
+def _prompt_for_revision() -> int:
+    """
+    Prompts for a revision number.
+
+    Returns:
+        int: The revision number.
+
+    Raises:
+        ValidationError: If it is not a positive number.
+    """
+    revision = ask("revision", "Enter the revision number: ").strip()
+    if not revision.isdigit() or int(revision) < 1:
+        raise ValidationError(format_red("Invalid revision. Please enter a positive number."))
+    return int(revision)
+
+
+@error_handler
+def handle_find_duplicates(manager: ContactManager) -> None:
+    """
+    Handles the detection and merging of duplicate contacts.
+
+    Prompts the user for an optional match threshold, displays the suggested merges and,
+    if the user confirms, merges all of them with a single save.
+
+    Args:
+        manager (ContactManager): An instance of ContactManager to manage contacts.
+    """
+    threshold_input = ask(
+        "threshold",
+        "Enter the match threshold 0-100 (or press Enter for 85): "
+    ).strip()
+    threshold = float(threshold_input) if threshold_input else 85.0
+    if not 0 <= threshold <= 100:
+        raise ValidationError(format_red("Threshold must be between 0 and 100."))
+
+    suggestions = manager.find_duplicates(threshold)
+    if not suggestions:
+        print(format_green("No duplicate contacts found."))
+        return
+
+    print(format_green(f"Found {len(suggestions)} group(s) of possible duplicates:"))
+    _print_merge_suggestions(suggestions)
+
+    answer = ask("merge", "Merge all suggested duplicates? (y/n): ").strip().lower()
+    if answer == "y":
+        manager.merge_duplicates(suggestions)
+    else:
+        print(format_yellow("No contacts were merged."))
+
+
+def _print_merge_suggestions(suggestions: List[Any]) -> None:
+    """
+    Prints a table of duplicate contact merge suggestions.
+
+    Args:
+        suggestions (List[Any]): List of MergeSuggestion objects.
+    """
+    from prettytable import PrettyTable
+
+    table_suggestions = PrettyTable()
+    table_suggestions.field_names = [
+        format_yellow("Keep"),
+        format_yellow("Merge"),
+        format_yellow("Score"),
+        format_yellow("Reasons")
+    ]
+
+    for suggestion in suggestions:
+        table_suggestions.add_row(
+            [
+                suggestion.primary.name,
+                "\n".join(duplicate.name for duplicate in suggestion.duplicates),
+                f"{suggestion.score:.0f}",
+                ", ".join(suggestion.reasons),
+            ]
+        )
+
+    print(table_suggestions)
+
+
+@error_handler
+def handle_undo(contact_manager: ContactManager, note_manager: NoteManager) -> None:
+    """
+    Handles taking back the last command that changed contacts or notes.
+
+    Args:
+        contact_manager (ContactManager): An instance of ContactManager to manage contacts.
+        note_manager (NoteManager): An instance of Note Manager to manage notes.
+    """
+    description = contact_manager.undo_log.undo()
+    if description is None:
+        print(format_yellow("Nothing to undo."))
+        return
+    print(format_green(f"Undone: {description}."))
+
+
+@error_handler
+def handle_redo(contact_manager: ContactManager, note_manager: NoteManager) -> None:
+    """
+    Handles making the last undone command again.
+
+    Args:
+        contact_manager (ContactManager): An instance of ContactManager to manage contacts.
+        note_manager (NoteManager): An instance of Note Manager to manage notes.
+    """
+    description = contact_manager.undo_log.redo()
+    if description is None:
+        print(format_yellow("Nothing to redo."))
+        return
+    print(format_green(f"Redone: {description}."))
+
+
+@error_handler
+def handle_stats() -> None:
+    """
+    Shows the latency statistics of the operations and optionally exports them to a JSON file.
+
+    Statistics are collected only when the assistant was started with `--stats`.
+    """
+    from metrics import metrics
+
+    if not metrics.enabled:
+        print(format_yellow("Statistics are off. Start the assistant with --stats to collect them."))
+        return
+
+    path = ask("path", "Export to a JSON file (or press Enter to skip): ").strip()
+    statistics = metrics.to_dict()
+    operations = statistics["operations"]
+    if path:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(statistics, file, indent=4)
+        print(format_green(f"Statistics of {len(operations)} operation(s) exported to '{path}'."))
+        return
+
+    if is_jsonl():
+        write_records(operations + statistics["writes"] + statistics["caches"])
+        return
+    if not operations:
+        print(format_yellow("No operations recorded yet."))
+        return
+    _print_stats(operations)
+    if statistics["writes"]:
+        _print_writes(statistics["writes"])
+    if statistics["caches"]:
+        _print_caches(statistics["caches"])
+
+
+def _print_stats(operations: List[Dict[str, Any]]) -> None:
+    """
+    Prints a table of operation statistics.
+
+    Args:
+        operations (List[Dict[str, Any]]): The statistics of each operation, see `metrics.snapshot`.
+    """
+    from prettytable import PrettyTable
+
+    table_stats = PrettyTable()
+    table_stats.field_names = [
+        format_yellow("Operation"),
+        format_yellow("Count"),
+        format_yellow("Total ms"),
+        format_yellow("Mean ms"),
+        format_yellow("p50 ms"),
+        format_yellow("p95 ms"),
+        format_yellow("p99 ms"),
+        format_yellow("Max ms"),
+        format_yellow("Read"),
+        format_yellow("Written"),
+    ]
+    table_stats.align = "r"
+    table_stats.align[format_yellow("Operation")] = "l"
+
+    for stats in operations:
+        table_stats.add_row(
+            [
+                stats["operation"],
+                stats["count"],
+                f"{stats['total_ms']:.1f}",
+                f"{stats['mean_ms']:.3f}",
+                f"{stats['p50_ms']:.3f}",
+                f"{stats['p95_ms']:.3f}",
+                f"{stats['p99_ms']:.3f}",
+                f"{stats['max_ms']:.3f}",
+                _format_bytes(stats["bytes_read"]),
+                _format_bytes(stats["bytes_written"]),
+            ]
+        )
+
+    print(table_stats)
+
+
+def _print_writes(writes: List[Dict[str, Any]]) -> None:
+    """
+    Prints a table of the write amplification of the data files.
+
+    Args:
+        writes (List[Dict[str, Any]]): The writes of each data file, see `metrics.writes`.
+    """
+    from prettytable import PrettyTable
+
+    table_writes = PrettyTable()
+    table_writes.field_names = [
+        format_yellow("File"),
+        format_yellow("Saves"),
+        format_yellow("Records written"),
+        format_yellow("Records changed"),
+        format_yellow("Records encoded"),
+        format_yellow("Written"),
+        format_yellow("Records per change"),
+        format_yellow("Bytes per change"),
+        format_yellow("Unchanged bytes"),
+    ]
+    table_writes.align = "r"
+    table_writes.align[format_yellow("File")] = "l"
+
+    for file_writes in writes:
+        per_change = file_writes["bytes_per_change"]
+        table_writes.add_row(
+            [
+                file_writes["file"],
+                file_writes["saves"],
+                file_writes["records_written"],
+                file_writes["records_changed"],
+                file_writes["records_encoded"],
+                _format_bytes(file_writes["bytes_written"]),
+                "-" if file_writes["records_per_change"] is None else file_writes["records_per_change"],
+                "-" if per_change is None else _format_bytes(per_change),
+                f"{file_writes['unchanged_bytes_pct']:.1f}%",
+            ]
+        )
+
+    print(format_green("Data file writes:"))
+    print(table_writes)
+
+
+def _print_caches(caches: List[Dict[str, Any]]) -> None:
+    """
+    Prints a table of the search result caches of the managers.
+
+    Args:
+        caches (List[Dict[str, Any]]): The counters of each cache, see `metrics.caches`.
+    """
+    from prettytable import PrettyTable
+
+    table_caches = PrettyTable()
+    table_caches.field_names = [
+        format_yellow("Cache"),
+        format_yellow("Hits"),
+        format_yellow("Misses"),
+        format_yellow("Hit ratio"),
+        format_yellow("Stale"),
+        format_yellow("Evictions"),
+        format_yellow("Too large"),
+        format_yellow("Entries"),
+        format_yellow("Memory"),
+    ]
+    table_caches.align = "r"
+    table_caches.align[format_yellow("Cache")] = "l"
+
+    for cache in caches:
+        table_caches.add_row(
+            [
+                cache["cache"],
+                cache["hits"],
+                cache["misses"],
+                "-" if cache["hit_ratio"] is None else f"{cache['hit_ratio']:.1%}",
+                cache["stale"],
+                cache["evictions"],
+                cache["uncached"],
+                f"{cache['entries']} / {cache['max_entries']}",
+                f"{_format_bytes(cache['bytes'])} / {_format_bytes(cache['max_bytes'])}",
+            ]
+        )
+
+    print(format_green("Search result caches:"))
+    print(table_caches)
+
+
+def _format_bytes(size: int) -> str:
+    """
+    Formats a byte count for people, e.g. '1.5 MB'.
+    """
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _ask_next_page(page: Any) -> bool:
+    """
+    Shows the page position and asks whether to display the next page.
+    Without a user at the prompt every page is displayed.
+
+    Args:
+        page (Any): The page that was just displayed.
+
+    Returns:
+        bool: True if the user wants to see the next page.
+    """
+    if not is_interactive():
+        return True
+
+    answer = ask(
+        "page",
+        f"Page {page.number} of {page.pages}. Press Enter for the next page or 'q' to stop: "
+    ).strip().lower()
+    return answer != "q"
+
+
 def _print_sorted_notes(sorted_notes: List[Any]) -> None:
     """
     Prints a table of sorted notes by tags.
@@ -501,6 +932,8 @@ def _print_sorted_notes(sorted_notes: List[Any]) -> None:
     Args:
         sorted_notes (List[Any]): List of notes sorted by tags.
     """
+    from prettytable import PrettyTable
+
     table_sorted_notes = PrettyTable()
     table_sorted_notes.field_names = [
         format_yellow("Title"),
@@ -520,6 +953,33 @@ def _print_sorted_notes(sorted_notes: List[Any]) -> None:
     print(table_sorted_notes)
 
 
+def _print_revisions(note: Any, revisions: List[Dict[str, Any]]) -> None:
+    """
+    Prints a table of the revisions of a note.
+
+    Args:
+        note (Any): The note.
+        revisions (List[Dict[str, Any]]): The revisions, as returned by `NoteManager.get_revisions`.
+    """
+    from prettytable import PrettyTable
+
+    table_revisions = PrettyTable()
+    table_revisions.field_names = [
+        format_yellow("Revision"),
+        format_yellow("Updated At"),
+        format_yellow("Stored As"),
+        format_yellow("Size"),
+    ]
+
+    for revision in revisions:
+        table_revisions.add_row(
+            [revision["revision"], revision["at"], revision["kind"], _format_bytes(revision["stored_bytes"])]
+        )
+
+    print(format_green(f"\nRevisions of the note '{note.title}':"))
+    print(table_revisions)
+
+
 def _print_upcoming_birthdays(upcoming_birthdays: List[Dict[str, str]]) -> None:
     """
     Prints a table of upcoming birthdays.
@@ -527,6 +987,8 @@ def _print_upcoming_birthdays(upcoming_birthdays: List[Dict[str, str]]) -> None:
     Args:
         upcoming_birthdays (List[Dict[str, str]]): List of dictionaries containing birthday details.
     """
+    from prettytable import PrettyTable
+
     table_birthdays = PrettyTable()
     table_birthdays.field_names = [
         format_yellow("Name"),
@@ -547,6 +1009,8 @@ def _print_contacts(contacts: List[Any]) -> None:
     Args:
         contacts (List[Any]): List of contact objects.
     """
+    from prettytable import PrettyTable
+
     table_contacts = PrettyTable()
     table_contacts.field_names = [
         format_yellow("Name"),
@@ -577,6 +1041,8 @@ def _print_notes(notes: List[Any]) -> None:
     Args:
         all_notes (List[Any]): List of all notes.
     """
+    from prettytable import PrettyTable
+
     table_notes = PrettyTable()
     table_notes.field_names = [
         format_yellow("ID"),
@@ -0,0 +1,178 @@
+"""
+Keeps the list of assistant commands in one place.
+
+Every command is registered once with its name, description, the names of the arguments its handler
+asks for and the module path of the handler ('module:function'). The handler module is imported on
+the first invocation of the command, and the resolved handler is reused afterwards, so dispatching a
+command is a single dictionary lookup. `help`, the prompt completer and the suggestions for mistyped
+commands are all generated from the registry.
+"""
+
+import importlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from metrics import metrics
+from profiling import profiler
+from slow_log import slow_log, summarize_arguments
+from utils.prompts import recorded_answers
+from colors import format_red
+
+# Which manager a handler receives as its only argument; BOTH handlers receive both managers
+CONTACTS = "contacts"
+NOTES = "notes"
+BOTH = "both"
+
+
+@dataclass
+class CommandSpec:
+    """
+    The registration of one command.
+
+    Attributes:
+        name (str): The command typed by the user.
+        description (str): The description shown by `help`.
+        handler_path (str): The handler as 'module:function', imported on first invocation.
+        arguments (Tuple[str, ...]): The names of the arguments the handler asks for.
+        manager (Optional[str]): CONTACTS, NOTES or BOTH for handlers that receive managers, None otherwise.
+    """
+
+    name: str
+    description: str
+    handler_path: str
+    arguments: Tuple[str, ...] = ()
+    manager: Optional[str] = None
+    _handler: Optional[Callable[..., Any]] = field(default=None, repr=False, compare=False)
+
+    def load(self) -> Callable[..., Any]:
+        """
+        Returns the handler, importing its module on the first call.
+
+        Returns:
+            Callable[..., Any]: The handler function.
+        """
+        if self._handler is None:
+            module_name, _, function_name = self.handler_path.partition(":")
+            self._handler = getattr(importlib.import_module(module_name), function_name)
+        return self._handler
+
+    def invoke(self, contact_manager: Any, note_manager: Any) -> Any:
+        """
+        Runs the handler with the managers it works on, timed as 'command.<name>' if statistics or
+        the slow-operation log are enabled and profiled if profiling was asked for this command.
+
+        The changes the command makes are recorded as one step of the undo log of the managers, if
+        they have one, so `undo` takes back the whole command.
+
+        Args:
+            contact_manager (ContactManager): The manager for contacts.
+            note_manager (NoteManager): The manager for notes.
+
+        Returns:
+            Any: Whatever the handler returns.
+        """
+        handler = self._handler or self.load()
+        undo_log = getattr(contact_manager, "undo_log", None)
+        if undo_log is not None:
+            with undo_log.step(self.name):
+                return self._profiled_call(handler, contact_manager, note_manager)
+        return self._profiled_call(handler, contact_manager, note_manager)
+
+    def _profiled_call(self, handler: Callable[..., Any], contact_manager: Any, note_manager: Any) -> Any:
+        if profiler.enabled and profiler.wants(self.name):
+            with profiler.profile(self.name):
+                return self._timed_call(handler, contact_manager, note_manager)
+        return self._timed_call(handler, contact_manager, note_manager)
+
+    def _timed_call(self, handler: Callable[..., Any], contact_manager: Any, note_manager: Any) -> Any:
+        if not (metrics.enabled or slow_log.enabled):
+            return self._call(handler, contact_manager, note_manager)
+        operation = f"command.{self.name}"
+        started = time.perf_counter_ns()
+        with recorded_answers() as answers:
+            try:
+                return self._call(handler, contact_manager, note_manager)
+            finally:
+                duration = time.perf_counter_ns() - started
+                metrics.record(operation, duration)
+                if slow_log.enabled:
+                    # The time the user spent typing the arguments is not the command's
+                    size = sum(getattr(manager, "loaded_count", 0) for manager in (contact_manager, note_manager))
+                    slow_log.observe(
+                        operation, duration - answers.waited_ns, size, summarize_arguments(kwargs=answers.values)
+                    )
+
+    def _call(self, handler: Callable[..., Any], contact_manager: Any, note_manager: Any) -> Any:
+        if self.manager == CONTACTS:
+            return handler(contact_manager)
+        if self.manager == NOTES:
+            return handler(note_manager)
+        if self.manager == BOTH:
+            return handler(contact_manager, note_manager)
+        return handler()
+
+
+class CommandRegistry:
+    """
+    The registered commands, in registration order.
+    """
+
+    def __init__(self) -> None:
+        self._commands: Dict[str, CommandSpec] = {}
+
+    def register(
+        self,
+        name: str,
+        description: str,
+        handler_path: str,
+        arguments: Tuple[str, ...] = (),
+        manager: Optional[str] = None,
+    ) -> CommandSpec:
+        """
+        Registers a command without importing its handler.
+
+        Args:
+            name (str): The command typed by the user.
+            description (str): The description shown by `help`.
+            handler_path (str): The handler as 'module:function'.
+            arguments (Tuple[str, ...]): The names of the arguments the handler asks for.
+            manager (Optional[str]): CONTACTS, NOTES or BOTH for handlers that receive managers.
+
+        Returns:
+            CommandSpec: The registration.
+
+        Raises:
+            ValueError: If the command is already registered or the handler path is malformed.
+        """
+        if name in self._commands:
+            raise ValueError(format_red(f"Command '{name}' is already registered."))
+        if ":" not in handler_path:
+            raise ValueError(format_red(f"Invalid handler path '{handler_path}'. Expected 'module:function'."))
+
+        spec = CommandSpec(name, description, handler_path, tuple(arguments), manager)
+        self._commands[name] = spec
+        return spec
+
+    def get(self, name: str) -> Optional[CommandSpec]:
+        """
+        Returns the registration of a command, or None if the command is unknown.
+        """
+        return self._commands.get(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._commands
+
+    def __iter__(self) -> Iterator[CommandSpec]:
+        return iter(self._commands.values())
+
+    def names(self) -> List[str]:
+        """
+        Returns the names of all commands, in registration order.
+        """
+        return list(self._commands)
+
+    def descriptions(self) -> Dict[str, str]:
+        """
+        Returns the description of every command, in registration order.
+        """
+        return {spec.name: spec.description for spec in self._commands.values()}
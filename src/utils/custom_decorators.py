@@ -1,5 +1,7 @@
 import logging
-from typing import Callable, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Any, Iterator, List, Optional
 from colors import format_red
 from utils.exceptions import ValidationError
 
@@ -9,6 +11,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Messages of the errors caught by error_handler while collect_errors() is active
+_collected_errors: ContextVar[Optional[List[str]]] = ContextVar("collected_errors", default=None)
+
+
+@contextmanager
+def collect_errors() -> Iterator[List[str]]:
+    """
+    Collects the messages of the errors that error_handler catches inside the block.
+
+    Yields:
+        List[str]: The list that receives the error messages.
+    """
+    errors: List[str] = []
+    token = _collected_errors.set(errors)
+    try:
+        yield errors
+    finally:
+        _collected_errors.reset(token)
+
+
+def _report_error(message: str) -> None:
+    """
+    Prints an error message and hands it to an active collect_errors() block.
+
+    Args:
+        message (str): The error message.
+    """
+    print(format_red(message))
+    errors = _collected_errors.get()
+    if errors is not None:
+        errors.append(message)
+
 
 def error_handler(func: Callable[..., Any]) -> Callable[..., Any]:
     """
@@ -28,30 +62,30 @@ def error_handler(func: Callable[..., Any]) -> Callable[..., Any]:
         except ValidationError as ex:
             message = f"A ValidationError occurred: {ex}"
             logger.error("ValidationError in function '%s': %s", func.__name__, message)
-            print(format_red(message))
+            _report_error(message)
         except ValueError as ex:
             message = f"A ValueError occurred: {ex}"
             logger.error("ValueError in function '%s': %s", func.__name__, message)
-            print(format_red(message))
+            _report_error(message)
         except IndexError as ex:
             message = f"An IndexError occurred: {ex}"
             logger.error("IndexError in function '%s': %s", func.__name__, message)
-            print(format_red(message))
+            _report_error(message)
         except KeyError as ex:
             message = f"A KeyError occurred: {ex}"
             logger.error("KeyError in function '%s': %s", func.__name__, message)
-            print(format_red(message))
+            _report_error(message)
         except NotImplementedError as nie:
             message = f"A NotImplementedError occurred: {nie}"
             logger.error(
                 "NotImplementedError in function '%s': %s", func.__name__, message
             )
-            print(format_red(message))
+            _report_error(message)
         except Exception as un_err:
             message = f"An unexpected error occurred: {un_err}"
             logger.error(
                 "Unexpected error in function '%s': %s", func.__name__, message
             )
-            print(format_red(message))
+            _report_error(message)
 
     return wrapper
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+The handlers of the commands that start, list and cancel background jobs.
+
+`import` and `export` move contacts or notes between the data files and JSON Lines files (one record
+per line, in the format of the data files). In the asynchronous REPL they run as background jobs, so
+the prompt stays responsive while millions of records are copied.
+"""
+
+import json
+import os
+from typing import Any, Callable, List, Tuple
+from managers import ContactManager, NoteManager
+from jobs import Job, JobCancelled, jobs
+from utils.custom_decorators import error_handler
+from utils.exceptions import ValidationError
+from utils.prompts import ask
+from colors import format_green, format_red, format_yellow
+
+# Records read or written between two progress reports, which are also the points where a job can stop
+CHUNK_SIZE = 5000
+
+
+def _select(
+    contact_manager: ContactManager, note_manager: NoteManager
+) -> Tuple[str, Any, Callable[[], List[Any]], Callable[[List[Any]], int]]:
+    """
+    Asks whether to work on contacts or notes.
+
+    Returns:
+        Tuple: The kind, its manager, the function listing its records and the one adding records.
+
+    Raises:
+        ValidationError: If the answer is neither 'contacts' nor 'notes'.
+    """
+    kind = ask("kind", "Contacts or notes? ").strip().lower()
+    if kind == "contacts":
+        return kind, contact_manager, contact_manager.get_all_contacts, contact_manager.add_contacts
+    if kind == "notes":
+        return kind, note_manager, note_manager.get_all_notes, note_manager.add_notes
+    raise ValidationError(format_red("Please enter 'contacts' or 'notes'."))
+
+
+def _ask_path() -> str:
+    path = ask("path", "Enter the file path: ").strip()
+    if not path:
+        raise ValidationError(format_red("The file path cannot be empty."))
+    return os.path.expanduser(path)
+
+
+@error_handler
+def handle_export(contact_manager: ContactManager, note_manager: NoteManager) -> None:
+    """
+    Starts a job writing all contacts or notes to a JSON Lines file.
+
+    The file appears under its name only when the export is complete; a cancelled export leaves nothing behind.
+
+    Args:
+        contact_manager (ContactManager): The manager for contacts.
+        note_manager (NoteManager): The manager for notes.
+    """
+    kind, manager, get_all, _ = _select(contact_manager, note_manager)
+    path = _ask_path()
+
+    def export_records(job: Job) -> str:
+        records = get_all()
+        partial_path = f"{path}.part"
+        try:
+            with open(partial_path, "w", encoding="utf-8") as file:
+                for start in range(0, len(records), CHUNK_SIZE):
+                    job.advance(start, len(records))
+                    # Records may be changed in place by commands running meanwhile
+                    with manager.lock.read():
+                        lines = [
+                            json.dumps(record.to_dict(), ensure_ascii=False)
+                            for record in records[start:start + CHUNK_SIZE]
+                        ]
+                    file.write("\n".join(lines) + "\n")
+            os.replace(partial_path, path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        return f"{len(records):,} {kind} written to '{path}'."
+
+    jobs.start(f"export {kind}", export_records)
+
+
+@error_handler
+def handle_import(contact_manager: ContactManager, note_manager: NoteManager) -> None:
+    """
+    Starts a job adding the contacts or notes of a JSON Lines file.
+
+    Records whose name (contacts) or title (notes) is already taken, and lines that are not valid
+    records, are skipped. A cancelled import keeps the records added before it stopped.
+
+    Args:
+        contact_manager (ContactManager): The manager for contacts.
+        note_manager (NoteManager): The manager for notes.
+    """
+    kind, manager, _, add_all = _select(contact_manager, note_manager)
+    path = _ask_path()
+    if not os.path.isfile(path):
+        raise ValidationError(format_red(f"File '{path}' does not exist."))
+
+    def import_records(job: Job) -> str:
+        total = os.path.getsize(path)
+        read = added = skipped = 0
+        chunk: List[Any] = []
+
+        def add_chunk() -> None:
+            nonlocal added
+            added += add_all(chunk)
+            chunk.clear()
+            job.advance(read, total)
+
+        # The data file is written once at the end rather than after every chunk; in the REPL the
+        # chunks are added without holding the write lock in between, so commands keep running
+        batch = manager.transaction() if manager.save_scheduler is None else jobs.saves_held(manager)
+        try:
+            with batch, open(path, "rb") as file:
+                for raw_line in file:
+                    read += len(raw_line)
+                    if not raw_line.strip():
+                        continue
+                    try:
+                        chunk.append(manager.storage.create_instance(json.loads(raw_line)))
+                    except (TypeError, ValueError, AttributeError, ValidationError):
+                        skipped += 1
+                    if len(chunk) == CHUNK_SIZE:
+                        add_chunk()
+                add_chunk()
+        except JobCancelled:
+            job.result = f"{added:,} {kind} were added before it stopped."
+            raise
+        message = f"{added:,} {kind} added from '{path}'."
+        if skipped:
+            message += f" {skipped:,} invalid line(s) skipped."
+        return message
+
+    jobs.start(f"import {kind}", import_records)
+
+
+@error_handler
+def handle_jobs() -> None:
+    """
+    Prints the background jobs with their progress or result.
+    """
+    started = jobs.all()
+    if not started:
+        print(format_yellow("No background jobs."))
+        return
+    for job in started:
+        line = job.describe()
+        if job.result:
+            line += f" - {job.result}"
+        print(format_green(line) if job.status == "running" else line)
+
+
+@error_handler
+def handle_cancel() -> None:
+    """
+    Asks for a job id and cancels the job; it stops at its next progress report.
+
+    Raises:
+        ValidationError: If the id is not a number or there is no such job.
+    """
+    value = ask("job", "Enter the job id: ").strip().lstrip("[").rstrip("]")
+    if not value.isdigit() or jobs.get(int(value)) is None:
+        raise ValidationError(format_red(f"There is no job '{value}'."))
+    job = jobs.get(int(value))
+    if job.cancel():
+        print(format_yellow(f"Cancelling job [{job.id}] {job.name}..."))
+    elif not job.cancellable:
+        print(format_red(f"Job [{job.id}] {job.name} cannot be cancelled."))
+    else:
+        print(format_red(f"Job [{job.id}] {job.name} is not running."))
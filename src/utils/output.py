@@ -0,0 +1,149 @@
+"""
+Chooses how the read commands show their results.
+
+By default results are shown as colored tables for people. In the JSON Lines format every result
+record is written as one JSON object per line, straight from the manager results, without building
+tables, colored strings or pages, so the output can be piped into other tools:
+
+    echo all_contacts | python main.py --batch - --output jsonl | jq -r .email
+
+Messages such as 'No contacts found.' are not written in this format; an empty result is no lines.
+
+Servers that handle requests on several threads capture what one request prints with `ThreadOutput`
+instead of `redirect_stdout`, which would also capture or lose what the other threads print meanwhile.
+"""
+
+import io
+import json
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Optional, TextIO
+from colors import format_red
+
+TABLE = "table"
+JSONL = "jsonl"
+FORMATS = (TABLE, JSONL)
+
+# Records encoded before each write to the stream
+WRITE_CHUNK = 1000
+
+_format = TABLE
+# Where records go; None means the current sys.stdout, which batch mode and the daemon capture
+_stream: Optional[TextIO] = None
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def set_output_format(output_format: str, stream: Optional[TextIO] = None) -> None:
+    """
+    Sets the output format of the process.
+
+    Args:
+        output_format (str): TABLE or JSONL.
+        stream (Optional[TextIO]): Where JSON Lines records are written; None for the current sys.stdout.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    global _format, _stream
+    if output_format not in FORMATS:
+        raise ValueError(
+            format_red(f"Unknown output format '{output_format}'. Expected one of: {', '.join(FORMATS)}.")
+        )
+    _format = output_format
+    _stream = stream
+
+
+def is_jsonl() -> bool:
+    """
+    Tells whether results are written as JSON Lines.
+
+    Returns:
+        bool: True in the JSON Lines format.
+    """
+    return _format == JSONL
+
+
+def write_records(records: Iterable[dict]) -> int:
+    """
+    Writes records as JSON Lines, encoding them in chunks as they are produced.
+
+    Args:
+        records (Iterable[dict]): The records, e.g. `contact.to_dict() for contact in contacts`.
+
+    Returns:
+        int: The number of records written.
+    """
+    stream = _stream or sys.stdout
+    lines = []
+    count = 0
+    for record in records:
+        lines.append(_encode(record))
+        if len(lines) == WRITE_CHUNK:
+            stream.write("\n".join(lines) + "\n")
+            count += len(lines)
+            lines.clear()
+    if lines:
+        stream.write("\n".join(lines) + "\n")
+        count += len(lines)
+    stream.flush()
+    return count
+
+
+class ThreadOutput:
+    """
+    Stands in for sys.stdout: what a thread prints inside `capture()` goes to a buffer of that thread,
+    everything else to the original stream.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        """
+        Initializes the stand-in with no thread capturing.
+
+        Args:
+            stream (TextIO): The original stream, e.g. sys.stdout.
+        """
+        self.stream = stream
+        self._local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self) -> None:
+        if getattr(self._local, "buffer", None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        # encoding, isatty, fileno and the like come from the original stream
+        return getattr(self.stream, name)
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        """
+        Captures what the current thread prints inside the block.
+
+        Yields:
+            io.StringIO: The captured text.
+        """
+        previous = getattr(self._local, "buffer", None)
+        buffer = io.StringIO()
+        self._local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = previous
+
+
+def thread_output() -> ThreadOutput:
+    """
+    Installs a `ThreadOutput` as sys.stdout, once, and returns it.
+
+    Call it before starting the threads that capture their output.
+
+    Returns:
+        ThreadOutput: The installed stand-in.
+    """
+    if not isinstance(sys.stdout, ThreadOutput):
+        sys.stdout = ThreadOutput(sys.stdout)
+    return sys.stdout
@@ -0,0 +1,122 @@
+"""
+Reads the arguments of command handlers.
+
+In the interactive REPL every argument is typed by the user at a prompt. When commands are run from a
+script, their arguments are provided up front by name and the handlers read them without prompting.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+from colors import format_red
+from utils.exceptions import ValidationError
+
+# The arguments of the command being run non-interactively; None in the interactive REPL
+_provided_arguments: ContextVar[Optional[Dict[str, str]]] = ContextVar(
+    "provided_arguments", default=None
+)
+
+
+@dataclass
+class Answers:
+    """
+    The arguments a command read, recorded for the slow-operation log.
+
+    Attributes:
+        values (Dict[str, str]): Argument name -> the value read.
+        waited_ns (int): The time spent waiting for the user at the prompts, in nanoseconds.
+    """
+
+    values: Dict[str, str] = field(default_factory=dict)
+    waited_ns: int = 0
+
+
+# Receives every argument read while recorded_answers() is active
+_recorded_answers: ContextVar[Optional[Answers]] = ContextVar("recorded_answers", default=None)
+
+
+def ask(field_name: str, prompt: str) -> str:
+    """
+    Reads one argument of a command.
+
+    Interactively the user is prompted. Non-interactively the provided value is returned; an empty value
+    (e.g. `address=""`) is the answer handlers treat as 'skip' or 'keep current'.
+
+    Args:
+        field_name (str): The name of the argument.
+        prompt (str): The prompt shown to the user in interactive mode.
+
+    Returns:
+        str: The argument value.
+
+    Raises:
+        ValidationError: Non-interactively, if the argument was not provided, or if a handler asks for the
+                         same argument twice, which happens when the provided value was rejected and the
+                         handler would otherwise ask again forever.
+    """
+    arguments = _provided_arguments.get()
+    answers = _recorded_answers.get()
+    if arguments is None:
+        started = time.perf_counter_ns()
+        value = input(prompt)
+        if answers is not None:
+            answers.waited_ns += time.perf_counter_ns() - started
+    else:
+        if field_name not in arguments:
+            raise ValidationError(format_red(f"Missing argument '{field_name}'."))
+        if arguments[field_name] is None:
+            raise ValidationError(format_red(f"Invalid value for argument '{field_name}'."))
+        value = arguments[field_name]
+        arguments[field_name] = None
+
+    if answers is not None:
+        answers.values[field_name] = value
+    return value
+
+
+def is_interactive() -> bool:
+    """
+    Tells whether a user is answering the prompts.
+
+    Returns:
+        bool: False while commands run with provided arguments.
+    """
+    return _provided_arguments.get() is None
+
+
+@contextmanager
+def recorded_answers() -> Iterator[Answers]:
+    """
+    Records the arguments read with `ask` inside the block, and how long the user took to type them.
+
+    Yields:
+        Answers: Filled in as the arguments are read.
+    """
+    answers = Answers()
+    token = _recorded_answers.set(answers)
+    try:
+        yield answers
+    finally:
+        _recorded_answers.reset(token)
+
+
+@contextmanager
+def provided_arguments(arguments: Dict[str, Any]) -> Iterator[None]:
+    """
+    Runs the body with the given arguments instead of interactive prompts.
+
+    Args:
+        arguments (Dict[str, Any]): Argument name -> value; values are converted to strings.
+
+    Yields:
+        None: The body of the `with` block reads its arguments with `ask`.
+    """
+    token = _provided_arguments.set(
+        {name: "" if value is None else str(value) for name, value in arguments.items()}
+    )
+    try:
+        yield
+    finally:
+        _provided_arguments.reset(token)
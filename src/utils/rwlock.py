@@ -0,0 +1,166 @@
+"""
+A reader-writer lock for sharing the managers between threads.
+
+Any number of threads may read at the same time, while a writer has exclusive access. Waiting writers
+take precedence over newly arriving readers, so a steady stream of searches cannot starve a change.
+The lock is reentrant: a thread may take the read or write lock again while holding it, and a writer
+may also read. A reader cannot upgrade to writing, since two upgrading readers would wait for each
+other forever.
+"""
+
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, TypeVar
+from colors import format_red
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Guard:
+    """
+    A reusable context manager that calls an acquire and a release function.
+    """
+
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire: Callable[[], None], release: Callable[[], None]) -> None:
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self) -> None:
+        self._acquire()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._release()
+
+
+class ReadWriteLock:
+    """
+    A reentrant, writer-preferring reader-writer lock.
+
+    Usage:
+        with lock.read():
+            ...  # shared access
+        with lock.write():
+            ...  # exclusive access
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        # Thread id -> how many times the thread holds the read lock
+        self._readers: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._read_guard = _Guard(self.acquire_read, self.release_read)
+        self._write_guard = _Guard(self.acquire_write, self.release_write)
+
+    def read(self) -> _Guard:
+        """
+        Returns a context manager holding the read lock.
+        """
+        return self._read_guard
+
+    def write(self) -> _Guard:
+        """
+        Returns a context manager holding the write lock.
+        """
+        return self._write_guard
+
+    def acquire_read(self) -> None:
+        """
+        Waits until no writer holds or waits for the lock, then takes a shared hold.
+
+        A thread that already holds the lock, for reading or writing, gets it again without waiting.
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers[me] = 1
+
+    def release_read(self) -> None:
+        """
+        Releases one shared hold of the calling thread.
+
+        Raises:
+            RuntimeError: If the thread does not hold the read lock.
+        """
+        me = threading.get_ident()
+        with self._condition:
+            depth = self._readers.get(me)
+            if not depth:
+                raise RuntimeError(format_red("Cannot release a read lock that is not held."))
+            if depth > 1:
+                self._readers[me] = depth - 1
+                return
+            del self._readers[me]
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Waits until no other thread holds the lock, then takes the exclusive hold.
+
+        Raises:
+            RuntimeError: If the thread holds only the read lock.
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError(format_red("Cannot upgrade a read lock to a write lock."))
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        """
+        Releases one exclusive hold of the calling thread.
+
+        Raises:
+            RuntimeError: If the thread does not hold the write lock.
+        """
+        with self._condition:
+            if self._writer != threading.get_ident():
+                raise RuntimeError(format_red("Cannot release a write lock that is not held."))
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+
+def read_locked(method: F) -> F:
+    """
+    Runs a method of an object with a `lock` attribute under the read lock.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def write_locked(method: F) -> F:
+    """
+    Runs a method of an object with a `lock` attribute under the write lock.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write():
+            return method(self, *args, **kwargs)
+
+    return wrapper
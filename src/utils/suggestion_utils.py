@@ -1,13 +1,30 @@
-from fuzzywuzzy import process
-from prompt_toolkit.completion import WordCompleter
-from constants import COMMANDS
+from typing import Optional
+from commands import registry
 from colors import format_purple, format_red
 
-# Initialize a WordCompleter instance for autocompletion of commands
-completer = WordCompleter(COMMANDS, ignore_case=True)
+# The WordCompleter for autocompletion of commands, created on first use
+_completer = None
 
 
-def get_closest_command(user_input: str, similarity: int) -> str:
+def get_completer():
+    """
+    Returns the autocompletion of commands for the interactive prompt.
+
+    prompt_toolkit is imported here rather than at module level, so batch runs and other
+    non-interactive uses of the package do not pay for it.
+
+    Returns:
+        WordCompleter: The completer of the command names.
+    """
+    global _completer
+    if _completer is None:
+        from prompt_toolkit.completion import WordCompleter
+
+        _completer = WordCompleter(registry.names(), ignore_case=True)
+    return _completer
+
+
+def get_closest_command(user_input: str, similarity: int) -> Optional[str]:
     """
     Finds the closest matching command from the list of valid commands.
 
@@ -18,7 +35,10 @@ def get_closest_command(user_input: str, similarity: int) -> str:
     Returns:
         str: The closest matching command or None if no match is found.
     """
-    suggestion, score = process.extractOne(user_input, COMMANDS)
+    # fuzzywuzzy is only needed for mistyped commands, so it is not imported at startup
+    from fuzzywuzzy import process
+
+    suggestion, score = process.extractOne(user_input, registry.names())
     if score > similarity:
         return suggestion
     return None
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The application modules are imported as top-level packages, the way `src/main.py` runs them
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+@pytest.fixture
+def restore_manager_methods():
+    """Puts back the manager methods that statistics or the slow-operation log replace on the classes."""
+    from managers import ContactManager, NoteManager
+
+    saved = {cls: dict(vars(cls)) for cls in (ContactManager, NoteManager)}
+    yield
+    for cls, attributes in saved.items():
+        for name, value in attributes.items():
+            if vars(cls).get(name) is not value:
+                setattr(cls, name, value)
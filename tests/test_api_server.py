@@ -0,0 +1,42 @@
+import io
+import json
+import threading
+
+from api_server import AssistantApi
+from managers import ContactManager, NoteManager
+from storage import ContactStorage, NoteStorage
+from utils.output import ThreadOutput
+
+
+def test_capture_only_takes_what_its_own_thread_prints():
+    stream = io.StringIO()
+    output = ThreadOutput(stream)
+    inside, other_done = threading.Event(), threading.Event()
+
+    def other_thread():
+        inside.wait()
+        output.write("from another request\n")
+        other_done.set()
+
+    worker = threading.Thread(target=other_thread)
+    worker.start()
+    with output.capture() as captured:
+        output.write("from this request\n")
+        inside.set()
+        other_done.wait()
+    worker.join()
+
+    assert captured.getvalue() == "from this request\n"
+    assert stream.getvalue() == "from another request\n"
+
+
+def test_a_change_returns_the_messages_it_printed(tmp_path):
+    api = AssistantApi(
+        ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json")),
+        NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json")),
+    )
+    body = {"name": "Ivan Petrenko", "phone_number": "0501234567", "email": "ivan@example.com", "birthday": "01.02.1990"}
+    status, payload = api.handle("POST", "/contacts", json.dumps(body).encode("utf-8"))
+
+    assert status == 201
+    assert payload["messages"] == ["Contact 'Ivan Petrenko' successfully added."]
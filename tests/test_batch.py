@@ -0,0 +1,71 @@
+import pytest
+
+from batch import run_batch, run_command
+from managers import ContactManager, NoteManager
+from storage import ContactStorage, NoteStorage
+from utils.exceptions import ValidationError
+
+
+@pytest.fixture
+def managers(tmp_path):
+    contact_manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    note_manager = NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+    return contact_manager, note_manager
+
+
+def test_a_command_with_all_its_arguments_succeeds(managers):
+    arguments = {
+        "name": "Ivan Petrenko", "address": "", "phone_number": "0501234567",
+        "email": "ivan@example.com", "birthday": "01.02.1990",
+    }
+    status, output, error = run_command("add_contact", arguments, *managers)
+
+    assert (status, error) == ("ok", None)
+    assert "successfully added" in output
+
+
+def test_a_missing_argument_fails_the_command(managers):
+    status, _, error = run_command("search_contact", {"query": "ivan"}, *managers)
+
+    assert status == "error"
+    assert "Missing argument 'by'" in error
+
+
+def test_a_rejected_argument_fails_the_command(managers):
+    status, _, error = run_command("edit_note", {"title": "", "content": "", "tags": ""}, *managers)
+
+    assert status == "error"
+    assert "Title cannot be empty." in error
+
+
+def test_an_invalid_choice_fails_the_command(managers):
+    status, _, error = run_command("search_contact", {"by": "age", "query": "30"}, *managers)
+
+    assert status == "error"
+    assert "Invalid search type" in error
+
+
+def test_a_command_failing_partway_leaves_no_partial_changes(managers, monkeypatch, tmp_path):
+    contact_manager, note_manager = managers
+    add_tag = NoteManager.add_tag
+    calls = []
+
+    def failing_add_tag(self, note_id, tag):
+        calls.append(note_id)
+        if len(calls) == 3:
+            raise ValidationError("The third tag fails.")
+        add_tag(self, note_id, tag)
+
+    monkeypatch.setattr(NoteManager, "add_tag", failing_add_tag)
+    script = [
+        f'add_note title="Trip {n}" contact="Ivan Petrenko" content="About the trip" tags=""' for n in range(4)
+    ] + ['add_tag title="trip" tag="work"']
+
+    results = run_batch(script, contact_manager, note_manager)
+
+    assert [result.status for result in results] == ["ok"] * 4 + ["error"]
+    assert len(calls) == 3
+    assert all("work" not in note.tags for note in note_manager.notes)
+    saved = NoteStorage(file_path=tmp_path / "note_data.json").load_data()
+    assert len(saved) == 4
+    assert all("work" not in note.tags for note in saved)
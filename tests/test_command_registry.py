@@ -0,0 +1,90 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from commands import registry
+from utils.command_registry import BOTH, CONTACTS, NOTES, CommandRegistry
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+HANDLER_MODULE = """
+calls = []
+
+
+def contacts_only(contact_manager):
+    calls.append(("contacts", contact_manager))
+
+
+def notes_only(note_manager):
+    calls.append(("notes", note_manager))
+
+
+def both(contact_manager, note_manager):
+    calls.append(("both", contact_manager, note_manager))
+
+
+def no_managers():
+    calls.append(("none",))
+"""
+
+
+@pytest.fixture
+def handlers(tmp_path, monkeypatch):
+    """A handler module that is not imported yet."""
+    (tmp_path / "registry_test_handlers.py").write_text(HANDLER_MODULE, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "registry_test_handlers"
+    sys.modules.pop("registry_test_handlers", None)
+
+
+def test_importing_the_registry_imports_no_handler_module():
+    code = "import sys, commands; print(sorted(m for m in ('utils.command_handlers', 'utils.job_handlers') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_a_handler_is_imported_on_first_invocation_and_reused(handlers):
+    commands = CommandRegistry()
+    spec = commands.register("contacts_only", "", f"{handlers}:contacts_only", manager=CONTACTS)
+    assert handlers not in sys.modules
+
+    spec.invoke("contact manager", "note manager")
+    module = sys.modules[handlers]
+    handler = spec._handler
+    spec.invoke("contact manager", "note manager")
+
+    assert sys.modules[handlers] is module and spec._handler is handler
+    assert module.calls == [("contacts", "contact manager")] * 2
+
+
+def test_handlers_receive_the_managers_they_registered_for(handlers):
+    commands = CommandRegistry()
+    commands.register("notes_only", "", f"{handlers}:notes_only", manager=NOTES)
+    commands.register("both", "", f"{handlers}:both", manager=BOTH)
+    commands.register("no_managers", "", f"{handlers}:no_managers")
+
+    for spec in commands:
+        spec.invoke("contact manager", "note manager")
+
+    assert sys.modules[handlers].calls == [
+        ("notes", "note manager"), ("both", "contact manager", "note manager"), ("none",)
+    ]
+    assert commands.names() == ["notes_only", "both", "no_managers"]
+
+
+def test_duplicate_names_and_malformed_paths_are_refused():
+    commands = CommandRegistry()
+    commands.register("help", "Show available commands", "launcher:show_help")
+
+    with pytest.raises(ValueError, match="already registered"):
+        commands.register("help", "Show help again", "launcher:show_help")
+    with pytest.raises(ValueError, match="Invalid handler path"):
+        commands.register("exit", "Exit", "launcher.exit_program")
+
+
+def test_every_registered_handler_resolves():
+    for spec in registry:
+        assert callable(spec.load()), spec.name
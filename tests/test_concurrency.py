@@ -0,0 +1,73 @@
+import threading
+
+from benchmarks.concurrency_stress import StressRun
+from benchmarks.memory_benchmark import _contact_rows, _note_rows
+from managers import ContactManager, NoteManager
+from storage import ContactStorage, NoteStorage
+from utils.rwlock import ReadWriteLock
+
+
+def test_readers_share_the_lock():
+    lock = ReadWriteLock()
+    both_reading = threading.Barrier(2, timeout=2)
+
+    def read():
+        with lock.read():
+            both_reading.wait()
+
+    threads = [threading.Thread(target=read) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not both_reading.broken
+
+
+def test_readers_never_see_a_half_written_pair():
+    lock = ReadWriteLock()
+    pair = [0, 0]
+    torn = []
+    stop = threading.Event()
+
+    def write():
+        for value in range(1, 2000):
+            with lock.write():
+                pair[0] = value
+                # Lets the other threads run in the middle of the change
+                stop.wait(0)
+                pair[1] = value
+
+    def read():
+        while not stop.is_set():
+            with lock.read():
+                first, second = pair
+            if first != second:
+                torn.append((first, second))
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    writers = [threading.Thread(target=write) for _ in range(2)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+    assert torn == []
+
+
+def test_manager_readers_never_see_a_half_applied_transaction(tmp_path):
+    records = 300
+    contacts_path = tmp_path / "contacts_data.json"
+    notes_path = tmp_path / "note_data.json"
+    contacts_path.write_text(_contact_rows(records), encoding="utf-8")
+    notes_path.write_text(_note_rows(records), encoding="utf-8")
+    contact_manager = ContactManager(ContactStorage(contacts_path))
+    note_manager = NoteManager(NoteStorage(notes_path))
+
+    run = StressRun(contact_manager, note_manager, records, write_interval=0)
+    run.run(readers=4, writers=2, seconds=0.5)
+
+    assert run.writes > 0 and run.reads > 0
+    assert run.violations == []
+    assert len(ContactStorage(contacts_path).load_data()) == records
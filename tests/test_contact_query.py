@@ -0,0 +1,129 @@
+import re
+import shlex
+
+import pytest
+
+from managers import ContactManager
+from managers.contact_query import VERIFY_DIRECTLY_BELOW, ContactQueryEngine, parse_query
+from models import Contact
+from storage import ContactStorage
+
+FIRST_NAMES = ["Ivan", "Olena", "Petro", "Iryna", "Taras", "Oksana"]
+CITIES = ["Kyiv, Main street", "Lviv, Market square", "Odesa, Sea avenue", "Kharkiv, Main street"]
+DOMAINS = ["gmail.com", "ukr.net", "example.com"]
+
+
+def _contacts(count: int = 300):
+    contacts = []
+    for i in range(count):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        # Both phone formats, so the exact phone index has to normalize them
+        phone = f"+38050{i:07d}" if i % 2 else f"050{i:07d}"
+        contacts.append(
+            Contact(
+                name=f"{first} Surname{i}",
+                address=CITIES[i % len(CITIES)],
+                phone_number=phone,
+                email=f"{first.lower()}.{i}@{DOMAINS[i % len(DOMAINS)]}",
+                birthday=f"{i % 28 + 1:02d}.{i % 12 + 1:02d}.{1960 + i % 40}",
+            )
+        )
+    return contacts
+
+
+def _holds(contact: Contact, term: str) -> bool:
+    """The meaning of one predicate, written independently of the engine."""
+    split_at = min(position for position in (term.find(":"), term.find("~")) if position > 0)
+    field, operator, value = term[:split_at], term[split_at], term[split_at + 1:]
+    if field.startswith("birthday_"):
+        start, end = {"birthday_day": (0, 2), "birthday_month": (3, 5), "birthday_year": (6, 10)}[field]
+        return int(contact.birthday[start:end]) == int(value)
+    if field == "phone" and operator == ":":
+        return re.sub(r"\D", "", contact.phone_number)[-9:] == re.sub(r"\D", "", value)[-9:]
+    if field == "email" and operator == ":" and value.startswith("@"):
+        return contact.email.lower().split("@")[1] == value[1:].lower()
+    actual = {
+        "name": contact.name, "address": contact.address, "phone": contact.phone_number,
+        "email": contact.email, "birthday": contact.birthday,
+    }[field].casefold()
+    value = value.casefold()
+    return actual == value if operator == ":" else value in actual
+
+
+def _brute_force(contacts, query: str):
+    return [contact for contact in contacts if all(_holds(contact, term) for term in shlex.split(query))]
+
+
+QUERIES = [
+    "name~ivan",
+    "name:\"IVAN SURNAME6\"",
+    "address~\"main street\" email:@gmail.com",
+    "name~olena address~lviv birthday_month:02",
+    "email:@UKR.NET name~surname1",
+    "phone:+380500000042",
+    "phone:0500000043",
+    "phone~00001",
+    "birthday_day:07",
+    "birthday_month:011 birthday_year:1974",
+    "birthday:01.01.1960",
+    "birthday~.1970",
+    "name~sur address~odesa email~taras",
+    # The name step leaves a single candidate, so the exact email step is skipped and must be verified
+    "name:\"Petro Surname2\" email:@example.com",
+    "name:\"Petro Surname2\" email:@gmail.com",
+    "name~ab",
+    "name~nobody",
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_execute_matches_a_brute_force_filter(query):
+    contacts = _contacts()
+    engine = ContactQueryEngine()
+
+    found = engine.execute(contacts, 0, parse_query(query))
+
+    assert [contact.name for contact in found] == [contact.name for contact in _brute_force(contacts, query)]
+
+
+def test_a_skipped_exact_step_is_still_verified():
+    contacts = _contacts()
+    engine = ContactQueryEngine()
+    predicates = parse_query("name:\"Petro Surname2\" email:@gmail.com")
+
+    plan = engine.plan(contacts, 0, predicates)
+    assert plan.steps[0].estimate < VERIFY_DIRECTLY_BELOW
+    assert [step.index for step in plan.steps] == ["name.exact", "email_domain.exact"]
+    # Petro Surname2 has an example.com address
+    assert engine.execute(contacts, 0, predicates) == []
+
+
+@pytest.fixture
+def contact_manager(tmp_path):
+    manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    for contact in _contacts(60):
+        manager.add_contact(contact)
+    return manager
+
+
+def test_indexes_follow_added_edited_and_removed_contacts(contact_manager):
+    query = "address~lviv email:@ukr.net"
+    assert [c.name for c in contact_manager.query(query)] == [c.name for c in _brute_force(contact_manager.contacts, query)]
+
+    contact_manager.add_contact(
+        Contact(name="Mykola Lviv", address="Lviv, New street", phone_number="0509999999",
+                email="mykola@ukr.net", birthday="02.03.1980")
+    )
+    assert "Mykola Lviv" in [contact.name for contact in contact_manager.query(query)]
+
+    first = contact_manager.query(query)[0]
+    edited = Contact(name=first.name, address="Kyiv, Main street", phone_number=first.phone_number,
+                     email=first.email, birthday=first.birthday)
+    contact_manager.edit_contact(first.name, edited)
+    assert first.name not in [contact.name for contact in contact_manager.query(query)]
+    assert [contact.name for contact in contact_manager.query("phone:" + first.phone_number)] == [first.name]
+
+    contact_manager.remove_contact("Mykola Lviv")
+    found = contact_manager.query(query)
+    assert "Mykola Lviv" not in [contact.name for contact in found]
+    assert [c.name for c in found] == [c.name for c in _brute_force(contact_manager.contacts, query)]
@@ -0,0 +1,61 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from client import send_requests
+from daemon import AssistantDaemon, CommandRequestHandler
+from managers import ContactManager, NoteManager
+from storage import ContactStorage, NoteStorage
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    assert CommandRequestHandler.timeout is not None
+    monkeypatch.setattr(CommandRequestHandler, "timeout", 0.2)
+    contact_manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    note_manager = NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+    server = AssistantDaemon(str(tmp_path / "assistant.sock"), contact_manager, note_manager)
+
+    def serve():
+        while not server.stop_requested:
+            server.handle_request()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield server
+    server.stop_requested = True
+    thread.join(timeout=5)
+    server.server_close()
+
+
+def test_a_stalled_client_does_not_block_the_others(daemon, capsys):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+        stalled.connect(daemon.server_address)
+        # A request line that never ends
+        stalled.sendall(b"search_contact by=name")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(5)
+            client.connect(daemon.server_address)
+            client.sendall(b"exit\n")
+            response = json.loads(client.makefile("rb").readline())
+
+        assert response["status"] == "ok"
+        # The stalled connection was closed by the daemon
+        assert stalled.recv(1) == b""
+    # Without a traceback of the timeout
+    assert capsys.readouterr().err == ""
+
+
+def test_the_client_reports_a_connection_closed_while_idle(daemon, capsys):
+    def slow_lines():
+        yield "search_contact by=name query=ivan"
+        # Longer than the idle timeout of the daemon
+        time.sleep(0.5)
+        yield "search_contact by=name query=petro"
+
+    assert send_requests(daemon.server_address, slow_lines()) == 2
+    assert "closed the connection (idle timeout)" in capsys.readouterr().err
@@ -0,0 +1,109 @@
+import random
+import string
+
+import pytest
+
+from managers import ContactManager
+from managers.duplicate_finder import DuplicateFinder, normalize_email, normalize_name, normalize_phone
+from models import Contact
+from storage import ContactStorage
+
+FIRST_NAMES = ["Ivan", "Olena", "Taras", "Iryna", "Mykola", "Oksana", "Andrii", "Sofiia"]
+
+
+def _people(count: int):
+    """Distinct people: no two share a phone or an email, and their surnames are random letters."""
+    rng = random.Random(5)
+    surnames = ["Petrenko", "Shevchenko", "Bondarenko"]
+    while len(surnames) < count:
+        surnames.append("".join(rng.choice(string.ascii_lowercase) for _ in range(9)).capitalize())
+    return [
+        Contact(
+            name=f"{FIRST_NAMES[n % 8]} {surnames[n]}",
+            address="",
+            phone_number=f"050{n:07d}",
+            email=f"person{n}@example.com",
+            birthday="01.02.1990",
+        )
+        for n in range(count)
+    ]
+
+
+def _copy(contact: Contact, **changes) -> Contact:
+    fields = dict(contact.to_dict(), **changes)
+    return Contact(**{name: fields[name] for name in ("name", "address", "phone_number", "email", "birthday")})
+
+
+@pytest.mark.parametrize("value, normalize, expected", [
+    ("+38 (050) 123-45-67", normalize_phone, "501234567"),
+    ("0501234567", normalize_phone, "501234567"),
+    ("Ivan.Petrenko+work@Gmail.com", normalize_email, "ivan.petrenko@gmail.com"),
+    ("Petrenko  IVAN", normalize_name, "ivan petrenko"),
+])
+def test_normalized_keys(value, normalize, expected):
+    assert normalize(value) == expected
+
+
+def test_planted_duplicates_are_grouped_and_distinct_people_are_not():
+    people = _people(200)
+    ivan, olena, taras = people[0], people[1], people[2]
+    contacts = people + [
+        # The same phone in the other format, with the name tokens swapped
+        _copy(ivan, name="Petrenko Ivan", phone_number="+380500000000", email="ivan@ukr.net", address="Kyiv"),
+        # The same email with a '+suffix' and another phone
+        _copy(olena, phone_number="0679999999", email="person1+home@EXAMPLE.com"),
+        # Only a misspelled name: no shared phone or email
+        _copy(taras, name="Taras Bondarenkko", phone_number="0671111111", email="taras@ukr.net"),
+    ]
+
+    suggestions = DuplicateFinder().find_duplicates(contacts)
+
+    groups = sorted(sorted(c.phone_number for c in [s.primary, *s.duplicates]) for s in suggestions)
+    assert groups == sorted([
+        sorted([ivan.phone_number, "+380500000000"]),
+        sorted([olena.phone_number, "0679999999"]),
+        sorted([taras.phone_number, "0671111111"]),
+    ])
+    reasons = {suggestion.primary.name: suggestion.reasons for suggestion in suggestions}
+    assert "same phone" in reasons["Petrenko Ivan"]
+    assert "same email" in reasons["Olena Shevchenko"]
+    # Duplicates that share a phone or an email are stronger matches than a similar name alone
+    assert suggestions[-1].primary.name.startswith("Taras")
+
+
+def test_only_contacts_that_share_a_block_are_compared():
+    contacts = _people(2000)
+    finder = DuplicateFinder()
+    names = [normalize_name(contact.name) for contact in contacts]
+    phones = [normalize_phone(contact.phone_number) for contact in contacts]
+    emails = [normalize_email(contact.email) for contact in contacts]
+
+    pairs = list(finder._candidate_pairs(names, phones, emails))
+
+    assert len(pairs) == len(set(pairs))
+    # The first name blocks are too large to compare and the random surnames share few prefixes
+    assert len(pairs) < len(contacts) * (len(contacts) - 1) // 2 // 100
+
+
+def test_merging_keeps_the_most_complete_contact(tmp_path):
+    path = tmp_path / "contacts_data.json"
+    manager = ContactManager(storage=ContactStorage(file_path=path))
+    people = _people(5)
+    for contact in people:
+        manager.add_contact(contact)
+    manager.add_contact(_copy(people[0], name="Petrenko Ivan", address="Kyiv", email="ivan@ukr.net"))
+    manager.add_contact(_copy(people[0], name="Ivan Petrenko Jr", email="ivan@gmail.com"))
+
+    suggestions = manager.find_duplicates()
+    assert len(suggestions) == 1
+    assert suggestions[0].primary.address == "Kyiv"
+
+    assert manager.merge_duplicates(suggestions) == 2
+
+    saved = ContactStorage(file_path=path).load_data()
+    assert len(saved) == 5
+    merged = [contact for contact in saved if contact.phone_number == people[0].phone_number]
+    assert [(contact.name, contact.address, contact.email) for contact in merged] == [
+        ("Petrenko Ivan", "Kyiv", "ivan@ukr.net")
+    ]
+    assert manager.find_duplicates() == []
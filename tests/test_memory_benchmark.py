@@ -0,0 +1,21 @@
+import json
+
+from benchmarks.baseline_models import BaselineContact, BaselineNote
+from benchmarks.memory_benchmark import _contact_rows, _note_rows, measure_bytes_per_record
+from models import Contact, Note
+
+
+def test_slotted_models_keep_no_instance_dict():
+    contact = Contact(**json.loads(_contact_rows(1))[0])
+    note = Note(**json.loads(_note_rows(1))[0])
+
+    assert not hasattr(contact, "__dict__")
+    assert not hasattr(note, "__dict__")
+
+
+def test_loaded_slotted_models_are_smaller_than_the_baseline_models():
+    contacts = _contact_rows(2000)
+    notes = _note_rows(2000)
+
+    assert measure_bytes_per_record(contacts, Contact) < measure_bytes_per_record(contacts, BaselineContact)
+    assert measure_bytes_per_record(notes, Note) < measure_bytes_per_record(notes, BaselineNote)
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from commands import registry
+from launcher import enable_statistics
+from managers import ContactManager, NoteManager
+from metrics import Histogram, metrics
+from models import Contact
+from storage import ContactStorage, NoteStorage
+from utils.prompts import provided_arguments
+
+
+@pytest.fixture
+def managers(tmp_path):
+    contact_manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    note_manager = NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+    for name in ("Ivan Petrenko", "Olena Shevchenko"):
+        contact_manager.add_contact(
+            Contact(name=name, address="Kyiv", phone_number="0501234567", email="ivan@example.com", birthday="01.02.1990")
+        )
+    return contact_manager, note_manager
+
+
+@pytest.fixture
+def statistics(monkeypatch, restore_manager_methods):
+    """What `--stats` turns on, undone after the test."""
+    monkeypatch.setattr(metrics, "enabled", False)
+    enable_statistics()
+    metrics.reset()
+
+
+def _invoke(command, managers, **arguments):
+    with provided_arguments(arguments):
+        registry.get(command).invoke(*managers)
+
+
+def _counts():
+    return {stats["operation"]: stats["count"] for stats in metrics.snapshot()}
+
+
+def test_every_run_of_a_command_adds_to_its_counters(managers, statistics):
+    for runs in (1, 2, 3):
+        _invoke("search_contact", managers, by="name", query="ivan")
+
+        counts = _counts()
+        assert counts["command.search_contact"] == runs
+        assert counts["contacts.search_by_name"] == runs
+
+    stats = {stats["operation"]: stats for stats in metrics.snapshot()}["command.search_contact"]
+    assert 0 < stats["p50_ms"] <= stats["max_ms"] <= stats["total_ms"]
+
+
+def test_nothing_is_recorded_without_stats(managers, monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+    metrics.reset()
+
+    _invoke("search_contact", managers, by="name", query="ivan")
+
+    assert metrics.snapshot() == []
+
+
+def test_the_stats_command_exports_what_was_recorded(tmp_path, managers, statistics):
+    _invoke("all_contacts", managers)
+    path = tmp_path / "stats.json"
+
+    _invoke("stats", managers, path=str(path))
+
+    exported = json.loads(path.read_text(encoding="utf-8"))
+    assert exported["enabled"] is True
+    assert {stats["operation"]: stats["count"] for stats in exported["operations"]}["command.all_contacts"] == 1
+
+
+def test_histogram_percentiles_stay_within_one_bucket():
+    histogram = Histogram()
+    for value in range(1, 10001):
+        histogram.record(value * 1000)
+
+    for percent in (50, 95, 99):
+        exact = percent * 100 * 1000
+        assert abs(histogram.percentile(percent) - exact) <= exact / 8
@@ -0,0 +1,179 @@
+import json
+import random
+
+import pytest
+
+from batch import run_command
+from managers import ContactManager, NoteManager
+from models import Note, NoteHistory
+from models.note_history import CHECKPOINT, DELTA, MAX_CHAIN, apply_delta, line_delta
+from storage import ContactStorage, NoteHistoryStorage, NoteStorage
+from utils.output import JSONL, TABLE, set_output_format
+
+WORDS = ["milk", "bread", "call Olena", "pay rent", "book tickets", "fix the bike", "", "water the plants"]
+
+
+def _edits(count: int, seed: int = 7):
+    """A series of note texts, each an edit of the one before: lines inserted, removed, changed and moved."""
+    rng = random.Random(seed)
+    lines = [f"{word}\n" for word in WORDS]
+    texts = []
+    for _ in range(count):
+        action = rng.choice(["insert", "remove", "change", "move", "rewrite"])
+        position = rng.randrange(len(lines) + 1)
+        if action == "insert" or not lines:
+            lines.insert(position, f"{rng.choice(WORDS)} {rng.randrange(1000)}\n")
+        elif action == "remove":
+            del lines[position % len(lines)]
+        elif action == "change":
+            lines[position % len(lines)] = f"{rng.choice(WORDS)} again\n"
+        elif action == "move":
+            lines.append(lines.pop(position % len(lines)))
+        else:
+            lines = [f"{rng.choice(WORDS)} {n}\n" for n in range(rng.randrange(1, 30))]
+        text = "".join(lines)
+        # Some texts end without a newline, so the last line is copied without one
+        texts.append(text.rstrip("\n") if rng.random() < 0.2 else text)
+    return texts
+
+
+@pytest.mark.parametrize("old, new", [
+    ("", "one\ntwo"),
+    ("one\ntwo\nthree\n", "one\nthree\n"),
+    ("one\ntwo", "one\ntwo\n"),
+    ("one\r\ntwo\r\n", "zero\r\none\r\ntwo\r\n"),
+    ("a\nb\nc\n", ""),
+])
+def test_apply_delta_rebuilds_the_new_text(old, new):
+    assert apply_delta(old, line_delta(old, new)) == new
+
+
+def test_every_revision_is_rebuilt_as_it_was_saved():
+    history = NoteHistory(1)
+    saved = []
+    for n, content in enumerate(_edits(150)):
+        tags = [WORDS[n % 4]] if n % 3 else []
+        if history.append(content, tags, f"2026-01-01T00:00:{n % 60:02d}") is not None:
+            saved.append((content, tags))
+
+    assert len(history) == len(saved)
+    kinds = {revision["kind"] for revision in history.revisions}
+    assert kinds == {CHECKPOINT, DELTA}
+
+    # A history read back from the file has no cached last state and rebuilds every revision from the data
+    for revisions in (history, NoteHistory(1, json.loads(json.dumps(history.to_dict()))["revisions"])):
+        assert [revisions.state(number) for number in range(1, len(saved) + 1)] == saved
+
+
+def test_a_rebuild_applies_at_most_max_chain_deltas():
+    history = NoteHistory(1)
+    # Small edits of a long note that compresses badly, so only the chain length forces checkpoints
+    rng = random.Random(3)
+    text = "".join(f"{rng.getrandbits(64):016x}\n" for _ in range(200))
+    for n in range(3 * MAX_CHAIN):
+        history.append(text + f"edit {n}\n", [], "2026-01-01T00:00:00")
+
+    chain = 0
+    for revision in history.revisions:
+        chain = 0 if revision["kind"] == CHECKPOINT else chain + 1
+        assert chain <= MAX_CHAIN
+    assert [revision["kind"] for revision in history.revisions].count(CHECKPOINT) == 3
+
+
+def test_an_unchanged_state_records_no_revision():
+    history = NoteHistory(1)
+
+    assert history.append("Text", ["home"], "2026-01-01T00:00:00") == 1
+    assert history.append("Text", ["home"], "2026-01-01T00:00:01") is None
+    assert history.append("Text", ["work"], "2026-01-01T00:00:02") == 2
+
+
+@pytest.fixture
+def note_manager(tmp_path):
+    def create():
+        return NoteManager(
+            storage=NoteStorage(file_path=tmp_path / "note_data.json"),
+            history_storage=NoteHistoryStorage(file_path=tmp_path / "note_history.json"),
+        )
+    return create
+
+
+def _edit(manager: NoteManager, content: str, tags) -> None:
+    manager.edit_note(1, Note(id=1, title="Shopping", contact="", content=content, tags=list(tags)))
+
+
+def test_the_manager_rebuilds_every_saved_revision_after_a_reload(note_manager):
+    manager = note_manager()
+    manager.add_note(Note(id=1, title="Shopping", contact="", content="milk\n", tags=["home"]))
+    saved = [("milk\n", ["home"])]
+    # An edit with empty content keeps the content, so the series leaves those out
+    for n, content in enumerate(filter(None, _edits(40, seed=11))):
+        tags = ["home", f"week {n // 10}"]
+        _edit(manager, content, tags)
+        # An edit that changes nothing records no revision
+        if (content, tags) != saved[-1]:
+            saved.append((content, tags))
+
+    for reloaded in (manager, note_manager()):
+        revisions = reloaded.get_revisions(1)
+        assert [revision["revision"] for revision in revisions] == list(range(1, len(saved) + 1))
+        rebuilt = [reloaded.get_note_revision(1, number) for number in range(1, len(saved) + 1)]
+        assert [(note.content, note.tags) for note in rebuilt] == saved
+
+
+def test_a_restore_is_recorded_as_a_new_revision(note_manager):
+    manager = note_manager()
+    manager.add_note(Note(id=1, title="Shopping", contact="", content="milk\n", tags=["home"]))
+    _edit(manager, "milk\nbread\n", ["home"])
+    _edit(manager, "bread\n", ["work"])
+
+    manager.restore_note_revision(1, 2)
+
+    note = manager.get_note_by_id(1)
+    assert (note.content, note.tags) == ("milk\nbread\n", ["home"])
+    assert len(manager.get_revisions(1)) == 4
+    assert manager.get_note_revision(1, 3).content == "bread\n"
+
+
+def test_a_rolled_back_edit_leaves_no_revisions(note_manager):
+    manager = note_manager()
+    manager.add_note(Note(id=1, title="Shopping", contact="", content="milk\n", tags=["home"]))
+    _edit(manager, "milk\nbread\n", ["home"])
+
+    with pytest.raises(RuntimeError):
+        with manager.transaction():
+            _edit(manager, "eggs\n", ["home"])
+            raise RuntimeError("Abort")
+
+    assert len(manager.get_revisions(1)) == 2
+    assert len(note_manager().get_revisions(1)) == 2
+
+
+@pytest.fixture
+def jsonl():
+    set_output_format(JSONL)
+    yield
+    set_output_format(TABLE)
+
+
+def test_the_revision_commands_show_the_saved_revisions(tmp_path, note_manager, jsonl):
+    managers = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json")), note_manager()
+    managers[1].add_note(Note(id=1, title="Shopping", contact="Olena", content="milk", tags=["home"]))
+    saved = [("milk", ["home"])]
+    for content in ("milk\nbread", "bread", "bread\neggs"):
+        status, _, error = run_command("edit_note", {"title": "Shopping", "content": content, "tags": "home"}, *managers)
+        assert (status, error) == ("ok", None)
+        saved.append((content, ["home"]))
+
+    status, output, _ = run_command("note_history", {"title": "Shopping"}, *managers)
+    assert status == "ok"
+    assert [json.loads(line)["revision"] for line in output.splitlines()] == [1, 2, 3, 4]
+
+    for number, (content, tags) in enumerate(saved, start=1):
+        status, output, _ = run_command("show_revision", {"title": "Shopping", "revision": str(number)}, *managers)
+        assert status == "ok"
+        shown = json.loads(output)
+        assert (shown["content"], shown["tags"]) == (content, tags)
+
+    status, _, error = run_command("show_revision", {"title": "Shopping", "revision": "5"}, *managers)
+    assert status == "error" and "no revision 5" in error
@@ -0,0 +1,21 @@
+import pytest
+
+from managers import NoteManager
+from models import Note
+from storage import NoteStorage
+
+
+@pytest.fixture
+def note_manager(tmp_path):
+    return NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+
+
+def test_note_has_tag_follows_tag_changes(note_manager):
+    note_manager.add_note(Note(id=1, title="Call Ivan", contact="Ivan Petrenko", content="About the trip"))
+
+    note_manager.add_tag(1, "work")
+    assert note_manager.note_has_tag(1, "work")
+
+    note_manager.remove_tag(1, "work")
+    assert not note_manager.note_has_tag(1, "work")
+    assert not note_manager.note_has_tag(2, "work")
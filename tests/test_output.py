@@ -0,0 +1,106 @@
+import io
+import json
+import threading
+
+import pytest
+
+from batch import run_command
+from managers import ContactManager, NoteManager
+from models import Contact, Note
+from storage import ContactStorage, NoteStorage
+from utils import output
+from utils.output import JSONL, TABLE, ThreadOutput, set_output_format, write_records
+
+
+@pytest.fixture
+def managers(tmp_path):
+    contact_manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    note_manager = NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+    for n, name in enumerate(["Ivan Petrenko", "Olena Shevchenko", "Ivan Bondarenko"]):
+        contact_manager.add_contact(
+            Contact(name=name, address="Kyiv", phone_number=f"050123456{n}", email=f"person{n}@example.com",
+                    birthday="01.02.1990")
+        )
+    note_manager.add_note(Note(id=1, title="Shopping", contact="Ivan Petrenko", content="Milk", tags=["home"]))
+    return contact_manager, note_manager
+
+
+@pytest.fixture
+def jsonl():
+    set_output_format(JSONL)
+    yield
+    set_output_format(TABLE)
+
+
+def _records(text: str):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_listings_write_one_record_per_line(managers, jsonl):
+    contact_manager, note_manager = managers
+
+    _, contacts, _ = run_command("all_contacts", {}, *managers)
+    _, notes, _ = run_command("all_notes", {}, *managers)
+
+    assert _records(contacts) == [contact.to_dict() for contact in contact_manager.contacts]
+    assert _records(notes) == [note.to_dict() for note in note_manager.notes]
+
+
+def test_searches_write_only_the_matching_records(managers, jsonl):
+    _, found, _ = run_command("search_contact", {"by": "name", "query": "ivan"}, *managers)
+    _, none_found, _ = run_command("search_contact", {"by": "name", "query": "nobody"}, *managers)
+
+    assert [record["name"] for record in _records(found)] == ["Ivan Petrenko", "Ivan Bondarenko"]
+    # No 'No contacts found.' message: an empty result is no lines
+    assert none_found == ""
+
+
+def test_the_table_format_is_unchanged(managers):
+    _, printed, _ = run_command("search_contact", {"by": "name", "query": "ivan"}, *managers)
+
+    assert "Ivan Petrenko" in printed
+    with pytest.raises(json.JSONDecodeError):
+        _records(printed)
+
+
+def test_records_are_written_in_chunks(monkeypatch):
+    monkeypatch.setattr(output, "WRITE_CHUNK", 3)
+    stream = io.StringIO()
+    writes = []
+    monkeypatch.setattr(stream, "write", lambda text: writes.append(text) or len(text))
+    monkeypatch.setattr(output, "_stream", stream)
+
+    assert write_records({"n": n, "name": "Ołena"} for n in range(7)) == 7
+
+    assert [len(text.splitlines()) for text in writes] == [3, 3, 1]
+    assert [json.loads(line)["n"] for line in "".join(writes).splitlines()] == list(range(7))
+    assert "Ołena" in writes[0]
+
+
+def test_an_unknown_format_is_refused():
+    with pytest.raises(ValueError, match="xml"):
+        set_output_format("xml")
+
+
+def test_thread_output_captures_each_thread_separately():
+    stream = io.StringIO()
+    thread_output = ThreadOutput(stream)
+    captured = {}
+    barrier = threading.Barrier(2)
+
+    def run(name):
+        with thread_output.capture() as buffer:
+            barrier.wait()
+            thread_output.write(f"{name}\n")
+            barrier.wait()
+        captured[name] = buffer.getvalue()
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("first", "second")]
+    for thread in threads:
+        thread.start()
+    thread_output.write("main\n")
+    for thread in threads:
+        thread.join()
+
+    assert captured == {"first": "first\n", "second": "second\n"}
+    assert stream.getvalue() == "main\n"
@@ -0,0 +1,91 @@
+import pytest
+
+from managers import ContactManager, NoteManager
+from managers.pagination import paginate
+from models import Contact, Note
+from storage import ContactStorage, NoteStorage
+
+
+def _contact(n: int) -> Contact:
+    return Contact(
+        name=f"Contact {n:02d}", address="", phone_number=f"050{n:07d}",
+        email=f"contact{n}@example.com", birthday="01.02.1990",
+    )
+
+
+@pytest.fixture
+def contact_manager(tmp_path):
+    manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    for n in range(25):
+        manager.add_contact(_contact(n))
+    return manager
+
+
+def _names(page):
+    return [contact.name for contact in page.items]
+
+
+def test_pages_by_offset_and_cursor_agree(contact_manager):
+    by_offset = [_names(contact_manager.get_contacts_page(limit=10, offset=offset)) for offset in (0, 10, 20)]
+
+    by_cursor = []
+    page = contact_manager.get_contacts_page(limit=10)
+    by_cursor.append(_names(page))
+    while page.next_cursor:
+        page = contact_manager.get_contacts_page(limit=10, cursor=page.next_cursor)
+        by_cursor.append(_names(page))
+
+    assert by_cursor == by_offset
+    assert page.pages == 3 and page.number == 3
+
+
+def test_a_cursor_survives_deletes_and_inserts_between_pages(contact_manager):
+    first = contact_manager.get_contacts_page(limit=10)
+    # Records before the cursor go away and a new one is appended
+    contact_manager.remove_contact("Contact 02")
+    contact_manager.remove_contact("Contact 05")
+    contact_manager.add_contact(_contact(25))
+
+    second = contact_manager.get_contacts_page(limit=10, cursor=first.next_cursor)
+    third = contact_manager.get_contacts_page(limit=10, cursor=second.next_cursor)
+
+    assert _names(second) == [f"Contact {n:02d}" for n in range(10, 20)]
+    assert _names(third) == [f"Contact {n:02d}" for n in range(20, 26)]
+    assert third.next_cursor is None
+
+
+def test_removing_the_last_shown_record_skips_nothing(contact_manager):
+    first = contact_manager.get_contacts_page(limit=10)
+    contact_manager.remove_contact("Contact 09")
+
+    second = contact_manager.get_contacts_page(limit=10, cursor=first.next_cursor)
+
+    assert _names(second)[0] == "Contact 10"
+
+
+def test_an_insert_before_the_cursor_is_neither_shown_nor_shifts_the_page():
+    records = list(range(30))
+    first = paginate(records, lambda record: record, 10)
+    # An undone removal puts a record back in front of the cursor
+    records.insert(3, 100)
+
+    second = paginate(records, lambda record: record, 10, cursor=first.next_cursor)
+
+    assert first.items + second.items == list(range(20))
+
+
+def test_note_pages_visit_every_note_once_while_notes_change(tmp_path):
+    manager = NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+    for n in range(1, 24):
+        manager.add_note(Note(id=n, title=f"Note {n}", contact="", content="Text"))
+
+    seen = []
+    page = manager.get_notes_page(limit=5)
+    seen += [note.id for note in page.items]
+    while page.next_cursor:
+        # Every round removes a note already shown
+        manager.remove_note(f"Note {seen[len(seen) // 2]}")
+        page = manager.get_notes_page(limit=5, cursor=page.next_cursor)
+        seen += [note.id for note in page.items]
+
+    assert seen == list(range(1, 24))
@@ -0,0 +1,67 @@
+import io
+import pstats
+
+import pytest
+
+from commands import registry
+from launcher import enable_profiling
+from managers import ContactManager, NoteManager
+from profiling import profiler
+from storage import ContactStorage, NoteStorage
+from utils.prompts import provided_arguments
+
+
+@pytest.fixture
+def managers(tmp_path):
+    contact_manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    note_manager = NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+    return contact_manager, note_manager
+
+
+@pytest.fixture
+def report():
+    """What the profiler prints, with profiling turned off again after the test."""
+    stream = io.StringIO()
+    profiler.stream = stream
+    yield stream
+    profiler.configure()
+    profiler.stream = None
+    profiler._kept.clear()
+
+
+def _invoke(command, managers, **arguments):
+    with provided_arguments(arguments):
+        registry.get(command).invoke(*managers)
+
+
+def test_only_the_chosen_commands_are_profiled(tmp_path, managers, report):
+    directory = tmp_path / "profiles"
+    enable_profiling(["all_contacts"], directory=str(directory))
+
+    _invoke("all_notes", managers)
+    assert not directory.exists()
+
+    _invoke("all_contacts", managers)
+    stats_files = list(directory.glob("*-all_contacts.prof"))
+    assert len(stats_files) == 1
+    assert len(list(directory.glob("*-all_contacts.tracemalloc"))) == 1
+    assert "handle_show_all_contacts" in "".join(str(key) for key in pstats.Stats(str(stats_files[0])).stats)
+    assert "Profile of 'all_contacts'" in report.getvalue()
+
+
+def test_slowest_mode_keeps_the_files_of_the_slowest_runs_only(tmp_path, managers, report):
+    directory = tmp_path / "profiles"
+    enable_profiling([], slowest=2, directory=str(directory), trace_memory=False)
+
+    for command in ("all_contacts", "all_notes", "all_contacts", "all_notes"):
+        _invoke(command, managers)
+
+    assert len(list(directory.glob("*.prof"))) == 2
+    assert list(directory.glob("*.tracemalloc")) == []
+    profiler.report()
+    assert report.getvalue().count("Profile of") == 2
+
+
+def test_an_unknown_command_is_refused(report):
+    with pytest.raises(ValueError, match="search_everything"):
+        enable_profiling(["search_everything"])
@@ -0,0 +1,139 @@
+import pytest
+
+from managers import ContactManager
+from managers.result_cache import ResultCache, normalize_text
+from models import Contact
+from storage import ContactStorage
+
+
+class Computations:
+    """Counts how often a result had to be computed."""
+
+    def __init__(self, result=("a", "b")):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.result)
+
+
+def test_a_result_is_reused_until_the_generation_changes():
+    cache = ResultCache("test")
+    compute = Computations()
+
+    assert cache.get_or_compute("key", 0, compute) == ["a", "b"]
+    assert cache.get_or_compute("key", 0, compute) == ["a", "b"]
+    assert compute.calls == 1
+
+    compute.result = ("c",)
+    assert cache.get_or_compute("key", 1, compute) == ["c"]
+    assert compute.calls == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"], stats["entries"]) == (1, 2, 1, 1)
+
+
+def test_the_caller_gets_its_own_list():
+    cache = ResultCache("test")
+    cache.get_or_compute("key", 0, Computations()).append("changed")
+
+    assert cache.get_or_compute("key", 0, Computations()) == ["a", "b"]
+
+
+def test_the_least_recently_used_entries_are_evicted():
+    cache = ResultCache("test", max_entries=2)
+    for key in ("first", "second"):
+        cache.get_or_compute(key, 0, Computations())
+    # 'first' is used again, so 'second' is the least recently used
+    cache.get_or_compute("first", 0, Computations())
+    cache.get_or_compute("third", 0, Computations())
+
+    compute = Computations()
+    cache.get_or_compute("first", 0, compute)
+    cache.get_or_compute("second", 0, compute)
+    assert compute.calls == 1
+    assert cache.stats()["evictions"] == 2
+
+
+def test_the_memory_budget_is_kept_and_huge_results_are_not_cached():
+    cache = ResultCache("test", max_bytes=20_000)
+    for key in range(20):
+        cache.get_or_compute(key, 0, Computations(result=tuple(range(100))))
+    assert cache.stats()["bytes"] <= 20_000
+    assert cache.stats()["evictions"] > 0
+
+    compute = Computations(result=tuple(range(2000)))
+    cache.get_or_compute("huge", 0, compute)
+    cache.get_or_compute("huge", 0, compute)
+    assert compute.calls == 2
+    assert cache.stats()["uncached"] == 2
+
+
+def test_failures_are_not_cached_and_a_disabled_cache_always_computes():
+    cache = ResultCache("test")
+
+    def fail():
+        raise RuntimeError("the search fails")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("key", 0, fail)
+    assert cache.get_or_compute("key", 0, Computations()) == ["a", "b"]
+
+    disabled = ResultCache("test", max_entries=0)
+    compute = Computations()
+    disabled.get_or_compute("key", 0, compute)
+    disabled.get_or_compute("key", 0, compute)
+    assert compute.calls == 2
+
+
+def test_only_ascii_search_text_is_lowercased():
+    assert normalize_text("IVAN") == "ivan"
+    assert normalize_text("ІВАН") == "ІВАН"
+
+
+def _contact(name: str, address: str = "Kyiv") -> Contact:
+    return Contact(name=name, address=address, phone_number="0501234567", email="ivan@example.com", birthday="01.02.1990")
+
+
+@pytest.fixture
+def contact_manager(tmp_path):
+    manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    for name in ("Ivan Petrenko", "Olena Shevchenko", "Ivan Bondarenko"):
+        manager.add_contact(_contact(name))
+    return manager
+
+
+def _names(contacts):
+    return [contact.name for contact in contacts]
+
+
+def test_searches_follow_every_change_of_the_contacts(contact_manager):
+    assert _names(contact_manager.search_by_name("ivan")) == ["Ivan Petrenko", "Ivan Bondarenko"]
+    assert _names(contact_manager.search_by_name("IVAN")) == ["Ivan Petrenko", "Ivan Bondarenko"]
+    assert contact_manager.result_cache.stats()["hits"] == 1
+
+    contact_manager.add_contact(_contact("Ivanna Melnyk"))
+    assert "Ivanna Melnyk" in _names(contact_manager.search_by_name("ivan"))
+
+    contact_manager.edit_contact("Ivan Petrenko", _contact("Petro Petrenko"))
+    assert "Ivan Petrenko" not in _names(contact_manager.search_by_name("ivan"))
+
+    contact_manager.remove_contact("Ivan Bondarenko")
+    assert _names(contact_manager.search_by_name("ivan")) == ["Ivanna Melnyk"]
+
+    with pytest.raises(RuntimeError):
+        with contact_manager.transaction():
+            contact_manager.remove_contact("Ivanna Melnyk")
+            assert _names(contact_manager.search_by_name("ivan")) == []
+            raise RuntimeError("the transaction fails")
+    assert _names(contact_manager.search_by_name("ivan")) == ["Ivanna Melnyk"]
+
+
+def test_searches_see_the_changes_another_process_saved(tmp_path, contact_manager):
+    assert _names(contact_manager.search_by_name("taras")) == []
+    other = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    other.add_contact(_contact("Taras Melnyk"))
+
+    contact_manager.refresh()
+
+    assert _names(contact_manager.search_by_name("taras")) == ["Taras Melnyk"]
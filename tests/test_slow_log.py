@@ -0,0 +1,88 @@
+import pytest
+
+from commands import registry
+from launcher import enable_slow_log
+from managers import ContactManager, NoteManager
+from models import Contact
+from slow_log import parse_thresholds, slow_log
+from storage import ContactStorage, NoteStorage
+from utils.prompts import provided_arguments
+
+# Long enough that nothing in a test reaches it
+NEVER_MS = 60_000
+
+
+@pytest.fixture
+def managers(tmp_path):
+    contact_manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    note_manager = NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+    for name in ("Ivan Petrenko", "Olena Shevchenko"):
+        contact_manager.add_contact(
+            Contact(name=name, address="Kyiv", phone_number="0501234567", email="ivan@example.com", birthday="01.02.1990")
+        )
+    return contact_manager, note_manager
+
+
+@pytest.fixture
+def log_path(tmp_path, restore_manager_methods):
+    """The file of the slow-operation log, closed after the test."""
+    yield tmp_path / "logs" / "slow.log"
+    slow_log.close()
+
+
+def _invoke(command, managers, **arguments):
+    with provided_arguments(arguments):
+        registry.get(command).invoke(*managers)
+
+
+def _entries(path):
+    # Closing the log writes the records still on the queue
+    slow_log.close()
+    return path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+
+
+def test_a_command_above_its_threshold_is_logged_with_its_arguments(managers, log_path):
+    enable_slow_log(str(log_path), NEVER_MS, ["command.search_contact=0"])
+
+    _invoke("search_contact", managers, by="name", query="ivan")
+
+    entries = _entries(log_path)
+    assert len(entries) == 1
+    assert "operation=command.search_contact " in entries[0]
+    assert "size=2 " in entries[0]
+    assert "args={'by': 'name', 'query': 'ivan'}" in entries[0]
+
+
+def test_operations_below_their_threshold_are_not_logged(managers, log_path):
+    enable_slow_log(str(log_path), NEVER_MS, ["command.search=0"])
+
+    _invoke("all_contacts", managers)
+    _invoke("search_contact", managers, by="name", query="ivan")
+    _invoke("all_notes", managers)
+
+    assert [entry.split()[2] for entry in _entries(log_path)] == ["operation=command.search_contact"]
+
+
+def test_manager_calls_are_logged_by_their_own_threshold(managers, log_path):
+    enable_slow_log(str(log_path), NEVER_MS, ["contacts.search_by_name=0"])
+
+    _invoke("search_contact", managers, by="name", query="ivan")
+
+    entries = _entries(log_path)
+    assert len(entries) == 1
+    assert "operation=contacts.search_by_name " in entries[0]
+    assert "args=('ivan',)" in entries[0]
+
+
+def test_the_longest_matching_prefix_sets_the_threshold(log_path):
+    slow_log.enable(str(log_path), NEVER_MS, {"command": 1000, "command.search": 0})
+
+    assert slow_log.threshold_ns("command.search_contact") == 0
+    assert slow_log.threshold_ns("command.all_contacts") == 1000 * 1_000_000
+    assert slow_log.threshold_ns("contacts.search_by_name") == NEVER_MS * 1_000_000
+
+
+@pytest.mark.parametrize("value", ["command", "command=", "=100", "command=-1", "command=fast"])
+def test_malformed_thresholds_are_refused(value):
+    with pytest.raises(ValueError):
+        parse_thresholds([value])
@@ -0,0 +1,78 @@
+import pytest
+
+import storage.storage as storage_module
+from models import Contact, Note
+from storage import ContactStorage, NoteStorage
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    """Collects the records each save serializes again instead of writing their kept fragment."""
+    records = []
+    encode_record = storage_module._encode_record
+
+    def counting_encode_record(item):
+        records.append(item)
+        return encode_record(item)
+
+    monkeypatch.setattr(storage_module, "_encode_record", counting_encode_record)
+    return records
+
+
+def _contacts():
+    return [
+        Contact(name=name, address="Kyiv", phone_number="0501234567", email="ivan@example.com", birthday="01.02.1990")
+        for name in ("Ivan Petrenko", "Olena Shevchenko", "Petro Bondarenko")
+    ]
+
+
+def test_a_save_encodes_only_the_edited_contact(tmp_path, encoded):
+    path = tmp_path / "contacts_data.json"
+    storage = ContactStorage(file_path=path)
+    contacts = _contacts()
+    storage.save_data(contacts)
+    before = [contact.to_dict() for contact in ContactStorage(file_path=path).load_data()]
+    encoded.clear()
+
+    contacts[1].address = "Lviv"
+    assert contacts[1].dirty and not contacts[0].dirty
+    storage.save_data(contacts)
+
+    assert [item["name"] for item in encoded] == ["Olena Shevchenko"]
+    after = [contact.to_dict() for contact in ContactStorage(file_path=path).load_data()]
+    assert [old == new for old, new in zip(before, after)] == [True, False, True]
+    assert after[1]["address"] == "Lviv"
+
+
+def test_an_unchanged_save_writes_the_same_text_without_encoding(tmp_path, encoded):
+    path = tmp_path / "contacts_data.json"
+    storage = ContactStorage(file_path=path)
+    contacts = _contacts()
+    storage.save_data(contacts)
+    text = path.read_text(encoding="utf-8")
+    encoded.clear()
+
+    storage.save_data(contacts)
+
+    assert encoded == []
+    assert path.read_text(encoding="utf-8") == text
+
+
+def test_changing_the_tags_in_place_drops_the_fragment(tmp_path, encoded):
+    path = tmp_path / "note_data.json"
+    storage = NoteStorage(file_path=path)
+    notes = [Note(id=n, title=f"Note {n}", contact="", content="Text", tags=["home"]) for n in (1, 2)]
+    storage.save_data(notes)
+    assert notes[0].fragment is not None
+    encoded.clear()
+
+    notes[0].tags.append("work")
+    assert notes[0].dirty and not notes[1].dirty
+    storage.save_data(notes)
+
+    assert [item["id"] for item in encoded] == [1]
+    assert [note.tags for note in NoteStorage(file_path=path).load_data()] == [["home", "work"], ["home"]]
+
+    # Assigning new tags drops the fragment as well
+    notes[1].tags = ["ideas"]
+    assert notes[1].dirty
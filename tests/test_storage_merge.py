@@ -0,0 +1,34 @@
+from metrics import metrics
+from models import Contact
+from storage import ContactStorage
+
+
+def _contact(name: str, email: str) -> Contact:
+    return Contact(name=name, address="", phone_number="0501234567", email=email, birthday="01.01.1990")
+
+
+def test_save_merges_the_changes_of_another_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    metrics.reset()
+    path = tmp_path / "contacts_data.json"
+    ContactStorage(file_path=path).save_data([_contact("Ivan", "ivan@example.com"), _contact("Olena", "olena@example.com")])
+
+    ours = ContactStorage(file_path=path)
+    theirs = ContactStorage(file_path=path)
+    our_data = ours.load_data()
+    their_data = theirs.load_data()
+
+    their_data[1] = _contact("Olena", "olena@work.com")
+    their_data.append(_contact("Petro", "petro@example.com"))
+    theirs.save_data(their_data)
+
+    our_data[0] = _contact("Ivan", "ivan@work.com")
+    assert ours.save_data(our_data) is True
+
+    saved = {contact.name: contact.email for contact in ContactStorage(file_path=path).load_data()}
+    assert saved == {"Ivan": "ivan@work.com", "Olena": "olena@work.com", "Petro": "petro@example.com"}
+
+    # The merge read is accounted to the merge step of the save, not as a load of its own
+    operations = {stats["operation"]: stats for stats in metrics.snapshot()}
+    assert operations["storage.save.contacts_data.json.merge"]["count"] == 1
+    assert operations["storage.save.contacts_data.json.merge"]["bytes_read"] > 0
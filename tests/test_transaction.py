@@ -0,0 +1,96 @@
+import pytest
+
+from managers import ContactManager, NoteManager
+from models import Contact, Note
+from storage import ContactStorage, NoteStorage
+
+
+@pytest.fixture
+def contact_manager(tmp_path):
+    return ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+
+
+def _contact(name: str, address: str = "") -> Contact:
+    return Contact(name=name, address=address, phone_number="0501234567", email="ivan@example.com", birthday="01.02.1990")
+
+
+def test_a_failed_nested_block_undoes_only_its_own_changes(contact_manager):
+    with contact_manager.transaction():
+        contact_manager.add_contact(_contact("Ivan Petrenko"))
+        with pytest.raises(RuntimeError):
+            with contact_manager.transaction():
+                contact_manager.add_contact(_contact("Olena Shevchenko"))
+                contact_manager.remove_contact("Ivan Petrenko")
+                raise RuntimeError("the block fails")
+        assert [contact.name for contact in contact_manager.contacts] == ["Ivan Petrenko"]
+        contact_manager.add_contact(_contact("Petro Bondarenko"))
+
+    saved = ContactStorage(file_path=contact_manager.storage.file_path).load_data()
+    assert [contact.name for contact in saved] == ["Ivan Petrenko", "Petro Bondarenko"]
+
+
+@pytest.fixture
+def saved_contacts(contact_manager):
+    for name in ("Ivan Petrenko", "Olena Shevchenko", "Petro Bondarenko"):
+        contact_manager.add_contact(_contact(name, address="Kyiv"))
+    return list(contact_manager.contacts)
+
+
+def _state(manager):
+    return [(id(contact), contact.to_dict()) for contact in manager.contacts]
+
+
+def test_a_failed_transaction_restores_edited_removed_and_added_contacts(contact_manager, saved_contacts):
+    before = _state(contact_manager)
+    text = contact_manager.storage.file_path.read_text(encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with contact_manager.transaction():
+            contact_manager.edit_contact("Olena Shevchenko", _contact("Olena Kovalenko", address="Lviv"))
+            contact_manager.remove_contact("Ivan Petrenko")
+            contact_manager.add_contact(_contact("Taras Melnyk"))
+            contact_manager.remove_contact("Petro Bondarenko")
+            raise RuntimeError("the transaction fails")
+
+    # The same objects, in the same order, with the same fields
+    assert _state(contact_manager) == before
+    assert contact_manager.storage.file_path.read_text(encoding="utf-8") == text
+    # Lookups built during the transaction are dropped with it
+    assert contact_manager.find_contact("Olena Shevchenko") is saved_contacts[1]
+    assert contact_manager.find_contact("Olena Kovalenko") is None
+    assert contact_manager.find_contact("Taras Melnyk") is None
+
+
+def test_a_committed_transaction_saves_once(contact_manager, saved_contacts, monkeypatch):
+    saves = []
+    save_data = contact_manager.storage.save_data
+    monkeypatch.setattr(contact_manager.storage, "save_data", lambda records: saves.append(len(records)) or save_data(records))
+
+    with contact_manager.transaction():
+        contact_manager.edit_contact("Olena Shevchenko", _contact("Olena Shevchenko", address="Lviv"))
+        contact_manager.remove_contact("Ivan Petrenko")
+        contact_manager.add_contact(_contact("Taras Melnyk"))
+        assert saves == []
+
+    assert saves == [3]
+    saved = ContactStorage(file_path=contact_manager.storage.file_path).load_data()
+    assert [(contact.name, contact.address) for contact in saved] == [
+        ("Olena Shevchenko", "Lviv"), ("Petro Bondarenko", "Kyiv"), ("Taras Melnyk", ""),
+    ]
+
+
+def test_a_failed_transaction_restores_notes_changed_in_place(tmp_path):
+    manager = NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+    for n in (1, 2, 3):
+        manager.add_note(Note(id=n, title=f"Note {n}", contact="Ivan", content=f"Text {n}", tags=["home"]))
+    before = [(note.id, note.content, list(note.tags)) for note in manager.notes]
+
+    with pytest.raises(RuntimeError):
+        with manager.transaction():
+            manager.add_tag(1, "work")
+            manager.edit_note(3, Note(id=3, title="Note 3", contact="Ivan", content="Changed", tags=["work"]))
+            manager.remove_note("Note 2")
+            raise RuntimeError("the transaction fails")
+
+    assert [(note.id, note.content, list(note.tags)) for note in manager.notes] == before
+    assert [note.id for note in manager.search_by_tag("work")] == []
@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+from managers import ContactManager, NoteManager
+from managers.duplicate_finder import MergeSuggestion
+from managers.undo_log import UndoLog
+from models import Contact, Note
+from storage import ContactStorage, NoteStorage
+
+
+@pytest.fixture
+def managers(tmp_path):
+    contact_manager = ContactManager(storage=ContactStorage(file_path=tmp_path / "contacts_data.json"))
+    note_manager = NoteManager(storage=NoteStorage(file_path=tmp_path / "note_data.json"))
+    contact_manager.undo_log = note_manager.undo_log = UndoLog()
+    return contact_manager, note_manager
+
+
+def _contact(name: str, address: str = "") -> Contact:
+    return Contact(name=name, address=address, phone_number="0501234567", email="ivan@example.com", birthday="01.02.1990")
+
+
+def test_undoing_a_merge_restores_the_duplicates_and_keeps_earlier_steps(managers):
+    contact_manager, note_manager = managers
+    primary = _contact("Ivan Petrenko")
+    duplicate = _contact("Ivan Petrenk0", address="Kyiv")
+    contact_manager.add_contact(primary)
+    note_manager.add_note(Note(id=1, title="Call Ivan", contact="Ivan Petrenko", content="About the trip"))
+    contact_manager.add_contact(duplicate)
+    contact_manager.add_contact(_contact("Olena Shevchenko"))
+
+    contact_manager.merge_duplicates([MergeSuggestion(primary, [duplicate], 100.0)])
+    assert primary.address == "Kyiv"
+    assert [contact.name for contact in contact_manager.contacts] == ["Ivan Petrenko", "Olena Shevchenko"]
+
+    assert contact_manager.undo_log.undo() == "merge 1 duplicate contact(s)"
+    assert [contact.name for contact in contact_manager.contacts] == [
+        "Ivan Petrenko", "Ivan Petrenk0", "Olena Shevchenko"
+    ]
+    assert contact_manager.contacts[1] is duplicate
+    assert primary.address == ""
+
+    assert contact_manager.undo_log.redo() == "merge 1 duplicate contact(s)"
+    assert primary.address == "Kyiv"
+    assert contact_manager.find_contact("Ivan Petrenk0") is None
+
+    # The merge does not wipe the steps before it, of either manager
+    contact_manager.undo_log.undo()
+    for _ in range(3):
+        contact_manager.undo_log.undo()
+    assert note_manager.notes == []
+    assert [contact.name for contact in contact_manager.contacts] == ["Ivan Petrenko"]
+
+
+def test_a_merge_changed_since_is_not_undone(managers):
+    contact_manager, _ = managers
+    primary = _contact("Ivan Petrenko")
+    duplicate = _contact("Ivan Petrenk0", address="Kyiv")
+    contact_manager.add_contact(primary)
+    contact_manager.add_contact(duplicate)
+    contact_manager.merge_duplicates([MergeSuggestion(primary, [duplicate], 100.0)])
+
+    primary.address = "Lviv"
+    with pytest.raises(ValueError):
+        contact_manager.undo_log.undo()
+    assert [contact.name for contact in contact_manager.contacts] == ["Ivan Petrenko"]
+    assert primary.address == "Lviv"
+
+
+def test_an_undo_waiting_for_a_manager_does_not_block_the_log(managers):
+    contact_manager, _ = managers
+    contact_manager.add_contact(_contact("Ivan Petrenko"))
+    undo_log = contact_manager.undo_log
+
+    # A writer holds the manager while an undo waits for it
+    with contact_manager.lock.write():
+        undoing = threading.Thread(target=undo_log.undo, daemon=True)
+        undoing.start()
+        undoing.join(timeout=0.2)
+        # The log's lock, which the writer needs to record its change, is free
+        reading = threading.Thread(target=undo_log.stats, daemon=True)
+        reading.start()
+        reading.join(timeout=2)
+        assert not reading.is_alive()
+
+    undoing.join(timeout=2)
+    assert not undoing.is_alive()
+    assert contact_manager.contacts == []
+
+
+def test_a_step_that_stops_applying_partway_is_rolled_back_inside_a_batch(managers):
+    contact_manager, _ = managers
+    undo_log = contact_manager.undo_log
+    with undo_log.step("add_contact"):
+        contact_manager.add_contact(_contact("Ivan Petrenko"))
+        contact_manager.add_contact(_contact("Olena Shevchenko"))
+    # Replaced without the log, so undoing the first addition no longer applies
+    contact_manager.undo_log = None
+    contact_manager.edit_contact("Ivan Petrenko", _contact("Ivan Petrenko", address="Kyiv"))
+    contact_manager.undo_log = undo_log
+
+    with contact_manager.transaction():
+        with pytest.raises(ValueError):
+            undo_log.undo()
+        # Taking out the second contact, which did apply, was rolled back with the step
+        assert [contact.name for contact in contact_manager.contacts] == ["Ivan Petrenko", "Olena Shevchenko"]